@@ -0,0 +1,106 @@
+"""Sustained connect rate on loopback for each connector tuning option.
+
+Usage:
+    python benchmarks/connect_rate.py [--duration 5] [--concurrency 200]
+
+Prints one JSON object per tuning variant with the sustained connections per
+second and how many TIME_WAIT entries the run left behind.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+from scanhero.connector import Connector
+from scanhero.resources import _time_wait_count
+
+
+VARIANTS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "linger_zero": {"linger_zero": True},
+    "syn_retries": {"syn_retries": 1},
+    "source_pool": {"source_addresses": ["127.0.0.1", "127.0.0.2", "127.0.0.3", "127.0.0.4"]},
+    "all": {
+        "linger_zero": True,
+        "syn_retries": 1,
+        "source_addresses": ["127.0.0.1", "127.0.0.2", "127.0.0.3", "127.0.0.4"],
+    },
+}
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Wait for the client to close first, as a scanned service would."""
+    try:
+        await reader.read()
+    except ConnectionResetError:
+        pass
+    writer.close()
+
+
+async def run_variant(name: str, options: Dict[str, Any], port: int, duration: float, concurrency: int) -> Dict[str, Any]:
+    """Connect and close as fast as possible for a fixed duration.
+    
+    Args:
+        name: Variant name.
+        options: Connector keyword arguments.
+        port: Loopback port of the listener.
+        duration: How long to run in seconds.
+        concurrency: Number of concurrent connect loops.
+    
+    Returns:
+        Benchmark record for the variant.
+    """
+    connector = Connector(**options)
+    time_wait_before = _time_wait_count() or 0
+    deadline = time.perf_counter() + duration
+    counts = {"connections": 0, "errors": 0}
+    
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                _, writer = await connector.open_connection("127.0.0.1", port)
+                writer.close()
+                await writer.wait_closed()
+                counts["connections"] += 1
+            except OSError:
+                counts["errors"] += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "variant": name,
+        "options": options,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "connections": counts["connections"],
+        "errors": counts["errors"],
+        "connections_per_s": round(counts["connections"] / elapsed, 1),
+        "time_wait_delta": (_time_wait_count() or 0) - time_wait_before,
+    }
+
+
+async def main() -> None:
+    """Run every variant against a loopback listener."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--variant", choices=sorted(VARIANTS), action="append")
+    args = parser.parse_args()
+    
+    server = await asyncio.start_server(_handle, "0.0.0.0", 0, backlog=4096)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        for name in args.variant or list(VARIANTS):
+            record = await run_variant(name, VARIANTS[name], port, args.duration, args.concurrency)
+            print(json.dumps(record), flush=True)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""Scan throughput, latency and footprint against loopback stand-in servers.
+
+Usage:
+    python benchmarks/scan_bench.py [--ports 100 1000 5000]
+        [--concurrency 50 200 1000] [--detection off on] [--output FILE]
+
+Every case runs ``PortScanner.scan`` in a fresh subprocess, so peak RSS is
+measured per case, and prints one JSON object per case with ports per second,
+p50/p99 per-port latency, peak RSS and CPU time per port.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from scanhero import PortScanner, ScanConfig
+
+from servers import StandInServers
+
+
+# Listeners of each kind started for every case; all other ports refuse
+LISTENERS_PER_KIND = 10
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Get a percentile by the nearest-rank method.
+    
+    Args:
+        values: Sample values.
+        fraction: Percentile as a fraction between 0 and 1.
+    
+    Returns:
+        The percentile, or None for an empty sample.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Get the peak resident set size of this process in KiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def run_case(port_count: int, concurrency: int, detection: bool) -> Dict[str, Any]:
+    """Scan a mix of stand-in ports once and measure the scan.
+    
+    Args:
+        port_count: Total number of ports to scan.
+        concurrency: Maximum number of concurrent connects.
+        detection: Whether service detection is enabled.
+    
+    Returns:
+        Benchmark record for the case.
+    """
+    listeners = min(LISTENERS_PER_KIND, port_count // 4)
+    refusing = port_count - 3 * listeners
+    
+    async with StandInServers(listeners, listeners, listeners, refusing) as servers:
+        config = ScanConfig(
+            timeout=1.0,
+            max_concurrent=concurrency,
+            service_detection=detection,
+            null_probe_timeout=0.2,
+            banner_timeout=0.5,
+            retry_count=0,
+        )
+        scanner = PortScanner(config)
+        
+        # Time every port from the moment it gets a connect slot until its
+        # result, including service detection
+        latencies: List[float] = []
+        scan_single_port = scanner._scan_single_port
+        
+        async def timed_scan_single_port(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await scan_single_port(*args, **kwargs)
+            finally:
+                latencies.append((time.perf_counter() - started) * 1000)
+        
+        scanner._scan_single_port = timed_scan_single_port  # type: ignore[assignment]
+        
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        result = await scanner.scan("127.0.0.1", servers.all_ports)
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_before
+    
+    return {
+        "ports": port_count,
+        "concurrency": concurrency,
+        "detection": detection,
+        "duration_s": round(elapsed, 4),
+        "ports_per_s": round(port_count / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 0.50) or 0.0, 3),
+        "latency_p99_ms": round(percentile(latencies, 0.99) or 0.0, 3),
+        "peak_rss_kb": peak_rss_kb(),
+        "cpu_per_port_us": round(cpu / port_count * 1e6, 2),
+        "open": len(result.open_ports),
+        "closed": len(result.closed_ports),
+        "filtered": len(result.filtered_ports),
+        "services_detected": sum(1 for p in result.open_ports if p.service is not None),
+        "python": sys.version.split()[0],
+    }
+
+
+def run_in_subprocess(port_count: int, concurrency: int, detection: bool) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter.
+    
+    Args:
+        port_count: Total number of ports to scan.
+        concurrency: Maximum number of concurrent connects.
+        detection: Whether service detection is enabled.
+    
+    Returns:
+        Benchmark record for the case.
+    """
+    command = [
+        sys.executable, __file__, "--case",
+        str(port_count), str(concurrency), "on" if detection else "off",
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def main() -> None:
+    """Run every combination of port count, concurrency and detection."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--detection", choices=["off", "on"], nargs="+", default=["off", "on"])
+    parser.add_argument("--output", help="Also write all records to this file as a JSON array")
+    parser.add_argument("--case", nargs=3, metavar=("PORTS", "CONCURRENCY", "DETECTION"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.case:
+        port_count, concurrency, detection = args.case
+        record = asyncio.run(run_case(int(port_count), int(concurrency), detection == "on"))
+        print(json.dumps(record))
+        return
+    
+    records = []
+    for port_count, concurrency, detection in itertools.product(args.ports, args.concurrency, args.detection):
+        record = run_in_subprocess(port_count, concurrency, detection == "on")
+        records.append(record)
+        print(json.dumps(record), flush=True)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Local loopback stand-in servers for ScanHero benchmarks.
+
+Four kinds of ports are provided:
+
+- open: accepts and waits for the client to close, never speaks;
+- silent: accepts and never speaks or closes (a server-speaks-second service);
+- banner: sends a banner as soon as a client connects;
+- refusing: nothing listens, so connects are refused.
+"""
+
+import asyncio
+import socket
+from typing import Dict, List
+
+
+BANNER = b"SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.1\r\n"
+
+
+class StandInServers:
+    """A set of loopback listeners of each kind.
+    
+    Use as an async context manager; the port numbers of each kind are
+    available in ``ports`` while it is active.
+    """
+    
+    def __init__(self, open_count: int = 5, silent_count: int = 5, banner_count: int = 5, refusing_count: int = 5) -> None:
+        """Initialize stand-in servers.
+        
+        Args:
+            open_count: Number of open listeners.
+            silent_count: Number of silent listeners.
+            banner_count: Number of banner listeners.
+            refusing_count: Number of refusing ports to reserve.
+        """
+        self.counts = {
+            "open": open_count,
+            "silent": silent_count,
+            "banner": banner_count,
+            "refusing": refusing_count,
+        }
+        self.ports: Dict[str, List[int]] = {kind: [] for kind in self.counts}
+        self._servers: List[asyncio.AbstractServer] = []
+        self._connections: List[asyncio.StreamWriter] = []
+    
+    async def __aenter__(self) -> "StandInServers":
+        """Start all listeners."""
+        handlers = {
+            "open": self._handle_open,
+            "silent": self._handle_silent,
+            "banner": self._handle_banner,
+        }
+        for kind, handler in handlers.items():
+            for _ in range(self.counts[kind]):
+                server = await asyncio.start_server(handler, "127.0.0.1", 0, backlog=1024)
+                self._servers.append(server)
+                self.ports[kind].append(server.sockets[0].getsockname()[1])
+        
+        self.ports["refusing"] = self._free_ports(self.counts["refusing"])
+        return self
+    
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop all listeners and drop held connections."""
+        for writer in self._connections:
+            writer.close()
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+    
+    @property
+    def all_ports(self) -> List[int]:
+        """All stand-in ports, sorted."""
+        return sorted(port for ports in self.ports.values() for port in ports)
+    
+    def _free_ports(self, count: int) -> List[int]:
+        """Find loopback ports with no listener.
+        
+        Args:
+            count: Number of ports to find.
+        
+        Returns:
+            Port numbers that refuse connections.
+        """
+        taken = {port for ports in self.ports.values() for port in ports}
+        sockets = []
+        ports: List[int] = []
+        try:
+            while len(ports) < count:
+                sock = socket.socket()
+                sockets.append(sock)
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+                if port not in taken:
+                    ports.append(port)
+        finally:
+            for sock in sockets:
+                sock.close()
+        return ports
+    
+    async def _handle_open(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Wait for the client to close."""
+        try:
+            await reader.read()
+        except ConnectionError:
+            pass
+        writer.close()
+    
+    async def _handle_silent(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Hold the connection open without ever answering."""
+        self._connections.append(writer)
+        try:
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+    
+    async def _handle_banner(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Send a banner, then wait for the client to close."""
+        try:
+            writer.write(BANNER)
+            await writer.drain()
+            await reader.read()
+        except ConnectionError:
+            pass
+        writer.close()
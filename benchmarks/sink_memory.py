@@ -0,0 +1,154 @@
+"""Peak memory of a many-host scan collected in a list versus written to a sink.
+
+Usage:
+    python benchmarks/sink_memory.py [--hosts 1000 10000 50000] [--ports 100]
+
+Every case scans a uniform simulated network in a fresh subprocess, so peak RSS is
+measured per case, and prints one JSON object per case. With ``scan_hosts``
+peak RSS grows with hosts x ports; with ``scan_to_sink`` and a JSONL sink it
+stays flat once the window of hosts in flight is full.
+"""
+
+import argparse
+import asyncio
+import errno
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from scanhero import PortScanner, ScanConfig
+from scanhero.simulation import SimulatedWriter
+from scanhero.sinks import JSONLSink
+from scanhero.transport import Transport
+
+
+# Ports that accept on every simulated host; all others refuse
+OPEN_PORTS = {22, 80}
+
+
+class UniformNetwork(Transport):
+    """Answers every host the same way, keeping no per-connection state.
+    
+    SimulatedNetwork remembers every (host, port) it has seen, which would
+    hide the scanner's own footprint at this scale.
+    """
+    
+    async def open_connection(self, host: str, port: int) -> Tuple[asyncio.StreamReader, SimulatedWriter]:
+        await asyncio.sleep(0)
+        if port not in OPEN_PORTS:
+            raise ConnectionRefusedError(errno.ECONNREFUSED, "Connection refused")
+        reader = asyncio.StreamReader()
+        return reader, SimulatedWriter(reader, None, 0.0)
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Get the peak resident set size of this process in KiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def addresses(count: int) -> Iterator[str]:
+    """Generate consecutive addresses in 10.0.0.0/8."""
+    for i in range(1, count + 1):
+        yield f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+async def run_case(host_count: int, port_count: int, mode: str) -> Dict[str, Any]:
+    """Scan simulated hosts once and measure the scan.
+    
+    Args:
+        host_count: Number of hosts to scan.
+        port_count: Number of ports per host.
+        mode: "list" to collect results with scan_hosts, "sink" to write
+            them to a JSONL sink with scan_to_sink.
+    
+    Returns:
+        Benchmark record for the case.
+    """
+    config = ScanConfig(timeout=1.0, max_concurrent=1000, retry_count=0, service_detection=False)
+    scanner = PortScanner(config, transport=UniformNetwork())
+    ports = list(range(1, port_count + 1))
+    rss_before = peak_rss_kb()
+    started = time.perf_counter()
+    
+    if mode == "list":
+        results = await scanner.scan_hosts(addresses(host_count), ports)
+        open_count = sum(r.open_count for r in results)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            with JSONLSink(os.path.join(directory, "results.jsonl")) as sink:
+                summary = await scanner.scan_to_sink(addresses(host_count), ports, sink)
+        open_count = summary.open_count
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "hosts": host_count,
+        "ports_per_host": port_count,
+        "open_ports": open_count,
+        "seconds": round(elapsed, 3),
+        "ports_per_second": round(host_count * port_count / elapsed),
+        "rss_before_kb": rss_before,
+        "peak_rss_kb": peak_rss_kb(),
+        "python": sys.version.split()[0],
+    }
+
+
+def run_in_subprocess(host_count: int, port_count: int, mode: str) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter.
+    
+    Args:
+        host_count: Number of hosts to scan.
+        port_count: Number of ports per host.
+        mode: "list" or "sink".
+    
+    Returns:
+        Benchmark record for the case.
+    """
+    command = [sys.executable, __file__, "--case", str(host_count), str(port_count), mode]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def main() -> None:
+    """Run every combination of host count and mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--ports", type=int, default=100)
+    parser.add_argument("--modes", choices=["list", "sink"], nargs="+", default=["list", "sink"])
+    parser.add_argument("--output", help="Also write all records to this file as a JSON array")
+    parser.add_argument("--case", nargs=3, metavar=("HOSTS", "PORTS", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.case:
+        host_count, port_count, mode = args.case
+        record = asyncio.run(run_case(int(host_count), int(port_count), mode))
+        print(json.dumps(record))
+        return
+    
+    records = []
+    for host_count, mode in itertools.product(args.hosts, args.modes):
+        record = run_in_subprocess(host_count, args.ports, mode)
+        records.append(record)
+        print(json.dumps(record), flush=True)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
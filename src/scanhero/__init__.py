@@ -8,10 +8,27 @@ __version__ = "1.0.0"
 __author__ = "Ahmet Hero"
 __email__ = "ahmet@example.com"
 
-from .scanner import PortScanner, ScanResult
-from .models import ServiceInfo, ScanConfig
-from .cli import main as cli_main
-from .exceptions import ScanHeroError, ScanTimeoutError, InvalidTargetError
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .scanner import PortScanner
+    from .models import ScanResult, ServiceInfo, ScanConfig
+    from .cli import main as cli_main
+    from .exceptions import ScanHeroError, ScanTimeoutError, InvalidTargetError
+
+# Public names are imported on first access, so that ``import scanhero`` in a
+# short-lived process only pays for the parts it actually uses.
+_LAZY_ATTRIBUTES: Dict[str, Tuple[str, str]] = {
+    "PortScanner": (".scanner", "PortScanner"),
+    "ScanResult": (".models", "ScanResult"),
+    "ServiceInfo": (".models", "ServiceInfo"),
+    "ScanConfig": (".models", "ScanConfig"),
+    "cli_main": (".cli", "main"),
+    "ScanHeroError": (".exceptions", "ScanHeroError"),
+    "ScanTimeoutError": (".exceptions", "ScanTimeoutError"),
+    "InvalidTargetError": (".exceptions", "InvalidTargetError"),
+}
 
 __all__ = [
     "PortScanner",
@@ -23,3 +40,29 @@ __all__ = [
     "ScanTimeoutError",
     "InvalidTargetError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name on first access.
+    
+    Args:
+        name: Attribute name.
+    
+    Returns:
+        The attribute.
+    
+    Raises:
+        AttributeError: If the package has no such attribute.
+    """
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List module attributes, including the lazily imported ones."""
+    return sorted(set(globals()) | set(__all__))
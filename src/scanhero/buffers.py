@@ -0,0 +1,75 @@
+"""Reusable receive buffers for ScanHero.
+
+Banner grabbing reads a few hundred bytes from each of many thousands of
+connections. Receiving into a fresh bytes object every time churns the
+allocator; the pool hands out preallocated buffers instead and takes them
+back once the banner has been matched and decoded.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Union
+
+# Bytes received from a service, usually a view into a pooled buffer
+Response = Union[bytes, memoryview]
+
+
+class BufferPool:
+    """Pool of fixed-size receive buffers.
+    
+    The pool never blocks: when every buffer is leased, a new one is
+    allocated, and at most ``capacity`` idle buffers are kept for reuse.
+    """
+    
+    def __init__(self, size: int, capacity: int = 64) -> None:
+        """Initialize the pool.
+        
+        Args:
+            size: Size of each buffer in bytes.
+            capacity: Maximum number of idle buffers kept.
+        
+        Raises:
+            ValueError: If size or capacity is less than 1.
+        """
+        if size < 1:
+            raise ValueError("Buffer size must be at least 1")
+        if capacity < 1:
+            raise ValueError("Pool capacity must be at least 1")
+        self.size = size
+        self.capacity = capacity
+        self._free: List[bytearray] = []
+    
+    @property
+    def idle(self) -> int:
+        """Get the number of idle buffers."""
+        return len(self._free)
+    
+    def acquire(self) -> bytearray:
+        """Take a buffer from the pool, allocating one if none is idle."""
+        if self._free:
+            return self._free.pop()
+        return bytearray(self.size)
+    
+    def release(self, buffer: bytearray) -> None:
+        """Return a buffer to the pool.
+        
+        Args:
+            buffer: Buffer previously taken with :meth:`acquire`.
+        """
+        if len(self._free) < self.capacity:
+            self._free.append(buffer)
+    
+    @contextmanager
+    def lease(self) -> Iterator[memoryview]:
+        """Lease a buffer for the duration of a ``with`` block.
+        
+        Yields:
+            Writable view of the whole buffer. Slices of it must not outlive
+            the block, since the buffer is handed out again afterwards.
+        """
+        buffer = self.acquire()
+        view = memoryview(buffer)
+        try:
+            yield view
+        finally:
+            view.release()
+            self.release(buffer)
@@ -0,0 +1,78 @@
+"""Time-bounded caches shared across scans.
+
+Used for DNS answers and service fingerprints, so that a long-running process
+does not resolve or fingerprint the same host over and over.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """A size-bounded cache whose entries expire after a fixed time.
+    
+    When full, the least recently stored entry is evicted first.
+    """
+    
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize cache.
+        
+        Args:
+            ttl: Lifetime of an entry in seconds.
+            max_entries: Maximum number of entries kept.
+            clock: Monotonic time source.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: K) -> Optional[V]:
+        """Look up a live entry.
+        
+        Args:
+            key: Cache key.
+        
+        Returns:
+            The cached value, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > self._clock():
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def set(self, key: K, value: V) -> None:
+        """Store an entry.
+        
+        Args:
+            key: Cache key.
+            value: Value to cache.
+        """
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        """Get the number of stored entries, including expired ones."""
+        return len(self._entries)
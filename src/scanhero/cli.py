@@ -2,13 +2,16 @@
 
 import argparse
 import asyncio
+import itertools
+import json
 import logging
 import sys
-from typing import List, Optional
+from typing import Any, Iterable, Iterator, List, Optional, Union
 from .scanner import PortScanner
-from .models import ScanConfig
+from .models import AUTO_CONCURRENCY, DEFAULT_DISCOVERY_PORTS, ENGINES, ScanConfig, ScanSummary
 from .formatters import get_formatter
 from .exceptions import ScanHeroError
+from .targets import ExclusionList, expand_targets, read_exclude_file, read_target_file
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -45,6 +48,219 @@ def parse_ports(ports_str: str) -> List[int]:
     return ports
 
 
+def parse_concurrency(value: str) -> Union[int, str]:
+    """Parse the --max-concurrent value.
+    
+    Args:
+        value: A positive integer or "auto".
+        
+    Returns:
+        The integer limit, or "auto".
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is neither.
+    """
+    if value == AUTO_CONCURRENCY:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"must be an integer or '{AUTO_CONCURRENCY}', got {value!r}"
+        )
+
+
+def add_scan_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options that tune scanning to a subcommand parser.
+    
+    Args:
+        parser: Subcommand parser.
+    """
+    parser.add_argument(
+        '--timeout', '-t',
+        type=float,
+        default=3.0,
+        help='Connection timeout in seconds (default: 3.0)'
+    )
+    
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        help='Timeout for each TCP connect in seconds (default: --timeout)'
+    )
+    
+    parser.add_argument(
+        '--banner-timeout',
+        type=float,
+        help='Timeout for each banner or probe read in seconds (default: --timeout)'
+    )
+    
+    parser.add_argument(
+        '--scan-deadline',
+        type=float,
+        help='Overall time budget for the scan in seconds; '
+             'unfinished ports are reported as unscanned'
+    )
+    
+    parser.add_argument(
+        '--max-concurrent', '-c',
+        type=parse_concurrency,
+        default=100,
+        help='Maximum concurrent connections, or "auto" to size it from the open '
+             'file limit and the ephemeral port range (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--max-per-host',
+        type=int,
+        help='Maximum concurrent connections to any one host (default: no per-host cap)'
+    )
+    
+    parser.add_argument(
+        '--max-per-subnet',
+        type=int,
+        help='Maximum concurrent connections to any one subnet of --subnet-prefix bits '
+             '(default: no per-subnet cap)'
+    )
+    
+    parser.add_argument(
+        '--subnet-prefix',
+        type=int,
+        default=24,
+        metavar='BITS',
+        help='Prefix length of the subnets --max-per-subnet applies to (default: 24)'
+    )
+    
+    add_exclude_options(parser)
+    
+    parser.add_argument(
+        '--exclude-ports',
+        type=parse_ports,
+        default=[],
+        metavar='PORTS',
+        help='Ports that are never scanned, e.g. 9100,515'
+    )
+    
+    parser.add_argument(
+        '--resolve-workers',
+        type=int,
+        default=64,
+        help='Number of hostnames resolved at once (default: 64)'
+    )
+    
+    parser.add_argument(
+        '--resolve-timeout',
+        type=float,
+        default=5.0,
+        help='Time allowed to resolve one hostname in seconds (default: 5.0)'
+    )
+    
+    parser.add_argument(
+        '--retry-count', '-r',
+        type=int,
+        default=1,
+        help='Number of retries for connections that failed with an unrecognized error (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--resource-retries',
+        type=int,
+        default=5,
+        help='Number of retries, with backoff, when local resources such as '
+             'file descriptors or ephemeral ports run out (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--linger-zero',
+        action='store_true',
+        help='Close connections with a RST (SO_LINGER 0) so they leave no TIME_WAIT entries'
+    )
+    
+    parser.add_argument(
+        '--syn-retries',
+        type=int,
+        help='Maximum SYN retransmissions per connect (Linux TCP_SYNCNT; default: kernel setting)'
+    )
+    
+    parser.add_argument(
+        '--source-address',
+        action='append',
+        default=[],
+        metavar='IP',
+        help='Local address to bind connections to; repeat to use a pool round-robin'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        choices=ENGINES,
+        default='asyncio',
+        help='How connects are driven: one asyncio task per port, or an epoll '
+             'worker thread for faster connect sweeps (Linux) (default: asyncio)'
+    )
+    
+    parser.add_argument(
+        '--no-service-detection',
+        action='store_true',
+        help='Disable service detection'
+    )
+    
+    parser.add_argument(
+        '--no-banner-grab',
+        action='store_true',
+        help='Disable banner grabbing'
+    )
+    
+    parser.add_argument(
+        '--detection-concurrency',
+        type=int,
+        default=20,
+        help='Maximum concurrent service detections, separate from connect slots (default: 20)'
+    )
+    
+    parser.add_argument(
+        '--detection-timeout',
+        type=float,
+        help='Overall time budget for detecting the service on one port in seconds'
+    )
+    
+    parser.add_argument(
+        '--scan-delay',
+        type=float,
+        default=0.0,
+        help='Delay between scans in seconds (default: 0.0)'
+    )
+    
+    parser.add_argument(
+        '--abandon-filtered',
+        type=int,
+        metavar='N',
+        help='Stop scanning a host after N filtered results with no open or closed '
+             'answer, and report its remaining ports as presumed filtered'
+    )
+    
+    parser.add_argument(
+        '--skip-discovery',
+        action='store_true',
+        help='Scan every host, without first probing which hosts are up'
+    )
+    
+    parser.add_argument(
+        '--discovery-ports',
+        type=parse_ports,
+        default=list(DEFAULT_DISCOVERY_PORTS),
+        metavar='PORTS',
+        help='Ports probed to find live hosts in multi-host scans '
+             f'(default: {",".join(map(str, DEFAULT_DISCOVERY_PORTS))})'
+    )
+    
+    parser.add_argument(
+        '--discovery-timeout',
+        type=float,
+        default=1.0,
+        help='Connect timeout for host discovery probes in seconds (default: 1.0)'
+    )
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create command-line argument parser.
     
@@ -57,7 +273,8 @@ def create_parser() -> argparse.ArgumentParser:
         epilog='Examples:\n'
                '  scanhero scan 192.168.1.1 --ports 80,443,22\n'
                '  scanhero scan example.com --ports 1-1000 --format json\n'
-               '  scanhero scan 10.0.0.1 --ports 80 --no-service-detection',
+               '  scanhero scan 10.0.0.1 --ports 80 --no-service-detection\n'
+               '  scanhero scan 10.0.0.0/24 --ports 22,80 --max-per-host 10',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
@@ -70,7 +287,16 @@ def create_parser() -> argparse.ArgumentParser:
     # Required arguments
     scan_parser.add_argument(
         'target',
-        help='Target host or IP address to scan'
+        nargs='?',
+        help='Target host, IP address or CIDR network to scan; '
+             'separate several targets with commas'
+    )
+    
+    scan_parser.add_argument(
+        '--target-file', '-iL',
+        metavar='FILE',
+        help='Read targets from FILE, or from stdin if FILE is "-", one or more per line; '
+             'the file is read lazily and each host is written out as soon as it is done'
     )
     
     scan_parser.add_argument(
@@ -92,60 +318,222 @@ def create_parser() -> argparse.ArgumentParser:
         help='Output file path (default: stdout)'
     )
     
-    # Scan options
     scan_parser.add_argument(
-        '--timeout', '-t',
-        type=float,
-        default=3.0,
-        help='Connection timeout in seconds (default: 3.0)'
+        '--sink',
+        choices=['jsonl', 'sqlite'],
+        help='Write each host to --output as soon as it is done, as JSON lines or into '
+             'an SQLite database, keeping only summary counts in memory. A JSON lines '
+             'file is overwritten; an existing database is added to'
     )
     
     scan_parser.add_argument(
-        '--max-concurrent', '-c',
-        type=int,
-        default=100,
-        help='Maximum concurrent connections (default: 100)'
+        '--metrics',
+        metavar='FILE',
+        help='Write scan metrics to FILE: JSON if it ends in .json, Prometheus text otherwise'
     )
     
     scan_parser.add_argument(
-        '--retry-count', '-r',
-        type=int,
-        default=1,
-        help='Number of retries for failed connections (default: 1)'
+        '--profile',
+        metavar='DIR',
+        help='Profile the scan and write cProfile data, event-loop lag and hot functions to DIR'
     )
     
+    add_scan_options(scan_parser)
+    
+    # Display options
     scan_parser.add_argument(
-        '--no-service-detection',
+        '--show-closed',
         action='store_true',
-        help='Disable service detection'
+        help='Show closed ports in console output'
     )
     
     scan_parser.add_argument(
-        '--no-banner-grab',
+        '--show-filtered',
         action='store_true',
-        help='Disable banner grabbing'
+        help='Show filtered ports in console output'
     )
     
-    scan_parser.add_argument(
-        '--scan-delay',
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Run a scan daemon with a local HTTP/JSON job API'
+    )
+    
+    serve_parser.add_argument(
+        '--listen',
+        default='127.0.0.1',
+        metavar='ADDRESS',
+        help='Address to listen on (default: 127.0.0.1)'
+    )
+    
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='Port to listen on (default: 8765)'
+    )
+    
+    serve_parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=4,
+        help='Maximum number of jobs running at once (default: 4)'
+    )
+    
+    serve_parser.add_argument(
+        '--max-job-hosts',
+        type=int,
+        default=65536,
+        help='Reject jobs whose targets expand to more hosts than this (default: 65536)'
+    )
+    
+    serve_parser.add_argument(
+        '--dns-ttl',
         type=float,
-        default=0.0,
-        help='Delay between scans in seconds (default: 0.0)'
+        default=300.0,
+        help='How long to cache DNS answers in seconds (default: 300)'
     )
     
-    # Display options
-    scan_parser.add_argument(
-        '--show-closed',
-        action='store_true',
-        help='Show closed ports in console output'
+    serve_parser.add_argument(
+        '--fingerprint-ttl',
+        type=float,
+        default=3600.0,
+        help='How long to reuse a detected service for the same host and port in seconds (default: 3600)'
     )
     
-    scan_parser.add_argument(
-        '--show-filtered',
+    serve_parser.add_argument(
+        '--schedule',
+        metavar='FILE',
+        help='Run the scheduled scans defined in the JSON file FILE as daemon jobs'
+    )
+    
+    add_scan_options(serve_parser)
+    
+    # Schedule command
+    schedule_parser = subparsers.add_parser(
+        'schedule',
+        help='Run recurring scans from a schedule file'
+    )
+    
+    schedule_parser.add_argument(
+        'schedule',
+        metavar='FILE',
+        help='JSON file with the scheduled scans'
+    )
+    
+    schedule_parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=2,
+        help='Maximum number of scan batches running at once (default: 2)'
+    )
+    
+    schedule_parser.add_argument(
+        '--output', '-o',
+        help='Append results to file as JSON lines instead of stdout'
+    )
+    
+    add_scan_options(schedule_parser)
+    
+    # Coordinator command
+    coordinator_parser = subparsers.add_parser(
+        'coordinator',
+        help='Split a scan into leases and hand them to workers over TCP'
+    )
+    
+    coordinator_parser.add_argument(
+        'target',
+        help='Target host, IP address or CIDR network to scan; '
+             'separate several targets with commas'
+    )
+    
+    coordinator_parser.add_argument(
+        '--ports', '-p',
+        default='1-1000',
+        help='Ports to scan (default: 1-1000)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--listen',
+        default='127.0.0.1',
+        metavar='ADDRESS',
+        help='Address to accept workers on (default: 127.0.0.1)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--port',
+        type=int,
+        default=8766,
+        help='Port to accept workers on (default: 8766)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--hosts-per-lease',
+        type=int,
+        default=16,
+        help='Maximum number of hosts per lease (default: 16)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--ports-per-lease',
+        type=int,
+        default=1024,
+        help='Maximum number of ports per lease (default: 1024)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--lease-timeout',
+        type=float,
+        default=60.0,
+        help='Seconds a silent worker keeps its lease before it is reassigned (default: 60)'
+    )
+    
+    add_exclude_options(coordinator_parser)
+    
+    coordinator_parser.add_argument(
+        '--no-service-detection',
         action='store_true',
-        help='Show filtered ports in console output'
+        help='Tell workers to skip service detection'
+    )
+    
+    coordinator_parser.add_argument(
+        '--format', '-f',
+        choices=['console', 'json', 'csv'],
+        default='console',
+        help='Output format (default: console)'
+    )
+    
+    coordinator_parser.add_argument(
+        '--output', '-o',
+        help='Output file path (default: stdout)'
+    )
+    
+    # Worker command
+    worker_parser = subparsers.add_parser(
+        'worker',
+        help='Scan leases handed out by a coordinator'
+    )
+    
+    worker_parser.add_argument(
+        'coordinator',
+        metavar='HOST:PORT',
+        help='Coordinator address'
+    )
+    
+    worker_parser.add_argument(
+        '--name',
+        help='Worker name reported to the coordinator (default: hostname and PID)'
     )
     
+    worker_parser.add_argument(
+        '--heartbeat',
+        type=float,
+        default=5.0,
+        help='Seconds between heartbeats while scanning (default: 5)'
+    )
+    
+    add_scan_options(worker_parser)
+    
     # General options
     parser.add_argument(
         '--verbose', '-v',
@@ -162,6 +550,103 @@ def create_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def add_exclude_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options that list addresses never to scan.
+    
+    Args:
+        parser: Parser to add the options to.
+    """
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        metavar='SPECS',
+        help='Addresses, CIDR networks or first-last ranges that are never scanned, '
+             'separated by commas; may be repeated'
+    )
+    
+    parser.add_argument(
+        '--exclude-file',
+        metavar='FILE',
+        help='Read exclusions from FILE, one or more per line'
+    )
+
+
+def read_exclusions(args: argparse.Namespace) -> List[str]:
+    """Collect the exclusions given by --exclude and --exclude-file.
+    
+    Args:
+        args: Parsed command-line arguments.
+    
+    Returns:
+        Exclusion specifications.
+    
+    Raises:
+        InvalidTargetError: If the exclude file cannot be read.
+    """
+    exclusions = list(args.exclude)
+    if args.exclude_file:
+        exclusions.extend(read_exclude_file(args.exclude_file))
+    return exclusions
+
+
+def build_config(args: argparse.Namespace, **overrides: Any) -> ScanConfig:
+    """Build the scan configuration from parsed scan options.
+    
+    Args:
+        args: Parsed command-line arguments.
+        **overrides: Extra ScanConfig fields.
+        
+    Returns:
+        Scan configuration.
+    """
+    return ScanConfig(
+        timeout=args.timeout,
+        max_concurrent=args.max_concurrent,
+        retry_count=args.retry_count,
+        resource_retries=args.resource_retries,
+        service_detection=not args.no_service_detection,
+        banner_grab=not args.no_banner_grab,
+        scan_delay=args.scan_delay,
+        connect_timeout=args.connect_timeout,
+        banner_timeout=args.banner_timeout,
+        scan_deadline=args.scan_deadline,
+        detection_concurrency=args.detection_concurrency,
+        detection_timeout=args.detection_timeout,
+        max_per_host=args.max_per_host,
+        max_per_subnet=args.max_per_subnet,
+        subnet_prefix=args.subnet_prefix,
+        linger_zero=args.linger_zero,
+        syn_retries=args.syn_retries,
+        source_addresses=args.source_address,
+        abandon_filtered=args.abandon_filtered,
+        host_discovery=not args.skip_discovery,
+        discovery_ports=args.discovery_ports,
+        discovery_timeout=args.discovery_timeout,
+        resolve_workers=args.resolve_workers,
+        resolve_timeout=args.resolve_timeout,
+        exclude=read_exclusions(args),
+        exclude_ports=args.exclude_ports,
+        engine=args.engine,
+        **overrides
+    )
+
+
+def write_metrics(scanner: PortScanner, path: str) -> None:
+    """Write the scanner's metrics to a file.
+    
+    Args:
+        scanner: Scanner whose metrics to export.
+        path: Output path; JSON if it ends in .json, Prometheus text otherwise.
+    """
+    if path.endswith('.json'):
+        content = json.dumps(scanner.metrics.to_dict(), indent=2)
+    else:
+        content = scanner.metrics.to_prometheus()
+    with open(path, 'w') as f:
+        f.write(content)
+
+
 async def run_scan(args: argparse.Namespace) -> int:
     """Run port scan with given arguments.
     
@@ -171,26 +656,65 @@ async def run_scan(args: argparse.Namespace) -> int:
     Returns:
         Exit code (0 for success, 1 for error).
     """
+    if args.sink and not args.output:
+        print("Error: --sink requires --output", file=sys.stderr)
+        return 1
+    if not args.target and not args.target_file:
+        print("Error: a target or --target-file is required", file=sys.stderr)
+        return 1
+    if args.target_file and not args.sink and args.format == 'csv':
+        print("Error: --target-file with --format csv requires --sink", file=sys.stderr)
+        return 1
+    source = 'stdin' if args.target_file == '-' else args.target_file
+    description = ' and '.join(part for part in (args.target, source and f"targets from {source}") if part)
+    
     try:
         # Parse ports
         ports = parse_ports(args.ports)
         
         # Create scan configuration
-        config = ScanConfig(
-            timeout=args.timeout,
-            max_concurrent=args.max_concurrent,
-            retry_count=args.retry_count,
-            service_detection=not args.no_service_detection,
-            banner_grab=not args.no_banner_grab,
-            scan_delay=args.scan_delay
-        )
+        config = build_config(args)
         
         # Create scanner
         scanner = PortScanner(config)
+        if scanner.resource_budget is not None:
+            print(f"Concurrency budget: {scanner.resource_budget.describe()}", file=sys.stderr)
+        
+        profiler = None
+        if args.profile:
+            from .profiling import ScanProfiler
+            profiler = ScanProfiler()
+            await profiler.start()
+        
+        if args.sink or args.target_file:
+            # Opens the target file now, so a bad path fails before scanning
+            target_iter = iter_targets(args, scanner.exclusions)
+            print(f"Scanning {description} on ports {args.ports}...", file=sys.stderr)
+            if args.sink:
+                summary = await scan_to_sink(scanner, args, ports, target_iter)
+            else:
+                summary = await stream_results(scanner, args, ports, target_iter)
+            await finish_scan(scanner, profiler, args)
+            print_summary(summary)
+            if args.output:
+                print(f"Results saved to {args.output}", file=sys.stderr)
+            return 0
         
         # Perform scan
-        print(f"Scanning {args.target} on ports {args.ports}...", file=sys.stderr)
-        result = await scanner.scan(args.target, ports)
+        print(f"Scanning {description} on ports {args.ports}...", file=sys.stderr)
+        targets = list(expand_targets(args.target, scanner.exclusions))
+        if not targets:
+            print("Error: no targets to scan", file=sys.stderr)
+            return 1
+        if len(targets) == 1:
+            results = [await scanner.scan(targets[0], ports)]
+        else:
+            results = await scanner.scan_hosts(targets, ports)
+        summary = ScanSummary()
+        for result in results:
+            summary.add(result)
+        summary.hosts_skipped = len(set(targets)) - sum(1 + len(r.aliases) for r in results)
+        summary.scan_duration = max((r.scan_duration for r in results), default=0.0)
         
         # Format output
         formatter_kwargs = {}
@@ -200,20 +724,26 @@ async def run_scan(args: argparse.Namespace) -> int:
                 'show_filtered': args.show_filtered
             })
         
-        formatter = get_formatter(args.format, **formatter_kwargs)
-        output = formatter.format(result)
+        with scanner.metrics.phase("format"):
+            formatter = get_formatter(args.format, **formatter_kwargs)
+            if len(results) == 1:
+                output = formatter.format(results[0])
+            else:
+                output = formatter.format_results(results)
         
         # Write output
         if args.output:
             with open(args.output, 'w') as f:
                 f.write(output)
-            print(f"Results saved to {args.output}", file=sys.stderr)
         else:
             print(output)
         
+        await finish_scan(scanner, profiler, args)
+        if args.output:
+            print(f"Results saved to {args.output}", file=sys.stderr)
+        
         # Print summary to stderr
-        print(f"\nScan completed in {result.scan_duration:.2f}s", file=sys.stderr)
-        print(f"Found {result.open_count} open ports out of {result.total_ports} scanned", file=sys.stderr)
+        print_summary(summary)
         
         return 0
         
@@ -231,6 +761,296 @@ async def run_scan(args: argparse.Namespace) -> int:
         return 1
 
 
+async def scan_to_sink(
+    scanner: PortScanner,
+    args: argparse.Namespace,
+    ports: List[int],
+    targets: Iterable[str]
+) -> ScanSummary:
+    """Scan the targets of a scan command into the sink chosen by --sink.
+    
+    Args:
+        scanner: Scanner to use.
+        args: Parsed command-line arguments.
+        ports: Ports to scan.
+        targets: Hosts to scan, read lazily.
+    
+    Returns:
+        Totals for the scan.
+    """
+    from .sinks import JSONLSink, ResultSink, SQLiteSink
+    
+    sink: ResultSink = JSONLSink(args.output) if args.sink == 'jsonl' else SQLiteSink(args.output)
+    with sink:
+        return await scanner.scan_to_sink(targets, ports, sink)
+
+
+async def stream_results(
+    scanner: PortScanner,
+    args: argparse.Namespace,
+    ports: List[int],
+    targets: Iterable[str]
+) -> ScanSummary:
+    """Scan a target file without --sink, writing each host as soon as it is done.
+    
+    Console output is written host by host and JSON output as JSON lines, so
+    memory stays bounded however long the target file is.
+    
+    Args:
+        scanner: Scanner to use.
+        args: Parsed command-line arguments.
+        ports: Ports to scan.
+        targets: Hosts to scan, read lazily.
+    
+    Returns:
+        Totals for the scan.
+    """
+    from .sinks import CallbackSink, JSONLSink, ResultSink
+    
+    stream = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        sink: ResultSink
+        if args.format == 'json':
+            sink = JSONLSink(stream=stream)
+        else:
+            formatter = get_formatter(
+                args.format, show_closed=args.show_closed, show_filtered=args.show_filtered
+            )
+            sink = CallbackSink(lambda result: print(formatter.format(result), file=stream, flush=True))
+        with sink:
+            return await scanner.scan_to_sink(targets, ports, sink)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def iter_targets(args: argparse.Namespace, exclude: Optional[ExclusionList] = None) -> Iterator[str]:
+    """Lazily expand the target argument and the target file of a scan command.
+    
+    Args:
+        args: Parsed command-line arguments.
+        exclude: Addresses to leave out.
+    
+    Returns:
+        Individual host names or IP addresses.
+    """
+    targets: List[Iterable[str]] = []
+    if args.target:
+        targets.append(expand_targets(args.target, exclude))
+    if args.target_file:
+        targets.append(read_target_file(args.target_file, exclude))
+    return itertools.chain.from_iterable(targets)
+
+
+async def finish_scan(scanner: PortScanner, profiler: Any, args: argparse.Namespace) -> None:
+    """Stop the profiler and write the metrics of a finished scan, if asked to.
+    
+    Args:
+        scanner: Scanner that ran the scan.
+        profiler: Running ScanProfiler, or None.
+        args: Parsed command-line arguments.
+    """
+    if profiler is not None:
+        await profiler.stop()
+        paths = profiler.write_report(args.profile)
+        print(f"Profile saved to {', '.join(paths)}", file=sys.stderr)
+    
+    if args.metrics:
+        write_metrics(scanner, args.metrics)
+        print(f"Metrics saved to {args.metrics}", file=sys.stderr)
+
+
+def print_summary(summary: ScanSummary) -> None:
+    """Print the totals of a scan to stderr.
+    
+    Args:
+        summary: Totals to print.
+    """
+    if summary.hosts_skipped:
+        print(
+            f"Host discovery: {summary.hosts_skipped} hosts answered no probe and were skipped",
+            file=sys.stderr
+        )
+    print(f"\nScan completed in {summary.scan_duration:.2f}s", file=sys.stderr)
+    print(f"Found {summary.open_count} open ports out of {summary.total_ports} scanned", file=sys.stderr)
+    if summary.unscanned_count:
+        print(
+            f"Scan deadline reached: {summary.unscanned_count} ports were not scanned",
+            file=sys.stderr
+        )
+    if summary.abandoned_hosts:
+        print(
+            f"{summary.abandoned_hosts} hosts looked fully filtered and were abandoned: "
+            f"{summary.presumed_filtered_count} ports presumed filtered",
+            file=sys.stderr
+        )
+
+
+async def run_serve(args: argparse.Namespace) -> int:
+    """Run the scan daemon until interrupted.
+    
+    Args:
+        args: Parsed command-line arguments.
+        
+    Returns:
+        Exit code (0 for success, 1 for error).
+    """
+    from .daemon import ScanDaemon
+    from .resolver import CachingResolver
+    from .scheduler import load_schedule
+    
+    try:
+        config = build_config(args, fingerprint_ttl=args.fingerprint_ttl)
+    except ScanHeroError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return 1
+    
+    try:
+        schedule = load_schedule(args.schedule) if args.schedule else None
+    except ScanHeroError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return 1
+    
+    resolver = CachingResolver(
+        ttl=args.dns_ttl, workers=config.resolve_workers, timeout=config.resolve_timeout
+    )
+    daemon = ScanDaemon(
+        PortScanner(config, resolver=resolver),
+        max_jobs=args.max_jobs,
+        schedule=schedule,
+        max_job_hosts=args.max_job_hosts
+    )
+    host, port = await daemon.start(args.listen, args.port)
+    print(f"Listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        await daemon.serve_forever()
+    finally:
+        await daemon.close()
+    return 0
+
+
+async def run_schedule(args: argparse.Namespace) -> int:
+    """Run scheduled scans until interrupted.
+    
+    Every finished batch is written as one JSON line per host.
+    
+    Args:
+        args: Parsed command-line arguments.
+        
+    Returns:
+        Exit code (0 for success, 1 for error).
+    """
+    from .formatters import JSONFormatter
+    from .scheduler import ScanScheduler, load_schedule, scanner_runner
+    
+    try:
+        config = build_config(args)
+        scans = load_schedule(args.schedule)
+        formatter = JSONFormatter()
+        
+        def on_result(scan: Any, results: List[Any]) -> None:
+            lines = "".join(
+                json.dumps({"schedule": scan.name, **formatter.result_to_dict(r)}, default=str) + "\n"
+                for r in results
+            )
+            if args.output:
+                with open(args.output, 'a') as f:
+                    f.write(lines)
+            else:
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+        
+        scheduler = ScanScheduler(
+            scanner_runner(PortScanner(config), on_result),
+            max_concurrent_jobs=args.max_jobs
+        )
+        for scan in scans:
+            scheduler.add(scan)
+    except ScanHeroError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return 1
+    
+    print(f"Running {len(scans)} scheduled scans", file=sys.stderr)
+    await scheduler.run_forever()
+    return 0
+
+
+async def run_coordinator(args: argparse.Namespace) -> int:
+    """Coordinate a distributed scan and print the merged results.
+    
+    Args:
+        args: Parsed command-line arguments.
+        
+    Returns:
+        Exit code (0 for success, 1 for error).
+    """
+    from .distributed import Coordinator
+    
+    try:
+        coordinator = Coordinator(
+            [args.target],
+            parse_ports(args.ports),
+            service_detection=False if args.no_service_detection else None,
+            hosts_per_lease=args.hosts_per_lease,
+            ports_per_lease=args.ports_per_lease,
+            lease_timeout=args.lease_timeout,
+            exclude=ExclusionList(read_exclusions(args))
+        )
+    except (ScanHeroError, ValueError) as e:
+        print(f"Error: {getattr(e, 'message', e)}", file=sys.stderr)
+        return 1
+    
+    host, port = await coordinator.start(args.listen, args.port)
+    print(f"Waiting for workers on {host}:{port}", file=sys.stderr)
+    try:
+        results = await coordinator.wait()
+    finally:
+        await coordinator.close()
+    
+    output = get_formatter(args.format).format_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    
+    progress = coordinator.progress()
+    print(
+        f"{progress['leases_done']} leases done, {progress['leases_failed']} failed, "
+        f"{sum(r.open_count for r in results)} open ports",
+        file=sys.stderr
+    )
+    return 1 if progress['leases_failed'] else 0
+
+
+async def run_worker(args: argparse.Namespace) -> int:
+    """Scan leases for a coordinator until it shuts down.
+    
+    Args:
+        args: Parsed command-line arguments.
+        
+    Returns:
+        Exit code (0 for success, 1 for error).
+    """
+    from .distributed import Worker
+    
+    host, _, port = args.coordinator.rpartition(':')
+    if not host or not port.isdigit():
+        print(f"Error: coordinator must be HOST:PORT, got {args.coordinator}", file=sys.stderr)
+        return 1
+    
+    try:
+        worker = Worker(PortScanner(build_config(args)), args.name, args.heartbeat)
+        done = await worker.run(host, int(port))
+    except (ScanHeroError, ConnectionError) as e:
+        print(f"Error: {getattr(e, 'message', e)}", file=sys.stderr)
+        return 1
+    
+    print(f"Worker {worker.name} completed {done} leases", file=sys.stderr)
+    return 0
+
+
 def main() -> int:
     """Main entry point for CLI.
     
@@ -251,6 +1071,20 @@ def main() -> int:
     # Run command
     if args.command == 'scan':
         return asyncio.run(run_scan(args))
+    if args.command == 'serve':
+        try:
+            return asyncio.run(run_serve(args))
+        except KeyboardInterrupt:
+            return 0
+    if args.command == 'coordinator':
+        return asyncio.run(run_coordinator(args))
+    if args.command == 'worker':
+        return asyncio.run(run_worker(args))
+    if args.command == 'schedule':
+        try:
+            return asyncio.run(run_schedule(args))
+        except KeyboardInterrupt:
+            return 0
     
     return 1
 
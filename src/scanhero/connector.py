@@ -0,0 +1,214 @@
+"""Socket-level connect tuning for ScanHero.
+
+The defaults of a TCP stack are tuned for long-lived connections, not for
+sweeps of short ones. The connector can:
+
+- close with SO_LINGER 0, which aborts the connection with a RST instead of a
+  FIN handshake and leaves no TIME_WAIT entry behind;
+- cap the number of SYN retransmissions (TCP_SYNCNT, Linux only) so the kernel
+  gives up on filtered ports no later than our own timeout;
+- bind to a rotating pool of local source addresses, each of which has its
+  own ephemeral port range.
+
+Raw connections skip the stream machinery altogether and receive with
+``recv_into`` straight into the caller's buffer.
+"""
+
+import asyncio
+import ipaddress
+import itertools
+import socket
+import struct
+from typing import Iterator, Optional, Sequence, Tuple
+from .transport import RawConnection, Transport
+
+
+class SocketConnection(RawConnection):
+    """Raw connection over a connected non-blocking socket."""
+    
+    def __init__(self, sock: socket.socket) -> None:
+        """Initialize the connection.
+        
+        Args:
+            sock: Connected non-blocking socket; the connection owns it.
+        """
+        self.sock = sock
+    
+    async def send(self, data: bytes) -> None:
+        """Send all of ``data``."""
+        await asyncio.get_running_loop().sock_sendall(self.sock, data)
+    
+    async def recv_into(self, buffer: memoryview) -> int:
+        """Receive into ``buffer``, returning the number of bytes written, 0 at EOF."""
+        return await asyncio.get_running_loop().sock_recv_into(self.sock, buffer)
+    
+    async def close(self) -> None:
+        """Close the connection."""
+        self.sock.close()
+
+
+class Connector(Transport):
+    """Opens real TCP connections with scan-specific socket tuning."""
+    
+    def __init__(
+        self,
+        linger_zero: bool = False,
+        syn_retries: Optional[int] = None,
+        source_addresses: Sequence[str] = ()
+    ) -> None:
+        """Initialize connector.
+        
+        Args:
+            linger_zero: Whether to close connections abortively with a RST.
+            syn_retries: Maximum number of SYN retransmissions, or None for
+                the kernel default. Ignored where TCP_SYNCNT is unavailable.
+            source_addresses: Local addresses to bind to, used round-robin.
+        """
+        self.linger_zero = linger_zero
+        self.syn_retries = syn_retries
+        self.source_addresses = list(source_addresses)
+        self._sources: Optional[Iterator[str]] = (
+            itertools.cycle(self.source_addresses) if self.source_addresses else None
+        )
+    
+    @property
+    def tuned(self) -> bool:
+        """Whether the connect itself needs a hand-built socket."""
+        return self._sources is not None or (
+            self.syn_retries is not None and hasattr(socket, "TCP_SYNCNT")
+        )
+    
+    async def open_connection(
+        self,
+        host: str,
+        port: int
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a TCP connection.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            (reader, writer) stream pair.
+        
+        Raises:
+            OSError: If the connection fails.
+        """
+        if self.tuned:
+            sock = await self._connect_socket(host, port)
+            reader, writer = await asyncio.open_connection(sock=sock)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        
+        if self.linger_zero:
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                self._set_linger_zero(sock)
+        
+        return reader, writer
+    
+    async def open_raw_connection(self, host: str, port: int) -> SocketConnection:
+        """Open a TCP connection that receives straight into caller buffers.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            Raw connection over the tuned socket.
+        
+        Raises:
+            OSError: If the connection fails.
+        """
+        sock = await self._connect_socket(host, port)
+        if self.linger_zero:
+            self._set_linger_zero(sock)
+        return SocketConnection(sock)
+    
+    @staticmethod
+    def _set_linger_zero(sock: socket.socket) -> None:
+        """Make closing the socket send a RST."""
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    
+    async def _connect_socket(self, host: str, port: int) -> socket.socket:
+        """Connect a hand-built, tuned non-blocking socket.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            Connected socket.
+        
+        Raises:
+            OSError: If resolution or the connection fails.
+        """
+        loop = asyncio.get_running_loop()
+        
+        source = next(self._sources) if self._sources is not None else None
+        family = socket.AF_UNSPEC
+        if source is not None:
+            family = socket.AF_INET6 if ipaddress.ip_address(source).version == 6 else socket.AF_INET
+        
+        infos = await loop.getaddrinfo(host, port, family=family, type=socket.SOCK_STREAM)
+        
+        # Try each address in turn, as socket.create_connection does
+        error = OSError(f"Could not resolve {host}")
+        for family, sock_type, proto, _, address in infos:
+            sock = socket.socket(family, sock_type, proto)
+            try:
+                self._prepare_socket(sock, source)
+                await loop.sock_connect(sock, address)
+            except OSError as e:
+                sock.close()
+                error = e
+                continue
+            except BaseException:
+                sock.close()
+                raise
+            return sock
+        raise error
+    
+    def create_socket(self, family: int) -> socket.socket:
+        """Create a tuned, non-blocking socket ready for a connect.
+        
+        Used by engines that drive connects themselves. SO_LINGER 0 is set
+        up front, so closing the socket at any point sends a RST.
+        
+        Args:
+            family: Address family of the target.
+        
+        Returns:
+            Unconnected socket, bound to the next source address if there
+            is a pool.
+        
+        Raises:
+            OSError: If the socket cannot be created or bound.
+        """
+        source = next(self._sources) if self._sources is not None else None
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            self._prepare_socket(sock, source)
+            if self.linger_zero:
+                self._set_linger_zero(sock)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+    
+    def _prepare_socket(self, sock: socket.socket, source: Optional[str]) -> None:
+        """Make a socket non-blocking, apply SYN retries and bind it.
+        
+        Args:
+            sock: Unconnected socket.
+            source: Local address to bind to, or None.
+        
+        Raises:
+            OSError: If an option cannot be set or the bind fails.
+        """
+        sock.setblocking(False)
+        if self.syn_retries is not None and hasattr(socket, "TCP_SYNCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_SYNCNT, self.syn_retries)
+        if source is not None:
+            sock.bind((source, 0))
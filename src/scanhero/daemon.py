@@ -0,0 +1,662 @@
+"""Long-running scan daemon with a local HTTP/JSON job API.
+
+One process, one event loop and one :class:`~scanhero.scanner.PortScanner`
+serve every job, so jobs share the global concurrency budget, the detection
+pool, the DNS cache and the fingerprint cache, and none of them pays for
+interpreter startup.
+
+Endpoints:
+
+- ``POST /jobs``: submit ``{"targets": ..., "ports": ..., "service_detection": ...}``;
+  ``targets`` is a target spec (host, IP, CIDR, comma-separated) or a list of them.
+- ``GET /jobs``: list jobs.
+- ``GET /jobs/<id>``: job status and, once available, its results.
+- ``GET /jobs/<id>/events``: newline-delimited JSON events, streamed until the
+  job ends.
+- ``DELETE /jobs/<id>``: cancel a queued or running job.
+- ``GET /health``: queue and cache statistics.
+- ``GET /metrics``: metrics of the shared scanner in Prometheus text format.
+- ``GET /schedules``: state of the scheduled scans.
+
+Scheduled scans (see :mod:`scanhero.scheduler`) are submitted as ordinary
+jobs, so they show up in ``/jobs`` and share the same job slots.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .exceptions import InvalidTargetError, ScanHeroError
+from .formatters import JSONFormatter
+from .hooks import Hooks
+from .models import PortResult, PortStatus, ServiceInfo
+from .resolver import CachingResolver
+from .scanner import PortScanner
+from .scheduler import ScanScheduler, ScheduledScan
+from .targets import count_targets, expand_targets
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = "1-1000"
+
+# Events kept per job for clients of /jobs/<id>/events
+DEFAULT_MAX_EVENTS = 10000
+
+# Hosts a single job may expand to; a job holds all of them in memory
+DEFAULT_MAX_JOB_HOSTS = 65536
+
+
+class JobStatus(Enum):
+    """Enumeration for scan job states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINAL_STATUSES = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class HTTPError(Exception):
+    """An error answered with an HTTP status and a JSON message."""
+    
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        """Initialize HTTP error.
+        
+        Args:
+            status: Response status.
+            message: Error message for the client.
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ScanJob:
+    """A submitted scan and the events it has produced so far."""
+    
+    def __init__(
+        self,
+        job_id: str,
+        targets: List[str],
+        ports: Union[str, List[int]],
+        service_detection: Optional[bool],
+        max_events: int = DEFAULT_MAX_EVENTS
+    ) -> None:
+        """Initialize job.
+        
+        Args:
+            job_id: Unique job identifier.
+            targets: Target specs to scan.
+            ports: Port spec, as accepted by ``PortScanner.scan``.
+            service_detection: Service detection override, or None.
+            max_events: Number of recent events kept for streaming clients.
+        """
+        self.id = job_id
+        self.targets = targets
+        self.ports = ports
+        self.service_detection = service_detection
+        self.status = JobStatus.QUEUED
+        self.created = datetime.now().isoformat()
+        self.started: Optional[str] = None
+        self.finished: Optional[str] = None
+        self.schedule: Optional[str] = None
+        self.results: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, str]] = []
+        self.events: List[Dict[str, Any]] = []
+        self.events_dropped = 0
+        self.max_events = max_events
+        self.task: Optional["asyncio.Task[None]"] = None
+        self._waiters: List["asyncio.Future[None]"] = []
+    
+    @property
+    def finished_running(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self.status in FINAL_STATUSES
+    
+    @property
+    def event_count(self) -> int:
+        """Number of events recorded so far, including dropped ones."""
+        return self.events_dropped + len(self.events)
+    
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Record an event and wake up streaming clients.
+        
+        Only the most recent ``max_events`` events are guaranteed to be kept;
+        the results and errors of the job are kept in full regardless.
+        
+        Args:
+            event: JSON-serializable event.
+        """
+        self.events.append(event)
+        if len(self.events) > self.max_events:
+            # Drop the older half in one go, so trimming stays cheap per event
+            dropped = len(self.events) - self.max_events // 2
+            del self.events[:dropped]
+            self.events_dropped += dropped
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    async def wait_for_event(self) -> None:
+        """Wait until the next event is recorded."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        await waiter
+    
+    async def wait(self) -> None:
+        """Wait until the job reaches a final state."""
+        while not self.finished_running:
+            await self.wait_for_event()
+    
+    def finish(self, status: JobStatus) -> None:
+        """Move the job to a final state.
+        
+        Args:
+            status: Final status.
+        """
+        self.status = status
+        self.finished = datetime.now().isoformat()
+        self.add_event({"event": "end", "job": self.id, "status": status.value})
+    
+    def to_dict(self, include_results: bool = False) -> Dict[str, Any]:
+        """Describe the job.
+        
+        Args:
+            include_results: Whether to include per-host results.
+        
+        Returns:
+            JSON-serializable job description.
+        """
+        data: Dict[str, Any] = {
+            "id": self.id,
+            "status": self.status.value,
+            "targets": self.targets,
+            "ports": self.ports,
+            "service_detection": self.service_detection,
+            "schedule": self.schedule,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "hosts_done": len(self.results),
+            "errors": self.errors,
+        }
+        if include_results:
+            data["results"] = self.results
+        return data
+
+
+class ScanDaemon:
+    """Job queue and HTTP/JSON API around a shared PortScanner."""
+    
+    def __init__(
+        self,
+        scanner: PortScanner,
+        resolver: Optional[CachingResolver] = None,
+        max_jobs: int = 4,
+        max_finished_jobs: int = 1000,
+        max_request_bytes: int = 1 << 20,
+        request_timeout: float = 10.0,
+        schedule: Optional[List[ScheduledScan]] = None,
+        max_job_events: int = DEFAULT_MAX_EVENTS,
+        max_job_hosts: int = DEFAULT_MAX_JOB_HOSTS
+    ) -> None:
+        """Initialize daemon.
+        
+        Args:
+            scanner: Scanner shared by all jobs.
+            resolver: DNS resolver shared by all jobs. Defaults to the
+                scanner's resolver.
+            max_jobs: Maximum number of jobs running at once.
+            max_finished_jobs: Number of finished jobs kept for polling.
+            max_request_bytes: Maximum accepted request body size.
+            request_timeout: Time allowed for a client to send its request.
+            schedule: Scans to run at fixed intervals as daemon jobs.
+            max_job_events: Number of recent events kept per job. A client
+                streaming events that falls further behind skips the
+                dropped ones.
+            max_job_hosts: Maximum number of hosts a job's targets may
+                expand to. Larger jobs are rejected when submitted.
+        """
+        self.scanner = scanner
+        self.resolver = resolver or scanner.resolver
+        self.max_jobs = max_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.max_request_bytes = max_request_bytes
+        self.request_timeout = request_timeout
+        self.max_job_events = max_job_events
+        self.max_job_hosts = max_job_hosts
+        self.jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._formatter = JSONFormatter()
+        self._ids = itertools.count(1)
+        self._queue: "asyncio.Queue[ScanJob]" = asyncio.Queue()
+        self._workers: List["asyncio.Task[None]"] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.scheduler = ScanScheduler(self.run_scheduled, max_concurrent_jobs=max_jobs)
+        for scan in schedule or []:
+            self.scheduler.add(scan)
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> Tuple[str, int]:
+        """Start the job workers and the HTTP listener.
+        
+        Args:
+            host: Address to listen on.
+            port: Port to listen on; 0 picks a free port.
+        
+        Returns:
+            (host, port) the daemon is listening on.
+        """
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.max_jobs)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.scheduler.start()
+        address = self._server.sockets[0].getsockname()
+        return str(address[0]), int(address[1])
+    
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        if self._server is None:
+            raise RuntimeError("Daemon is not started")
+        await self._server.serve_forever()
+    
+    async def close(self) -> None:
+        """Stop accepting requests and cancel all jobs."""
+        await self.scheduler.stop()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in self._workers + tasks:
+            task.cancel()
+        await asyncio.gather(*self._workers, *tasks, return_exceptions=True)
+        self._workers = []
+    
+    def submit(self, request: Dict[str, Any]) -> ScanJob:
+        """Validate a scan request and queue it.
+        
+        Args:
+            request: Decoded request body.
+        
+        Returns:
+            The queued job.
+        
+        Raises:
+            HTTPError: If the request is invalid.
+        """
+        if not isinstance(request, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        
+        targets = request.get("targets")
+        if isinstance(targets, str):
+            targets = [targets]
+        if not targets or not isinstance(targets, list) or not all(isinstance(t, str) for t in targets):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "targets must be a string or a list of strings")
+        hosts = sum(count_targets(spec) for spec in targets)
+        if hosts > self.max_job_hosts:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"targets expand to {hosts} hosts, more than the limit of {self.max_job_hosts}"
+            )
+        
+        ports = request.get("ports", DEFAULT_PORTS)
+        service_detection = request.get("service_detection")
+        if service_detection is not None and not isinstance(service_detection, bool):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "service_detection must be a boolean")
+        try:
+            self.scanner._parse_ports(ports)
+        except ScanHeroError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, e.message)
+        
+        job = ScanJob(str(next(self._ids)), targets, ports, service_detection, self.max_job_events)
+        self.jobs[job.id] = job
+        self._prune_jobs()
+        self._queue.put_nowait(job)
+        return job
+    
+    async def run_scheduled(self, scan: ScheduledScan, targets: List[str]) -> None:
+        """Run a batch of a scheduled scan as a job and wait for it.
+        
+        Args:
+            scan: Scheduled scan.
+            targets: Target specs of the batch.
+        """
+        job = self.submit({
+            "targets": targets,
+            "ports": scan.ports,
+            "service_detection": scan.service_detection,
+        })
+        job.schedule = scan.name
+        try:
+            await job.wait()
+        except asyncio.CancelledError:
+            self.cancel(job)
+            raise
+    
+    def cancel(self, job: ScanJob) -> None:
+        """Cancel a queued or running job.
+        
+        Args:
+            job: Job to cancel.
+        """
+        if job.status is JobStatus.QUEUED:
+            job.finish(JobStatus.CANCELLED)
+        elif job.task is not None:
+            job.task.cancel()
+    
+    def health(self) -> Dict[str, Any]:
+        """Describe the daemon's load and caches.
+        
+        Returns:
+            JSON-serializable statistics.
+        """
+        statuses = {status.value: 0 for status in JobStatus}
+        for job in self.jobs.values():
+            statuses[job.status.value] += 1
+        fingerprints = self.scanner.fingerprint_cache
+        return {
+            "jobs": statuses,
+            "max_jobs": self.max_jobs,
+            "connects_in_flight": self.scanner._limiter.in_flight,
+            "max_concurrent": self.scanner.max_concurrent,
+            "dns_cache": {
+                "entries": len(self.resolver.cache),
+                "hits": self.resolver.cache.hits,
+                "misses": self.resolver.cache.misses,
+            },
+            "fingerprint_cache": None if fingerprints is None else {
+                "entries": len(fingerprints),
+                "hits": fingerprints.hits,
+                "misses": fingerprints.misses,
+            },
+        }
+    
+    async def _work(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job = await self._queue.get()
+            if job.status is not JobStatus.QUEUED:
+                continue
+            job.task = asyncio.ensure_future(self._run_job(job))
+            # asyncio.wait does not cancel the job when only the job is cancelled
+            await asyncio.wait([job.task])
+    
+    async def _run_job(self, job: ScanJob) -> None:
+        """Resolve, scan and record the results of a job.
+        
+        Args:
+            job: Job to run.
+        """
+        job.status = JobStatus.RUNNING
+        job.started = datetime.now().isoformat()
+        job.add_event({"event": "start", "job": job.id})
+        try:
+            names = self._expand(job)
+            if names:
+                # Resolved once here, through the shared DNS cache; the
+                # scanner reuses the answers and applies the exclusions
+                resolution = await self.resolver.resolve_all(names)
+                results = await self.scanner.scan_hosts(
+                    names, job.ports, job.service_detection,
+                    hooks=self._job_hooks(job, resolution.names_by_address), resolution=resolution
+                )
+                for result in results:
+                    if result.address is None:
+                        # Did not resolve, or resolved to an excluded address
+                        for error in result.errors:
+                            self._record_error(job, result.target, error)
+                        continue
+                    for name in [result.target, *result.aliases]:
+                        data = self._formatter.result_to_dict(result)
+                        data["target"] = name
+                        data["address"] = result.address
+                        job.results.append(data)
+                        job.add_event({"event": "host", "job": job.id, "result": data})
+        except asyncio.CancelledError:
+            job.finish(JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.errors.append({"target": "", "error": str(e)})
+            job.finish(JobStatus.FAILED)
+        else:
+            job.finish(JobStatus.DONE)
+    
+    def _expand(self, job: ScanJob) -> List[str]:
+        """Expand the target specs of a job, recording invalid ones.
+        
+        Args:
+            job: Job whose targets to expand.
+        
+        Returns:
+            Distinct host names and addresses, in input order.
+        """
+        names: Dict[str, None] = {}
+        for spec in job.targets:
+            try:
+                for name in expand_targets(spec, self.scanner.exclusions):
+                    names[name] = None
+            except InvalidTargetError as e:
+                self._record_error(job, spec, e.message)
+        return list(names)
+    
+    def _job_hooks(self, job: ScanJob, names_by_ip: Dict[str, List[str]]) -> Hooks:
+        """Build the hooks that stream a job's open ports and services.
+        
+        Args:
+            job: Job being run.
+            names_by_ip: Mapping of IP address to requested names.
+        
+        Returns:
+            Hooks for the job's scan.
+        """
+        hooks = Hooks()
+        
+        def on_port_result(host: str, result: PortResult) -> None:
+            if result.status is PortStatus.OPEN:
+                for name in names_by_ip.get(host, [host]):
+                    job.add_event({
+                        "event": "port", "job": job.id, "target": name,
+                        "port": result.port, "status": result.status.value,
+                    })
+        
+        def on_service_detected(host: str, port: int, service: ServiceInfo) -> None:
+            for name in names_by_ip.get(host, [host]):
+                job.add_event({
+                    "event": "service", "job": job.id, "target": name, "port": port,
+                    "service": self._formatter.service_to_dict(service),
+                })
+        
+        hooks.register("on_port_result", on_port_result)
+        hooks.register("on_service_detected", on_service_detected)
+        return hooks
+    
+    def _record_error(self, job: ScanJob, target: str, message: str) -> None:
+        """Record a per-target error of a job.
+        
+        Args:
+            job: Job being run.
+            target: Target the error belongs to.
+            message: Error message.
+        """
+        job.errors.append({"target": target, "error": message})
+        job.add_event({"event": "error", "job": job.id, "target": target, "error": message})
+    
+    def _prune_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_finished_jobs``."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished_running]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP request.
+        
+        Args:
+            reader: Client stream reader.
+            writer: Client stream writer.
+        """
+        try:
+            method, path, body = await asyncio.wait_for(
+                self._read_request(reader), timeout=self.request_timeout
+            )
+            await self._route(method, path, body, writer)
+        except HTTPError as e:
+            await self._respond(writer, e.status, {"error": e.message})
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        """Read an HTTP request.
+        
+        Args:
+            reader: Client stream reader.
+        
+        Returns:
+            (method, path, body) of the request.
+        
+        Raises:
+            HTTPError: If the request is malformed or too large.
+        """
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        method, target, _ = request_line
+        
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value.strip())
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        
+        if length > self.max_request_bytes:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), target.split("?", 1)[0], body
+    
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        """Dispatch a request to its endpoint.
+        
+        Args:
+            method: HTTP method.
+            path: Request path without the query string.
+            body: Request body.
+            writer: Client stream writer.
+        
+        Raises:
+            HTTPError: For unknown endpoints and invalid requests.
+        """
+        parts = [part for part in path.split("/") if part]
+        
+        if parts == ["health"] and method == "GET":
+            await self._respond(writer, HTTPStatus.OK, self.health())
+        elif parts == ["metrics"] and method == "GET":
+            await self._respond_raw(
+                writer, HTTPStatus.OK, self.scanner.metrics.to_prometheus().encode(),
+                "text/plain; version=0.0.4"
+            )
+        elif parts == ["schedules"] and method == "GET":
+            await self._respond(writer, HTTPStatus.OK, self.scheduler.status())
+        elif parts == ["jobs"] and method == "GET":
+            await self._respond(writer, HTTPStatus.OK, [job.to_dict() for job in self.jobs.values()])
+        elif parts == ["jobs"] and method == "POST":
+            try:
+                request = json.loads(body or b"null")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+            submitted = self.submit(request)
+            await self._respond(writer, HTTPStatus.ACCEPTED, submitted.to_dict())
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No job {parts[1]}")
+            if len(parts) == 3 and parts[2] == "events" and method == "GET":
+                await self._stream_events(job, writer)
+            elif len(parts) == 2 and method == "GET":
+                await self._respond(writer, HTTPStatus.OK, job.to_dict(include_results=True))
+            elif len(parts) == 2 and method == "DELETE":
+                self.cancel(job)
+                await self._respond(writer, HTTPStatus.ACCEPTED, job.to_dict())
+            else:
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint {path}")
+    
+    async def _stream_events(self, job: ScanJob, writer: asyncio.StreamWriter) -> None:
+        """Stream a job's events as newline-delimited JSON until it ends.
+        
+        Args:
+            job: Job to follow.
+            writer: Client stream writer.
+        """
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        sent = 0
+        while True:
+            # Skip events dropped while this client was behind
+            sent = max(sent, job.events_dropped)
+            while sent < job.event_count:
+                event = job.events[sent - job.events_dropped]
+                writer.write(json.dumps(event, default=str).encode() + b"\n")
+                sent += 1
+            await writer.drain()
+            if job.finished_running and sent == job.event_count:
+                return
+            await job.wait_for_event()
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any) -> None:
+        """Send a JSON response.
+        
+        Args:
+            writer: Client stream writer.
+            status: Response status.
+            payload: JSON-serializable body.
+        """
+        body = json.dumps(payload, default=str).encode()
+        await self._respond_raw(writer, status, body, "application/json")
+    
+    async def _respond_raw(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str
+    ) -> None:
+        """Send a complete response.
+        
+        Args:
+            writer: Client stream writer.
+            status: Response status.
+            body: Response body.
+            content_type: Value of the Content-Type header.
+        """
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
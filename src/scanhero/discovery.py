@@ -0,0 +1,108 @@
+"""Host discovery for ScanHero.
+
+Before a sweep of many hosts, each host is probed on a few high-yield TCP
+ports with a short timeout. Any answer from the host, an accepted connection
+or a refusal (RST), proves it is up; hosts where every probe times out or is
+reported unreachable are left out of the full port scan, where they would
+otherwise burn the full connect timeout on every port.
+"""
+
+import asyncio
+from typing import Iterator, List
+from .limiter import ConcurrencyLimiter
+from .retry import ErrorClass, classify_error
+from .transport import Transport
+
+
+class HostDiscovery:
+    """Finds live hosts by probing a few TCP ports per host."""
+    
+    def __init__(
+        self,
+        transport: Transport,
+        limiter: ConcurrencyLimiter,
+        ports: List[int],
+        timeout: float
+    ) -> None:
+        """Initialize host discovery.
+        
+        Args:
+            transport: Transport used to open probe connections.
+            limiter: Concurrency limiter shared with the port scan.
+            ports: Ports to probe on every host.
+            timeout: Connect timeout in seconds for each probe.
+        """
+        self.transport = transport
+        self.limiter = limiter
+        self.ports = ports
+        self.timeout = timeout
+    
+    async def discover(self, hosts: List[str]) -> List[str]:
+        """Probe hosts and keep the live ones.
+        
+        Only as many hosts are probed at once as their probes fit in the
+        limiter's global cap, so the limiter never has a crowd of waiters.
+        
+        Args:
+            hosts: Hosts to probe.
+        
+        Returns:
+            Live hosts, in input order.
+        """
+        alive = [False] * len(hosts)
+        queue: Iterator[int] = iter(range(len(hosts)))
+        
+        async def work() -> None:
+            for index in queue:
+                alive[index] = await self.is_alive(hosts[index])
+        
+        workers = max(1, min(len(hosts), self.limiter.global_limit // max(1, len(self.ports))))
+        await asyncio.gather(*(work() for _ in range(workers)))
+        return [host for host, up in zip(hosts, alive) if up]
+    
+    async def is_alive(self, host: str) -> bool:
+        """Probe one host on all discovery ports at once.
+        
+        Args:
+            host: Host to probe.
+        
+        Returns:
+            True as soon as one probe gets an answer, False if none does.
+        """
+        probes = [asyncio.ensure_future(self._probe(host, port)) for port in self.ports]
+        try:
+            for probe in asyncio.as_completed(probes):
+                if await probe:
+                    return True
+            return False
+        finally:
+            for probe in probes:
+                probe.cancel()
+            await asyncio.gather(*probes, return_exceptions=True)
+    
+    async def _probe(self, host: str, port: int) -> bool:
+        """Probe one port.
+        
+        Args:
+            host: Host to probe.
+            port: Port to probe.
+        
+        Returns:
+            Whether the host answered. Errors that say nothing about the
+            host, such as running out of local sockets, count as an answer
+            so a host is never skipped because of a local problem.
+        """
+        slot = await self.limiter.acquire(host)
+        try:
+            reader, writer = await asyncio.wait_for(
+                self.transport.open_connection(host, port), timeout=self.timeout
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except OSError as e:
+            return classify_error(e) is not ErrorClass.FILTERED
+        finally:
+            slot.release()
@@ -0,0 +1,627 @@
+"""Distributed scanning: one coordinator, many workers, plain TCP.
+
+The coordinator splits the (host, port) space into leases of a few hosts
+and a slice of the ports. Workers connect to it, take one lease at a time,
+scan it with their own local :class:`~scanhero.scanner.PortScanner` and send
+back one result per host. The coordinator merges those into one
+:class:`~scanhero.models.ScanResult` per host.
+
+Messages are newline-delimited JSON objects with a ``type`` field:
+
+- worker -> coordinator: ``hello`` (``worker``), ``heartbeat``,
+  ``result`` (``lease``, ``result``) and ``done`` (``lease``);
+- coordinator -> worker: ``lease`` (``lease``, ``hosts``, ``ports``,
+  ``service_detection``, ``host_discovery``) and ``shutdown``.
+
+Host discovery runs once per chunk of hosts: only the lease with the
+chunk's first port slice is scanned with the worker's discovery settings.
+The chunk's other leases wait until it is done, then go out with discovery
+off and only the hosts that answered.
+
+A lease whose worker disconnects or stays silent for ``lease_timeout``
+seconds goes back to the queue for another worker. Results are buffered per
+lease and only merged on ``done``, so a reassigned lease never yields
+duplicate ports.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .exceptions import ConfigurationError, InvalidTargetError
+from .formatters import JSONFormatter
+from .models import PortResult, PortStatus, ScanResult, ServiceInfo, ServiceType, port_ranges
+from .scanner import PortScanner
+from .targets import ExclusionList, expand_targets
+
+logger = logging.getLogger(__name__)
+
+# Largest message either side accepts; a host result with many banners can
+# be far larger than asyncio's 64 KiB line default.
+MAX_MESSAGE_BYTES = 16 << 20
+
+
+@dataclass
+class Lease:
+    """A slice of the scan handed to one worker at a time.
+    
+    Attributes:
+        id: Lease identifier.
+        hosts: Hosts to scan.
+        ports: Ports to scan on every host.
+        attempts: Number of times the lease has been handed out.
+        results: Host results received from the current holder.
+        discovery: Id of the lease that runs host discovery for these hosts,
+            or None if this lease runs it itself.
+    """
+    id: str
+    hosts: List[str]
+    ports: List[int]
+    attempts: int = 0
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    discovery: Optional[str] = None
+
+
+def partition(
+    targets: Iterable[str],
+    ports: List[int],
+    hosts_per_lease: int = 16,
+    ports_per_lease: int = 1024,
+    exclude: Optional[ExclusionList] = None
+) -> Iterator[Lease]:
+    """Split a scan into leases, lazily.
+    
+    Args:
+        targets: Target specs (hosts, IP addresses, CIDR networks).
+        ports: Ports to scan on every host.
+        hosts_per_lease: Maximum number of hosts per lease.
+        ports_per_lease: Maximum number of ports per lease.
+        exclude: Addresses that are left out of every lease.
+    
+    Yields:
+        Leases covering every (host, port) pair exactly once. The leases of
+        one chunk of hosts are consecutive, and all but the first rely on
+        the first for host discovery.
+    """
+    ids = itertools.count(1)
+    port_slices = [ports[i:i + ports_per_lease] for i in range(0, len(ports), ports_per_lease)]
+    hosts = (host for spec in targets for host in expand_targets(spec, exclude))
+    while True:
+        chunk = list(itertools.islice(hosts, hosts_per_lease))
+        if not chunk:
+            return
+        first = Lease(str(next(ids)), chunk, port_slices[0])
+        yield first
+        for port_slice in port_slices[1:]:
+            yield Lease(str(next(ids)), chunk, port_slice, discovery=first.id)
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    """Encode a protocol message as one line."""
+    return json.dumps(message, default=str).encode() + b"\n"
+
+
+def _decode_port(data: Dict[str, Any]) -> PortResult:
+    """Rebuild a PortResult from its JSON form."""
+    service = None
+    if data.get("service"):
+        s = data["service"]
+        service = ServiceInfo(
+            service_type=ServiceType(s["type"]),
+            name=s["name"],
+            version=s["version"],
+            banner=s["banner"],
+            confidence=s["confidence"],
+        )
+    return PortResult(
+        port=data["port"],
+        status=PortStatus(data["status"]),
+        service=service,
+        response_time=data["response_time"],
+        error=data["error"],
+    )
+
+
+class Coordinator:
+    """Hands out leases to workers and merges their results."""
+    
+    def __init__(
+        self,
+        targets: Iterable[str],
+        ports: List[int],
+        service_detection: Optional[bool] = None,
+        hosts_per_lease: int = 16,
+        ports_per_lease: int = 1024,
+        lease_timeout: float = 60.0,
+        max_attempts: int = 3,
+        exclude: Optional[ExclusionList] = None
+    ) -> None:
+        """Initialize coordinator.
+        
+        Args:
+            targets: Target specs (hosts, IP addresses, CIDR networks).
+            ports: Ports to scan on every host.
+            service_detection: Service detection override sent to workers,
+                or None to let each worker use its own configuration.
+            hosts_per_lease: Maximum number of hosts per lease.
+            ports_per_lease: Maximum number of ports per lease.
+            lease_timeout: Seconds a worker may stay silent before its
+                lease is reassigned.
+            max_attempts: Times a lease is handed out before it is given up.
+            exclude: Addresses that are never handed out.
+        
+        Raises:
+            ConfigurationError: If a lease setting is out of range.
+            InvalidTargetError: If there are no targets or no ports.
+        """
+        if hosts_per_lease < 1 or ports_per_lease < 1:
+            raise ConfigurationError("Leases need at least one host and one port")
+        if lease_timeout <= 0:
+            raise ConfigurationError(f"lease_timeout must be positive, got {lease_timeout}")
+        if max_attempts < 1:
+            raise ConfigurationError(f"max_attempts must be at least 1, got {max_attempts}")
+        if not ports:
+            raise InvalidTargetError("No ports to scan")
+        
+        self.service_detection = service_detection
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.results: Dict[str, ScanResult] = {}
+        self.leases_done = 0
+        self.leases_failed = 0
+        self.workers: Dict[str, Optional[str]] = {}
+        self._source = partition(targets, ports, hosts_per_lease, ports_per_lease, exclude)
+        self._requeued: Deque[Lease] = deque()
+        first = next(self._source, None)
+        if first is None:
+            raise InvalidTargetError("No targets to scan")
+        self._requeued.append(first)
+        self._active: Dict[str, Lease] = {}
+        # Leases waiting for host discovery, by the id of the lease running it
+        self._parked: Dict[str, List[Lease]] = {}
+        # Hosts that answered discovery, or None if it failed, by lease id
+        self._discovered: Dict[str, Optional[Set[str]]] = {}
+        self._down: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._exhausted = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: List["asyncio.Task[None]"] = []
+        self._started = time.time()
+        self._timestamp = datetime.now().isoformat()
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 8766) -> Tuple[str, int]:
+        """Start accepting workers.
+        
+        Args:
+            host: Address to listen on.
+            port: Port to listen on; 0 picks a free port.
+        
+        Returns:
+            (host, port) the coordinator is listening on.
+        """
+        self._started = time.time()
+        self._timestamp = datetime.now().isoformat()
+        self._server = await asyncio.start_server(self._accept, host, port, limit=MAX_MESSAGE_BYTES)
+        address = self._server.sockets[0].getsockname()
+        return str(address[0]), int(address[1])
+    
+    async def wait(self) -> List[ScanResult]:
+        """Wait until every lease is done or given up.
+        
+        Returns:
+            One merged ScanResult per host, in lease order.
+        """
+        await self._finished.wait()
+        duration = time.time() - self._started
+        for result in self.results.values():
+            result.scan_duration = duration
+            for ports in (result.open_ports, result.closed_ports, result.filtered_ports):
+                ports.sort(key=lambda p: p.port)
+            result.ports_scanned.sort()
+            result.unscanned_ports.sort()
+            result.presumed_filtered = port_ranges(
+                port for first, last in result.presumed_filtered for port in range(first, last + 1)
+            )
+        return list(self.results.values())
+    
+    async def close(self) -> None:
+        """Stop accepting workers and drop their connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._handlers:
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        self._handlers = []
+    
+    def progress(self) -> Dict[str, Any]:
+        """Describe the state of the scan.
+        
+        Returns:
+            JSON-serializable progress counters.
+        """
+        return {
+            "leases_done": self.leases_done,
+            "leases_failed": self.leases_failed,
+            "leases_active": len(self._active),
+            "leases_requeued": len(self._requeued),
+            "workers": len(self.workers),
+            "hosts": len(self.results),
+        }
+    
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Track a worker connection so close() can cancel it."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._handlers.append(task)
+        try:
+            await self._serve_worker(reader, writer)
+        finally:
+            if task is not None and task in self._handlers:
+                self._handlers.remove(task)
+            writer.close()
+    
+    async def _serve_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Feed leases to one worker until the scan ends or the worker dies.
+        
+        Args:
+            reader: Worker stream reader.
+            writer: Worker stream writer.
+        """
+        peer = writer.get_extra_info("peername")
+        try:
+            hello = await self._receive(reader)
+        except (ConnectionError, asyncio.TimeoutError, ValueError):
+            return
+        if hello is None or hello.get("type") != "hello":
+            return
+        name = str(hello.get("worker") or peer)
+        self.workers[name] = None
+        logger.info("Worker %s joined", name)
+        
+        lease: Optional[Lease] = None
+        try:
+            while True:
+                lease = await self._next_lease()
+                if lease is None:
+                    writer.write(_encode({"type": "shutdown"}))
+                    await writer.drain()
+                    return
+                await self._run_lease(name, lease, reader, writer)
+                lease = None
+        except (ConnectionError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning("Worker %s lost: %s", name, e or type(e).__name__)
+        finally:
+            self.workers.pop(name, None)
+            if lease is not None:
+                self._release(lease)
+    
+    async def _run_lease(
+        self,
+        name: str,
+        lease: Lease,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """Hand a lease to a worker and collect its results.
+        
+        Args:
+            name: Worker name.
+            lease: Lease to run.
+            reader: Worker stream reader.
+            writer: Worker stream writer.
+        
+        Raises:
+            ConnectionError: If the worker disconnects.
+            asyncio.TimeoutError: If the worker stays silent too long.
+            ValueError: If the worker sends an invalid message.
+        """
+        lease.attempts += 1
+        lease.results = []
+        self._active[lease.id] = lease
+        self.workers[name] = lease.id
+        writer.write(_encode({
+            "type": "lease",
+            "lease": lease.id,
+            "hosts": lease.hosts,
+            "ports": lease.ports,
+            "service_detection": self.service_detection,
+            "host_discovery": False if lease.discovery is not None else None,
+        }))
+        await writer.drain()
+        
+        while True:
+            message = await self._receive(reader)
+            if message is None:
+                raise ConnectionError("worker disconnected")
+            kind = message.get("type")
+            if kind == "result" and message.get("lease") == lease.id:
+                lease.results.append(message["result"])
+            elif kind == "done" and message.get("lease") == lease.id:
+                self._complete(lease)
+                self.workers[name] = None
+                return
+            elif kind != "heartbeat":
+                raise ValueError(f"unexpected message {kind!r}")
+    
+    async def _receive(self, reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+        """Read one message, or None at end of stream.
+        
+        Raises:
+            asyncio.TimeoutError: If nothing arrives within the lease timeout.
+            ValueError: If the line is not a JSON object.
+        """
+        line = await asyncio.wait_for(reader.readline(), self.lease_timeout)
+        if not line:
+            return None
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError("message is not a JSON object")
+        return message
+    
+    async def _next_lease(self) -> Optional[Lease]:
+        """Wait for the next lease to hand out.
+        
+        Returns:
+            A lease, or None once every lease is done or given up.
+        """
+        while True:
+            if self._requeued:
+                return self._requeued.popleft()
+            if not self._exhausted:
+                lease = self._pull()
+                if lease is not None:
+                    return lease
+            if not self._active:
+                self._finished.set()
+                return None
+            self._changed.clear()
+            await self._changed.wait()
+    
+    def _release(self, lease: Lease) -> None:
+        """Put the lease of a lost worker back in the queue, or give it up.
+        
+        Args:
+            lease: Lease that was not completed.
+        """
+        self._active.pop(lease.id, None)
+        lease.results = []
+        if lease.attempts < self.max_attempts:
+            self._requeued.append(lease)
+        else:
+            logger.error("Giving up lease %s after %d attempts", lease.id, lease.attempts)
+            self.leases_failed += 1
+            for host in lease.hosts:
+                result = self._result_for(host)
+                result.unscanned_ports.extend(lease.ports)
+                result.incomplete = True
+                result.errors.append(f"Lease {lease.id} failed after {lease.attempts} attempts")
+            if lease.discovery is None:
+                self._settle(lease.id, None)
+        self._check_finished()
+        self._changed.set()
+    
+    def _complete(self, lease: Lease) -> None:
+        """Merge the results of a finished lease.
+        
+        Args:
+            lease: Completed lease.
+        """
+        self._active.pop(lease.id, None)
+        self.leases_done += 1
+        reported = set()
+        for data in lease.results:
+            reported.add(data["target"])
+            reported.update(data.get("aliases", []))
+            result = self._result_for(data["target"])
+            ports = data["ports"]
+            result.open_ports.extend(_decode_port(p) for p in ports["open"])
+            result.closed_ports.extend(_decode_port(p) for p in ports["closed"])
+            result.filtered_ports.extend(_decode_port(p) for p in ports["filtered"])
+            result.unscanned_ports.extend(data.get("unscanned_ports", []))
+            result.presumed_filtered.extend(tuple(r) for r in data.get("presumed_filtered", []))
+            result.incomplete = result.incomplete or data.get("incomplete", False)
+            result.errors.extend(data.get("errors", []))
+            result.ports_scanned.extend(data.get("ports_scanned", []))
+        for host in lease.hosts:
+            if host not in reported and host not in self._down:
+                # Dropped by the worker's host discovery
+                self._down.add(host)
+                self._result_for(host).errors.append(f"{host} is down: no answer to host discovery")
+        if lease.discovery is None:
+            self._settle(lease.id, {host for host in lease.hosts if host in reported})
+        lease.results = []
+        self._check_finished()
+        self._changed.set()
+    
+    def _check_finished(self) -> None:
+        """Mark the scan finished once no lease is left or outstanding."""
+        if self._requeued or self._active:
+            return
+        if not self._exhausted:
+            lease = self._pull()
+            if lease is not None:
+                self._requeued.append(lease)
+                return
+        self._finished.set()
+    
+    def _pull(self) -> Optional[Lease]:
+        """Take the next lease from the source that can be handed out now.
+        
+        Leases whose host discovery is still running are parked until it
+        is done.
+        
+        Returns:
+            A lease, or None once the source is exhausted.
+        """
+        for lease in self._source:
+            if lease.discovery is None:
+                # Every lease of the earlier chunks has left the source
+                self._discovered.clear()
+                return lease
+            if lease.discovery not in self._discovered:
+                self._parked.setdefault(lease.discovery, []).append(lease)
+            elif self._follow(lease, self._discovered[lease.discovery]):
+                return lease
+        self._exhausted = True
+        return None
+    
+    def _settle(self, lease_id: str, up: Optional[Set[str]]) -> None:
+        """Record a lease's host discovery and requeue the leases waiting for it.
+        
+        Args:
+            lease_id: Id of the lease that ran host discovery.
+            up: Hosts that answered, or None if the lease was given up.
+        """
+        self._discovered[lease_id] = up
+        for lease in self._parked.pop(lease_id, []):
+            if self._follow(lease, up):
+                self._requeued.append(lease)
+    
+    def _follow(self, lease: Lease, up: Optional[Set[str]]) -> bool:
+        """Narrow a lease to the hosts that answered discovery.
+        
+        Args:
+            lease: Lease that relied on another for host discovery.
+            up: Hosts that answered, or None if discovery never finished, in
+                which case the lease runs discovery itself.
+        
+        Returns:
+            Whether the lease has any host left to scan.
+        """
+        if up is None:
+            lease.discovery = None
+            return True
+        lease.hosts = [host for host in lease.hosts if host in up]
+        return bool(lease.hosts)
+    
+    def _result_for(self, host: str) -> ScanResult:
+        """Get or create the merged result of a host."""
+        result = self.results.get(host)
+        if result is None:
+            result = ScanResult(
+                target=host,
+                ports_scanned=[],
+                open_ports=[],
+                closed_ports=[],
+                filtered_ports=[],
+                scan_duration=0.0,
+                timestamp=self._timestamp,
+                errors=[],
+            )
+            self.results[host] = result
+        return result
+
+
+class Worker:
+    """Scans leases from a coordinator with a local PortScanner."""
+    
+    def __init__(
+        self,
+        scanner: PortScanner,
+        name: Optional[str] = None,
+        heartbeat_interval: float = 5.0
+    ) -> None:
+        """Initialize worker.
+        
+        Args:
+            scanner: Scanner to run leases with.
+            name: Name reported to the coordinator. Defaults to host name and PID.
+            heartbeat_interval: Seconds between heartbeats while scanning;
+                must be well below the coordinator's lease timeout.
+        """
+        self.scanner = scanner
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.leases_done = 0
+        self._formatter = JSONFormatter()
+    
+    async def run(self, host: str, port: int, connect_retry: float = 10.0) -> int:
+        """Work for a coordinator until it shuts down.
+        
+        Args:
+            host: Coordinator address.
+            port: Coordinator port.
+            connect_retry: Seconds to keep retrying the first connection,
+                so workers may start before the coordinator.
+        
+        Returns:
+            Number of leases completed.
+        
+        Raises:
+            ConnectionError: If the coordinator cannot be reached.
+        """
+        reader, writer = await self._connect(host, port, connect_retry)
+        try:
+            writer.write(_encode({"type": "hello", "worker": self.name}))
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("type") == "shutdown":
+                    break
+                if message.get("type") == "lease":
+                    await self._run_lease(message, writer)
+        finally:
+            writer.close()
+        return self.leases_done
+    
+    async def _connect(
+        self,
+        host: str,
+        port: int,
+        connect_retry: float
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Connect to the coordinator, retrying until it is up."""
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + connect_retry
+        while True:
+            try:
+                return await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+            except OSError:
+                if loop.time() >= give_up:
+                    raise ConnectionError(f"Cannot reach coordinator at {host}:{port}")
+                await asyncio.sleep(0.2)
+    
+    async def _run_lease(self, message: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        """Scan a lease and send its results.
+        
+        Args:
+            message: Lease message.
+            writer: Coordinator stream writer.
+        """
+        heartbeat = asyncio.ensure_future(self._heartbeat(writer))
+        try:
+            results = await self.scanner.scan_hosts(
+                message["hosts"], message["ports"], message.get("service_detection"),
+                host_discovery=message.get("host_discovery")
+            )
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        
+        for result in results:
+            data = self._formatter.result_to_dict(result)
+            data["ports_scanned"] = result.ports_scanned
+            writer.write(_encode({"type": "result", "lease": message["lease"], "result": data}))
+        writer.write(_encode({"type": "done", "lease": message["lease"]}))
+        await writer.drain()
+        self.leases_done += 1
+    
+    async def _heartbeat(self, writer: asyncio.StreamWriter) -> None:
+        """Tell the coordinator the worker is alive while a lease runs."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            writer.write(_encode({"type": "heartbeat"}))
+            await writer.drain()
@@ -0,0 +1,350 @@
+"""Epoll-driven connect engine for ScanHero.
+
+In a pure connect sweep, most of the CPU goes into per-connection asyncio
+bookkeeping: a task, a future, a ``wait_for`` timer and several callbacks for
+every port. The engine drives non-blocking connects with ``select.epoll`` in
+a tight loop on a worker thread instead:
+
+- connects are submitted from the event loop in batches;
+- timeouts live on a timer wheel, so arming and expiring one is O(1);
+- outcomes go back to the event loop in batches, one callback per turn of the
+  worker loop rather than one per connection.
+
+Only available where ``select.epoll`` is (Linux).
+"""
+
+import asyncio
+import errno
+import math
+import os
+import select
+import socket
+import threading
+import time
+from typing import Callable, Dict, Generic, List, NamedTuple, Optional, Tuple, TypeVar
+from .connector import Connector
+
+T = TypeVar("T")
+
+# Whether this platform can run the engine
+EPOLL_AVAILABLE = hasattr(select, "epoll")
+
+
+class ConnectOutcome(NamedTuple):
+    """Outcome of one connect driven by the engine.
+    
+    Attributes:
+        host: Target IP address.
+        port: Target port.
+        error: errno of the failed connect, 0 if it succeeded or timed out.
+        timed_out: Whether the connect got no answer within the timeout.
+        latency: Seconds from the connect call to the outcome.
+    """
+    host: str
+    port: int
+    error: int
+    timed_out: bool
+    latency: float
+
+
+class TimerWheel(Generic[T]):
+    """Hashed timer wheel with a fixed tick.
+    
+    Timers are bucketed by the tick in which they expire. A timer fires up to
+    one tick late but never early. Timers cannot be cancelled; the owner
+    ignores expired items that have already completed.
+    """
+    
+    def __init__(self, tick: float, horizon: float, now: float) -> None:
+        """Initialize the wheel.
+        
+        Args:
+            tick: Resolution of the wheel in seconds.
+            horizon: Longest delay that will be scheduled, in seconds.
+            now: Current time, on the clock later passed to the wheel.
+        
+        Raises:
+            ValueError: If tick or horizon is not positive.
+        """
+        if tick <= 0 or horizon <= 0:
+            raise ValueError("tick and horizon must be positive")
+        self.tick = tick
+        # One spare slot for rounding and one for the tick in progress
+        self._slots: List[List[T]] = [[] for _ in range(math.ceil(horizon / tick) + 2)]
+        self._origin = now
+        # Ticks are counted from the origin, so rounding errors never accumulate
+        self._current = 0
+        self._count = 0
+    
+    def __len__(self) -> int:
+        """Get the number of timers that have not expired."""
+        return self._count
+    
+    def schedule(self, item: T, delay: float, now: float) -> None:
+        """Arm a timer.
+        
+        Args:
+            item: Item returned by :meth:`advance` once the timer expires.
+            delay: Delay in seconds.
+            now: Current time.
+        
+        Raises:
+            ValueError: If the timer would expire beyond the horizon.
+        """
+        expiry = max(self._current + 1, math.ceil((now - self._origin + delay) / self.tick))
+        if expiry - self._current >= len(self._slots):
+            raise ValueError(f"Delay {delay} is beyond the wheel's horizon")
+        self._slots[expiry % len(self._slots)].append(item)
+        self._count += 1
+    
+    def advance(self, now: float) -> List[T]:
+        """Move the wheel forward to the current time.
+        
+        Args:
+            now: Current time.
+        
+        Returns:
+            Items whose timers expired, in expiry order.
+        """
+        target = int((now - self._origin) / self.tick)
+        if target <= self._current:
+            return []
+        if not self._count:
+            # Nothing to expire, so jump straight to the current tick
+            self._current = target
+            return []
+        
+        expired: List[T] = []
+        # Every armed timer expires within one turn of the wheel
+        first = max(self._current + 1, target - len(self._slots) + 1)
+        for index in range(first, target + 1):
+            slot = self._slots[index % len(self._slots)]
+            if slot:
+                expired.extend(slot)
+                slot.clear()
+        self._current = target
+        self._count -= len(expired)
+        return expired
+
+
+class _PendingConnect:
+    """A connect waiting for its socket to become writable."""
+    
+    __slots__ = ("sock", "host", "port", "started", "done")
+    
+    def __init__(self, sock: socket.socket, host: str, port: int, started: float) -> None:
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.started = started
+        self.done = False
+
+
+class EpollConnectEngine:
+    """Drives non-blocking connects with epoll on a worker thread.
+    
+    The engine only answers whether a connect succeeded, was refused or
+    timed out; sockets are closed as soon as that is known. Concurrency is
+    left to the caller, who decides how much to submit.
+    """
+    
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_outcomes: Callable[[List[ConnectOutcome]], None],
+        timeout: float,
+        connector: Optional[Connector] = None,
+        tick: float = 0.01
+    ) -> None:
+        """Initialize the engine.
+        
+        Args:
+            loop: Event loop that receives the outcomes.
+            on_outcomes: Called on the event loop with each batch of outcomes.
+            timeout: Connect timeout in seconds.
+            connector: Connector whose socket tuning (SYN retries, SO_LINGER
+                0, source addresses) is applied. If None, plain sockets are
+                used.
+            tick: Resolution of the timeout wheel in seconds.
+        
+        Raises:
+            RuntimeError: If epoll is not available on this platform.
+        """
+        if not EPOLL_AVAILABLE:
+            raise RuntimeError("The epoll connect engine needs select.epoll (Linux)")
+        self.loop = loop
+        self.on_outcomes = on_outcomes
+        self.timeout = timeout
+        self.connector = connector
+        self.tick = tick
+        self._queue: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._epoll = select.epoll()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+        self._thread = threading.Thread(target=self._run, name="scanhero-epoll-engine", daemon=True)
+    
+    def start(self) -> None:
+        """Start the worker thread."""
+        self._thread.start()
+    
+    def submit(self, targets: List[Tuple[str, int]]) -> None:
+        """Queue connects. Safe to call from any thread.
+        
+        Args:
+            targets: (IP address, port) pairs to connect to.
+        """
+        if self._stopping or not targets:
+            return
+        with self._lock:
+            self._queue.extend(targets)
+        self._wake()
+    
+    def close(self) -> None:
+        """Stop the worker thread and close every socket.
+        
+        Connects still in flight are dropped without an outcome.
+        """
+        if self._stopping:
+            return
+        self._stopping = True
+        if self._thread.is_alive():
+            self._wake()
+            self._thread.join()
+        else:
+            self._close_handles()
+    
+    def _wake(self) -> None:
+        """Interrupt the worker's epoll wait."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # The pipe is full, so a wakeup is already pending
+            pass
+    
+    def _run(self) -> None:
+        """Worker loop: start queued connects, collect answers and expire timeouts."""
+        pending: Dict[int, _PendingConnect] = {}
+        wheel: TimerWheel[_PendingConnect] = TimerWheel(self.tick, self.timeout, time.monotonic())
+        outcomes: List[ConnectOutcome] = []
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                for entry in wheel.advance(now):
+                    if not entry.done:
+                        del pending[entry.sock.fileno()]
+                        self._finish(entry, 0, True, now, outcomes)
+                
+                with self._lock:
+                    queued, self._queue = self._queue, []
+                for host, port in queued:
+                    self._start(host, port, now, pending, wheel, outcomes)
+                
+                if outcomes:
+                    self._deliver(outcomes)
+                    outcomes = []
+                
+                events = self._epoll.poll(self.tick if pending else -1)
+                now = time.monotonic()
+                for fd, _ in events:
+                    if fd == self._wake_r:
+                        self._drain_wakeups()
+                        continue
+                    answered = pending.pop(fd, None)
+                    if answered is not None:
+                        error = answered.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        self._finish(answered, error, False, now, outcomes)
+                
+                if outcomes:
+                    self._deliver(outcomes)
+                    outcomes = []
+        finally:
+            for entry in pending.values():
+                entry.sock.close()
+            self._close_handles()
+    
+    def _start(
+        self,
+        host: str,
+        port: int,
+        now: float,
+        pending: Dict[int, _PendingConnect],
+        wheel: "TimerWheel[_PendingConnect]",
+        outcomes: List[ConnectOutcome]
+    ) -> None:
+        """Start one non-blocking connect.
+        
+        Args:
+            host: Target IP address.
+            port: Target port.
+            now: Current time.
+            pending: Connects in flight, by file descriptor.
+            wheel: Timeout wheel.
+            outcomes: Receives the outcome if the connect finishes at once.
+        """
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        try:
+            if self.connector is not None:
+                sock = self.connector.create_socket(family)
+            else:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+                sock.setblocking(False)
+        except OSError as e:
+            outcomes.append(ConnectOutcome(host, port, e.errno or errno.EIO, False, 0.0))
+            return
+        
+        entry = _PendingConnect(sock, host, port, now)
+        try:
+            error = sock.connect_ex((host, port))
+        except OSError as e:
+            error = e.errno or errno.EIO
+        
+        if error != errno.EINPROGRESS:
+            self._finish(entry, error, False, now, outcomes)
+            return
+        
+        fd = sock.fileno()
+        pending[fd] = entry
+        self._epoll.register(fd, select.EPOLLOUT)
+        wheel.schedule(entry, self.timeout, now)
+    
+    def _finish(
+        self,
+        entry: _PendingConnect,
+        error: int,
+        timed_out: bool,
+        now: float,
+        outcomes: List[ConnectOutcome]
+    ) -> None:
+        """Close a connect's socket and record its outcome."""
+        entry.done = True
+        # Closing the socket also removes it from the epoll set
+        entry.sock.close()
+        outcomes.append(ConnectOutcome(entry.host, entry.port, error, timed_out, now - entry.started))
+    
+    def _deliver(self, outcomes: List[ConnectOutcome]) -> None:
+        """Hand a batch of outcomes to the event loop."""
+        try:
+            self.loop.call_soon_threadsafe(self.on_outcomes, outcomes)
+        except RuntimeError:
+            # The event loop is closed; nobody is waiting any more
+            self._stopping = True
+    
+    def _drain_wakeups(self) -> None:
+        """Empty the wakeup pipe."""
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+    
+    def _close_handles(self) -> None:
+        """Close the epoll object and the wakeup pipe, once."""
+        if self._epoll.closed:
+            return
+        self._epoll.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
@@ -1,5 +1,7 @@
 """Custom exceptions for ScanHero package."""
 
+import warnings
+
 
 class ScanHeroError(Exception):
     """Base exception class for all ScanHero errors."""
@@ -17,7 +19,12 @@ class ScanHeroError(Exception):
 
 
 class ScanTimeoutError(ScanHeroError):
-    """Raised when a scan operation times out."""
+    """Raised when a scan operation times out.
+    
+    Deprecated: ScanHero no longer raises it. A scan that runs past
+    ``scan_deadline`` returns a partial result with ``incomplete`` set and
+    the remaining ports in ``unscanned_ports``.
+    """
     
     def __init__(self, message: str = "Scan operation timed out") -> None:
         """Initialize scan timeout error.
@@ -25,6 +32,11 @@ class ScanTimeoutError(ScanHeroError):
         Args:
             message: Error message describing the timeout.
         """
+        warnings.warn(
+            "ScanTimeoutError is deprecated and never raised; check ScanResult.incomplete instead",
+            DeprecationWarning,
+            stacklevel=2
+        )
         super().__init__(message, "SCAN_TIMEOUT")
 
 
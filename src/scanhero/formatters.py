@@ -3,14 +3,12 @@
 import csv
 import json
 from io import StringIO
-from typing import Any, Dict, List, Optional
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from rich.panel import Panel
-from rich import box
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from .models import ScanResult, PortResult, PortStatus, ServiceType
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 
 class BaseFormatter:
     """Base class for output formatters."""
@@ -25,10 +23,25 @@ class BaseFormatter:
             Formatted string.
         """
         raise NotImplementedError
+    
+    def format_results(self, results: List[ScanResult]) -> str:
+        """Format the results of a multi-host scan.
+        
+        Args:
+            results: ScanResults to format, one per host.
+            
+        Returns:
+            Formatted string.
+        """
+        return "\n".join(self.format(result) for result in results)
 
 
 class ConsoleFormatter(BaseFormatter):
-    """Rich console formatter with colored output."""
+    """Rich console formatter with colored output.
+    
+    rich is only imported once a console formatter is created, so JSON and
+    CSV output never pay for loading it.
+    """
     
     def __init__(self, show_closed: bool = False, show_filtered: bool = False) -> None:
         """Initialize console formatter.
@@ -37,6 +50,8 @@ class ConsoleFormatter(BaseFormatter):
             show_closed: Whether to show closed ports.
             show_filtered: Whether to show filtered ports.
         """
+        from rich.console import Console
+        
         self.console = Console()
         self.show_closed = show_closed
         self.show_filtered = show_filtered
@@ -50,6 +65,11 @@ class ConsoleFormatter(BaseFormatter):
         Returns:
             Formatted string.
         """
+        from rich import box
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.table import Table
+        
         output = StringIO()
         console = Console(file=output, width=120)
         
@@ -71,6 +91,14 @@ class ConsoleFormatter(BaseFormatter):
         summary_table.add_row("Open Ports", str(result.open_count), style="green")
         summary_table.add_row("Closed Ports", str(result.closed_count), style="red")
         summary_table.add_row("Filtered Ports", str(result.filtered_count), style="yellow")
+        if result.incomplete:
+            summary_table.add_row(
+                "Unscanned Ports (deadline)", str(len(result.unscanned_ports)), style="dim"
+            )
+        if result.abandoned:
+            summary_table.add_row(
+                "Presumed Filtered (host abandoned)", str(result.presumed_filtered_count), style="dim"
+            )
         
         console.print(summary_table)
         console.print()
@@ -100,7 +128,7 @@ class ConsoleFormatter(BaseFormatter):
     
     def _create_ports_table(
         self,
-        console: Console,
+        console: "Console",
         ports: List[PortResult],
         title: str,
         style: str
@@ -113,6 +141,10 @@ class ConsoleFormatter(BaseFormatter):
             title: Table title.
             style: Style for the table.
         """
+        from rich import box
+        from rich.table import Table
+        from rich.text import Text
+        
         table = Table(title=title, box=box.ROUNDED)
         table.add_column("Port", style="cyan", justify="right")
         table.add_column("Status", style=style)
@@ -145,13 +177,16 @@ class ConsoleFormatter(BaseFormatter):
         console.print(table)
         console.print()
     
-    def _create_services_table(self, console: Console, services: List[Any]) -> None:
+    def _create_services_table(self, console: "Console", services: List[Any]) -> None:
         """Create a table for detected services.
         
         Args:
             console: Rich console instance.
             services: List of service info objects.
         """
+        from rich import box
+        from rich.table import Table
+        
         table = Table(title="Detected Services", box=box.ROUNDED)
         table.add_column("Service", style="cyan")
         table.add_column("Version", style="dim")
@@ -172,13 +207,15 @@ class ConsoleFormatter(BaseFormatter):
         console.print(table)
         console.print()
     
-    def _create_errors_section(self, console: Console, errors: List[str]) -> None:
+    def _create_errors_section(self, console: "Console", errors: List[str]) -> None:
         """Create errors section.
         
         Args:
             console: Rich console instance.
             errors: List of error messages.
         """
+        from rich.panel import Panel
+        
         error_text = "\n".join(f"• {error}" for error in errors)
         console.print(Panel(
             error_text,
@@ -199,28 +236,55 @@ class JSONFormatter(BaseFormatter):
         Returns:
             JSON string.
         """
-        data = {
+        return json.dumps(self.result_to_dict(result), indent=2, default=str)
+    
+    def format_results(self, results: List[ScanResult]) -> str:
+        """Format the results of a multi-host scan as a JSON array.
+        
+        Args:
+            results: ScanResults to format, one per host.
+            
+        Returns:
+            JSON string.
+        """
+        return json.dumps([self.result_to_dict(r) for r in results], indent=2, default=str)
+    
+    def result_to_dict(self, result: ScanResult) -> Dict[str, Any]:
+        """Convert ScanResult to dictionary.
+        
+        Args:
+            result: ScanResult to convert.
+            
+        Returns:
+            Dictionary representation.
+        """
+        return {
             "target": result.target,
+            "address": result.address,
+            "aliases": result.aliases,
             "scan_duration": result.scan_duration,
             "timestamp": result.timestamp,
             "summary": {
                 "total_ports": result.total_ports,
                 "open_ports": result.open_count,
                 "closed_ports": result.closed_count,
-                "filtered_ports": result.filtered_count
+                "filtered_ports": result.filtered_count,
+                "unscanned_ports": len(result.unscanned_ports),
+                "presumed_filtered_ports": result.presumed_filtered_count
             },
+            "incomplete": result.incomplete,
+            "unscanned_ports": result.unscanned_ports,
+            "presumed_filtered": [list(r) for r in result.presumed_filtered],
             "ports": {
-                "open": [self._port_to_dict(p) for p in result.open_ports],
-                "closed": [self._port_to_dict(p) for p in result.closed_ports],
-                "filtered": [self._port_to_dict(p) for p in result.filtered_ports]
+                "open": [self.port_to_dict(p) for p in result.open_ports],
+                "closed": [self.port_to_dict(p) for p in result.closed_ports],
+                "filtered": [self.port_to_dict(p) for p in result.filtered_ports]
             },
-            "services": [self._service_to_dict(s) for s in result.get_services()],
+            "services": [self.service_to_dict(s) for s in result.get_services()],
             "errors": result.errors
         }
-        
-        return json.dumps(data, indent=2, default=str)
     
-    def _port_to_dict(self, port_result: PortResult) -> Dict[str, Any]:
+    def port_to_dict(self, port_result: PortResult) -> Dict[str, Any]:
         """Convert PortResult to dictionary.
         
         Args:
@@ -237,11 +301,11 @@ class JSONFormatter(BaseFormatter):
         }
         
         if port_result.service:
-            data["service"] = self._service_to_dict(port_result.service)
+            data["service"] = self.service_to_dict(port_result.service)
         
         return data
     
-    def _service_to_dict(self, service: Any) -> Dict[str, Any]:
+    def service_to_dict(self, service: Any) -> Dict[str, Any]:
         """Convert ServiceInfo to dictionary.
         
         Args:
@@ -268,6 +332,17 @@ class CSVFormatter(BaseFormatter):
         Args:
             result: ScanResult to format.
             
+        Returns:
+            CSV string.
+        """
+        return self.format_results([result])
+    
+    def format_results(self, results: List[ScanResult]) -> str:
+        """Format the results of a multi-host scan as one CSV table.
+        
+        Args:
+            results: ScanResults to format, one per host.
+            
         Returns:
             CSV string.
         """
@@ -280,6 +355,18 @@ class CSVFormatter(BaseFormatter):
             "Response Time (ms)", "Confidence", "Banner", "Error"
         ])
         
+        for result in results:
+            self._write_rows(writer, result)
+        
+        return output.getvalue()
+    
+    def _write_rows(self, writer: Any, result: ScanResult) -> None:
+        """Write one CSV row per port of a scan result.
+        
+        Args:
+            writer: csv writer to write to.
+            result: ScanResult to write.
+        """
         # All port results
         all_ports = result.open_ports + result.closed_ports + result.filtered_ports
         
@@ -310,8 +397,6 @@ class CSVFormatter(BaseFormatter):
                 banner,
                 port_result.error or ""
             ])
-        
-        return output.getvalue()
 
 
 def get_formatter(format_type: str, **kwargs) -> BaseFormatter:
@@ -0,0 +1,122 @@
+"""Event hooks for per-port and per-scan instrumentation.
+
+Callbacks may be plain functions or coroutine functions. Coroutines are
+awaited in the scan task that raised the event, so a slow async callback
+slows that port down (which gives natural backpressure when pushing results
+into a bounded queue). An exception raised by a callback is logged and never
+aborts the scan.
+
+Events and their arguments:
+
+- ``on_connect_start(host, port)``: a connect slot was granted and the connect
+  is about to start.
+- ``on_port_result(host, port_result)``: the status of a port is known. Service
+  detection, if any, fills in ``port_result.service`` afterwards.
+- ``on_service_detected(host, port, service_info)``: a service was identified.
+- ``on_scan_complete(scan_result)``: a host finished scanning.
+"""
+
+import inspect
+import logging
+from typing import Any, Callable, List, Tuple, cast
+
+logger = logging.getLogger(__name__)
+
+HookCallback = Callable[..., Any]
+
+EVENTS: Tuple[str, ...] = (
+    "on_connect_start",
+    "on_port_result",
+    "on_service_detected",
+    "on_scan_complete",
+)
+
+
+class Hooks:
+    """Registry of event callbacks.
+    
+    Each event is an attribute holding the list of its callbacks, so callers
+    on the hot path can skip building event arguments entirely with a plain
+    truth test such as ``if hooks.on_port_result:``.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an empty hook registry."""
+        self.on_connect_start: List[HookCallback] = []
+        self.on_port_result: List[HookCallback] = []
+        self.on_service_detected: List[HookCallback] = []
+        self.on_scan_complete: List[HookCallback] = []
+    
+    def register(self, event: str, callback: HookCallback) -> HookCallback:
+        """Register a callback for an event.
+        
+        Args:
+            event: Event name, e.g. "on_port_result".
+            callback: Function or coroutine function to call.
+        
+        Returns:
+            The registered callback.
+        
+        Raises:
+            ValueError: If the event name is unknown.
+        """
+        self._callbacks(event).append(callback)
+        return callback
+    
+    def merged(self, other: "Hooks") -> "Hooks":
+        """Combine two registries.
+        
+        Args:
+            other: Registry whose callbacks run after this one's.
+        
+        Returns:
+            New registry holding the callbacks of both.
+        """
+        combined = Hooks()
+        for event in EVENTS:
+            getattr(combined, event).extend(getattr(self, event) + getattr(other, event))
+        return combined
+    
+    def unregister(self, event: str, callback: HookCallback) -> None:
+        """Remove a previously registered callback.
+        
+        Args:
+            event: Event name.
+            callback: Callback to remove.
+        
+        Raises:
+            ValueError: If the event name is unknown or the callback is not
+                registered for it.
+        """
+        self._callbacks(event).remove(callback)
+    
+    async def emit(self, event: str, *args: Any) -> None:
+        """Call every callback registered for an event.
+        
+        Args:
+            event: Event name.
+            *args: Event arguments.
+        """
+        for callback in list(getattr(self, event)):
+            try:
+                outcome = callback(*args)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception:
+                logger.exception("Hook %s for %s failed", getattr(callback, "__name__", callback), event)
+    
+    def _callbacks(self, event: str) -> List[HookCallback]:
+        """Get the callback list of an event.
+        
+        Args:
+            event: Event name.
+        
+        Returns:
+            The live list of callbacks.
+        
+        Raises:
+            ValueError: If the event name is unknown.
+        """
+        if event not in EVENTS:
+            raise ValueError(f"Unknown hook event {event!r}; expected one of {', '.join(EVENTS)}")
+        return cast(List[HookCallback], getattr(self, event))
@@ -0,0 +1,87 @@
+"""Sets of integers stored as sorted, merged intervals.
+
+Used for exclusion lists, where a handful of large ranges (networks given in
+CIDR notation, port ranges) would be wasteful to hold element by element.
+Membership is a binary search over the interval starts.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Tuple
+
+
+class IntervalSet:
+    """Immutable set of integers held as inclusive (start, end) intervals.
+    
+    Overlapping and adjacent intervals are merged when the set is built.
+    """
+    
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()) -> None:
+        """Build the set.
+        
+        Args:
+            intervals: Inclusive (start, end) intervals, in any order.
+        
+        Raises:
+            ValueError: If an interval ends before it starts.
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        for start, end in sorted(intervals):
+            if start > end:
+                raise ValueError(f"Interval ends before it starts: ({start}, {end})")
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
+    
+    def __contains__(self, value: object) -> bool:
+        """Check whether an integer is in the set in O(log n)."""
+        if not isinstance(value, int):
+            return False
+        index = bisect_right(self._starts, value) - 1
+        return index >= 0 and value <= self._ends[index]
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the merged intervals in ascending order."""
+        return zip(self._starts, self._ends)
+    
+    def __len__(self) -> int:
+        """Get the number of merged intervals."""
+        return len(self._starts)
+    
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)!r})"
+    
+    def count(self) -> int:
+        """Get the number of integers in the set."""
+        return sum(end - start + 1 for start, end in self)
+    
+    def gaps(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Iterate over the parts of a range that are not in the set.
+        
+        Excluded spans are skipped wholesale, so the cost depends on the
+        number of intervals overlapping the range, not on its size.
+        
+        Args:
+            start: First integer of the range.
+            end: Last integer of the range.
+        
+        Yields:
+            Inclusive (start, end) sub-ranges outside the set, in order.
+        """
+        index = bisect_right(self._starts, start) - 1
+        if index >= 0 and self._ends[index] >= start:
+            start = self._ends[index] + 1
+        index += 1
+        while start <= end:
+            if index < len(self._starts) and self._starts[index] <= end:
+                if self._starts[index] > start:
+                    yield start, self._starts[index] - 1
+                start = self._ends[index] + 1
+                index += 1
+            else:
+                yield start, end
+                return
@@ -0,0 +1,196 @@
+"""Hierarchical concurrency limiting for ScanHero.
+
+A single global cap protects the scanning machine; per-host and per-subnet caps
+protect each target from being flooded with simultaneous SYNs, which it would
+start dropping (and which would then show up as spurious filtered ports).
+"""
+
+import asyncio
+import ipaddress
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class Slot:
+    """A reserved concurrency slot for one host.
+    
+    Releasing a slot more than once is a no-op, so both the code that did the
+    work and a cleanup callback can safely release it.
+    """
+    
+    __slots__ = ("_limiter", "host", "_released")
+    
+    def __init__(self, limiter: "ConcurrencyLimiter", host: str) -> None:
+        """Initialize slot.
+        
+        Args:
+            limiter: Limiter the slot was taken from.
+            host: Host the slot was reserved for.
+        """
+        self._limiter = limiter
+        self.host = host
+        self._released = False
+    
+    def release(self) -> None:
+        """Return the slot to the limiter."""
+        if not self._released:
+            self._released = True
+            self._limiter._release(self.host)
+
+
+class ConcurrencyLimiter:
+    """Concurrency limiter with global, per-host and per-subnet caps.
+    
+    A slot is granted only when all three levels have room. Waiters are not
+    queued per host, so a saturated host never blocks slots for other hosts.
+    
+    The global cap is adaptive: local resource errors halve it (at most once
+    per cooldown period) and every successful connect grows it back towards
+    ``global_limit`` by a fraction of a slot.
+    """
+    
+    def __init__(
+        self,
+        global_limit: int,
+        per_host_limit: Optional[int] = None,
+        per_subnet_limit: Optional[int] = None,
+        subnet_prefix: int = 24,
+        backoff_cooldown: float = 0.25
+    ) -> None:
+        """Initialize limiter.
+        
+        Args:
+            global_limit: Maximum number of slots in use across all hosts.
+            per_host_limit: Maximum number of slots per host, or None.
+            per_subnet_limit: Maximum number of slots per IPv4 subnet, or None.
+            subnet_prefix: Prefix length used to group IPv4 hosts into subnets.
+            backoff_cooldown: Minimum time in seconds between two reductions
+                of the global cap.
+        """
+        self.global_limit = global_limit
+        self.limit = float(global_limit)
+        self.backoff_cooldown = backoff_cooldown
+        self._last_backoff: Optional[float] = None
+        self.per_host_limit = per_host_limit
+        self.per_subnet_limit = per_subnet_limit
+        self.subnet_prefix = subnet_prefix
+        self.in_flight = 0
+        self._per_host: Dict[str, int] = {}
+        self._per_subnet: Dict[int, int] = {}
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+    
+    def try_acquire(self, host: str) -> Optional[Slot]:
+        """Reserve a slot for a host without waiting.
+        
+        Args:
+            host: Target host or IP address.
+        
+        Returns:
+            A Slot if every level had room, None otherwise.
+        """
+        if self.in_flight >= int(self.limit):
+            return None
+        
+        host_count = self._per_host.get(host, 0)
+        if self.per_host_limit is not None and host_count >= self.per_host_limit:
+            return None
+        
+        subnet = self._subnet_of(host) if self.per_subnet_limit is not None else None
+        if (
+            subnet is not None
+            and self.per_subnet_limit is not None
+            and self._per_subnet.get(subnet, 0) >= self.per_subnet_limit
+        ):
+            return None
+        
+        self.in_flight += 1
+        self._per_host[host] = host_count + 1
+        if subnet is not None:
+            self._per_subnet[subnet] = self._per_subnet.get(subnet, 0) + 1
+        return Slot(self, host)
+    
+    def back_off(self) -> None:
+        """Halve the global cap after a local resource error.
+        
+        Errors from connects that were already in flight when the cap was
+        reduced belong to the same episode, so further calls within the
+        cooldown period are ignored.
+        """
+        now = asyncio.get_running_loop().time()
+        if self._last_backoff is not None and now - self._last_backoff < self.backoff_cooldown:
+            return
+        self._last_backoff = now
+        self.limit = max(1.0, self.limit / 2)
+    
+    def recover(self) -> None:
+        """Grow the global cap back after a successful connect."""
+        if self.limit < self.global_limit:
+            self.limit = min(float(self.global_limit), self.limit + 1.0 / self.limit)
+    
+    async def acquire(self, host: str) -> Slot:
+        """Reserve a slot for a host, waiting until one is free.
+        
+        Args:
+            host: Target host or IP address.
+        
+        Returns:
+            The reserved Slot.
+        """
+        while True:
+            slot = self.try_acquire(host)
+            if slot is not None:
+                return slot
+            await self.wait_for_release()
+    
+    async def wait_for_release(self) -> None:
+        """Wait until any slot is released."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+    
+    def _release(self, host: str) -> None:
+        """Return a slot and wake up everyone waiting for one.
+        
+        Args:
+            host: Host the slot was reserved for.
+        """
+        self.in_flight -= 1
+        
+        host_count = self._per_host[host] - 1
+        if host_count:
+            self._per_host[host] = host_count
+        else:
+            del self._per_host[host]
+        
+        subnet = self._subnet_of(host) if self.per_subnet_limit is not None else None
+        if subnet is not None:
+            subnet_count = self._per_subnet[subnet] - 1
+            if subnet_count:
+                self._per_subnet[subnet] = subnet_count
+            else:
+                del self._per_subnet[subnet]
+        
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    def _subnet_of(self, host: str) -> Optional[int]:
+        """Get the subnet key of an IPv4 host.
+        
+        Args:
+            host: Target host or IP address.
+        
+        Returns:
+            Network number of the host's subnet, or None for hostnames and
+            IPv6 addresses, which are only limited per host.
+        """
+        try:
+            address = ipaddress.IPv4Address(host)
+        except ValueError:
+            return None
+        return int(address) >> (32 - self.subnet_prefix)
@@ -0,0 +1,336 @@
+"""Metrics registry for ScanHero.
+
+Counters, gauges and fixed-bucket histograms that the scanner and the service
+detector update on their hot paths, exportable as Prometheus exposition text
+or as JSON-serializable dicts.
+
+Metric children are resolved once, when the scanner is built, so an update on
+the hot path is a single attribute increment (plus a bisect for histograms).
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Latency buckets in seconds, from loopback to slow WAN links
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class Counter:
+    """A monotonically increasing value."""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self) -> None:
+        """Initialize counter at zero."""
+        self.value: Union[int, float] = 0
+    
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        """Increase the counter.
+        
+        Args:
+            amount: Non-negative amount to add.
+        """
+        self.value += amount
+
+
+class Gauge:
+    """A value that can go up and down."""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self) -> None:
+        """Initialize gauge at zero."""
+        self.value: Union[int, float] = 0
+    
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        """Increase the gauge."""
+        self.value += amount
+    
+    def dec(self, amount: Union[int, float] = 1) -> None:
+        """Decrease the gauge."""
+        self.value -= amount
+    
+    def set(self, value: Union[int, float]) -> None:
+        """Set the gauge."""
+        self.value = value
+
+
+class Histogram:
+    """Observation counts in fixed buckets, plus their sum and count."""
+    
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initialize histogram.
+        
+        Args:
+            buckets: Sorted upper bounds of the buckets; +Inf is implied.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """Record an observation.
+        
+        Args:
+            value: Observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def cumulative_counts(self) -> List[int]:
+        """Get the number of observations at or below each bucket bound.
+        
+        Returns:
+            Cumulative counts, one per bucket followed by the +Inf bucket.
+        """
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricFamily:
+    """A named metric with one child per combination of label values."""
+    
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        label_names: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None
+    ) -> None:
+        """Initialize metric family.
+        
+        Args:
+            name: Metric name.
+            help_text: One-line description.
+            kind: "counter", "gauge" or "histogram".
+            label_names: Names of the labels.
+            buckets: Histogram bucket bounds.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets or LATENCY_BUCKETS)
+        self.children: Dict[Tuple[str, ...], Metric] = {}
+    
+    def labels(self, *values: Any) -> Any:
+        """Get the child for a combination of label values.
+        
+        Args:
+            *values: One value per label name.
+        
+        Returns:
+            The Counter, Gauge or Histogram for those labels.
+        
+        Raises:
+            ValueError: If the number of values does not match the labels.
+        """
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            child = self._new_child()
+            self.children[key] = child
+        return child
+    
+    def _new_child(self) -> Metric:
+        """Create an empty child of this family's kind."""
+        if self.kind == "counter":
+            return Counter()
+        if self.kind == "gauge":
+            return Gauge()
+        return Histogram(self.buckets)
+
+
+class MetricsRegistry:
+    """A collection of metric families."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._families: Dict[str, MetricFamily] = {}
+        self._phases = self.counter(
+            "scanhero_phase_seconds_total", "Wall-clock time spent per scan phase.", ("phase",)
+        )
+    
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily:
+        """Get or create a counter family.
+        
+        Args:
+            name: Metric name.
+            help_text: One-line description.
+            label_names: Names of the labels.
+        
+        Returns:
+            The counter family.
+        """
+        return self._register(name, help_text, "counter", label_names)
+    
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily:
+        """Get or create a gauge family.
+        
+        Args:
+            name: Metric name.
+            help_text: One-line description.
+            label_names: Names of the labels.
+        
+        Returns:
+            The gauge family.
+        """
+        return self._register(name, help_text, "gauge", label_names)
+    
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> MetricFamily:
+        """Get or create a histogram family.
+        
+        Args:
+            name: Metric name.
+            help_text: One-line description.
+            label_names: Names of the labels.
+            buckets: Sorted bucket upper bounds.
+        
+        Returns:
+            The histogram family.
+        """
+        return self._register(name, help_text, "histogram", label_names, buckets)
+    
+    def get(self, name: str) -> MetricFamily:
+        """Look up a registered family.
+        
+        Args:
+            name: Metric name.
+        
+        Returns:
+            The family.
+        
+        Raises:
+            KeyError: If no family has that name.
+        """
+        return self._families[name]
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the wall-clock time of a block to a scan phase.
+        
+        Args:
+            name: Phase name, e.g. "scan" or "format".
+        """
+        counter = self._phases.labels(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            counter.inc(time.perf_counter() - started)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Export all metrics as JSON-serializable data.
+        
+        Returns:
+            Mapping of metric name to its type, help text and samples.
+        """
+        exported: Dict[str, Any] = {}
+        for family in self._families.values():
+            samples = []
+            for key, child in sorted(family.children.items()):
+                sample: Dict[str, Any] = {"labels": dict(zip(family.label_names, key))}
+                if isinstance(child, Histogram):
+                    sample["buckets"] = dict(zip(
+                        [_format_number(b) for b in child.buckets] + ["+Inf"],
+                        child.cumulative_counts()
+                    ))
+                    sample["sum"] = child.sum
+                    sample["count"] = child.count
+                else:
+                    sample["value"] = child.value
+                samples.append(sample)
+            exported[family.name] = {
+                "type": family.kind,
+                "help": family.help_text,
+                "samples": samples,
+            }
+        return exported
+    
+    def to_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            Exposition text, ending with a newline.
+        """
+        lines = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for key, child in sorted(family.children.items()):
+                labels = list(zip(family.label_names, key))
+                if isinstance(child, Histogram):
+                    bounds = [_format_number(b) for b in child.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, child.cumulative_counts()):
+                        lines.append(_sample(f"{family.name}_bucket", labels + [("le", bound)], count))
+                    lines.append(_sample(f"{family.name}_sum", labels, child.sum))
+                    lines.append(_sample(f"{family.name}_count", labels, child.count))
+                else:
+                    lines.append(_sample(family.name, labels, child.value))
+        return "\n".join(lines) + "\n"
+    
+    def _register(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        label_names: Sequence[str],
+        buckets: Optional[Sequence[float]] = None
+    ) -> MetricFamily:
+        """Get a family, creating it on first use.
+        
+        Raises:
+            ValueError: If the name is already registered with another type.
+        """
+        family = self._families.get(name)
+        if family is None:
+            family = MetricFamily(name, help_text, kind, label_names, buckets)
+            self._families[name] = family
+        elif family.kind != kind:
+            raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+        return family
+
+
+def _format_number(value: Union[int, float]) -> str:
+    """Format a sample value or bucket bound."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _sample(name: str, labels: List[Tuple[str, str]], value: Union[int, float]) -> str:
+    """Format one exposition line."""
+    if not labels:
+        return f"{name} {_format_number(value)}"
+    rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{rendered}}} {_format_number(value)}"
+
+
+def _escape(text: str) -> str:
+    """Escape a label value."""
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,8 +1,39 @@
 """Data models for ScanHero package."""
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Union
+import ipaddress
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from enum import Enum
+from .exceptions import ConfigurationError, InvalidTargetError
+from .targets import ExclusionList
+
+
+# Value of ScanConfig.max_concurrent that sizes concurrency from local limits
+AUTO_CONCURRENCY = "auto"
+
+# Connect engines selectable with ScanConfig.engine
+ENGINES = ("asyncio", "epoll")
+
+# High-yield TCP ports probed by host discovery
+DEFAULT_DISCOVERY_PORTS = [80, 443, 22, 445, 3389, 8080, 25, 139, 21, 23]
+
+
+def port_ranges(ports: Iterable[int]) -> List[Tuple[int, int]]:
+    """Compress port numbers into inclusive ranges.
+    
+    Args:
+        ports: Port numbers, in any order.
+    
+    Returns:
+        Sorted, non-overlapping (first, last) ranges covering the ports.
+    """
+    ranges: List[Tuple[int, int]] = []
+    for port in sorted(set(ports)):
+        if ranges and ranges[-1][1] == port - 1:
+            ranges[-1] = (ranges[-1][0], port)
+        else:
+            ranges.append((port, port))
+    return ranges
 
 
 class PortStatus(Enum):
@@ -83,6 +114,13 @@ class ScanResult:
         scan_duration: Total time taken for the scan in seconds.
         timestamp: Timestamp when the scan was performed.
         errors: List of errors encountered during scanning.
+        incomplete: Whether the scan deadline expired before all ports were scanned.
+        unscanned_ports: Ports that were not scanned because the deadline expired.
+        presumed_filtered: Inclusive (first, last) port ranges that were not
+            scanned because the host looked fully filtered and was abandoned.
+        address: IP address that was scanned, if the target was resolved.
+        aliases: Other target names that resolved to the same address and
+            were covered by this scan.
     """
     target: str
     ports_scanned: List[int]
@@ -92,6 +130,21 @@ class ScanResult:
     scan_duration: float
     timestamp: str
     errors: List[str]
+    incomplete: bool = False
+    unscanned_ports: List[int] = field(default_factory=list)
+    presumed_filtered: List[Tuple[int, int]] = field(default_factory=list)
+    address: Optional[str] = None
+    aliases: List[str] = field(default_factory=list)
+
+    @property
+    def abandoned(self) -> bool:
+        """Whether the host was abandoned as fully filtered."""
+        return bool(self.presumed_filtered)
+
+    @property
+    def presumed_filtered_count(self) -> int:
+        """Number of ports presumed filtered without being scanned."""
+        return sum(last - first + 1 for first, last in self.presumed_filtered)
 
     @property
     def total_ports(self) -> int:
@@ -141,21 +194,221 @@ class ScanResult:
         return services
 
 
+@dataclass
+class ScanSummary:
+    """Running totals of a scan whose results are written to a sink.
+
+    Attributes:
+        hosts: Number of host results written.
+        hosts_skipped: Number of hosts skipped by host discovery.
+        total_ports: Number of ports scanned.
+        open_count: Number of open ports found.
+        closed_count: Number of closed ports found.
+        filtered_count: Number of filtered ports found.
+        unscanned_count: Number of ports cut off by the scan deadline.
+        presumed_filtered_count: Number of ports presumed filtered on
+            abandoned hosts.
+        abandoned_hosts: Number of hosts abandoned as fully filtered.
+        incomplete_hosts: Number of hosts with unscanned ports.
+        error_count: Number of errors reported.
+        scan_duration: Total time taken for the scan in seconds.
+        open_ports: Open ports by target, if open ports are retained.
+    """
+    hosts: int = 0
+    hosts_skipped: int = 0
+    total_ports: int = 0
+    open_count: int = 0
+    closed_count: int = 0
+    filtered_count: int = 0
+    unscanned_count: int = 0
+    presumed_filtered_count: int = 0
+    abandoned_hosts: int = 0
+    incomplete_hosts: int = 0
+    error_count: int = 0
+    scan_duration: float = 0.0
+    open_ports: Dict[str, List[PortResult]] = field(default_factory=dict)
+
+    def add(self, result: ScanResult, retain_open_ports: bool = False) -> None:
+        """Count a host result.
+
+        Args:
+            result: Result to count.
+            retain_open_ports: Whether to keep the result's open ports.
+        """
+        self.hosts += 1
+        self.total_ports += result.total_ports
+        self.open_count += result.open_count
+        self.closed_count += result.closed_count
+        self.filtered_count += result.filtered_count
+        self.unscanned_count += len(result.unscanned_ports)
+        self.presumed_filtered_count += result.presumed_filtered_count
+        self.abandoned_hosts += result.abandoned
+        self.incomplete_hosts += result.incomplete
+        self.error_count += len(result.errors)
+        if retain_open_ports and result.open_ports:
+            self.open_ports[result.target] = list(result.open_ports)
+
+
 @dataclass
 class ScanConfig:
     """Configuration for port scanning.
     
     Attributes:
-        timeout: Connection timeout in seconds.
-        max_concurrent: Maximum number of concurrent connections.
-        retry_count: Number of retries for failed connections.
+        timeout: Default timeout in seconds, used for any of the more specific
+            timeouts below that are left unset.
+        max_concurrent: Maximum number of concurrent connections, or "auto" to
+            size it from the open file limit and the ephemeral port range.
+        retry_count: Number of retries for connections that failed with an
+            unrecognized error. Refused and unreachable answers are final.
         service_detection: Whether to perform service detection.
         banner_grab: Whether to attempt banner grabbing.
         scan_delay: Delay between scans in seconds.
+        null_probe_timeout: How long to wait for an unknown service to speak
+            first before sending active probes.
+        connect_timeout: Timeout in seconds for each TCP connect.
+        banner_timeout: Timeout in seconds for each banner or probe read.
+        scan_deadline: Overall time budget in seconds for a scan. When it
+            expires, in-flight work is cancelled and a partial result is
+            returned. None means no deadline.
+        detection_concurrency: Maximum number of concurrent service
+            detections. Detection runs in its own pool, separate from
+            ``max_concurrent`` connect slots.
+        detection_timeout: Overall time budget in seconds for detecting the
+            service on one port. None means only the connect and banner
+            timeouts apply.
+        max_per_host: Maximum number of concurrent connections to any one
+            host. None means only ``max_concurrent`` applies.
+        max_per_subnet: Maximum number of concurrent connections to any one
+            IPv4 subnet of ``subnet_prefix`` bits. None disables the cap.
+        subnet_prefix: Prefix length used to group hosts for ``max_per_subnet``.
+        resource_retries: Number of retries for connections that failed
+            because a local resource (file descriptors, buffers, ephemeral
+            ports) ran out.
+        retry_backoff: Initial backoff ceiling in seconds between retries.
+        retry_backoff_max: Maximum backoff ceiling in seconds between retries.
+        linger_zero: Whether to close connections with SO_LINGER 0, sending a
+            RST instead of a FIN so no TIME_WAIT entry is left behind.
+        syn_retries: Maximum number of SYN retransmissions per connect
+            (TCP_SYNCNT, Linux only). None keeps the kernel default.
+        source_addresses: Local addresses to bind connections to, used
+            round-robin to multiply the available ephemeral ports.
+        fingerprint_ttl: How long in seconds to reuse a detected service for
+            the same host and port. None disables the fingerprint cache.
+        abandon_filtered: Number of filtered results, with no open or closed
+            answer, after which a host is abandoned and its remaining ports
+            are presumed filtered. The first probes are spread over the port
+            list so they sample all of it. None scans every port.
+        host_discovery: Whether multi-host scans first probe each host on
+            ``discovery_ports`` and skip hosts that never answer.
+        discovery_ports: Ports probed by host discovery.
+        discovery_timeout: Connect timeout in seconds for discovery probes.
+        resolve_workers: Number of concurrent DNS lookups, each on its own
+            thread of the resolver's pool.
+        resolve_timeout: Time allowed for resolving one hostname in seconds.
+        exclude: Addresses, CIDR networks and ``first-last`` address ranges
+            that are never scanned, including when a host name resolves
+            into them.
+        exclude_ports: Ports that are never scanned.
+        engine: How connects are driven: "asyncio" runs one task per port;
+            "epoll" hands connects to a worker thread that drives them with
+            epoll, for faster connect sweeps (Linux, socket connector only).
     """
     timeout: float = 3.0
-    max_concurrent: int = 100
+    max_concurrent: Union[int, str] = 100
     retry_count: int = 1
     service_detection: bool = True
     banner_grab: bool = True
     scan_delay: float = 0.0
+    null_probe_timeout: float = 0.5
+    connect_timeout: Optional[float] = None
+    banner_timeout: Optional[float] = None
+    scan_deadline: Optional[float] = None
+    detection_concurrency: int = 20
+    detection_timeout: Optional[float] = None
+    max_per_host: Optional[int] = None
+    max_per_subnet: Optional[int] = None
+    subnet_prefix: int = 24
+    resource_retries: int = 5
+    retry_backoff: float = 0.05
+    retry_backoff_max: float = 2.0
+    linger_zero: bool = False
+    syn_retries: Optional[int] = None
+    source_addresses: List[str] = field(default_factory=list)
+    fingerprint_ttl: Optional[float] = None
+    abandon_filtered: Optional[int] = None
+    host_discovery: bool = False
+    discovery_ports: List[int] = field(default_factory=lambda: list(DEFAULT_DISCOVERY_PORTS))
+    discovery_timeout: float = 1.0
+    resolve_workers: int = 64
+    resolve_timeout: float = 5.0
+    exclude: List[str] = field(default_factory=list)
+    exclude_ports: List[int] = field(default_factory=list)
+    engine: str = "asyncio"
+
+    def __post_init__(self) -> None:
+        """Fill unset timeouts from the default timeout and validate the config.
+        
+        Raises:
+            ConfigurationError: If a timeout or concurrency limit is out of range.
+        """
+        if self.connect_timeout is None:
+            self.connect_timeout = self.timeout
+        if self.banner_timeout is None:
+            self.banner_timeout = self.timeout
+        
+        for name in (
+            "timeout", "connect_timeout", "banner_timeout",
+            "scan_deadline", "detection_timeout", "fingerprint_ttl", "discovery_timeout",
+            "resolve_timeout"
+        ):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ConfigurationError(f"{name} must be positive, got {value}")
+        
+        if isinstance(self.max_concurrent, str) and self.max_concurrent != AUTO_CONCURRENCY:
+            raise ConfigurationError(
+                f"max_concurrent must be an integer or '{AUTO_CONCURRENCY}', got {self.max_concurrent!r}"
+            )
+        
+        for name in (
+            "max_concurrent", "detection_concurrency", "max_per_host", "max_per_subnet",
+            "abandon_filtered", "resolve_workers"
+        ):
+            value = getattr(self, name)
+            if isinstance(value, int) and value < 1:
+                raise ConfigurationError(f"{name} must be at least 1, got {value}")
+        
+        if not 0 <= self.subnet_prefix <= 32:
+            raise ConfigurationError(f"subnet_prefix must be between 0 and 32, got {self.subnet_prefix}")
+        
+        if self.syn_retries is not None and not 1 <= self.syn_retries <= 127:
+            raise ConfigurationError(f"syn_retries must be between 1 and 127, got {self.syn_retries}")
+        
+        if not self.discovery_ports or not all(1 <= p <= 65535 for p in self.discovery_ports):
+            raise ConfigurationError("discovery_ports must be a non-empty list of ports between 1 and 65535")
+        
+        for address in self.source_addresses:
+            try:
+                ipaddress.ip_address(address)
+            except ValueError:
+                raise ConfigurationError(f"Invalid source address: {address}")
+        
+        try:
+            ExclusionList(self.exclude)
+        except InvalidTargetError as e:
+            raise ConfigurationError(f"Invalid exclusion: {e.message}")
+        if not all(1 <= p <= 65535 for p in self.exclude_ports):
+            raise ConfigurationError("exclude_ports must be ports between 1 and 65535")
+        
+        if self.engine not in ENGINES:
+            raise ConfigurationError(f"engine must be one of {', '.join(ENGINES)}, got {self.engine!r}")
+
+    @property
+    def effective_connect_timeout(self) -> float:
+        """Connect timeout in seconds, falling back to the default timeout."""
+        return self.connect_timeout if self.connect_timeout is not None else self.timeout
+
+    @property
+    def effective_banner_timeout(self) -> float:
+        """Banner timeout in seconds, falling back to the default timeout."""
+        return self.banner_timeout if self.banner_timeout is not None else self.timeout
@@ -0,0 +1,128 @@
+"""Active probe definitions for ScanHero service detection.
+
+Many services (HTTP, Redis, Elasticsearch, ...) never send anything until the
+client speaks first. Waiting for a banner on those ports only burns the read
+timeout, so the service detector sends one of the probes below instead.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Tuple, Union
+from .models import ServiceType
+
+
+@dataclass(frozen=True)
+class Probe:
+    """An active probe for services that wait for the client to speak first.
+
+    Attributes:
+        name: Unique probe name.
+        payload: Bytes sent right after the connection is established.
+        ports: Ports on which this probe is sent immediately.
+        match: Pattern a response must match for the probe to count as a hit.
+        service_type: Service reported when the response matches.
+    """
+    name: str
+    payload: bytes
+    ports: Tuple[int, ...]
+    match: Pattern[bytes]
+    service_type: ServiceType
+
+    def matches(self, response: Union[bytes, memoryview]) -> bool:
+        """Check whether a response matches this probe's signature.
+
+        Args:
+            response: Raw bytes received after sending the probe, or a view
+                of them.
+
+        Returns:
+            True if the response matches, False otherwise.
+        """
+        return self.match.search(response) is not None
+
+
+# Ordered from most to least specific: the first matching probe wins.
+PROBES: List[Probe] = [
+    Probe(
+        name="elasticsearch",
+        payload=b"GET / HTTP/1.0\r\n\r\n",
+        ports=(9200, 9201),
+        match=re.compile(rb'"cluster_name"|You Know, for Search'),
+        service_type=ServiceType.ELASTICSEARCH,
+    ),
+    Probe(
+        name="redis-ping",
+        payload=b"*1\r\n$4\r\nPING\r\n",
+        ports=(6379, 6380),
+        match=re.compile(rb"^(?:\+PONG|-NOAUTH|-DENIED)"),
+        service_type=ServiceType.REDIS,
+    ),
+    Probe(
+        name="http-head",
+        payload=b"HEAD / HTTP/1.0\r\n\r\n",
+        ports=(80, 443, 8000, 8008, 8080, 8443, 8888, 9200, 9201),
+        match=re.compile(rb"^HTTP/\d\.\d \d{3}"),
+        service_type=ServiceType.HTTP,
+    ),
+]
+
+# Probes tried on unknown ports once the null-probe window has passed.
+FALLBACK_PROBES: Tuple[str, ...] = ("http-head", "redis-ping")
+
+
+def get_probe(name: str) -> Probe:
+    """Look up a probe by name.
+
+    Args:
+        name: Probe name.
+
+    Returns:
+        The matching Probe.
+
+    Raises:
+        KeyError: If no probe has that name.
+    """
+    for probe in PROBES:
+        if probe.name == name:
+            return probe
+    raise KeyError(name)
+
+
+def select_probes(port: int) -> List[Probe]:
+    """Select the probes to send immediately on a port.
+
+    Args:
+        port: Port number.
+
+    Returns:
+        Probes hinted for this port, in priority order. Empty if the service
+        on this port is expected to speak first.
+    """
+    return [probe for probe in PROBES if port in probe.ports]
+
+
+def fallback_probes(exclude: Tuple[str, ...] = ()) -> List[Probe]:
+    """Get the probes to try on ports that stayed silent.
+
+    Args:
+        exclude: Names of probes that were already sent.
+
+    Returns:
+        Fallback probes in priority order.
+    """
+    return [get_probe(name) for name in FALLBACK_PROBES if name not in exclude]
+
+
+def identify_response(response: bytes) -> Optional[ServiceType]:
+    """Identify a service from a probe response.
+
+    Args:
+        response: Raw response bytes.
+
+    Returns:
+        ServiceType of the first matching probe, or None.
+    """
+    for probe in PROBES:
+        if probe.matches(response):
+            return probe.service_type
+    return None
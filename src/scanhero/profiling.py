@@ -0,0 +1,188 @@
+"""Scan profiling for performance bug reports.
+
+A :class:`ScanProfiler` runs a block of the scan under cProfile while a
+sampler task measures event-loop lag (how late a scheduled wake-up actually
+runs) and the number of live tasks. The report written by
+:meth:`ScanProfiler.write_report` contains:
+
+- ``scan.prof``: raw cProfile data, readable with ``pstats`` or snakeviz;
+- ``profile.json``: loop lag percentiles, peak task count and hot functions;
+- ``summary.txt``: the same, as plain text for pasting into an issue.
+"""
+
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Modules whose hot functions are listed separately
+WATCHED_MODULES: Tuple[str, ...] = ("scanner.py", "service_detector.py", "formatters.py")
+
+
+class ScanProfiler:
+    """cProfile plus event-loop lag and task count sampling."""
+    
+    def __init__(self, interval: float = 0.01, top: int = 15) -> None:
+        """Initialize profiler.
+        
+        Args:
+            interval: Seconds between loop lag samples.
+            top: Number of hot functions listed per section.
+        """
+        self.interval = interval
+        self.top = top
+        self.lags: List[float] = []
+        self.peak_tasks = 0
+        self.duration = 0.0
+        self._profile = cProfile.Profile()
+        self._sampler: Optional["asyncio.Task[None]"] = None
+        self._started = 0.0
+    
+    async def start(self) -> None:
+        """Start profiling and sampling."""
+        self._started = time.perf_counter()
+        self._sampler = asyncio.ensure_future(self._sample())
+        self._profile.enable()
+    
+    async def stop(self) -> None:
+        """Stop profiling and sampling."""
+        self._profile.disable()
+        self.duration = time.perf_counter() - self._started
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+    
+    async def _sample(self) -> None:
+        """Measure how late each periodic wake-up runs."""
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - scheduled))
+            self.peak_tasks = max(self.peak_tasks, len(asyncio.all_tasks(loop)))
+    
+    def loop_lag(self) -> Dict[str, Optional[float]]:
+        """Summarize event-loop lag.
+        
+        Returns:
+            Sample count plus mean, p50, p99 and max lag in milliseconds.
+        """
+        if not self.lags:
+            return {"samples": 0, "mean_ms": None, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        ordered = sorted(self.lags)
+        
+        def at(fraction: float) -> float:
+            index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+            return round(ordered[index] * 1000, 3)
+        
+        return {
+            "samples": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": at(0.50),
+            "p99_ms": at(0.99),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+    
+    def hot_functions(self, module: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the functions with the most own time.
+        
+        Args:
+            module: Only list functions from files with this base name, or
+                None for all functions.
+        
+        Returns:
+            Up to ``top`` functions, hottest first.
+        """
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, lineno, name), (_, calls, own, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+            if module is not None and os.path.basename(filename) != module:
+                continue
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{lineno}({name})",
+                "calls": calls,
+                "own_s": round(own, 6),
+                "cumulative_s": round(cumulative, 6),
+            })
+        rows.sort(key=lambda row: row["own_s"], reverse=True)
+        return rows[:self.top]
+    
+    def report(self) -> Dict[str, Any]:
+        """Build the profiling report.
+        
+        Returns:
+            JSON-serializable report.
+        """
+        return {
+            "duration_s": round(self.duration, 4),
+            "loop_lag": self.loop_lag(),
+            "peak_tasks": self.peak_tasks,
+            "hot_functions": self.hot_functions(),
+            "hot_functions_by_module": {module: self.hot_functions(module) for module in WATCHED_MODULES},
+        }
+    
+    def write_report(self, directory: str) -> List[str]:
+        """Write the cProfile dump, JSON report and text summary.
+        
+        Args:
+            directory: Output directory, created if missing.
+        
+        Returns:
+            Paths of the written files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        report = self.report()
+        
+        prof_path = os.path.join(directory, "scan.prof")
+        self._profile.dump_stats(prof_path)
+        
+        json_path = os.path.join(directory, "profile.json")
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        
+        summary_path = os.path.join(directory, "summary.txt")
+        with open(summary_path, "w") as f:
+            f.write(format_summary(report))
+        
+        return [prof_path, json_path, summary_path]
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    """Render a profiling report as plain text.
+    
+    Args:
+        report: Report from :meth:`ScanProfiler.report`.
+    
+    Returns:
+        Text summary.
+    """
+    lag = report["loop_lag"]
+    lines = [
+        f"Duration: {report['duration_s']:.3f}s",
+        f"Peak tasks: {report['peak_tasks']}",
+        "Event loop lag: " + ", ".join(
+            f"{key}={value}" for key, value in lag.items()
+        ),
+        "",
+    ]
+    
+    sections = [("All modules", report["hot_functions"])]
+    sections.extend(report["hot_functions_by_module"].items())
+    for title, rows in sections:
+        lines.append(f"Hot functions - {title} (by own time)")
+        if not rows:
+            lines.append("  (none)")
+        for row in rows:
+            lines.append(
+                f"  {row['own_s']:>10.6f}s own {row['cumulative_s']:>10.6f}s cum "
+                f"{row['calls']:>8} calls  {row['function']}"
+            )
+        lines.append("")
+    return "\n".join(lines)
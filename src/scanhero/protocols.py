@@ -0,0 +1,443 @@
+"""Protocol fingerprinting modules for ScanHero service detection.
+
+A raw banner rarely says which version of a service is running, but most
+database protocols tell a client during the first exchange: MySQL in its
+handshake packet, Redis in ``INFO``, MongoDB in ``buildInfo``. Each module here
+speaks just enough of one protocol to read that, in as few round trips as
+possible and on a single connection.
+
+A module is chosen by port hint before any banner is read, or by the first
+bytes a service sends on its own. Third-party modules can be added with
+:func:`register_protocol`.
+"""
+
+import asyncio
+import re
+import struct
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+from .buffers import Response
+from .models import ServiceInfo, ServiceType
+from .transport import RawConnection
+
+
+class ProtocolSession:
+    """One connection lent to a protocol module.
+    
+    Every reply is received into the same pooled buffer, so a module must
+    copy out what it needs before receiving the next one.
+    """
+    
+    def __init__(self, connection: RawConnection, buffer: memoryview, timeout: float) -> None:
+        """Initialize the session.
+        
+        Args:
+            connection: Open connection to the service.
+            buffer: Buffer replies are received into.
+            timeout: Time allowed for each reply in seconds.
+        """
+        self.connection = connection
+        self.buffer = buffer
+        self.timeout = timeout
+    
+    async def send(self, data: bytes) -> None:
+        """Send a request."""
+        await self.connection.send(data)
+    
+    async def receive(self, complete: Optional[Callable[[memoryview], bool]] = None) -> memoryview:
+        """Receive a reply into the buffer.
+        
+        Reads until ``complete`` accepts what has arrived, the buffer is
+        full, the service closes the connection or the timeout expires.
+        
+        Args:
+            complete: Tells whether a reply is complete. If None, the first
+                chunk that arrives is the reply.
+        
+        Returns:
+            View of the reply, possibly truncated or empty.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        filled = 0
+        while filled < len(self.buffer):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                received = await asyncio.wait_for(
+                    self.connection.recv_into(self.buffer[filled:]), timeout=remaining
+                )
+            except asyncio.TimeoutError:
+                break
+            if not received:
+                break
+            filled += received
+            if complete is None or complete(self.buffer[:filled]):
+                break
+        return self.buffer[:filled]
+
+
+class ProtocolModule(ABC):
+    """Fingerprints one protocol over a single connection.
+    
+    Attributes:
+        name: Unique module name.
+        service_type: Service the module identifies.
+        ports: Ports on which the module runs before any banner is read.
+        speaks_first: Whether the service sends a greeting before the
+            client speaks.
+    """
+    
+    name: str = ""
+    service_type: ServiceType = ServiceType.UNKNOWN
+    ports: Tuple[int, ...] = ()
+    speaks_first: bool = False
+    
+    def recognizes(self, greeting: Response) -> bool:
+        """Check whether unsolicited first bytes come from this protocol.
+        
+        Args:
+            greeting: Bytes the service sent before the client spoke.
+        
+        Returns:
+            True if the module should handle the connection.
+        """
+        return False
+    
+    @abstractmethod
+    async def probe(self, session: ProtocolSession, greeting: Response) -> Optional[ServiceInfo]:
+        """Fingerprint the service.
+        
+        Args:
+            session: Connection to the service.
+            greeting: Bytes the service already sent, empty if none.
+        
+        Returns:
+            ServiceInfo if the service speaks this protocol, None otherwise.
+        """
+
+
+class MySQLProtocol(ProtocolModule):
+    """Reads the server version from the MySQL initial handshake packet.
+    
+    The server speaks first, so this costs no round trip at all.
+    """
+    
+    name = "mysql"
+    service_type = ServiceType.MYSQL
+    ports = (3306, 3307)
+    speaks_first = True
+    
+    # MariaDB prefixes its version for clients that expect MySQL 5.5
+    MARIADB_PREFIX = "5.5.5-"
+    
+    def recognizes(self, greeting: Response) -> bool:
+        """Check for a handshake or error packet with sequence number 0."""
+        if len(greeting) < 5:
+            return False
+        length = int.from_bytes(greeting[0:3], "little")
+        return 0 < length <= 1024 and greeting[3] == 0 and greeting[4] in (9, 10, 0xff)
+    
+    async def probe(self, session: ProtocolSession, greeting: Response) -> Optional[ServiceInfo]:
+        """Parse the handshake packet, waiting for it if needed."""
+        if not greeting:
+            greeting = await session.receive(
+                lambda data: len(data) >= 4 and len(data) >= 4 + int.from_bytes(data[0:3], "little")
+            )
+        if not self.recognizes(greeting):
+            return None
+        
+        payload = bytes(greeting[4:4 + int.from_bytes(greeting[0:3], "little")])
+        if payload[0] == 0xff:
+            # Error packet, e.g. "Host ... is not allowed to connect"
+            message = payload[3:]
+            if message.startswith(b"#"):
+                message = message[6:]
+            return ServiceInfo(
+                service_type=self.service_type,
+                name="MySQL",
+                banner=message.decode("utf-8", errors="replace"),
+                confidence=0.9
+            )
+        
+        end = payload.find(b"\0", 1)
+        server_version = payload[1:end if end >= 0 else len(payload)].decode("ascii", errors="replace")
+        version = server_version
+        name = "MySQL"
+        if "MariaDB" in server_version:
+            name = "MariaDB"
+            if version.startswith(self.MARIADB_PREFIX):
+                version = version[len(self.MARIADB_PREFIX):]
+        return ServiceInfo(
+            service_type=self.service_type,
+            name=name,
+            version=version,
+            banner=server_version,
+            confidence=1.0
+        )
+
+
+class PostgreSQLProtocol(ProtocolModule):
+    """Identifies PostgreSQL by its one-byte answer to an SSLRequest.
+    
+    PostgreSQL reveals its version only after authentication, so the module
+    confirms the service and reports whether it offers TLS.
+    """
+    
+    name = "postgresql"
+    service_type = ServiceType.POSTGRESQL
+    ports = (5432, 5433)
+    
+    SSL_REQUEST = struct.pack("!II", 8, 80877103)
+    
+    async def probe(self, session: ProtocolSession, greeting: Response) -> Optional[ServiceInfo]:
+        """Send an SSLRequest and read the answer."""
+        await session.send(self.SSL_REQUEST)
+        reply = await session.receive()
+        
+        if len(reply) == 1 and reply[0] in b"SN":
+            ssl = "supported" if reply[0] == ord("S") else "not supported"
+            return ServiceInfo(
+                service_type=self.service_type,
+                name="PostgreSQL",
+                banner=f"PostgreSQL (SSL {ssl})",
+                confidence=1.0
+            )
+        
+        # Servers too old for SSLRequest answer with an ErrorResponse
+        if len(reply) > 5 and reply[0] == ord("E"):
+            match = re.search(rb"M([^\0]*)\0", bytes(reply[5:]))
+            return ServiceInfo(
+                service_type=self.service_type,
+                name="PostgreSQL",
+                banner=match.group(1).decode("utf-8", errors="replace") if match else None,
+                confidence=0.9
+            )
+        return None
+
+
+class RedisProtocol(ProtocolModule):
+    """Reads the server version from the Redis ``INFO server`` section."""
+    
+    name = "redis"
+    service_type = ServiceType.REDIS
+    ports = (6379, 6380)
+    
+    INFO_SERVER = b"*2\r\n$4\r\nINFO\r\n$6\r\nserver\r\n"
+    INFO_FIELDS = (b"redis_version", b"redis_mode", b"os")
+    
+    async def probe(self, session: ProtocolSession, greeting: Response) -> Optional[ServiceInfo]:
+        """Send ``INFO server`` and parse the reply."""
+        await session.send(self.INFO_SERVER)
+        reply = bytes(await session.receive(self._complete))
+        
+        # Authentication or protected mode; still Redis, but no version
+        if reply.startswith((b"-NOAUTH", b"-DENIED", b"-ERR")):
+            return ServiceInfo(
+                service_type=self.service_type,
+                name="Redis",
+                banner=reply.split(b"\r\n", 1)[0][1:].decode("utf-8", errors="replace"),
+                confidence=0.9
+            )
+        
+        if not reply.startswith(b"$"):
+            return None
+        fields = dict(re.findall(rb"^(\w+):([^\r\n]*)\r?$", reply, re.MULTILINE))
+        if b"redis_version" not in fields:
+            return None
+        return ServiceInfo(
+            service_type=self.service_type,
+            name="Redis",
+            version=fields[b"redis_version"].decode("ascii", errors="replace"),
+            banner=" ".join(
+                f"{key.decode()}:{fields[key].decode('utf-8', errors='replace')}"
+                for key in self.INFO_FIELDS if key in fields
+            ),
+            confidence=1.0
+        )
+    
+    @staticmethod
+    def _complete(data: memoryview) -> bool:
+        """Stop once the version line or an error line has arrived."""
+        reply = bytes(data)
+        if reply.startswith(b"-"):
+            return b"\r\n" in reply
+        return re.search(rb"redis_version:[^\r\n]*\r\n", reply) is not None
+
+
+class MongoDBProtocol(ProtocolModule):
+    """Reads the server version with ``isMaster`` and ``buildInfo``.
+    
+    Both commands are sent at once and answered on the same connection, so
+    the fingerprint costs one round trip. ``isMaster`` is sent as OP_QUERY,
+    which every server version answers; ``buildInfo`` needs OP_MSG (3.6+)
+    and is the one that carries the exact version.
+    """
+    
+    name = "mongodb"
+    service_type = ServiceType.MONGODB
+    ports = (27017, 27018, 27019)
+    
+    OP_REPLY = 1
+    OP_QUERY = 2004
+    OP_MSG = 2013
+    
+    async def probe(self, session: ProtocolSession, greeting: Response) -> Optional[ServiceInfo]:
+        """Send isMaster and buildInfo and parse what comes back."""
+        is_master = struct.pack("<i", 0) + b"admin.$cmd\0" + struct.pack("<ii", 0, -1) + _bson_document(isMaster=1)
+        build_info = struct.pack("<I", 0) + b"\0" + _bson_document(buildInfo=1, **{"$db": "admin"})
+        await session.send(
+            self._message(1, self.OP_QUERY, is_master) + self._message(2, self.OP_MSG, build_info)
+        )
+        reply = bytes(await session.receive(self._complete))
+        
+        if len(reply) < 16 or struct.unpack_from("<i", reply, 12)[0] not in (self.OP_REPLY, self.OP_MSG):
+            return None
+        version = _bson_string(reply, b"version")
+        wire_version = _bson_int32(reply, b"maxWireVersion")
+        if version is None and wire_version is None:
+            return None
+        
+        banner = f"MongoDB {version}" if version else "MongoDB"
+        if wire_version is not None:
+            banner += f" (maxWireVersion {wire_version})"
+        return ServiceInfo(
+            service_type=self.service_type,
+            name="MongoDB",
+            version=version,
+            banner=banner,
+            confidence=1.0
+        )
+    
+    @staticmethod
+    def _message(request_id: int, opcode: int, body: bytes) -> bytes:
+        """Frame a wire protocol message."""
+        return struct.pack("<iiii", 16 + len(body), request_id, 0, opcode) + body
+    
+    @staticmethod
+    def _complete(data: memoryview) -> bool:
+        """Stop once the version has arrived or both replies are complete."""
+        reply = bytes(data)
+        if _bson_string(reply, b"version") is not None:
+            return True
+        offset = 0
+        for _ in range(2):
+            if len(reply) < offset + 4:
+                return False
+            length = struct.unpack_from("<i", reply, offset)[0]
+            if length < 16:
+                # Not a wire protocol message; nothing more worth waiting for
+                return True
+            offset += length
+        return len(reply) >= offset
+
+
+def _bson_document(**fields: object) -> bytes:
+    """Encode a flat BSON document of int32 and string fields."""
+    body = b""
+    for key, value in fields.items():
+        name = key.encode() + b"\0"
+        if isinstance(value, int):
+            body += b"\x10" + name + struct.pack("<i", value)
+        else:
+            data = str(value).encode() + b"\0"
+            body += b"\x02" + name + struct.pack("<i", len(data)) + data
+    return struct.pack("<i", len(body) + 5) + body + b"\0"
+
+
+def _bson_string(data: bytes, key: bytes) -> Optional[str]:
+    """Find a string element by name in raw BSON, without decoding the documents."""
+    start = data.find(b"\x02" + key + b"\0")
+    if start < 0:
+        return None
+    start += len(key) + 2
+    if len(data) < start + 4:
+        return None
+    length = struct.unpack_from("<i", data, start)[0]
+    value = data[start + 4:start + 4 + length - 1]
+    if length < 1 or len(value) != length - 1:
+        return None
+    return value.decode("utf-8", errors="replace")
+
+
+def _bson_int32(data: bytes, key: bytes) -> Optional[int]:
+    """Find an int32 element by name in raw BSON, without decoding the documents."""
+    start = data.find(b"\x10" + key + b"\0")
+    if start < 0 or len(data) < start + len(key) + 6:
+        return None
+    value: int = struct.unpack_from("<i", data, start + len(key) + 2)[0]
+    return value
+
+
+# Tried in order: the first module hinted for a port or recognizing a greeting wins.
+PROTOCOLS: List[ProtocolModule] = [
+    MySQLProtocol(),
+    PostgreSQLProtocol(),
+    RedisProtocol(),
+    MongoDBProtocol(),
+]
+
+
+def register_protocol(module: ProtocolModule) -> None:
+    """Add a protocol module, ahead of the built-in ones.
+    
+    Args:
+        module: Module to add.
+    
+    Raises:
+        ValueError: If a module with the same name is already registered.
+    """
+    if any(existing.name == module.name for existing in PROTOCOLS):
+        raise ValueError(f"Protocol module already registered: {module.name}")
+    PROTOCOLS.insert(0, module)
+
+
+def get_protocol(name: str) -> ProtocolModule:
+    """Look up a protocol module by name.
+    
+    Args:
+        name: Module name.
+    
+    Returns:
+        The matching module.
+    
+    Raises:
+        KeyError: If no module has that name.
+    """
+    for module in PROTOCOLS:
+        if module.name == name:
+            return module
+    raise KeyError(name)
+
+
+def protocol_for_port(port: int) -> Optional[ProtocolModule]:
+    """Select the module to run on a port before reading any banner.
+    
+    Args:
+        port: Port number.
+    
+    Returns:
+        The first module hinted for the port, or None.
+    """
+    for module in PROTOCOLS:
+        if port in module.ports:
+            return module
+    return None
+
+
+def protocol_for_greeting(greeting: Response) -> Optional[ProtocolModule]:
+    """Select a module by the first bytes a service sent on its own.
+    
+    Args:
+        greeting: Bytes received before the client spoke.
+    
+    Returns:
+        The first module recognizing the greeting, or None.
+    """
+    if not greeting:
+        return None
+    for module in PROTOCOLS:
+        if module.recognizes(greeting):
+            return module
+    return None
@@ -0,0 +1,201 @@
+"""Caching asynchronous DNS resolution for ScanHero.
+
+The system resolver (``getaddrinfo``) blocks, so lookups run in a thread
+pool. The resolver owns a dedicated pool rather than borrowing the event
+loop's small default executor, so resolving a large inventory neither
+queues behind nor starves other blocking work.
+"""
+
+import asyncio
+import functools
+import ipaddress
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from .cache import TTLCache
+from .exceptions import ConfigurationError, InvalidTargetError
+
+
+@dataclass
+class BulkResolution:
+    """Outcome of resolving many names at once.
+    
+    Attributes:
+        names_by_address: IP address to the names that resolved to it, in
+            input order of each address's first name.
+        errors: Name to error message, for names that did not resolve.
+    """
+    names_by_address: Dict[str, List[str]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def addresses(self) -> List[str]:
+        """Distinct addresses, in input order."""
+        return list(self.names_by_address)
+
+
+class CachingResolver:
+    """Resolves hostnames to IP addresses, caching answers for a TTL.
+    
+    Concurrent lookups of the same name share one query.
+    """
+    
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 10000,
+        workers: int = 64,
+        timeout: Optional[float] = 5.0
+    ) -> None:
+        """Initialize resolver.
+        
+        Args:
+            ttl: How long to cache an answer in seconds.
+            max_entries: Maximum number of cached names.
+            workers: Number of threads, and so of concurrent lookups.
+            timeout: Time allowed for one lookup in seconds, or None.
+        
+        Raises:
+            ConfigurationError: If workers or timeout is out of range.
+        """
+        if workers < 1:
+            raise ConfigurationError(f"workers must be at least 1, got {workers}")
+        if timeout is not None and timeout <= 0:
+            raise ConfigurationError(f"timeout must be positive, got {timeout}")
+        self.cache: TTLCache[str, str] = TTLCache(ttl, max_entries)
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, "asyncio.Future[str]"] = {}
+    
+    def close(self) -> None:
+        """Shut down the lookup threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    async def resolve_all(self, names: Iterable[str]) -> BulkResolution:
+        """Resolve many names concurrently, up to ``workers`` at a time.
+        
+        Names that resolve to the same address are grouped, so each address
+        is scanned once, and each failing name is reported once.
+        
+        Args:
+            names: Hostnames or IP addresses.
+        
+        Returns:
+            Addresses and failures, in input order.
+        """
+        unique = list(dict.fromkeys(names))
+        answers: List[Optional[str]] = [None] * len(unique)
+        errors: Dict[str, str] = {}
+        queue = iter(range(len(unique)))
+        
+        async def work() -> None:
+            for index in queue:
+                name = unique[index]
+                try:
+                    answers[index] = await self.resolve(name)
+                except InvalidTargetError as e:
+                    errors[name] = e.message
+        
+        await asyncio.gather(*(work() for _ in range(min(self.workers, len(unique)))))
+        
+        resolution = BulkResolution()
+        for name, address in zip(unique, answers):
+            if address is None:
+                resolution.errors[name] = errors[name]
+            else:
+                resolution.names_by_address.setdefault(address, []).append(name)
+        return resolution
+    
+    async def resolve(self, host: str) -> str:
+        """Resolve a hostname.
+        
+        Args:
+            host: Hostname or IP address.
+        
+        Returns:
+            IP address; IP address literals are returned unchanged.
+        
+        Raises:
+            InvalidTargetError: If the name cannot be resolved.
+        """
+        if _is_ip_address(host):
+            return host
+        
+        address = self.cache.get(host)
+        if address is not None:
+            return address
+        
+        pending = self._pending.get(host)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._pending[host] = future
+        try:
+            address = await self._lookup(host)
+        except OSError as e:
+            error = InvalidTargetError(f"Could not resolve {host}: {e}")
+            self._fail(future, error)
+            raise error from e
+        except BaseException as e:
+            self._fail(future, e)
+            raise
+        finally:
+            del self._pending[host]
+        
+        self.cache.set(host, address)
+        future.set_result(address)
+        return address
+    
+    def _fail(self, future: "asyncio.Future[str]", error: BaseException) -> None:
+        """Pass a failed lookup on to callers sharing it.
+        
+        Args:
+            future: Shared lookup future.
+            error: Exception to propagate.
+        """
+        if isinstance(error, asyncio.CancelledError):
+            future.cancel()
+            return
+        future.set_exception(error)
+        # Retrieve it here so an unshared failure is not reported as unhandled
+        future.exception()
+    
+    async def _lookup(self, host: str) -> str:
+        """Query the system resolver.
+        
+        Args:
+            host: Hostname.
+        
+        Returns:
+            First address returned for the name.
+        
+        Raises:
+            InvalidTargetError: If the name has no addresses or the lookup
+                timed out.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="scanhero-dns")
+        lookup = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(socket.getaddrinfo, host, None, type=socket.SOCK_STREAM)
+        )
+        try:
+            infos = await asyncio.wait_for(lookup, self.timeout)
+        except asyncio.TimeoutError:
+            raise InvalidTargetError(f"Timed out resolving {host}")
+        if not infos:
+            raise InvalidTargetError(f"Could not resolve {host}")
+        return str(infos[0][4][0])
+
+
+def _is_ip_address(host: str) -> bool:
+    """Check whether a host is an IP address literal."""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
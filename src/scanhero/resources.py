@@ -0,0 +1,175 @@
+"""Automatic sizing of scan concurrency from local resource limits.
+
+Every in-flight connect costs one file descriptor and one ephemeral port, so
+the safe concurrency of a machine is bounded by RLIMIT_NOFILE and by the size
+of the ephemeral port range minus the ports still parked in TIME_WAIT.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # pragma: no cover - not available on Windows
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for automatically chosen concurrency
+AUTO_CONCURRENCY_CAP = 5000
+
+# Concurrency used when the limits of the platform cannot be inspected
+AUTO_CONCURRENCY_FALLBACK = 100
+
+# File descriptors kept free for stdio, log files, output files and the event loop
+RESERVED_FDS = 64
+
+PORT_RANGE_PATH = "/proc/sys/net/ipv4/ip_local_port_range"
+TCP_TABLE_PATHS = ("/proc/net/tcp", "/proc/net/tcp6")
+TCP_TIME_WAIT = "06"
+
+
+@dataclass
+class ResourceBudget:
+    """Concurrency budget derived from local resource limits.
+    
+    Attributes:
+        max_concurrent: Chosen maximum number of concurrent connects.
+        nofile_soft: Soft RLIMIT_NOFILE after any adjustment, or None.
+        nofile_hard: Hard RLIMIT_NOFILE, or None.
+        nofile_raised: Whether the soft limit was raised.
+        ephemeral_ports: Size of the ephemeral port range, or None.
+        time_wait: Number of sockets currently in TIME_WAIT, or None.
+    """
+    max_concurrent: int
+    nofile_soft: Optional[int] = None
+    nofile_hard: Optional[int] = None
+    nofile_raised: bool = False
+    ephemeral_ports: Optional[int] = None
+    time_wait: Optional[int] = None
+    
+    def describe(self) -> str:
+        """Describe the budget in one line.
+        
+        Returns:
+            Human-readable summary of the budget and the limits behind it.
+        """
+        parts = [f"max_concurrent={self.max_concurrent}"]
+        if self.nofile_soft is not None:
+            raised = " (raised)" if self.nofile_raised else ""
+            parts.append(f"nofile={self.nofile_soft}/{self.nofile_hard}{raised}")
+        if self.ephemeral_ports is not None:
+            parts.append(f"ephemeral_ports={self.ephemeral_ports}")
+        if self.time_wait is not None:
+            parts.append(f"time_wait={self.time_wait}")
+        return ", ".join(parts)
+
+
+def detect_resource_budget(reserved: int = 0, raise_limit: bool = True) -> ResourceBudget:
+    """Derive a safe maximum concurrency for this machine.
+    
+    Args:
+        reserved: Extra file descriptors to keep free, e.g. for service
+            detection connections that run alongside the connect stage.
+        raise_limit: Whether to raise the soft RLIMIT_NOFILE towards the hard
+            limit when that allows more concurrency.
+    
+    Returns:
+        ResourceBudget with the chosen concurrency.
+    """
+    budget = ResourceBudget(max_concurrent=AUTO_CONCURRENCY_FALLBACK)
+    limits = []
+    
+    nofile = _nofile_limits(reserved, raise_limit)
+    if nofile is not None:
+        budget.nofile_soft, budget.nofile_hard, budget.nofile_raised = nofile
+        limits.append(budget.nofile_soft - RESERVED_FDS - reserved)
+    
+    budget.ephemeral_ports = _ephemeral_port_count()
+    budget.time_wait = _time_wait_count()
+    if budget.ephemeral_ports is not None:
+        # Keep half of the free ports in reserve for the TIME_WAIT entries
+        # this scan itself is about to create
+        free_ports = budget.ephemeral_ports - (budget.time_wait or 0)
+        limits.append(free_ports // 2)
+    
+    if limits:
+        budget.max_concurrent = max(1, min(min(limits), AUTO_CONCURRENCY_CAP))
+    
+    logger.debug("Concurrency budget: %s", budget.describe())
+    return budget
+
+
+def _nofile_limits(reserved: int, raise_limit: bool) -> Optional[Tuple[int, int, bool]]:
+    """Read, and where allowed raise, the open file limit.
+    
+    Args:
+        reserved: Extra file descriptors to keep free.
+        raise_limit: Whether to try raising the soft limit.
+    
+    Returns:
+        (soft, hard, raised) tuple, or None if the limit cannot be inspected.
+    """
+    if not RESOURCE_AVAILABLE:
+        return None
+    
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = AUTO_CONCURRENCY_CAP + RESERVED_FDS + reserved
+    if hard != resource.RLIM_INFINITY:
+        wanted = min(wanted, hard)
+    
+    raised = False
+    if raise_limit and soft != resource.RLIM_INFINITY and soft < wanted:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+            soft, raised = wanted, True
+        except (ValueError, OSError) as e:
+            logger.debug("Could not raise RLIMIT_NOFILE to %d: %s", wanted, e)
+    
+    if soft == resource.RLIM_INFINITY:
+        soft = wanted
+    return soft, hard, raised
+
+
+def _ephemeral_port_count(path: str = PORT_RANGE_PATH) -> Optional[int]:
+    """Get the size of the ephemeral port range.
+    
+    Args:
+        path: procfs file holding the port range.
+    
+    Returns:
+        Number of ephemeral ports, or None if the range cannot be read.
+    """
+    try:
+        with open(path) as f:
+            low, high = (int(value) for value in f.read().split())
+    except (OSError, ValueError):
+        return None
+    return high - low + 1
+
+
+def _time_wait_count(paths: Tuple[str, ...] = TCP_TABLE_PATHS) -> Optional[int]:
+    """Count the TCP sockets currently in TIME_WAIT.
+    
+    Args:
+        paths: procfs TCP tables to read.
+    
+    Returns:
+        Number of TIME_WAIT sockets, or None if no table could be read.
+    """
+    count = 0
+    found = False
+    for path in paths:
+        try:
+            with open(path) as f:
+                next(f, None)  # Header
+                for line in f:
+                    fields = line.split(None, 4)
+                    if len(fields) > 3 and fields[3] == TCP_TIME_WAIT:
+                        count += 1
+            found = True
+        except OSError:
+            continue
+    return count if found else None
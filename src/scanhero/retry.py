@@ -0,0 +1,98 @@
+"""Connection error classification and retry policy for ScanHero.
+
+Errors from a connect attempt fall into very different groups: answers from
+the remote side (refused, unreachable), which are final; local resource
+exhaustion (out of file descriptors, buffers or ephemeral ports), which says
+nothing about the target and is worth retrying once the scanner has eased
+off; and local policy (a firewall rule on this machine or a sandbox refusing
+the connect), which says nothing about the target either but will not go
+away on retry.
+"""
+
+import errno
+import random
+from dataclasses import dataclass
+from enum import Enum
+from typing import FrozenSet
+
+
+class ErrorClass(Enum):
+    """Enumeration for connect error classes."""
+    CLOSED = "closed"
+    FILTERED = "filtered"
+    LOCAL_RESOURCE = "local_resource"
+    LOCAL_POLICY = "local_policy"
+    UNKNOWN = "unknown"
+
+
+def _errnos(*names: str) -> FrozenSet[int]:
+    """Collect the errno values that exist on this platform.
+    
+    Args:
+        *names: errno constant names.
+    
+    Returns:
+        Set of errno values.
+    """
+    return frozenset(getattr(errno, name) for name in names if hasattr(errno, name))
+
+
+# Definitive answers from the remote side or the network path
+CLOSED_ERRNOS = _errnos("ECONNREFUSED", "ECONNRESET")
+FILTERED_ERRNOS = _errnos("EHOSTUNREACH", "ENETUNREACH", "EHOSTDOWN", "ENETDOWN", "ETIMEDOUT")
+
+# Transient exhaustion of local resources
+LOCAL_RESOURCE_ERRNOS = _errnos(
+    "EMFILE", "ENFILE", "ENOBUFS", "ENOMEM", "EADDRNOTAVAIL", "EADDRINUSE", "EAGAIN"
+)
+
+# Refusals from the local netfilter OUTPUT chain or a sandbox, not the target
+LOCAL_POLICY_ERRNOS = _errnos("EACCES", "EPERM")
+
+
+def classify_error(error: BaseException) -> ErrorClass:
+    """Classify a connect error.
+    
+    Args:
+        error: Exception raised by a connect attempt.
+    
+    Returns:
+        ErrorClass describing how the scanner should treat the error.
+    """
+    if isinstance(error, ConnectionRefusedError):
+        return ErrorClass.CLOSED
+    
+    code = getattr(error, "errno", None)
+    if code in CLOSED_ERRNOS:
+        return ErrorClass.CLOSED
+    if code in FILTERED_ERRNOS:
+        return ErrorClass.FILTERED
+    if code in LOCAL_RESOURCE_ERRNOS:
+        return ErrorClass.LOCAL_RESOURCE
+    if code in LOCAL_POLICY_ERRNOS:
+        return ErrorClass.LOCAL_POLICY
+    return ErrorClass.UNKNOWN
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+    
+    Attributes:
+        base_delay: Delay ceiling in seconds for the first retry.
+        max_delay: Upper bound for the delay ceiling in seconds.
+    """
+    base_delay: float = 0.05
+    max_delay: float = 2.0
+    
+    def delay(self, attempt: int) -> float:
+        """Get the delay before a retry.
+        
+        Args:
+            attempt: Zero-based number of the attempt that just failed.
+        
+        Returns:
+            Delay in seconds, drawn uniformly from zero to the backoff ceiling.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0.0, ceiling)
@@ -1,33 +1,337 @@
 """Core port scanner implementation for ScanHero."""
 
 import asyncio
+import errno
+import functools
+import itertools
+import os
 import socket
 import time
+from collections import deque
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Optional, Set, Union
-from .models import PortResult, PortStatus, ScanResult, ScanConfig
+from typing import (
+    TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence,
+    Set, Tuple, Union
+)
+from .models import (
+    AUTO_CONCURRENCY, PortResult, PortStatus, ScanConfig, ScanResult, ScanSummary, ServiceInfo,
+    port_ranges
+)
 from .service_detector import ServiceDetector
-from .exceptions import InvalidTargetError, ScanTimeoutError
+from .connector import Connector
+from .engine import EPOLL_AVAILABLE, ConnectOutcome, EpollConnectEngine
+from .transport import Transport
+from .metrics import MetricsRegistry
+from .hooks import Hooks
+from .cache import TTLCache
+from .discovery import HostDiscovery
+from .resolver import BulkResolution, CachingResolver
+from .intervals import IntervalSet
+from .targets import ExclusionList
+from .limiter import ConcurrencyLimiter, Slot
+from .retry import ErrorClass, RetryPolicy, classify_error
+from .resources import ResourceBudget, detect_resource_budget
+from .exceptions import ConfigurationError, InvalidTargetError
+
+if TYPE_CHECKING:
+    from .sinks import ResultSink
+
+# Host-port pairs held in memory at once by PortScanner.scan_to_sink
+SINK_BATCH_PORTS = 65536
+
+
+class _FilteredHosts:
+    """Tracks hosts whose answers so far were all filtered, for ``abandon_filtered``."""
+    
+    def __init__(self, threshold: Optional[int]) -> None:
+        """Initialize tracker.
+        
+        Args:
+            threshold: Number of filtered results after which a host with no
+                open or closed answer is abandoned, or None to never abandon.
+        """
+        self.threshold = threshold
+        self.abandoned: Set[str] = set()
+        self._answered: Set[str] = set()
+        self._counts: Dict[str, int] = {}
+    
+    def record(self, host: str, status: PortStatus) -> None:
+        """Count a port result towards abandoning its host.
+        
+        Args:
+            host: Host the port belongs to.
+            status: Status of the port.
+        """
+        if self.threshold is None or host in self._answered:
+            return
+        if status in (PortStatus.OPEN, PortStatus.CLOSED):
+            self._answered.add(host)
+        elif status is PortStatus.FILTERED:
+            self._counts[host] = self._counts.get(host, 0) + 1
+            if self._counts[host] >= self.threshold:
+                self.abandoned.add(host)
+    
+    def forget(self, host: str) -> None:
+        """Drop everything recorded about a host that is done.
+        
+        Args:
+            host: Host to forget.
+        """
+        self.abandoned.discard(host)
+        self._answered.discard(host)
+        self._counts.pop(host, None)
+
+
+class _HostStream:
+    """Hosts that join a dispatch while it runs, for PortScanner.scan_to_sink.
+    
+    A producer adds hosts as room frees up. The dispatch takes them between
+    turns of its round and hands each host's results to ``on_done`` as soon
+    as all of its ports are done, so no host waits for another. The
+    dispatch's per-host state lives here and is dropped once a host is
+    reported.
+    """
+    
+    def __init__(
+        self,
+        on_done: Callable[[str, List[PortResult], List[int]], None],
+        abandon_filtered: Optional[int]
+    ) -> None:
+        """Initialize stream.
+        
+        Args:
+            on_done: Called with a host, its port results in port order and
+                the ports presumed filtered if it was abandoned.
+            abandon_filtered: Threshold for abandoning fully filtered hosts.
+        """
+        self.on_done = on_done
+        self.finished: Dict[str, Dict[int, PortResult]] = {}
+        self.connected: Dict[str, Dict[int, PortResult]] = {}
+        self.presumed: Dict[str, List[int]] = {}
+        self.filtered_hosts = _FilteredHosts(abandon_filtered)
+        self.changed = asyncio.Event()
+        self.closed = False
+        self._ready: List[Tuple[str, List[int]]] = []
+        self._ports: Dict[str, List[int]] = {}
+        self._outstanding: Dict[str, int] = {}
+        self._retired: Set[str] = set()
+    
+    @property
+    def exhausted(self) -> bool:
+        """Whether the producer is done and every host has been taken."""
+        return self.closed and not self._ready
+    
+    def add(self, host: str, ports: List[int]) -> None:
+        """Queue a host for the dispatch.
+        
+        Args:
+            host: IP address to scan.
+            ports: Ports to scan on it.
+        """
+        self._ready.append((host, ports))
+        self.changed.set()
+    
+    def close(self) -> None:
+        """Tell the dispatch that no more hosts will be added."""
+        self.closed = True
+        self.changed.set()
+    
+    def take(self) -> List[Tuple[str, List[int]]]:
+        """Take the hosts added since the last call.
+        
+        Returns:
+            (host, ports) pairs for the dispatch to scan.
+        """
+        self.changed.clear()
+        ready, self._ready = self._ready, []
+        for host, ports in ready:
+            self.finished[host] = {}
+            self.connected[host] = {}
+            self._ports[host] = ports
+            self._outstanding[host] = 0
+        return ready
+    
+    def launched(self, host: str) -> None:
+        """Count a port of a host handed a slot."""
+        self._outstanding[host] += 1
+    
+    def landed(self, host: str) -> None:
+        """Count a port of a host that has its final result."""
+        if host in self._outstanding:
+            self._outstanding[host] -= 1
+            self._settle(host)
+    
+    def retire(self, host: str) -> None:
+        """Mark a host whose ports have all been launched or abandoned."""
+        self._retired.add(host)
+        self._settle(host)
+    
+    def flush(self) -> None:
+        """Report every host left, with the results it has, once a dispatch is cut short."""
+        self.take()
+        for host in list(self._ports):
+            self._report(host)
+    
+    def _settle(self, host: str) -> None:
+        """Report a host once it is retired and none of its ports is outstanding."""
+        if host in self._retired and not self._outstanding[host]:
+            self._report(host)
+    
+    def _report(self, host: str) -> None:
+        """Hand a host's results to the consumer and drop its state."""
+        results = self.finished.pop(host)
+        # Ports cut off during service detection fall back to their connect result
+        for port, result in self.connected.pop(host).items():
+            results.setdefault(port, result)
+        ports = self._ports.pop(host)
+        del self._outstanding[host]
+        self._retired.discard(host)
+        self.filtered_hosts.forget(host)
+        self.on_done(host, [results[p] for p in ports if p in results], self.presumed.pop(host, []))
+
+
+async def _first_of(*awaitables: Awaitable[Any]) -> None:
+    """Wait until any of several awaitables is done, cancelling the others.
+    
+    Args:
+        awaitables: Awaitables to wait on.
+    """
+    tasks = [asyncio.ensure_future(a) for a in awaitables]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 class PortScanner:
     """Asynchronous port scanner with service detection capabilities."""
     
-    def __init__(self, config: Optional[ScanConfig] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[ScanConfig] = None,
+        transport: Optional[Transport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[Hooks] = None,
+        resolver: Optional[CachingResolver] = None
+    ) -> None:
         """Initialize port scanner.
         
         Args:
             config: Scanner configuration. If None, uses default config.
+            transport: Transport used to open connections, e.g. a
+                SimulatedNetwork. If None, a Connector tuned from the config
+                is used.
+            metrics: Registry that receives scan metrics. If None, the
+                scanner creates its own, available as ``metrics``.
+            hooks: Event callbacks. If None, the scanner creates an empty
+                registry, available as ``hooks``.
+            resolver: DNS resolver for hostname targets. If None, a
+                CachingResolver sized from the config is used.
         """
         self.config = config or ScanConfig()
-        self.service_detector = ServiceDetector(timeout=self.config.timeout)
-        self._semaphore = asyncio.Semaphore(self.config.max_concurrent)
+        
+        # Size concurrency from local limits if asked to
+        self.resource_budget: Optional[ResourceBudget] = None
+        max_concurrent = self.config.max_concurrent
+        if max_concurrent == AUTO_CONCURRENCY:
+            self.resource_budget = detect_resource_budget(
+                reserved=self.config.detection_concurrency
+            )
+            max_concurrent = self.resource_budget.max_concurrent
+        self.max_concurrent = int(max_concurrent)
+        
+        self.metrics = metrics or MetricsRegistry()
+        self._init_metrics()
+        self.hooks = hooks or Hooks()
+        
+        self.transport = transport or Connector(
+            linger_zero=self.config.linger_zero,
+            syn_retries=self.config.syn_retries,
+            source_addresses=self.config.source_addresses
+        )
+        if self.config.engine == "epoll":
+            if not EPOLL_AVAILABLE:
+                raise ConfigurationError("The epoll engine needs select.epoll, which this platform lacks")
+            if not isinstance(self.transport, Connector):
+                raise ConfigurationError("The epoll engine opens its own sockets and cannot use a custom transport")
+        self.resolver = resolver or CachingResolver(
+            workers=self.config.resolve_workers,
+            timeout=self.config.resolve_timeout
+        )
+        self.service_detector = ServiceDetector(
+            timeout=self.config.effective_banner_timeout,
+            null_probe_timeout=self.config.null_probe_timeout,
+            connect_timeout=self.config.effective_connect_timeout,
+            transport=self.transport,
+            metrics=self.metrics
+        )
+        self._limiter = ConcurrencyLimiter(
+            self.max_concurrent,
+            per_host_limit=self.config.max_per_host,
+            per_subnet_limit=self.config.max_per_subnet,
+            subnet_prefix=self.config.subnet_prefix
+        )
+        self._retry_policy = RetryPolicy(
+            base_delay=self.config.retry_backoff,
+            max_delay=self.config.retry_backoff_max
+        )
+        self._detection_semaphore = asyncio.Semaphore(self.config.detection_concurrency)
+        self.host_discovery = HostDiscovery(
+            self.transport,
+            self._limiter,
+            self.config.discovery_ports,
+            self.config.discovery_timeout
+        )
+        self.exclusions = ExclusionList(self.config.exclude)
+        self._excluded_ports = IntervalSet(port_ranges(self.config.exclude_ports))
+        self.fingerprint_cache: Optional[TTLCache[Tuple[str, int], ServiceInfo]] = None
+        if self.config.fingerprint_ttl is not None:
+            self.fingerprint_cache = TTLCache(self.config.fingerprint_ttl)
+    
+    def _init_metrics(self) -> None:
+        """Register scan metrics and resolve the children used on the hot path."""
+        ports_total = self.metrics.counter(
+            "scanhero_ports_total", "Ports scanned, by result status.", ("status",)
+        )
+        self._ports_by_status = {status: ports_total.labels(status.value) for status in PortStatus}
+        self._connect_errors = self.metrics.counter(
+            "scanhero_connect_errors_total", "Failed connect attempts, by errno name or timeout.", ("errno",)
+        )
+        self._connect_latency = self.metrics.histogram(
+            "scanhero_connect_latency_seconds", "Latency of connect attempts that got an answer."
+        ).labels()
+        self._connects_in_flight = self.metrics.gauge(
+            "scanhero_connects_in_flight", "Connect attempts in flight."
+        ).labels()
+        self._detections_in_flight = self.metrics.gauge(
+            "scanhero_detections_in_flight", "Service detections in flight."
+        ).labels()
+        self._services = self.metrics.counter(
+            "scanhero_services_detected_total", "Detected services, by service type.", ("service",)
+        )
+        self._abandoned_hosts = self.metrics.counter(
+            "scanhero_abandoned_hosts_total", "Hosts abandoned because every answer so far was filtered."
+        ).labels()
+        self._excluded_hosts = self.metrics.counter(
+            "scanhero_excluded_hosts_total", "Targets not scanned because their address is excluded."
+        ).labels()
+        self._resolve_failures = self.metrics.counter(
+            "scanhero_resolve_failures_total", "Target names that could not be resolved."
+        ).labels()
+        hosts_total = self.metrics.counter(
+            "scanhero_discovered_hosts_total", "Hosts probed by host discovery, by state.", ("state",)
+        )
+        self._hosts_up = hosts_total.labels("up")
+        self._hosts_down = hosts_total.labels("down")
     
     async def scan(
         self,
         target: str,
         ports: Union[int, List[int], str],
-        service_detection: Optional[bool] = None
+        service_detection: Optional[bool] = None,
+        hooks: Optional[Hooks] = None
     ) -> ScanResult:
         """Scan target host for open ports.
         
@@ -35,15 +339,19 @@ class PortScanner:
             target: Target host or IP address to scan.
             ports: Port(s) to scan. Can be int, list of ints, or range string (e.g., "1-1000").
             service_detection: Whether to perform service detection. Overrides config.
+            hooks: Extra callbacks for this scan only, run after the
+                scanner's own hooks.
             
         Returns:
-            ScanResult containing scan results.
+            ScanResult containing scan results. If ``scan_deadline`` expires,
+            the result is marked incomplete and lists the unscanned ports.
             
         Raises:
-            InvalidTargetError: If target is invalid.
-            ScanTimeoutError: If scan times out.
+            InvalidTargetError: If target is invalid, cannot be resolved or
+                resolves to an excluded address.
         """
         start_time = time.time()
+        deadline = self._deadline()
         timestamp = datetime.now().isoformat()
         
         # Validate and parse target
@@ -52,17 +360,436 @@ class PortScanner:
         # Parse ports
         port_list = self._parse_ports(ports)
         
+        # Resolve once, rather than on every connect
+        with self.metrics.phase("resolve"):
+            try:
+                address = await self.resolver.resolve(target)
+            except InvalidTargetError:
+                self._resolve_failures.inc()
+                raise
+        if address in self.exclusions:
+            self._excluded_hosts.inc()
+            raise InvalidTargetError(f"{target} resolves to excluded address {address}")
+        
         # Determine service detection setting
         detect_services = service_detection if service_detection is not None else self.config.service_detection
         
         # Perform scan
+        hooks = self._hooks_for(hooks)
+        presumed: Dict[str, List[int]] = {}
+        with self.metrics.phase("scan"):
+            results = await self._scan_ports(
+                address, port_list, detect_services, deadline, hooks, presumed=presumed
+            )
+        
+        result = self._build_result(
+            target, port_list, results, time.time() - start_time, timestamp, presumed.get(address, [])
+        )
+        result.address = address
+        if hooks.on_scan_complete:
+            await hooks.emit("on_scan_complete", result)
+        return result
+    
+    async def scan_hosts(
+        self,
+        targets: Iterable[str],
+        ports: Union[int, List[int], str],
+        service_detection: Optional[bool] = None,
+        hooks: Optional[Hooks] = None,
+        resolution: Optional[BulkResolution] = None,
+        host_discovery: Optional[bool] = None
+    ) -> List[ScanResult]:
+        """Scan several hosts in one sweep.
+        
+        All hosts share the global ``max_concurrent`` budget, while
+        ``max_per_host`` and ``max_per_subnet`` cap the load on each target.
+        Hosts are served round-robin, so one slow host never starves the rest.
+        
+        Hostnames are resolved up front in the resolver's thread pool. Names
+        that resolve to the same address are scanned once, and a name that
+        does not resolve, or resolves to an excluded address, gets one error
+        instead of one per port.
+        
+        With ``host_discovery`` enabled and more than one host, hosts that
+        answer none of the discovery probes are skipped.
+        
+        Args:
+            targets: Target hosts or IP addresses to scan.
+            ports: Port(s) to scan on every host.
+            service_detection: Whether to perform service detection. Overrides config.
+            hooks: Extra callbacks for this scan only, run after the
+                scanner's own hooks.
+            resolution: Resolution of the targets the caller already did,
+                e.g. with ``resolver.resolve_all``. If given, targets are not
+                resolved again; excluded addresses are still skipped.
+            host_discovery: Whether to run host discovery. Overrides config.
+            
+        Returns:
+            One ScanResult per distinct address, or per name that failed to
+            resolve, in input order. A result's target is the first name that
+            resolved to its address, with the others in ``aliases``. Hosts
+            skipped by host discovery have no result.
+            
+        Raises:
+            InvalidTargetError: If a target or the ports are invalid.
+        """
+        start_time = time.time()
+        deadline = self._deadline()
+        timestamp = datetime.now().isoformat()
+        
+        names = list(dict.fromkeys(self._validate_target(t) for t in targets))
+        port_list = self._parse_ports(ports)
+        detect_services = service_detection if service_detection is not None else self.config.service_detection
+        
+        return await self._scan_batch(
+            names, port_list, detect_services, deadline, self._hooks_for(hooks), start_time, timestamp,
+            resolution, host_discovery
+        )
+    
+    async def scan_to_sink(
+        self,
+        targets: Iterable[str],
+        ports: Union[int, List[int], str],
+        sink: "ResultSink",
+        service_detection: Optional[bool] = None,
+        hooks: Optional[Hooks] = None,
+        retain_open_ports: bool = False,
+        batch_ports: int = SINK_BATCH_PORTS
+    ) -> ScanSummary:
+        """Scan hosts, writing each host's result to a sink.
+        
+        Targets are consumed lazily, keeping at most about ``batch_ports``
+        host-port pairs in flight. Hosts are scanned round-robin like in
+        :meth:`scan_hosts`, and each host's result is written to the sink
+        and dropped as soon as the host is done, which makes room for the
+        next target. A slow host therefore never holds up the others, and
+        memory stays bounded however many targets there are. Results are
+        written in the order hosts finish. Names resolving to the same
+        address are merged while the address is being scanned.
+        
+        Args:
+            targets: Target hosts or IP addresses to scan, read lazily.
+            ports: Port(s) to scan on every host.
+            sink: Sink that receives one ScanResult per host.
+            service_detection: Whether to perform service detection. Overrides config.
+            hooks: Extra callbacks for this scan only, run after the
+                scanner's own hooks.
+            retain_open_ports: Whether to keep the open ports of every host
+                in the returned summary.
+            batch_ports: Host-port pairs held in memory at once.
+            
+        Returns:
+            Totals for the whole scan.
+            
+        Raises:
+            InvalidTargetError: If a target or the ports are invalid.
+            ConfigurationError: If batch_ports is less than 1.
+        """
+        if batch_ports < 1:
+            raise ConfigurationError(f"batch_ports must be at least 1, got {batch_ports}")
+        start_time = time.time()
+        deadline = self._deadline()
+        timestamp = datetime.now().isoformat()
+        
+        port_list = self._parse_ports(ports)
+        detect_services = service_detection if service_detection is not None else self.config.service_detection
+        hooks = self._hooks_for(hooks)
+        window = max(1, batch_ports // max(1, len(port_list)))
+        
+        summary = ScanSummary()
+        target_iter = iter(targets)
+        # Names of the addresses being scanned, by address
+        names_of: Dict[str, List[str]] = {}
+        # Names read from the targets but not yet handed on
+        held: List[str] = []
+        results: "asyncio.Queue[Optional[ScanResult]]" = asyncio.Queue()
+        room = asyncio.Event()
+        in_window = 0
+        
+        def on_done(host: str, port_results: List[PortResult], presumed_filtered: List[int]) -> None:
+            first, *aliases = names_of.pop(host)
+            result = self._build_result(
+                first, port_list, port_results, time.time() - start_time, timestamp, presumed_filtered
+            )
+            result.address = host
+            result.aliases = aliases
+            results.put_nowait(result)
+        
+        stream = _HostStream(on_done, self.config.abandon_filtered)
+        
+        async def produce() -> None:
+            nonlocal in_window
+            discover_single = False
+            try:
+                while True:
+                    if in_window >= window:
+                        room.clear()
+                        await room.wait()
+                        continue
+                    held[:] = dict.fromkeys(
+                        self._validate_target(t) for t in itertools.islice(target_iter, window - in_window)
+                    )
+                    if not held:
+                        return
+                    # Once a scan has several hosts, hosts read one at a time are discovered too
+                    discover_single = discover_single or len(held) > 1
+                    resolution, hosts, errors = await self._prepare_hosts(
+                        held, deadline, discover_single=discover_single
+                    )
+                    summary.hosts_skipped += len(held) - len(errors) - sum(
+                        len(resolution.names_by_address[host]) for host in hosts
+                    )
+                    for name, error in errors.items():
+                        in_window += 1
+                        results.put_nowait(self._error_result(name, error, time.time() - start_time, timestamp))
+                    for host in hosts:
+                        names = resolution.names_by_address[host]
+                        if host in names_of:
+                            names_of[host].extend(n for n in names if n not in names_of[host])
+                        else:
+                            names_of[host] = list(names)
+                            in_window += 1
+                            stream.add(host, port_list)
+                    held.clear()
+            finally:
+                stream.close()
+        
+        async def write() -> None:
+            nonlocal in_window
+            while True:
+                result = await results.get()
+                if result is None:
+                    return
+                if hooks.on_scan_complete:
+                    await hooks.emit("on_scan_complete", result)
+                await sink.write(result)
+                summary.add(result, retain_open_ports)
+                in_window -= 1
+                room.set()
+        
+        producer = asyncio.ensure_future(produce())
+        writer = asyncio.ensure_future(write())
+        # A failing sink stops the scan
+        writer.add_done_callback(lambda _: producer.cancel())
         try:
-            results = await self._scan_ports(target, port_list, detect_services)
-        except asyncio.TimeoutError as e:
-            raise ScanTimeoutError(f"Scan timed out after {self.config.timeout} seconds") from e
+            with self.metrics.phase("scan"):
+                await self._dispatch([], detect_services, deadline, hooks, stream.presumed, stream)
+            # Only still running if the deadline cut the dispatch short
+            producer.cancel()
+            await asyncio.wait([producer])
+            error = None if producer.cancelled() else producer.exception()
+            if error is not None:
+                raise error
+            stream.flush()
+            results.put_nowait(None)
+            await writer
+        finally:
+            producer.cancel()
+            writer.cancel()
+            await asyncio.gather(producer, writer, return_exceptions=True)
+        
+        # The deadline has expired: the targets left are reported unscanned
+        remaining = itertools.chain(held, target_iter)
+        while True:
+            batch = list(dict.fromkeys(
+                self._validate_target(t) for t in itertools.islice(remaining, window)
+            ))
+            if not batch:
+                break
+            for result in await self._scan_batch(
+                batch, port_list, detect_services, deadline, hooks, start_time, timestamp
+            ):
+                await sink.write(result)
+                summary.add(result, retain_open_ports)
+        
+        summary.scan_duration = time.time() - start_time
+        return summary
+    
+    async def _prepare_hosts(
+        self,
+        names: List[str],
+        deadline: Optional[float],
+        resolution: Optional[BulkResolution] = None,
+        host_discovery: Optional[bool] = None,
+        discover_single: bool = False
+    ) -> Tuple[BulkResolution, List[str], Dict[str, str]]:
+        """Resolve names, leave out excluded addresses and run host discovery.
+        
+        Args:
+            names: Distinct, validated host names and addresses.
+            deadline: Event loop time at which unfinished ports are cancelled.
+            resolution: Resolution of the names, if the caller already did it.
+            host_discovery: Whether to run host discovery. Defaults to config.
+            discover_single: Whether to run host discovery on a single host,
+                e.g. one of many read one at a time.
+        
+        Returns:
+            The resolution, the addresses to scan and, by name, an error for
+            each name that did not resolve or resolved to an excluded address.
+        """
+        if resolution is None:
+            with self.metrics.phase("resolve"):
+                resolution = await self.resolver.resolve_all(names)
+        self._resolve_failures.inc(len(resolution.errors))
+        errors = dict(resolution.errors)
+        hosts = []
+        for address in resolution.addresses:
+            if address in self.exclusions:
+                self._excluded_hosts.inc()
+                for name in resolution.names_by_address[address]:
+                    errors[name] = f"{name} resolves to excluded address {address}"
+            else:
+                hosts.append(address)
+        
+        expired = deadline is not None and asyncio.get_running_loop().time() >= deadline
+        if host_discovery is None:
+            host_discovery = self.config.host_discovery
+        if host_discovery and (len(hosts) > 1 or discover_single) and hosts and not expired:
+            hosts = await self.discover_hosts(hosts)
+        return resolution, hosts, errors
+    
+    async def _scan_batch(
+        self,
+        names: List[str],
+        port_list: List[int],
+        detect_services: bool,
+        deadline: Optional[float],
+        hooks: Hooks,
+        start_time: float,
+        timestamp: str,
+        resolution: Optional[BulkResolution] = None,
+        host_discovery: Optional[bool] = None
+    ) -> List[ScanResult]:
+        """Resolve, discover and scan a list of hosts.
+        
+        Args:
+            names: Distinct, validated host names and addresses.
+            port_list: Ports to scan on every host.
+            detect_services: Whether to perform service detection.
+            deadline: Event loop time at which unfinished ports are cancelled.
+            hooks: Hooks to raise events on.
+            start_time: Wall-clock time the scan started.
+            timestamp: Timestamp when the scan was started.
+            resolution: Resolution of the names, if the caller already did it.
+            host_discovery: Whether to run host discovery. Defaults to config.
+        
+        Returns:
+            Results as described for :meth:`scan_hosts`.
+        """
+        resolution, hosts, errors = await self._prepare_hosts(names, deadline, resolution, host_discovery)
+        
+        presumed: Dict[str, List[int]] = {}
+        with self.metrics.phase("scan"):
+            results = await self._dispatch(
+                [(host, port_list) for host in hosts], detect_services, deadline, hooks, presumed
+            )
         
         scan_duration = time.time() - start_time
+        by_name: Dict[str, ScanResult] = {}
+        for host in hosts:
+            first, *aliases = resolution.names_by_address[host]
+            result = self._build_result(
+                first, port_list, results[host], scan_duration, timestamp, presumed.get(host, [])
+            )
+            result.address = host
+            result.aliases = aliases
+            by_name[first] = result
+        for name, error in errors.items():
+            by_name[name] = self._error_result(name, error, scan_duration, timestamp)
+        scan_results = [by_name[name] for name in names if name in by_name]
+        if hooks.on_scan_complete:
+            for result in scan_results:
+                await hooks.emit("on_scan_complete", result)
+        return scan_results
+    
+    def _error_result(self, name: str, error: str, scan_duration: float, timestamp: str) -> ScanResult:
+        """Build the result of a name that was not scanned.
+        
+        Args:
+            name: Host name.
+            error: Why it was not scanned.
+            scan_duration: Time taken for the scan in seconds.
+            timestamp: Timestamp when the scan was started.
+        
+        Returns:
+            ScanResult with the error and no ports.
+        """
+        return ScanResult(
+            target=name,
+            ports_scanned=[],
+            open_ports=[],
+            closed_ports=[],
+            filtered_ports=[],
+            scan_duration=scan_duration,
+            timestamp=timestamp,
+            errors=[error]
+        )
+    
+    async def discover_hosts(self, targets: Iterable[str]) -> List[str]:
+        """Find the hosts that answer on any of the discovery ports.
+        
+        A host counts as up when a probe connection is accepted or refused;
+        hosts where every probe times out or is unreachable count as down.
+        
+        Args:
+            targets: Target hosts or IP addresses to probe.
+            
+        Returns:
+            Live hosts, in input order.
+            
+        Raises:
+            InvalidTargetError: If a target is invalid.
+        """
+        hosts = list(dict.fromkeys(self._validate_target(t) for t in targets))
+        with self.metrics.phase("discovery"):
+            alive = await self.host_discovery.discover(hosts)
+        self._hosts_up.inc(len(alive))
+        self._hosts_down.inc(len(hosts) - len(alive))
+        return alive
+    
+    def _hooks_for(self, extra: Optional[Hooks]) -> Hooks:
+        """Get the hooks for one scan.
+        
+        Args:
+            extra: Callbacks for this scan only, or None.
+        
+        Returns:
+            The scanner's hooks, combined with ``extra`` if given.
+        """
+        return self.hooks if extra is None else self.hooks.merged(extra)
+    
+    def _deadline(self) -> Optional[float]:
+        """Get the event loop time at which the current scan must stop.
+        
+        Returns:
+            Absolute deadline, or None if no scan deadline is configured.
+        """
+        if self.config.scan_deadline is None:
+            return None
+        return asyncio.get_running_loop().time() + self.config.scan_deadline
+    
+    def _build_result(
+        self,
+        target: str,
+        port_list: List[int],
+        results: List[PortResult],
+        scan_duration: float,
+        timestamp: str,
+        presumed_filtered: Sequence[int] = ()
+    ) -> ScanResult:
+        """Organize port results into a ScanResult.
         
+        Args:
+            target: Target host or IP address.
+            port_list: Ports that were requested.
+            results: Results for the ports that finished.
+            scan_duration: Time taken for the scan in seconds.
+            timestamp: Timestamp when the scan was started.
+            presumed_filtered: Ports skipped because the host was abandoned.
+            
+        Returns:
+            ScanResult for the target.
+        """
         # Organize results
         open_ports = [r for r in results if r.status == PortStatus.OPEN]
         closed_ports = [r for r in results if r.status == PortStatus.CLOSED]
@@ -71,22 +798,34 @@ class PortScanner:
         # Collect errors
         errors = [r.error for r in results if r.error]
         
+        # Ports without a result were cut off by the scan deadline, unless
+        # the host was abandoned before they were tried
+        scanned = {r.port for r in results}
+        skipped = set(presumed_filtered)
+        unscanned_ports = [p for p in port_list if p not in scanned and p not in skipped]
+        
         return ScanResult(
             target=target,
-            ports_scanned=port_list,
+            ports_scanned=[p for p in port_list if p in scanned],
             open_ports=open_ports,
             closed_ports=closed_ports,
             filtered_ports=filtered_ports,
             scan_duration=scan_duration,
             timestamp=timestamp,
-            errors=errors
+            errors=errors,
+            incomplete=bool(unscanned_ports),
+            unscanned_ports=unscanned_ports,
+            presumed_filtered=port_ranges(skipped)
         )
     
     async def _scan_ports(
         self,
         target: str,
         ports: List[int],
-        detect_services: bool
+        detect_services: bool,
+        deadline: Optional[float] = None,
+        hooks: Optional[Hooks] = None,
+        presumed: Optional[Dict[str, List[int]]] = None
     ) -> List[PortResult]:
         """Scan multiple ports concurrently.
         
@@ -94,122 +833,633 @@ class PortScanner:
             target: Target host or IP address.
             ports: List of ports to scan.
             detect_services: Whether to perform service detection.
+            deadline: Event loop time at which unfinished ports are cancelled.
+            hooks: Hooks to raise events on. Defaults to the scanner's hooks.
+            presumed: Optional mapping that receives the ports skipped if
+                the host is abandoned as fully filtered.
+            
+        Returns:
+            List of PortResult objects for the ports that finished in time.
+        """
+        results = await self._dispatch([(target, ports)], detect_services, deadline, hooks, presumed)
+        return results[target]
+    
+    async def _dispatch(
+        self,
+        plan: List[Tuple[str, List[int]]],
+        detect_services: bool,
+        deadline: Optional[float] = None,
+        hooks: Optional[Hooks] = None,
+        presumed: Optional[Dict[str, List[int]]] = None,
+        stream: Optional[_HostStream] = None
+    ) -> Dict[str, List[PortResult]]:
+        """Schedule port scans across hosts round-robin under the limiter.
+        
+        Each turn of the round hands the next port of the next host a slot,
+        skipping hosts that are at their per-host or per-subnet cap, so tasks
+        are only created once they can actually run.
+        
+        With ``abandon_filtered`` set, a host whose first results are all
+        filtered gets no further connects once the threshold is reached.
+        
+        With the epoll engine configured, the connects are handed to the
+        engine instead; see :meth:`_dispatch_engine`.
+        
+        Args:
+            plan: (host, ports) pairs to scan.
+            detect_services: Whether to perform service detection.
+            deadline: Event loop time at which unfinished ports are cancelled.
+            hooks: Hooks to raise events on. Defaults to the scanner's hooks.
+            presumed: Optional mapping that receives, for each abandoned
+                host, the ports that were never tried.
+            stream: Hosts joining while the dispatch runs, each reported
+                through the stream as soon as it is done.
             
         Returns:
-            List of PortResult objects.
+            Mapping of host to the PortResults that finished in time, in port
+            order. Hosts from the stream are not included.
         """
-        tasks = []
-        for port in ports:
-            task = self._scan_single_port(target, port, detect_services)
-            tasks.append(task)
+        if self.config.engine == "epoll":
+            return await self._dispatch_engine(plan, detect_services, deadline, hooks, presumed, stream)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        finished: Dict[str, Dict[int, PortResult]] = {host: {} for host, _ in plan}
+        # Ports whose connect stage finished, kept so that a deadline hit
+        # during service detection still reports the port status
+        connected: Dict[str, Dict[int, PortResult]] = {host: {} for host, _ in plan}
+        in_flight: Set["asyncio.Task[PortResult]"] = set()
+        ring = deque((host, iter(self._probe_order(ports))) for host, ports in plan)
+        filtered_hosts = _FilteredHosts(self.config.abandon_filtered)
+        if stream is not None:
+            finished, connected, filtered_hosts = stream.finished, stream.connected, stream.filtered_hosts
         
-        # Handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append(PortResult(
-                    port=ports[i],
+        def on_done(task: "asyncio.Task[PortResult]", host: str, port: int, slot: Slot) -> None:
+            slot.release()
+            in_flight.discard(task)
+            if task.cancelled():
+                return
+            exception = task.exception()
+            if exception is not None:
+                finished[host][port] = PortResult(
+                    port=port,
                     status=PortStatus.UNKNOWN,
-                    error=str(result)
-                ))
+                    error=str(exception)
+                )
+            else:
+                finished[host][port] = task.result()
+            filtered_hosts.record(host, finished[host][port].status)
+            if stream is not None:
+                stream.landed(host)
+        
+        def launch(host: str, port: int, slot: Slot) -> None:
+            if stream is not None:
+                stream.launched(host)
+            task = asyncio.ensure_future(self._scan_single_port(
+                host, port, detect_services, connected=connected[host], slot=slot, hooks=hooks
+            ))
+            in_flight.add(task)
+            task.add_done_callback(functools.partial(on_done, host=host, port=port, slot=slot))
+        
+        async def feed() -> None:
+            await self._feed(ring, filtered_hosts.abandoned, presumed, launch, stream=stream)
+            while in_flight:
+                await asyncio.wait(set(in_flight))
+        
+        try:
+            await self._run_until(feed(), deadline)
+        finally:
+            # Deadline expired (or we were cancelled) - cancel in-flight work
+            # and wait for it to unwind
+            pending = list(in_flight)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return self._collect(plan, finished, connected)
+    
+    async def _dispatch_engine(
+        self,
+        plan: List[Tuple[str, List[int]]],
+        detect_services: bool,
+        deadline: Optional[float] = None,
+        hooks: Optional[Hooks] = None,
+        presumed: Optional[Dict[str, List[int]]] = None,
+        stream: Optional[_HostStream] = None
+    ) -> Dict[str, List[PortResult]]:
+        """Schedule port scans like :meth:`_dispatch`, with connects run by the epoll engine.
+        
+        Slots are taken round-robin exactly as in :meth:`_dispatch`, but each
+        turn of the round is submitted to the engine thread as one batch, and
+        outcomes come back in batches. No task is created for a port unless
+        it needs an ``on_port_result`` hook or service detection.
+        
+        Args:
+            plan: (host, ports) pairs to scan; hosts must be IP addresses.
+            detect_services: Whether to perform service detection.
+            deadline: Event loop time at which unfinished ports are cancelled.
+            hooks: Hooks to raise events on. Defaults to the scanner's hooks.
+            presumed: Optional mapping that receives, for each abandoned
+                host, the ports that were never tried.
+            stream: Hosts joining while the dispatch runs, each reported
+                through the stream as soon as it is done.
+            
+        Returns:
+            Mapping of host to the PortResults that finished in time, in port
+            order. Hosts from the stream are not included.
+        """
+        if hooks is None:
+            hooks = self.hooks
+        loop = asyncio.get_running_loop()
+        finished: Dict[str, Dict[int, PortResult]] = {host: {} for host, _ in plan}
+        connected: Dict[str, Dict[int, PortResult]] = {host: {} for host, _ in plan}
+        # Connects submitted or waiting for a retry, holding their slot
+        slots: Dict[Tuple[str, int], Slot] = {}
+        attempts: Dict[Tuple[str, int], int] = {}
+        follow_ups: Set["asyncio.Task[PortResult]"] = set()
+        batch: List[Tuple[str, int]] = []
+        idle = asyncio.Event()
+        ring = deque((host, iter(self._probe_order(ports))) for host, ports in plan)
+        filtered_hosts = _FilteredHosts(self.config.abandon_filtered)
+        if stream is not None:
+            finished, connected, filtered_hosts = stream.finished, stream.connected, stream.filtered_hosts
+        
+        def on_follow_up_done(task: "asyncio.Task[PortResult]", host: str, port: int) -> None:
+            follow_ups.discard(task)
+            if not task.cancelled():
+                exception = task.exception()
+                if exception is not None:
+                    finished[host][port] = PortResult(port=port, status=PortStatus.UNKNOWN, error=str(exception))
+                else:
+                    finished[host][port] = task.result()
+            if stream is not None:
+                stream.landed(host)
+            if not slots and not follow_ups:
+                idle.set()
+        
+        def on_outcomes(outcomes: List[ConnectOutcome]) -> None:
+            if engine_closed:
+                return
+            for outcome in outcomes:
+                key = (outcome.host, outcome.port)
+                attempt = attempts.get(key, 0)
+                error = None
+                try:
+                    status = self._outcome_status(outcome, attempt)
+                except OSError as e:
+                    status, error = PortStatus.UNKNOWN, str(e)
+                if status is None:
+                    attempts[key] = attempt + 1
+                    loop.call_later(self._retry_policy.delay(attempt), engine.submit, [key])
+                    continue
+                
+                slots.pop(key).release()
+                self._connects_in_flight.value -= 1
+                result = PortResult(
+                    port=outcome.port, status=status, response_time=outcome.latency * 1000, error=error
+                )
+                self._ports_by_status[status].value += 1
+                connected[outcome.host][outcome.port] = result
+                filtered_hosts.record(outcome.host, status)
+                
+                if hooks.on_port_result or (status is PortStatus.OPEN and detect_services):
+                    task = asyncio.ensure_future(
+                        self._finish_port(outcome.host, result, detect_services, hooks)
+                    )
+                    follow_ups.add(task)
+                    task.add_done_callback(
+                        functools.partial(on_follow_up_done, host=outcome.host, port=outcome.port)
+                    )
+                else:
+                    finished[outcome.host][outcome.port] = result
+                    if stream is not None:
+                        stream.landed(outcome.host)
+            
+            if not slots and not follow_ups:
+                idle.set()
+        
+        def launch(host: str, port: int, slot: Slot) -> None:
+            if stream is not None:
+                stream.launched(host)
+            slots[(host, port)] = slot
+            batch.append((host, port))
+        
+        async def flush() -> None:
+            if not batch:
+                return
+            submitted = list(batch)
+            batch.clear()
+            self._connects_in_flight.value += len(submitted)
+            if hooks.on_connect_start:
+                for host, port in submitted:
+                    await hooks.emit("on_connect_start", host, port)
+            engine.submit(submitted)
+        
+        async def feed() -> None:
+            await self._feed(ring, filtered_hosts.abandoned, presumed, launch, flush, stream)
+            while slots or follow_ups:
+                idle.clear()
+                await idle.wait()
+        
+        engine_closed = False
+        engine = EpollConnectEngine(
+            loop,
+            on_outcomes,
+            timeout=self.config.effective_connect_timeout,
+            connector=self.transport if isinstance(self.transport, Connector) else None
+        )
+        engine.start()
+        try:
+            await self._run_until(feed(), deadline)
+        finally:
+            engine.close()
+            engine_closed = True
+            self._connects_in_flight.value -= len(slots)
+            for slot in slots.values():
+                slot.release()
+            pending = list(follow_ups)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return self._collect(plan, finished, connected)
+    
+    async def _feed(
+        self,
+        ring: "Deque[Tuple[str, Iterator[int]]]",
+        abandoned: Set[str],
+        presumed: Optional[Dict[str, List[int]]],
+        launch: Callable[[str, int, Slot], None],
+        flush: Optional[Callable[[], Awaitable[None]]] = None,
+        stream: Optional[_HostStream] = None
+    ) -> None:
+        """Hand out connect slots round-robin until every host's ports are launched.
+        
+        Args:
+            ring: (host, remaining ports) pairs, rotated as slots are handed out.
+            abandoned: Hosts to drop from the ring; their remaining ports are
+                recorded in ``presumed``.
+            presumed: Optional mapping that receives the ports of abandoned hosts.
+            launch: Starts the connect for a host and port holding a slot.
+            flush: Awaited after each turn of the round, e.g. to submit the
+                ports launched in it as one batch.
+            stream: Hosts that join the ring between turns, until the stream
+                is closed and drained.
+        """
+        while ring or (stream is not None and not stream.exhausted):
+            if stream is not None:
+                ring.extend((host, iter(self._probe_order(ports))) for host, ports in stream.take())
+            launched = False
+            for _ in range(len(ring)):
+                host, port_iter = ring[0]
+                if host in abandoned:
+                    ring.popleft()
+                    skipped = list(port_iter)
+                    if skipped:
+                        self._abandoned_hosts.inc()
+                        if presumed is not None:
+                            presumed[host] = skipped
+                    if stream is not None:
+                        stream.retire(host)
+                    continue
+                
+                slot = self._limiter.try_acquire(host)
+                if slot is None:
+                    ring.rotate(-1)
+                    continue
+                
+                port = next(port_iter, None)
+                if port is None:
+                    slot.release()
+                    ring.popleft()
+                    if stream is not None:
+                        stream.retire(host)
+                    continue
+                
+                ring.rotate(-1)
+                launch(host, port, slot)
+                launched = True
+            
+            if flush is not None:
+                await flush()
+            if launched:
+                continue
+            if stream is None or stream.exhausted:
+                if ring:
+                    await self._limiter.wait_for_release()
+            elif ring:
+                await _first_of(self._limiter.wait_for_release(), stream.changed.wait())
             else:
-                processed_results.append(result)
+                await stream.changed.wait()
+    
+    async def _run_until(self, work: Awaitable[None], deadline: Optional[float]) -> None:
+        """Run scheduling work, stopping quietly when the deadline expires.
         
-        return processed_results
+        Args:
+            work: Coroutine to run.
+            deadline: Event loop time at which to stop, or None.
+        """
+        timeout = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        
+        try:
+            await asyncio.wait_for(work, timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _collect(
+        self,
+        plan: List[Tuple[str, List[int]]],
+        finished: Dict[str, Dict[int, PortResult]],
+        connected: Dict[str, Dict[int, PortResult]]
+    ) -> Dict[str, List[PortResult]]:
+        """Gather the results of a dispatch, in port order.
+        
+        Ports cut off during service detection fall back to their connect
+        result.
+        
+        Args:
+            plan: (host, ports) pairs that were scanned.
+            finished: Final results, by host and port.
+            connected: Connect-stage results, by host and port.
+        
+        Returns:
+            Mapping of host to its PortResults.
+        """
+        results: Dict[str, List[PortResult]] = {}
+        for host, ports in plan:
+            host_results = finished[host]
+            for port, result in connected[host].items():
+                host_results.setdefault(port, result)
+            results[host] = [host_results[p] for p in ports if p in host_results]
+        return results
+    
+    def _probe_order(self, ports: List[int]) -> List[int]:
+        """Order ports so the first probes sample the whole list.
+        
+        With ``abandon_filtered`` set, the ports are interleaved with a
+        stride, so the results that decide whether to abandon a host come
+        from across the port range rather than from its low end.
+        
+        Args:
+            ports: Ports to scan.
+        
+        Returns:
+            Ports in scan order.
+        """
+        threshold = self.config.abandon_filtered
+        if threshold is None or len(ports) <= threshold:
+            return ports
+        stride = len(ports) // threshold
+        return [ports[i] for offset in range(stride) for i in range(offset, len(ports), stride)]
     
     async def _scan_single_port(
         self,
         target: str,
         port: int,
-        detect_services: bool
+        detect_services: bool,
+        connected: Optional[Dict[int, PortResult]] = None,
+        slot: Optional[Slot] = None,
+        hooks: Optional[Hooks] = None
     ) -> PortResult:
         """Scan a single port.
         
+        The connect slot is released as soon as the port status is known, so
+        slow service detection never holds up the rest of the sweep. Detection
+        then runs in its own, separately limited pool.
+        
         Args:
             target: Target host or IP address.
             port: Port number to scan.
             detect_services: Whether to perform service detection.
+            connected: Optional mapping that receives the result as soon as
+                the connect stage finishes.
+            slot: Connect slot already reserved by the scheduler. If None, a
+                slot is acquired from the limiter first.
+            hooks: Hooks to raise events on. Defaults to the scanner's hooks.
             
         Returns:
             PortResult for the scanned port.
         """
-        async with self._semaphore:
+        if slot is None:
+            slot = await self._limiter.acquire(target)
+        
+        if hooks is None:
+            hooks = self.hooks
+        self._connects_in_flight.value += 1
+        try:
+            if hooks.on_connect_start:
+                await hooks.emit("on_connect_start", target, port)
+            
             start_time = time.time()
             
             try:
                 # Attempt connection
                 status = await self._check_port_status(target, port)
-                
-                response_time = (time.time() - start_time) * 1000  # Convert to ms
-                
-                # Perform service detection if port is open
-                service = None
-                if status == PortStatus.OPEN and detect_services:
-                    try:
-                        service = await self.service_detector.detect_service(target, port)
-                    except Exception:
-                        # Service detection failed, but port is still open
-                        pass
-                
-                return PortResult(
+                result = PortResult(
                     port=port,
                     status=status,
-                    service=service,
-                    response_time=response_time
+                    response_time=(time.time() - start_time) * 1000  # Convert to ms
                 )
-                
             except Exception as e:
-                return PortResult(
+                result = PortResult(
                     port=port,
                     status=PortStatus.UNKNOWN,
                     error=str(e)
                 )
+        finally:
+            self._connects_in_flight.value -= 1
+            slot.release()
+        
+        self._ports_by_status[result.status].value += 1
+        if connected is not None:
+            connected[port] = result
+        return await self._finish_port(target, result, detect_services, hooks)
+    
+    async def _finish_port(
+        self,
+        target: str,
+        result: PortResult,
+        detect_services: bool,
+        hooks: Hooks
+    ) -> PortResult:
+        """Report a port's connect result and detect the service if it is open.
+        
+        Args:
+            target: Target host or IP address.
+            result: Result of the connect stage.
+            detect_services: Whether to perform service detection.
+            hooks: Hooks to raise events on.
+            
+        Returns:
+            The result, with the service filled in if one was detected.
+        """
+        if hooks.on_port_result:
+            await hooks.emit("on_port_result", target, result)
+        
+        # Perform service detection if port is open
+        if result.status == PortStatus.OPEN and detect_services:
+            result.service = await self._detect_service(target, result.port)
+            if result.service is not None:
+                self._services.labels(result.service.service_type.value).inc()
+                if hooks.on_service_detected:
+                    await hooks.emit("on_service_detected", target, result.port, result.service)
+        
+        return result
+    
+    async def _detect_service(self, target: str, port: int) -> Optional[ServiceInfo]:
+        """Detect a service, reusing a cached fingerprint when there is one.
+        
+        Args:
+            target: Target host or IP address.
+            port: Open port to fingerprint.
+            
+        Returns:
+            ServiceInfo if detected, None if detection failed or timed out.
+        """
+        cache = self.fingerprint_cache
+        if cache is not None:
+            cached = cache.get((target, port))
+            if cached is not None:
+                return replace(cached)
+        
+        service = await self._run_detection(target, port)
+        if cache is not None and service is not None:
+            cache.set((target, port), replace(service))
+        return service
+    
+    async def _run_detection(self, target: str, port: int) -> Optional[ServiceInfo]:
+        """Run service detection in the detection pool, bypassing the cache.
+        
+        Args:
+            target: Target host or IP address.
+            port: Open port to fingerprint.
+            
+        Returns:
+            ServiceInfo if detected, None if detection failed or timed out.
+        """
+        async with self._detection_semaphore:
+            self._detections_in_flight.value += 1
+            try:
+                return await asyncio.wait_for(
+                    self.service_detector.detect_service(target, port),
+                    timeout=self.config.detection_timeout
+                )
+            except Exception:
+                # Service detection failed, but port is still open
+                return None
+            finally:
+                self._detections_in_flight.value -= 1
     
     async def _check_port_status(self, target: str, port: int) -> PortStatus:
         """Check if a port is open, closed, or filtered.
         
+        Definitive answers from the remote side are final. Local resource
+        errors (EMFILE, ENOBUFS, EADDRNOTAVAIL, ...) make the limiter ease off
+        globally and are retried with exponential backoff and jitter, up to
+        ``resource_retries`` times. Refusals by local policy (EACCES, EPERM)
+        are raised rather than retried. Any other error is retried up to
+        ``retry_count`` times.
+        
         Args:
             target: Target host or IP address.
             port: Port number to check.
             
         Returns:
             PortStatus indicating port state.
+            
+        Raises:
+            OSError: If a local firewall rule or sandbox refused the connect.
         """
-        for attempt in range(self.config.retry_count + 1):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
             try:
                 # Create connection
                 reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(target, port),
-                    timeout=self.config.timeout
+                    self.transport.open_connection(target, port),
+                    timeout=self.config.effective_connect_timeout
                 )
                 
                 # Connection successful - port is open
+                self._connect_latency.observe(time.perf_counter() - started)
                 writer.close()
                 await writer.wait_closed()
+                self._limiter.recover()
                 return PortStatus.OPEN
                 
             except asyncio.TimeoutError:
                 # Timeout - port might be filtered
+                self._connect_errors.labels("timeout").inc()
                 return PortStatus.FILTERED
                 
-            except ConnectionRefusedError:
-                # Connection refused - port is closed
-                return PortStatus.CLOSED
-                
             except OSError as e:
-                if e.errno == 113:  # No route to host
-                    return PortStatus.FILTERED
-                elif e.errno == 111:  # Connection refused
+                self._connect_errors.labels(errno.errorcode.get(e.errno or 0, "unknown")).inc()
+                error_class = classify_error(e)
+                if error_class is ErrorClass.CLOSED:
+                    self._connect_latency.observe(time.perf_counter() - started)
+                    self._limiter.recover()
                     return PortStatus.CLOSED
+                if error_class is ErrorClass.FILTERED:
+                    return PortStatus.FILTERED
+                if error_class is ErrorClass.LOCAL_POLICY:
+                    # Our own machine refused; the port's state is unknown
+                    raise
+                
+                if error_class is ErrorClass.LOCAL_RESOURCE:
+                    # Our own machine ran out of something - slow everyone down
+                    self._limiter.back_off()
+                    max_retries = self.config.resource_retries
                 else:
-                    # Other network error
-                    if attempt == self.config.retry_count:
-                        return PortStatus.UNKNOWN
-                    await asyncio.sleep(0.1)  # Brief delay before retry
+                    max_retries = self.config.retry_count
+                
+                if attempt >= max_retries:
+                    return PortStatus.UNKNOWN
+                await asyncio.sleep(self._retry_policy.delay(attempt))
+                attempt += 1
+    
+    def _outcome_status(self, outcome: ConnectOutcome, attempt: int) -> Optional[PortStatus]:
+        """Turn an engine connect outcome into a port status.
+        
+        Errors are treated as in :meth:`_check_port_status`, including the
+        limiter feedback and the retry budgets.
+        
+        Args:
+            outcome: Outcome reported by the engine.
+            attempt: Zero-based number of the attempt that produced it.
+            
+        Returns:
+            PortStatus, or None if the connect should be retried.
+            
+        Raises:
+            OSError: If a local firewall rule or sandbox refused the connect.
+        """
+        if outcome.timed_out:
+            self._connect_errors.labels("timeout").inc()
+            return PortStatus.FILTERED
+        if not outcome.error:
+            self._connect_latency.observe(outcome.latency)
+            self._limiter.recover()
+            return PortStatus.OPEN
+        
+        self._connect_errors.labels(errno.errorcode.get(outcome.error, "unknown")).inc()
+        error_class = classify_error(OSError(outcome.error, os.strerror(outcome.error)))
+        if error_class is ErrorClass.CLOSED:
+            self._connect_latency.observe(outcome.latency)
+            self._limiter.recover()
+            return PortStatus.CLOSED
+        if error_class is ErrorClass.FILTERED:
+            return PortStatus.FILTERED
+        if error_class is ErrorClass.LOCAL_POLICY:
+            raise OSError(outcome.error, os.strerror(outcome.error))
         
-        return PortStatus.UNKNOWN
+        if error_class is ErrorClass.LOCAL_RESOURCE:
+            self._limiter.back_off()
+            max_retries = self.config.resource_retries
+        else:
+            max_retries = self.config.retry_count
+        return PortStatus.UNKNOWN if attempt >= max_retries else None
     
     def _validate_target(self, target: str) -> str:
         """Validate target host or IP address.
@@ -243,23 +1493,29 @@ class PortScanner:
             ports: Port specification (int, list, or range string).
             
         Returns:
-            List of port numbers.
+            List of port numbers, leaving out excluded ports.
             
         Raises:
-            InvalidTargetError: If ports specification is invalid.
+            InvalidTargetError: If ports specification is invalid or every
+                requested port is excluded.
         """
         if isinstance(ports, int):
-            return [ports]
-        
-        if isinstance(ports, list):
+            port_list = [ports]
+        elif isinstance(ports, list):
             if not all(isinstance(p, int) and 1 <= p <= 65535 for p in ports):
                 raise InvalidTargetError("All ports must be integers between 1 and 65535")
-            return ports
-        
-        if isinstance(ports, str):
-            return self._parse_port_range(ports)
+            port_list = ports
+        elif isinstance(ports, str):
+            port_list = self._parse_port_range(ports)
+        else:
+            raise InvalidTargetError("Ports must be int, list of ints, or range string")
         
-        raise InvalidTargetError("Ports must be int, list of ints, or range string")
+        if self._excluded_ports:
+            allowed = [p for p in port_list if p not in self._excluded_ports]
+            if port_list and not allowed:
+                raise InvalidTargetError("All requested ports are excluded")
+            port_list = allowed
+        return port_list
     
     def _parse_port_range(self, port_range: str) -> List[int]:
         """Parse port range string (e.g., "1-1000", "80,443,8080").
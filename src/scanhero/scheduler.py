@@ -0,0 +1,398 @@
+"""Recurring scan scheduling for ScanHero.
+
+Every scheduled scan runs on a fixed grid of ``interval`` seconds. To avoid
+the thundering herd of cron jobs that all fire on the same second:
+
+- each scan gets a phase offset inside its interval, derived from its name
+  unless set explicitly, so scans with equal intervals start at different
+  times;
+- every start is delayed by a random jitter of up to ``jitter`` seconds;
+- a run can be split into ``batches`` that start evenly spaced over the
+  interval instead of scanning every host at once.
+
+If a run is still going when the next one is due, the new run is either
+skipped or queued behind it (several missed runs coalesce into one queued
+run). A global cap limits how many batches run at once across all scans.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from .exceptions import ConfigurationError
+from .targets import expand_targets
+
+logger = logging.getLogger(__name__)
+
+
+class OverlapPolicy(Enum):
+    """Enumeration for what to do when a run is due while the last one is still going."""
+    SKIP = "skip"
+    QUEUE = "queue"
+
+
+@dataclass
+class ScheduledScan:
+    """A scan that repeats at a fixed interval.
+    
+    Attributes:
+        name: Unique schedule name.
+        targets: Target specs (hosts, IP addresses, CIDR networks).
+        ports: Port spec, as accepted by ``PortScanner.scan``.
+        interval: Seconds between run starts.
+        jitter: Maximum random delay in seconds added to each start.
+        overlap: What to do when a run is due while the last one is still going.
+        batches: Number of batches the targets are split into, started
+            evenly spaced over the interval.
+        phase: Offset in seconds of the first run within the interval, or
+            None to derive a stable offset from the name.
+        service_detection: Service detection override, or None.
+    """
+    name: str
+    targets: List[str]
+    ports: Union[str, List[int]]
+    interval: float
+    jitter: float = 0.0
+    overlap: OverlapPolicy = OverlapPolicy.SKIP
+    batches: int = 1
+    phase: Optional[float] = None
+    service_detection: Optional[bool] = None
+    
+    def __post_init__(self) -> None:
+        """Validate the schedule.
+        
+        Raises:
+            ConfigurationError: If a field is out of range.
+        """
+        if not self.name:
+            raise ConfigurationError("Scheduled scan needs a name")
+        if not self.targets:
+            raise ConfigurationError(f"Scheduled scan {self.name} has no targets")
+        if self.interval <= 0:
+            raise ConfigurationError(f"interval must be positive, got {self.interval}")
+        if not 0 <= self.jitter < self.interval:
+            raise ConfigurationError(f"jitter must be between 0 and the interval, got {self.jitter}")
+        if self.batches < 1:
+            raise ConfigurationError(f"batches must be at least 1, got {self.batches}")
+        if self.phase is not None and not 0 <= self.phase < self.interval:
+            raise ConfigurationError(f"phase must be between 0 and the interval, got {self.phase}")
+        if isinstance(self.overlap, str):
+            try:
+                self.overlap = OverlapPolicy(self.overlap)
+            except ValueError:
+                raise ConfigurationError(f"overlap must be 'skip' or 'queue', got {self.overlap!r}")
+    
+    @property
+    def phase_offset(self) -> float:
+        """Offset of the first run within the interval, in seconds."""
+        if self.phase is not None:
+            return self.phase
+        return zlib.crc32(self.name.encode()) / 2 ** 32 * self.interval
+
+
+@dataclass
+class ScheduleState:
+    """Run statistics of one scheduled scan.
+    
+    Attributes:
+        runs: Number of runs started.
+        skipped: Number of runs skipped because the last one was still going.
+        queued: Number of runs queued behind a run that was still going.
+        running: Whether a run is in progress.
+        pending: Whether a queued run is waiting for the current one.
+        last_started: Start time of the last run.
+        last_finished: End time of the last run.
+        last_duration: Duration of the last run in seconds.
+        last_error: Error of the last run, if it failed.
+    """
+    runs: int = 0
+    skipped: int = 0
+    queued: int = 0
+    running: bool = False
+    pending: bool = False
+    last_started: Optional[str] = None
+    last_finished: Optional[str] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+# Runs one batch of a scheduled scan: runner(scan, targets)
+ScanRunner = Callable[[ScheduledScan, List[str]], Awaitable[Any]]
+
+
+class ScanScheduler:
+    """Runs scheduled scans through a runner coroutine."""
+    
+    def __init__(
+        self,
+        runner: ScanRunner,
+        max_concurrent_jobs: int = 2,
+        seed: Optional[int] = None,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ) -> None:
+        """Initialize scheduler.
+        
+        Args:
+            runner: Coroutine function that scans one batch of targets.
+            max_concurrent_jobs: Maximum number of batches running at once
+                across all scheduled scans.
+            seed: Seed for start jitter, for reproducible schedules.
+            clock: Monotonic time source. Defaults to the event loop's clock.
+            sleep: Coroutine function that waits a number of seconds on
+                ``clock``.
+        """
+        if max_concurrent_jobs < 1:
+            raise ConfigurationError(f"max_concurrent_jobs must be at least 1, got {max_concurrent_jobs}")
+        self.runner = runner
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.scans: Dict[str, ScheduledScan] = {}
+        self.states: Dict[str, ScheduleState] = {}
+        self._rng = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._slots = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._runs: Dict[str, "asyncio.Task[None]"] = {}
+        self._started_at: Optional[float] = None
+    
+    def add(self, scan: ScheduledScan) -> None:
+        """Add a scheduled scan, starting it if the scheduler is running.
+        
+        Args:
+            scan: Scan to schedule.
+        
+        Raises:
+            ConfigurationError: If a scan with the same name exists.
+        """
+        if scan.name in self.scans:
+            raise ConfigurationError(f"Duplicate scheduled scan {scan.name}")
+        self.scans[scan.name] = scan
+        self.states[scan.name] = ScheduleState()
+        if self._started_at is not None:
+            self._tasks[scan.name] = asyncio.ensure_future(self._tick(scan))
+    
+    def remove(self, name: str) -> None:
+        """Remove a scheduled scan and cancel its timer and current run.
+        
+        Args:
+            name: Name of the scheduled scan.
+        """
+        self.scans.pop(name)
+        self.states.pop(name)
+        for tasks in (self._tasks, self._runs):
+            task = tasks.pop(name, None)
+            if task is not None:
+                task.cancel()
+    
+    def start(self) -> None:
+        """Start the timers of all scheduled scans."""
+        self._started_at = self._now()
+        for scan in self.scans.values():
+            self._tasks[scan.name] = asyncio.ensure_future(self._tick(scan))
+    
+    async def stop(self) -> None:
+        """Cancel all timers and running scans."""
+        tasks = list(self._tasks.values()) + list(self._runs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._runs.clear()
+        self._started_at = None
+    
+    async def run_forever(self) -> None:
+        """Run the schedule until cancelled."""
+        self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Describe every scheduled scan.
+        
+        Returns:
+            JSON-serializable state per scheduled scan name.
+        """
+        return {
+            name: {
+                "interval": scan.interval,
+                "overlap": scan.overlap.value,
+                "batches": scan.batches,
+                **vars(self.states[name]),
+            }
+            for name, scan in self.scans.items()
+        }
+    
+    async def _tick(self, scan: ScheduledScan) -> None:
+        """Start runs of one scheduled scan on its interval grid.
+        
+        Args:
+            scan: Scheduled scan.
+        """
+        state = self.states[scan.name]
+        due = (self._started_at or self._now()) + scan.phase_offset
+        while True:
+            jitter = self._rng.uniform(0.0, scan.jitter) if scan.jitter else 0.0
+            await self._sleep(max(0.0, due + jitter - self._now()))
+            
+            if not state.running:
+                self._launch(scan)
+            elif scan.overlap is OverlapPolicy.QUEUE:
+                if not state.pending:
+                    state.pending = True
+                    state.queued += 1
+            else:
+                state.skipped += 1
+                logger.info("Skipping run of %s: previous run is still going", scan.name)
+            
+            due += scan.interval
+    
+    def _launch(self, scan: ScheduledScan) -> None:
+        """Start a run of a scheduled scan.
+        
+        Args:
+            scan: Scheduled scan.
+        """
+        state = self.states[scan.name]
+        state.running = True
+        state.runs += 1
+        self._runs[scan.name] = asyncio.ensure_future(self._run(scan))
+    
+    async def _run(self, scan: ScheduledScan) -> None:
+        """Run all batches of one run, then any queued run.
+        
+        Args:
+            scan: Scheduled scan.
+        """
+        state = self.states[scan.name]
+        started = self._now()
+        state.last_started = datetime.now().isoformat()
+        state.last_error = None
+        try:
+            batches = self._batches(scan)
+            spacing = scan.interval / len(batches)
+            await asyncio.gather(*(
+                self._run_batch(scan, batch, started + index * spacing)
+                for index, batch in enumerate(batches)
+            ))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Scheduled scan %s failed", scan.name)
+            state.last_error = str(e)
+        finally:
+            state.running = False
+            state.last_finished = datetime.now().isoformat()
+            state.last_duration = self._now() - started
+            self._runs.pop(scan.name, None)
+        
+        if state.pending and scan.name in self.scans:
+            state.pending = False
+            self._launch(scan)
+    
+    async def _run_batch(self, scan: ScheduledScan, targets: List[str], start_at: float) -> None:
+        """Run one batch at its slot in the interval.
+        
+        Args:
+            scan: Scheduled scan.
+            targets: Hosts of the batch.
+            start_at: Time on the scheduler's clock at which the batch may start.
+        """
+        await self._sleep(max(0.0, start_at - self._now()))
+        async with self._slots:
+            await self.runner(scan, targets)
+    
+    def _now(self) -> float:
+        """Get the current time on the scheduler's clock."""
+        if self._clock is not None:
+            return self._clock()
+        return asyncio.get_running_loop().time()
+    
+    def _batches(self, scan: ScheduledScan) -> List[List[str]]:
+        """Split the targets of a scan into its batches.
+        
+        Args:
+            scan: Scheduled scan.
+        
+        Returns:
+            Non-empty batches of hosts, as even in size as possible.
+        """
+        if scan.batches == 1:
+            return [list(scan.targets)]
+        hosts = [host for spec in scan.targets for host in expand_targets(spec)]
+        count = min(scan.batches, len(hosts)) or 1
+        size, extra = divmod(len(hosts), count)
+        batches = []
+        start = 0
+        for index in range(count):
+            end = start + size + (1 if index < extra else 0)
+            batches.append(hosts[start:end])
+            start = end
+        return batches
+
+
+def load_schedule(path: str) -> List[ScheduledScan]:
+    """Load scheduled scans from a JSON file.
+    
+    The file holds a list of objects with the fields of ScheduledScan;
+    ``targets`` may be a single string.
+    
+    Args:
+        path: Path to the schedule file.
+    
+    Returns:
+        Scheduled scans.
+    
+    Raises:
+        ConfigurationError: If the file cannot be read or is invalid.
+    """
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigurationError(f"Cannot read schedule {path}: {e}")
+    
+    if not isinstance(entries, list):
+        raise ConfigurationError("Schedule must be a JSON list of scans")
+    
+    scans = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ConfigurationError("Each scheduled scan must be a JSON object")
+        entry = dict(entry)
+        if isinstance(entry.get("targets"), str):
+            entry["targets"] = [entry["targets"]]
+        try:
+            scans.append(ScheduledScan(**entry))
+        except TypeError as e:
+            raise ConfigurationError(f"Invalid scheduled scan: {e}")
+    return scans
+
+
+def scanner_runner(
+    scanner: Any,
+    on_result: Optional[Callable[[ScheduledScan, List[Any]], Any]] = None
+) -> ScanRunner:
+    """Build a runner that scans batches with a PortScanner.
+    
+    Args:
+        scanner: PortScanner to scan with.
+        on_result: Optional callback receiving the scan and its ScanResults.
+    
+    Returns:
+        Runner for ScanScheduler.
+    """
+    async def run(scan: ScheduledScan, targets: List[str]) -> None:
+        hosts = [host for spec in targets for host in expand_targets(spec, scanner.exclusions)]
+        results = await scanner.scan_hosts(hosts, scan.ports, scan.service_detection)
+        if on_result is not None:
+            on_result(scan, results)
+    
+    return run
@@ -2,9 +2,22 @@
 
 import asyncio
 import socket
-from typing import Dict, Optional, Tuple
+import time
+from typing import Dict, List, Optional
 from .models import ServiceInfo, ServiceType
 from .exceptions import ServiceDetectionError
+from .buffers import BufferPool, Response
+from .connector import Connector
+from .transport import RawConnection, Transport
+from .metrics import MetricsRegistry
+from .probes import Probe, fallback_probes, identify_response, select_probes
+from .protocols import ProtocolModule, ProtocolSession, protocol_for_greeting, protocol_for_port
+
+# Bytes received per banner or probe response
+BANNER_BUFFER_SIZE = 1024
+
+# Longest banner, in bytes, decoded and stored on ServiceInfo
+MAX_BANNER_LENGTH = 512
 
 
 class ServiceDetector:
@@ -53,13 +66,40 @@ class ServiceDetector:
         ServiceType.UNKNOWN: "Unknown",
     }
     
-    def __init__(self, timeout: float = 3.0) -> None:
+    def __init__(
+        self,
+        timeout: float = 3.0,
+        null_probe_timeout: float = 0.5,
+        connect_timeout: Optional[float] = None,
+        transport: Optional[Transport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        max_banner_length: int = MAX_BANNER_LENGTH
+    ) -> None:
         """Initialize service detector.
         
         Args:
-            timeout: Connection timeout for service detection.
+            timeout: Read timeout for banners and probe responses.
+            null_probe_timeout: How long to wait for an unknown service to
+                speak first before sending active probes.
+            connect_timeout: Connection timeout for service detection.
+                Defaults to ``timeout``.
+            transport: Transport used to open connections. Defaults to a
+                Connector without socket tuning.
+            metrics: Registry that receives detection metrics. If None, the
+                detector creates its own.
+            max_banner_length: Longest banner, in bytes, that is decoded
+                and reported; longer responses are truncated.
         """
         self.timeout = timeout
+        self.null_probe_timeout = null_probe_timeout
+        self.connect_timeout = connect_timeout if connect_timeout is not None else timeout
+        self.transport = transport or Connector()
+        self.metrics = metrics or MetricsRegistry()
+        self.max_banner_length = max_banner_length
+        self._buffers = BufferPool(BANNER_BUFFER_SIZE)
+        self._banner_latency = self.metrics.histogram(
+            "scanhero_banner_latency_seconds", "Time spent grabbing a banner, including probes."
+        ).labels()
     
     async def detect_service(self, host: str, port: int) -> Optional[ServiceInfo]:
         """Detect service running on a specific port.
@@ -77,10 +117,13 @@ class ServiceDetector:
         try:
             # First, try to identify service by port number
             service_type = self.PORT_SERVICES.get(port, ServiceType.UNKNOWN)
+            identified: List[ServiceInfo] = []
             
             # If it's a known service port, try banner grabbing
             if service_type != ServiceType.UNKNOWN:
-                banner = await self._grab_banner(host, port)
+                banner = await self._timed_grab_banner(host, port, identified)
+                if identified:
+                    return identified[0]
                 version = self._extract_version(banner, service_type)
                 
                 return ServiceInfo(
@@ -92,7 +135,9 @@ class ServiceDetector:
                 )
             
             # For unknown ports, try to grab any banner
-            banner = await self._grab_banner(host, port)
+            banner = await self._timed_grab_banner(host, port, identified)
+            if identified:
+                return identified[0]
             if banner:
                 # Try to identify service from banner
                 service_type = self._identify_from_banner(banner)
@@ -108,45 +153,268 @@ class ServiceDetector:
         except Exception as e:
             raise ServiceDetectionError(f"Service detection failed for {host}:{port}: {str(e)}")
     
-    async def _grab_banner(self, host: str, port: int) -> Optional[str]:
+    async def _timed_grab_banner(
+        self,
+        host: str,
+        port: int,
+        identified: Optional[List[ServiceInfo]] = None
+    ) -> Optional[str]:
+        """Grab a banner and record how long it took.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            identified: Optional list that receives the service if a
+                protocol module fingerprinted it.
+            
+        Returns:
+            Banner string if available, None otherwise.
+        """
+        started = time.perf_counter()
+        try:
+            return await self._grab_banner(host, port, identified)
+        finally:
+            self._banner_latency.observe(time.perf_counter() - started)
+    
+    async def _grab_banner(
+        self,
+        host: str,
+        port: int,
+        identified: Optional[List[ServiceInfo]] = None
+    ) -> Optional[str]:
         """Grab banner from a service.
         
+        Ports hinted for a protocol module (MySQL, Redis, ...) are
+        fingerprinted by that module first. Ports with a probe hint (HTTP,
+        Redis, ...) get their probes sent immediately, since those services
+        never speak first. Known speaks-first services are read directly.
+        Unknown ports wait for a short null-probe window before falling back
+        to active probes; a greeting sent in that window is handed to the
+        protocol module that recognizes it.
+        
+        Responses are received into a pooled buffer and matched as bytes;
+        only the final banner is decoded.
+        
         Args:
             host: Target host or IP address.
             port: Port number to connect to.
+            identified: Optional list that receives the service if a
+                protocol module fingerprinted it.
             
         Returns:
             Banner string if successful, None otherwise.
         """
+        if identified is None:
+            identified = []
         try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(host, port),
-                timeout=self.timeout
-            )
-            
-            # Send a simple probe for some services
-            probe_data = self._get_probe_data(port)
-            if probe_data:
-                writer.write(probe_data.encode())
-                await writer.drain()
-            
-            # Try to read response
-            try:
-                banner = await asyncio.wait_for(
-                    reader.read(1024),
-                    timeout=self.timeout
-                )
-                banner_str = banner.decode('utf-8', errors='ignore').strip()
-                return banner_str if banner_str else None
-            except asyncio.TimeoutError:
-                return None
-            finally:
-                writer.close()
-                await writer.wait_closed()
+            with self._buffers.lease() as buffer:
+                module = protocol_for_port(port)
+                if module is not None:
+                    service = await self._run_protocol(host, port, module, buffer)
+                    if service is not None:
+                        identified.append(service)
+                        return service.banner
+                
+                probes = select_probes(port)
+                if probes:
+                    return self._decode_banner(await self._send_probes(host, port, probes, buffer))
+                
+                if port in self.PORT_SERVICES:
+                    probe_data = self._get_probe_data(port)
+                    payload = probe_data.encode() if probe_data else None
+                    response = await self._exchange(host, port, payload, self.timeout, buffer)
+                    return self._decode_banner(response)
+                
+                response = await self._null_probe(host, port, buffer, identified)
+                if identified:
+                    return identified[0].banner
+                return self._decode_banner(response)
                 
         except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
             return None
     
+    async def _send_probes(
+        self,
+        host: str,
+        port: int,
+        probes: List[Probe],
+        buffer: memoryview,
+        fallback: bytes = b""
+    ) -> Response:
+        """Send probes one connection at a time until one matches.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            probes: Probes to send, in priority order.
+            buffer: Buffer each response is received into.
+            fallback: Response to return if no probe matches.
+            
+        Returns:
+            The first matching response, otherwise the first non-empty one.
+            A matching response is a view into ``buffer``.
+        """
+        for probe in probes:
+            response = await self._exchange(host, port, probe.payload, self.timeout, buffer)
+            if probe.matches(response):
+                return response
+            if not fallback:
+                # The next probe reuses the buffer, so keep a copy
+                fallback = bytes(response)
+        return fallback
+    
+    async def _null_probe(
+        self,
+        host: str,
+        port: int,
+        buffer: memoryview,
+        identified: Optional[List[ServiceInfo]] = None
+    ) -> Response:
+        """Wait briefly for a banner, then fall back to active probes.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            buffer: Buffer responses are received into.
+            identified: Optional list that receives the service if a
+                protocol module recognizes the banner.
+            
+        Returns:
+            Raw response bytes, empty if the service never answered.
+        """
+        probes = fallback_probes()
+        connection = await self._connect(host, port)
+        try:
+            response = await self._read_response(connection, buffer, self.null_probe_timeout)
+            module = protocol_for_greeting(response)
+            if module is not None and identified is not None:
+                # The module's own reads reuse the buffer, so keep the greeting
+                greeting = bytes(response)
+                service = await module.probe(ProtocolSession(connection, buffer, self.timeout), greeting)
+                if service is not None:
+                    identified.append(service)
+                return greeting
+            if response or not probes:
+                return response
+            
+            # The connection is still idle, so reuse it for the first probe
+            await connection.send(probes[0].payload)
+            response = await self._read_response(connection, buffer, self.timeout)
+        finally:
+            await connection.close()
+        
+        if probes[0].matches(response):
+            return response
+        return await self._send_probes(host, port, probes[1:], buffer, bytes(response))
+    
+    async def _exchange(
+        self,
+        host: str,
+        port: int,
+        payload: Optional[bytes],
+        read_timeout: float,
+        buffer: memoryview
+    ) -> Response:
+        """Open a connection, optionally send a payload and read the reply.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            payload: Bytes to send before reading, or None.
+            read_timeout: How long to wait for the reply.
+            buffer: Buffer the reply is received into.
+            
+        Returns:
+            Raw response bytes as a view into ``buffer``, empty if nothing
+            arrived in time.
+        """
+        connection = await self._connect(host, port)
+        try:
+            if payload:
+                await connection.send(payload)
+            return await self._read_response(connection, buffer, read_timeout)
+        finally:
+            await connection.close()
+    
+    async def _run_protocol(
+        self,
+        host: str,
+        port: int,
+        module: ProtocolModule,
+        buffer: memoryview
+    ) -> Optional[ServiceInfo]:
+        """Fingerprint a service with a protocol module on a fresh connection.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            module: Protocol module to run.
+            buffer: Buffer replies are received into.
+            
+        Returns:
+            ServiceInfo if the module identified the service, None if it did
+            not or the connection failed.
+        """
+        try:
+            connection = await self._connect(host, port)
+            try:
+                return await module.probe(ProtocolSession(connection, buffer, self.timeout), b"")
+            finally:
+                await connection.close()
+        except (asyncio.TimeoutError, OSError):
+            return None
+    
+    async def _connect(self, host: str, port: int) -> RawConnection:
+        """Open a raw connection within the connect timeout.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+            
+        Returns:
+            Open raw connection.
+        """
+        return await asyncio.wait_for(
+            self.transport.open_raw_connection(host, port),
+            timeout=self.connect_timeout
+        )
+    
+    async def _read_response(
+        self,
+        connection: RawConnection,
+        buffer: memoryview,
+        timeout: float
+    ) -> memoryview:
+        """Receive a single response chunk into a buffer.
+        
+        Args:
+            connection: Connection to read from.
+            buffer: Buffer to receive into.
+            timeout: How long to wait for data.
+            
+        Returns:
+            View of the received bytes, empty on timeout or EOF.
+        """
+        try:
+            received = await asyncio.wait_for(connection.recv_into(buffer), timeout=timeout)
+        except asyncio.TimeoutError:
+            received = 0
+        return buffer[:received]
+    
+    def _decode_banner(self, response: Response) -> Optional[str]:
+        """Decode a raw response into a banner string.
+        
+        Only the first ``max_banner_length`` bytes are decoded.
+        
+        Args:
+            response: Raw response bytes, or a view of them.
+            
+        Returns:
+            Banner string, or None if the response was empty.
+        """
+        banner_str = str(response[:self.max_banner_length], 'utf-8', 'ignore').strip()
+        return banner_str if banner_str else None
+    
     def _get_probe_data(self, port: int) -> Optional[str]:
         """Get probe data to send for specific services.
         
@@ -206,6 +474,10 @@ class ServiceDetector:
         Returns:
             Identified service type.
         """
+        probed_type = identify_response(banner.encode('utf-8', errors='ignore'))
+        if probed_type is not None:
+            return probed_type
+        
         banner_lower = banner.lower()
         
         # Service identification patterns
@@ -0,0 +1,243 @@
+"""In-memory simulated network for deterministic large-scale scans.
+
+A :class:`SimulatedNetwork` is a :class:`~scanhero.transport.Transport` that
+never touches a socket. Hosts have an RTT distribution, a packet drop rate,
+open and filtered ports, banners and probe responses, so the scheduler,
+timeouts and concurrency limits can be exercised against a /16 or a full
+65k-port sweep in seconds.
+
+Random draws are seeded from the network seed, the host, the port and the
+attempt number, so a scan behaves the same on every run regardless of the
+order in which connects happen to be scheduled.
+"""
+
+import asyncio
+import errno
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NoReturn, Optional, Set, Tuple
+from .exceptions import ConfigurationError
+from .models import PortStatus
+from .transport import Transport
+
+
+@dataclass
+class SimulatedHost:
+    """Behaviour of one simulated host.
+    
+    Attributes:
+        open_ports: Ports that accept connections.
+        filtered_ports: Ports whose SYNs are silently dropped.
+        default_status: How ports that are neither open nor filtered answer:
+            CLOSED (refused) or FILTERED (dropped).
+        banners: Bytes sent by the service as soon as a client connects.
+        responses: Bytes sent by the service once the client has sent
+            anything, e.g. an HTTP response to a probe.
+        rtt: Mean round-trip time in seconds.
+        rtt_jitter: Standard deviation of the round-trip time in seconds.
+        drop_rate: Probability that a connect attempt is lost entirely.
+        unreachable: Whether every connect fails with EHOSTUNREACH.
+    """
+    open_ports: Set[int] = field(default_factory=set)
+    filtered_ports: Set[int] = field(default_factory=set)
+    default_status: PortStatus = PortStatus.CLOSED
+    banners: Dict[int, bytes] = field(default_factory=dict)
+    responses: Dict[int, bytes] = field(default_factory=dict)
+    rtt: float = 0.001
+    rtt_jitter: float = 0.0
+    drop_rate: float = 0.0
+    unreachable: bool = False
+    
+    def __post_init__(self) -> None:
+        """Validate host behaviour after initialization."""
+        if self.rtt < 0 or self.rtt_jitter < 0:
+            raise ConfigurationError("RTT and jitter must be non-negative")
+        if not 0.0 <= self.drop_rate <= 1.0:
+            raise ConfigurationError("Drop rate must be between 0 and 1")
+        if self.default_status not in (PortStatus.CLOSED, PortStatus.FILTERED):
+            raise ConfigurationError("Default status must be CLOSED or FILTERED")
+    
+    @property
+    def is_random(self) -> bool:
+        """Whether random draws affect the host's answers."""
+        return self.drop_rate > 0 or self.rtt_jitter > 0
+    
+    def sample_rtt(self, rng: random.Random) -> float:
+        """Draw a round-trip time.
+        
+        Args:
+            rng: Random generator for this connect attempt.
+        
+        Returns:
+            Round-trip time in seconds, never negative.
+        """
+        if not self.rtt_jitter:
+            return self.rtt
+        return max(0.0, rng.gauss(self.rtt, self.rtt_jitter))
+    
+    def is_filtered(self, port: int) -> bool:
+        """Check whether SYNs to a port are silently dropped.
+        
+        Args:
+            port: Port number.
+        
+        Returns:
+            True if the port never answers.
+        """
+        if port in self.filtered_ports:
+            return True
+        return port not in self.open_ports and self.default_status is PortStatus.FILTERED
+
+
+class SimulatedWriter:
+    """Write side of a simulated connection."""
+    
+    def __init__(self, reader: asyncio.StreamReader, response: Optional[bytes], rtt: float) -> None:
+        """Initialize writer.
+        
+        Args:
+            reader: Reader of the same connection, fed with the reply.
+            response: Bytes the service sends after the client's first write.
+            rtt: Round-trip time of the connection in seconds.
+        """
+        self._reader = reader
+        self._response = response
+        self._rtt = rtt
+        self._handles: List[asyncio.TimerHandle] = []
+        self._closed = False
+    
+    def write(self, data: bytes) -> None:
+        """Send data; the service replies one RTT later."""
+        if self._closed:
+            raise ConnectionResetError(errno.ECONNRESET, os.strerror(errno.ECONNRESET))
+        if data and self._response is not None:
+            response, self._response = self._response, None
+            loop = asyncio.get_running_loop()
+            self._handles.append(loop.call_later(self._rtt, self._reader.feed_data, response))
+    
+    async def drain(self) -> None:
+        """Wait until written data may be sent (immediately)."""
+    
+    def close(self) -> None:
+        """Close the connection and discard undelivered data."""
+        self._closed = True
+        for handle in self._handles:
+            handle.cancel()
+        self._handles.clear()
+    
+    async def wait_closed(self) -> None:
+        """Wait until the connection is closed (immediately)."""
+    
+    def get_extra_info(self, name: str, default: Optional[Any] = None) -> Any:
+        """Get transport information; there is no underlying socket."""
+        return default
+
+
+class SimulatedNetwork(Transport):
+    """A transport that simulates hosts in memory.
+    
+    Attributes:
+        hosts: Simulated hosts by IP address.
+        default_host: Behaviour of addresses missing from ``hosts``, or None
+            to drop every packet sent to them.
+        seed: Seed for all random draws.
+        connect_attempts: Number of connects attempted so far.
+        in_flight: Number of connects currently waiting for an answer.
+        peak_in_flight: Highest ``in_flight`` seen so far.
+    """
+    
+    def __init__(
+        self,
+        hosts: Optional[Dict[str, SimulatedHost]] = None,
+        default_host: Optional[SimulatedHost] = None,
+        seed: int = 0
+    ) -> None:
+        """Initialize simulated network.
+        
+        Args:
+            hosts: Simulated hosts by IP address.
+            default_host: Behaviour of addresses missing from ``hosts``, or
+                None to drop every packet sent to them.
+            seed: Seed for all random draws.
+        """
+        self.hosts = dict(hosts or {})
+        self.default_host = default_host
+        self.seed = seed
+        self.connect_attempts = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Attempts per endpoint, only kept for hosts with random behaviour
+        self._attempts: Dict[Tuple[str, int], int] = {}
+        # Shared by hosts without random behaviour, whose draws change nothing
+        self._steady = random.Random(seed)
+    
+    async def open_connection(
+        self,
+        host: str,
+        port: int
+    ) -> Tuple[asyncio.StreamReader, SimulatedWriter]:
+        """Open a simulated connection.
+        
+        Args:
+            host: Target IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            (reader, writer) stream pair.
+        
+        Raises:
+            ConnectionRefusedError: If the port is closed.
+            OSError: With EHOSTUNREACH if the host is unreachable.
+        """
+        self.connect_attempts += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            spec = self.hosts.get(host, self.default_host)
+            rng = self._rng(host, port) if spec is not None and spec.is_random else self._steady
+            if spec is None or rng.random() < spec.drop_rate:
+                await self._black_hole()
+            
+            rtt = spec.sample_rtt(rng)
+            if spec.unreachable:
+                await asyncio.sleep(rtt)
+                raise OSError(errno.EHOSTUNREACH, os.strerror(errno.EHOSTUNREACH))
+            if spec.is_filtered(port):
+                await self._black_hole()
+            
+            await asyncio.sleep(rtt)
+            if port not in spec.open_ports:
+                raise ConnectionRefusedError(errno.ECONNREFUSED, os.strerror(errno.ECONNREFUSED))
+        finally:
+            self.in_flight -= 1
+        
+        reader = asyncio.StreamReader()
+        banner = spec.banners.get(port)
+        if banner is not None:
+            # The banner leaves the server with the final ACK of the handshake
+            asyncio.get_running_loop().call_later(rtt / 2, reader.feed_data, banner)
+        return reader, SimulatedWriter(reader, spec.responses.get(port), rtt)
+    
+    def _rng(self, host: str, port: int) -> random.Random:
+        """Get the random generator for the next attempt on a port.
+        
+        Args:
+            host: Target IP address.
+            port: Port number.
+        
+        Returns:
+            Generator seeded independently of scheduling order.
+        """
+        key = (host, port)
+        attempt = self._attempts.get(key, 0)
+        self._attempts[key] = attempt + 1
+        return random.Random(f"{self.seed}:{host}:{port}:{attempt}")
+    
+    async def _black_hole(self) -> NoReturn:
+        """Wait forever, like a connect whose SYNs are never answered.
+        
+        The caller's connect timeout cancels the wait.
+        """
+        await asyncio.get_running_loop().create_future()
+        raise AssertionError("unreachable")  # pragma: no cover
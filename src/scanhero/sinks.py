@@ -0,0 +1,199 @@
+"""Result sinks for ScanHero.
+
+A sink receives one :class:`~scanhero.models.ScanResult` per host as soon as
+the host is done, so a scan of a whole address block only holds the hosts in
+flight in memory. See :meth:`PortScanner.scan_to_sink`.
+"""
+
+import inspect
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Any, Callable, IO, Optional
+from .formatters import JSONFormatter
+from .models import ScanResult
+
+
+class ResultSink(ABC):
+    """Receives host results as a scan produces them.
+    
+    Sinks are context managers that close themselves on exit.
+    """
+    
+    @abstractmethod
+    async def write(self, result: ScanResult) -> None:
+        """Store the result of one host.
+        
+        Args:
+            result: Result to store.
+        """
+    
+    def close(self) -> None:
+        """Flush and release any resources held by the sink."""
+    
+    def __enter__(self) -> "ResultSink":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JSONLSink(ResultSink):
+    """Writes each host result as one JSON line."""
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        stream: Optional[IO[str]] = None,
+        append: bool = False
+    ) -> None:
+        """Initialize sink.
+        
+        Args:
+            path: File to write to.
+            stream: Open text stream to write to instead of a file. It is
+                not closed by the sink.
+            append: Whether to append to the file rather than overwrite it.
+        
+        Raises:
+            ValueError: If neither or both of path and stream are given.
+        """
+        if path is not None and stream is None:
+            self._stream: IO[str] = open(path, "a" if append else "w")
+        elif stream is not None and path is None:
+            self._stream = stream
+        else:
+            raise ValueError("Exactly one of path and stream must be given")
+        self._owned = stream is None
+        self._formatter = JSONFormatter()
+    
+    async def write(self, result: ScanResult) -> None:
+        """Append the result as a JSON line.
+        
+        Args:
+            result: Result to store.
+        """
+        self._stream.write(json.dumps(self._formatter.result_to_dict(result)) + "\n")
+        self._stream.flush()
+    
+    def close(self) -> None:
+        """Close the file, if the sink opened it."""
+        if self._owned and not self._stream.closed:
+            self._stream.close()
+
+
+class SQLiteSink(ResultSink):
+    """Stores host results in an SQLite database.
+    
+    Each host is a row in ``hosts`` with its counts; its port results are
+    rows in ``ports``. Every host is committed as it is written.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS hosts (
+            id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL,
+            address TEXT,
+            aliases TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            scan_duration REAL NOT NULL,
+            total_ports INTEGER NOT NULL,
+            open_ports INTEGER NOT NULL,
+            closed_ports INTEGER NOT NULL,
+            filtered_ports INTEGER NOT NULL,
+            unscanned_ports TEXT NOT NULL,
+            presumed_filtered TEXT NOT NULL,
+            incomplete INTEGER NOT NULL,
+            errors TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS ports (
+            host_id INTEGER NOT NULL REFERENCES hosts (id),
+            port INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            response_time REAL,
+            service TEXT,
+            version TEXT,
+            banner TEXT,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ports_by_status ON ports (status, port);
+    """
+    
+    def __init__(self, path: str, store_closed: bool = True) -> None:
+        """Initialize sink, creating the tables if needed.
+        
+        Args:
+            path: Database file.
+            store_closed: Whether to store a row for every closed port. The
+                host row always has the count.
+        """
+        self.store_closed = store_closed
+        self._db = sqlite3.connect(path)
+        self._db.executescript(self.SCHEMA)
+    
+    async def write(self, result: ScanResult) -> None:
+        """Insert the host and its ports.
+        
+        Args:
+            result: Result to store.
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO hosts (target, address, aliases, timestamp, scan_duration, total_ports,"
+                " open_ports, closed_ports, filtered_ports, unscanned_ports, presumed_filtered,"
+                " incomplete, errors) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.target, result.address, json.dumps(result.aliases), result.timestamp,
+                    result.scan_duration, result.total_ports, result.open_count,
+                    result.closed_count, result.filtered_count, json.dumps(result.unscanned_ports),
+                    json.dumps(result.presumed_filtered), result.incomplete, json.dumps(result.errors)
+                )
+            )
+            host_id = cursor.lastrowid
+            port_results = result.open_ports + result.filtered_ports
+            if self.store_closed:
+                port_results += result.closed_ports
+            self._db.executemany(
+                "INSERT INTO ports VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        host_id, p.port, p.status.value, p.response_time,
+                        p.service.service_type.value if p.service else None,
+                        p.service.version if p.service else None,
+                        p.service.banner if p.service else None,
+                        p.error
+                    )
+                    for p in port_results
+                )
+            )
+    
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+
+class CallbackSink(ResultSink):
+    """Passes each host result to a callback.
+    
+    The callback may be a plain function or a coroutine function; a
+    coroutine is awaited before the scan moves on, which gives natural
+    backpressure.
+    """
+    
+    def __init__(self, callback: Callable[[ScanResult], Any]) -> None:
+        """Initialize sink.
+        
+        Args:
+            callback: Called with every host result.
+        """
+        self.callback = callback
+    
+    async def write(self, result: ScanResult) -> None:
+        """Call the callback.
+        
+        Args:
+            result: Result to pass on.
+        """
+        value = self.callback(result)
+        if inspect.isawaitable(value):
+            await value
@@ -0,0 +1,292 @@
+"""Target specification parsing for ScanHero."""
+
+import ipaddress
+import sys
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .exceptions import InvalidTargetError
+from .intervals import IntervalSet
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class ExclusionList:
+    """Addresses that must never be scanned.
+    
+    Excluded addresses, networks and ranges are kept as merged intervals of
+    integer addresses, one set per IP version, so checking an address costs
+    O(log n) in the number of exclusions.
+    """
+    
+    def __init__(self, specs: Iterable[str] = ()) -> None:
+        """Build the list.
+        
+        Args:
+            specs: IP addresses, CIDR networks and ``first-last`` address
+                ranges; each may hold several, separated by commas or
+                whitespace.
+        
+        Raises:
+            InvalidTargetError: If a specification is not an address,
+                network or range.
+        """
+        ranges: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for spec in specs:
+            for part in spec.replace(',', ' ').split():
+                version, first, last = _parse_address_range(part)
+                ranges[version].append((first, last))
+        self.ipv4 = IntervalSet(ranges[4])
+        self.ipv6 = IntervalSet(ranges[6])
+    
+    def __bool__(self) -> bool:
+        """Whether anything is excluded."""
+        return bool(self.ipv4) or bool(self.ipv6)
+    
+    def __contains__(self, host: object) -> bool:
+        """Check whether a host is excluded.
+        
+        Host names are never excluded; check the address they resolve to.
+        """
+        try:
+            address = ipaddress.ip_address(host)  # type: ignore[arg-type]
+        except ValueError:
+            return False
+        return int(address) in self._intervals(address.version)
+    
+    def hosts(self, network: IPNetwork) -> Iterator[str]:
+        """Iterate over the hosts of a network that are not excluded.
+        
+        Excluded spans are skipped without generating their addresses.
+        
+        Args:
+            network: Network to expand.
+        
+        Yields:
+            Host addresses, in order.
+        """
+        address_type = type(network.network_address)
+        first, last = _host_range(network)
+        for start, end in self._intervals(network.version).gaps(first, last):
+            for value in range(start, end + 1):
+                yield str(address_type(value))
+    
+    def _intervals(self, version: int) -> IntervalSet:
+        """Get the excluded intervals for an IP version."""
+        return self.ipv4 if version == 4 else self.ipv6
+
+
+def read_exclude_file(path: str) -> List[str]:
+    """Read exclusion specifications from a file, or from stdin if ``path`` is "-".
+    
+    Args:
+        path: File path, or "-" for standard input.
+    
+    Returns:
+        Specifications, as accepted by ExclusionList.
+    
+    Raises:
+        InvalidTargetError: If the file cannot be read.
+    """
+    return [
+        spec for line in _read_lines(path, "exclude file") for spec in _strip_comment(line).split()
+    ]
+
+
+def expand_targets(spec: str, exclude: Optional[ExclusionList] = None) -> Iterator[str]:
+    """Expand a target specification into individual hosts.
+    
+    The specification is a comma-separated list of hostnames, IP addresses
+    and CIDR networks (e.g. ``"10.0.0.0/30,example.com"``). Networks are
+    expanded lazily, host by host.
+    
+    Args:
+        spec: Target specification string.
+        exclude: Addresses to leave out. Excluded parts of a network are
+            skipped wholesale rather than expanded and filtered.
+    
+    Yields:
+        Individual host names or IP addresses.
+    
+    Raises:
+        InvalidTargetError: If a network specification is invalid.
+    """
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        
+        if '/' not in part:
+            if exclude is None or part not in exclude:
+                yield part
+            continue
+        
+        try:
+            network = ipaddress.ip_network(part, strict=False)
+        except ValueError:
+            raise InvalidTargetError(f"Invalid network: {part}")
+        
+        if exclude:
+            yield from exclude.hosts(network)
+        elif network.num_addresses == 1:
+            yield str(network.network_address)
+        else:
+            for address in network.hosts():
+                yield str(address)
+
+
+def count_targets(spec: str) -> int:
+    """Count the hosts a target specification expands to, without expanding it.
+    
+    Exclusions are not taken into account, so the count is an upper bound
+    of what :func:`expand_targets` yields. Invalid networks count as zero
+    hosts; :func:`expand_targets` reports them.
+    
+    Args:
+        spec: Target specification string.
+    
+    Returns:
+        Number of hosts.
+    """
+    count = 0
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '/' not in part:
+            count += 1
+            continue
+        try:
+            network = ipaddress.ip_network(part, strict=False)
+        except ValueError:
+            continue
+        first, last = _host_range(network)
+        count += last - first + 1
+    return count
+
+
+def expand_target_lines(lines: Iterable[str], exclude: Optional[ExclusionList] = None) -> Iterator[str]:
+    """Expand target specifications given one or more per line.
+    
+    Each line holds target specifications separated by commas or
+    whitespace; blank lines and ``#`` comments are skipped. Lines are
+    consumed only as hosts are taken from the result.
+    
+    Args:
+        lines: Lines of text, e.g. an open file.
+        exclude: Addresses to leave out.
+    
+    Yields:
+        Individual host names or IP addresses.
+    
+    Raises:
+        InvalidTargetError: If a network specification is invalid; the
+            message names the line.
+    """
+    for number, line in enumerate(lines, 1):
+        for spec in _strip_comment(line).split():
+            try:
+                yield from expand_targets(spec, exclude)
+            except InvalidTargetError as e:
+                raise InvalidTargetError(f"Line {number}: {e.message}") from e
+
+
+def read_target_file(path: str, exclude: Optional[ExclusionList] = None) -> Iterator[str]:
+    """Lazily read targets from a file, or from stdin if ``path`` is "-".
+    
+    The file is opened at once, so a missing or unreadable file is reported
+    before any scanning starts. Its lines are then read as hosts are
+    requested and the file is closed once it is exhausted, so a file of
+    millions of targets is never held in memory.
+    
+    Args:
+        path: File path, or "-" for standard input.
+        exclude: Addresses to leave out.
+    
+    Returns:
+        Individual host names or IP addresses.
+    
+    Raises:
+        InvalidTargetError: If the file cannot be opened. An invalid network
+            specification is raised when its line is read.
+    """
+    return expand_target_lines(_read_lines(path, "target file"), exclude)
+
+
+def _read_lines(path: str, kind: str) -> Iterator[str]:
+    """Open a file, or stdin if ``path`` is "-", and lazily read its lines.
+    
+    Args:
+        path: File path, or "-" for standard input.
+        kind: What the file holds, for error messages.
+    
+    Returns:
+        Lines of text.
+    
+    Raises:
+        InvalidTargetError: If the file cannot be opened.
+    """
+    if path == '-':
+        return iter(sys.stdin)
+    
+    try:
+        f = open(path)
+    except OSError as e:
+        raise InvalidTargetError(f"Cannot read {kind} {path}: {e.strerror}")
+    return _lines_of(f)
+
+
+def _lines_of(f: IO[str]) -> Iterator[str]:
+    """Yield the lines of an open file, closing it once exhausted."""
+    with f:
+        yield from f
+
+
+def _strip_comment(line: str) -> str:
+    """Remove a ``#`` comment from a line."""
+    return line.split('#', 1)[0]
+
+
+def _parse_address_range(spec: str) -> Tuple[int, int, int]:
+    """Parse an address, CIDR network or ``first-last`` range.
+    
+    Args:
+        spec: Specification to parse.
+    
+    Returns:
+        (IP version, first address, last address), addresses as integers.
+    
+    Raises:
+        InvalidTargetError: If the specification is invalid.
+    """
+    try:
+        if '/' in spec:
+            network = ipaddress.ip_network(spec, strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+        if '-' in spec:
+            first_text, last_text = spec.split('-', 1)
+            first = ipaddress.ip_address(first_text)
+            last = ipaddress.ip_address(last_text)
+            if first.version != last.version or int(first) > int(last):
+                raise ValueError(spec)
+            return first.version, int(first), int(last)
+        address = ipaddress.ip_address(spec)
+        return address.version, int(address), int(address)
+    except ValueError:
+        raise InvalidTargetError(f"Invalid address, network or range: {spec}")
+
+
+def _host_range(network: IPNetwork) -> Tuple[int, int]:
+    """Get the first and last host address of a network, as expand_targets yields them.
+    
+    Args:
+        network: Network.
+    
+    Returns:
+        (first, last) host addresses as integers.
+    """
+    if network.num_addresses == 1:
+        return int(network.network_address), int(network.network_address)
+    first = int(next(iter(network.hosts())))
+    last = int(network.broadcast_address)
+    if network.version == 4 and network.num_addresses > 2:
+        last -= 1
+    return first, last
@@ -0,0 +1,145 @@
+"""Pluggable connection transport for ScanHero.
+
+The scanner and the service detector never open sockets themselves; they ask a
+transport for a connection. The default transport is the socket-level
+:class:`~scanhero.connector.Connector`, and
+:class:`~scanhero.simulation.SimulatedNetwork` provides an in-memory network
+for deterministic tests and benchmarks at scale.
+
+Banner reads go through a :class:`RawConnection`, which receives into a
+buffer owned by the caller. Transports backed by real sockets receive straight
+into that buffer; the default implementation adapts the stream pair.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Protocol, Tuple
+
+
+class StreamReaderLike(Protocol):
+    """Read side of a connection, as provided by ``asyncio.StreamReader``."""
+    
+    async def read(self, n: int = -1) -> bytes:
+        """Read up to ``n`` bytes, returning b"" at EOF."""
+        ...
+
+
+class StreamWriterLike(Protocol):
+    """Write side of a connection, as provided by ``asyncio.StreamWriter``."""
+    
+    def write(self, data: bytes) -> None:
+        """Queue data for sending."""
+        ...
+    
+    async def drain(self) -> None:
+        """Wait until queued data may be sent."""
+        ...
+    
+    def close(self) -> None:
+        """Close the connection."""
+        ...
+    
+    async def wait_closed(self) -> None:
+        """Wait until the connection is closed."""
+        ...
+    
+    def get_extra_info(self, name: str, default: Optional[Any] = None) -> Any:
+        """Get transport information such as the underlying socket."""
+        ...
+
+
+class RawConnection(ABC):
+    """Connection that receives into caller-provided buffers."""
+    
+    @abstractmethod
+    async def send(self, data: bytes) -> None:
+        """Send all of ``data``."""
+    
+    @abstractmethod
+    async def recv_into(self, buffer: memoryview) -> int:
+        """Receive into ``buffer``, returning the number of bytes written, 0 at EOF."""
+    
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the connection."""
+
+
+class StreamConnection(RawConnection):
+    """Raw connection over a stream pair.
+    
+    Streams hand out fresh bytes objects, so each receive costs one copy into
+    the caller's buffer.
+    """
+    
+    def __init__(self, reader: StreamReaderLike, writer: StreamWriterLike) -> None:
+        """Initialize the connection.
+        
+        Args:
+            reader: Read side of the connection.
+            writer: Write side of the connection.
+        """
+        self.reader = reader
+        self.writer = writer
+    
+    async def send(self, data: bytes) -> None:
+        """Send all of ``data``."""
+        self.writer.write(data)
+        await self.writer.drain()
+    
+    async def recv_into(self, buffer: memoryview) -> int:
+        """Receive into ``buffer``, returning the number of bytes written, 0 at EOF."""
+        data = await self.reader.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    async def close(self) -> None:
+        """Close the connection."""
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class Transport(ABC):
+    """Opens connections for the scanner and the service detector.
+    
+    Implementations report connect failures the way the socket layer does:
+    ``OSError`` with an ``errno`` for answers such as a refusal, and a
+    connect that never completes for dropped packets, which the caller
+    turns into a timeout.
+    """
+    
+    @abstractmethod
+    async def open_connection(
+        self,
+        host: str,
+        port: int
+    ) -> Tuple[StreamReaderLike, StreamWriterLike]:
+        """Open a TCP connection.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            (reader, writer) stream pair.
+        
+        Raises:
+            OSError: If the connection fails.
+        """
+    
+    async def open_raw_connection(self, host: str, port: int) -> RawConnection:
+        """Open a TCP connection for reading into caller-provided buffers.
+        
+        The default adapts :meth:`open_connection`; transports with access to
+        the socket override it to receive without intermediate copies.
+        
+        Args:
+            host: Target host or IP address.
+            port: Port number to connect to.
+        
+        Returns:
+            Raw connection.
+        
+        Raises:
+            OSError: If the connection fails.
+        """
+        reader, writer = await self.open_connection(host, port)
+        return StreamConnection(reader, writer)
@@ -0,0 +1,38 @@
+"""Tests for the receive buffer pool."""
+
+import pytest
+from scanhero.buffers import BufferPool
+
+
+class TestBufferPool:
+    """Test cases for BufferPool class."""
+    
+    def test_lease_reuses_buffer(self):
+        """Test that a released buffer is handed out again."""
+        pool = BufferPool(64)
+        with pool.lease() as view:
+            view[:5] = b"hello"
+            assert len(view) == 64
+        assert pool.idle == 1
+        
+        with pool.lease() as view:
+            assert bytes(view[:5]) == b"hello"
+            assert pool.idle == 0
+        assert pool.idle == 1
+    
+    def test_capacity_bounds_idle_buffers(self):
+        """Test that the pool allocates past capacity but keeps at most capacity idle."""
+        pool = BufferPool(16, capacity=2)
+        buffers = [pool.acquire() for _ in range(3)]
+        assert len({id(buffer) for buffer in buffers}) == 3
+        
+        for buffer in buffers:
+            pool.release(buffer)
+        assert pool.idle == 2
+    
+    def test_invalid_size(self):
+        """Test that sizes below 1 are rejected."""
+        with pytest.raises(ValueError):
+            BufferPool(0)
+        with pytest.raises(ValueError):
+            BufferPool(16, capacity=0)
@@ -0,0 +1,42 @@
+"""Tests for the TTL cache."""
+
+from scanhero.cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test cases for TTLCache class."""
+    
+    def test_expiry(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_eviction(self):
+        """Test that the oldest entries are evicted first."""
+        cache = TTLCache(ttl=10, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 3)
+        cache.set("c", 4)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 3
+        assert cache.get("c") == 4
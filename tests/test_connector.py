@@ -0,0 +1,141 @@
+"""Tests for socket-level connect tuning."""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import socket
+import struct
+from unittest.mock import patch
+from scanhero.connector import Connector
+
+
+@pytest_asyncio.fixture
+async def loopback_server():
+    """Start a loopback listener that records peer addresses."""
+    peers = []
+    
+    async def handle(reader, writer):
+        peers.append(writer.get_extra_info('peername')[0])
+        await reader.read()
+        writer.close()
+    
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield port, peers
+    server.close()
+    await server.wait_closed()
+
+
+class TestConnector:
+    """Test cases for Connector class."""
+    
+    def test_untuned_by_default(self):
+        """Test that a default connector uses the plain asyncio connect."""
+        assert Connector().tuned is False
+        assert Connector(linger_zero=True).tuned is False
+        assert Connector(source_addresses=["127.0.0.1"]).tuned is True
+    
+    @pytest.mark.asyncio
+    async def test_linger_zero(self, loopback_server):
+        """Test that SO_LINGER 0 is set on the connection."""
+        port, _ = loopback_server
+        reader, writer = await Connector(linger_zero=True).open_connection("127.0.0.1", port)
+        try:
+            sock = writer.get_extra_info('socket')
+            onoff, linger = struct.unpack("ii", sock.getsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.calcsize("ii")
+            ))
+            assert (onoff, linger) == (1, 0)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not hasattr(socket, "TCP_SYNCNT"), reason="TCP_SYNCNT is Linux only")
+    async def test_syn_retries(self, loopback_server):
+        """Test that TCP_SYNCNT is applied before connecting."""
+        port, _ = loopback_server
+        reader, writer = await Connector(syn_retries=2).open_connection("127.0.0.1", port)
+        try:
+            sock = writer.get_extra_info('socket')
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_SYNCNT) == 2
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    
+    @pytest.mark.asyncio
+    async def test_source_address_pool(self, loopback_server):
+        """Test that connections rotate through the source address pool."""
+        port, peers = loopback_server
+        connector = Connector(source_addresses=["127.0.0.1", "127.0.0.2"])
+        for _ in range(4):
+            reader, writer = await connector.open_connection("127.0.0.1", port)
+            writer.close()
+            await writer.wait_closed()
+        await asyncio.sleep(0.05)
+        
+        assert sorted(peers) == ["127.0.0.1", "127.0.0.1", "127.0.0.2", "127.0.0.2"]
+    
+    @pytest.mark.asyncio
+    async def test_tuned_connect_refused(self, loopback_server):
+        """Test that a refused tuned connect raises ConnectionRefusedError."""
+        port, _ = loopback_server
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            closed_port = probe.getsockname()[1]
+        
+        with pytest.raises(ConnectionRefusedError):
+            await Connector(source_addresses=["127.0.0.1"]).open_connection("127.0.0.1", closed_port)
+    
+    @pytest.mark.asyncio
+    async def test_tuned_connect_tries_every_address(self, loopback_server):
+        """Test that a tuned connect falls through to the next resolved address."""
+        port, peers = loopback_server
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            closed_port = probe.getsockname()[1]
+        infos = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", closed_port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port)),
+        ]
+        
+        async def getaddrinfo(*args, **kwargs):
+            return infos
+        
+        connector = Connector(source_addresses=["127.0.0.1"])
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "getaddrinfo", getaddrinfo):
+            reader, writer = await connector.open_connection("example.com", port)
+            writer.close()
+            await writer.wait_closed()
+            
+            infos.pop()
+            with pytest.raises(ConnectionRefusedError):
+                await connector.open_connection("example.com", port)
+        await asyncio.sleep(0.05)
+        
+        assert peers == ["127.0.0.1"]
+    
+    @pytest.mark.asyncio
+    async def test_raw_connection_receives_into_buffer(self):
+        """Test that a raw connection sends and receives into the caller's buffer."""
+        async def handle(reader, writer):
+            writer.write(await reader.readline())
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        buffer = bytearray(64)
+        try:
+            connection = await Connector(linger_zero=True).open_raw_connection("127.0.0.1", port)
+            try:
+                await connection.send(b"ping\n")
+                received = await connection.recv_into(memoryview(buffer))
+            finally:
+                await connection.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+        
+        assert buffer[:received] == b"ping\n"
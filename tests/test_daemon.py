@@ -0,0 +1,162 @@
+"""Tests for the scan daemon."""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+from scanhero.daemon import JobStatus, ScanDaemon, ScanJob
+from scanhero.models import ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+async def http(address, method, path, body=None):
+    """Send one HTTP request and return (status, raw body)."""
+    reader, writer = await asyncio.open_connection(*address)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), content
+
+
+async def http_json(address, method, path, body=None):
+    """Send one HTTP request and decode the JSON response."""
+    status, content = await http(address, method, path, body)
+    return status, json.loads(content)
+
+
+@pytest_asyncio.fixture
+async def daemon():
+    """Start a daemon over a simulated network."""
+    network = SimulatedNetwork({
+        "10.0.0.1": SimulatedHost(open_ports={22, 80}, banners={22: b"SSH-2.0-OpenSSH_8.9\r\n"}),
+        "10.0.0.2": SimulatedHost(open_ports={443}, rtt=0.2),
+    })
+    config = ScanConfig(timeout=0.5, retry_count=0, null_probe_timeout=0.02, fingerprint_ttl=60)
+    daemon = ScanDaemon(PortScanner(config, transport=network), max_jobs=1)
+    address = await daemon.start("127.0.0.1", 0)
+    yield daemon, address
+    await daemon.close()
+
+
+class TestScanDaemon:
+    """Test cases for ScanDaemon class."""
+    
+    @pytest.mark.asyncio
+    async def test_submit_stream_and_poll(self, daemon):
+        """Test a job from submission through streamed events to polling."""
+        daemon, address = daemon
+        
+        status, job = await http_json(address, "POST", "/jobs", {"targets": "10.0.0.1", "ports": "20-25"})
+        assert status == 202
+        assert job["status"] == "queued"
+        
+        status, content = await http(address, "GET", f"/jobs/{job['id']}/events")
+        events = [json.loads(line) for line in content.splitlines()]
+        kinds = [event["event"] for event in events]
+        assert kinds[0] == "start"
+        assert kinds[-1] == "end" and events[-1]["status"] == "done"
+        assert {"event": "port", "job": job["id"], "target": "10.0.0.1", "port": 22, "status": "open"} in events
+        assert "service" in kinds and "host" in kinds
+        
+        status, polled = await http_json(address, "GET", f"/jobs/{job['id']}")
+        assert polled["status"] == "done"
+        assert polled["results"][0]["summary"]["open_ports"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_fingerprint_cache_stays_warm(self, daemon):
+        """Test that a second job reuses the first job's fingerprints."""
+        daemon, address = daemon
+        
+        for _ in range(2):
+            _, job = await http_json(address, "POST", "/jobs", {"targets": ["10.0.0.1"], "ports": [22]})
+            await http(address, "GET", f"/jobs/{job['id']}/events")
+        
+        _, health = await http_json(address, "GET", "/health")
+        assert health["fingerprint_cache"]["hits"] == 1
+        assert health["jobs"]["done"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancel(self, daemon):
+        """Test cancelling a running and a queued job."""
+        daemon, address = daemon
+        
+        _, running = await http_json(address, "POST", "/jobs", {"targets": "10.0.0.2", "ports": "1-1000"})
+        _, queued = await http_json(address, "POST", "/jobs", {"targets": "10.0.0.1", "ports": "22"})
+        await asyncio.sleep(0.05)
+        
+        for job in (queued, running):
+            status, _ = await http_json(address, "DELETE", f"/jobs/{job['id']}")
+            assert status == 202
+        await asyncio.sleep(0.05)
+        
+        assert daemon.jobs[running["id"]].status is JobStatus.CANCELLED
+        assert daemon.jobs[queued["id"]].status is JobStatus.CANCELLED
+    
+    @pytest.mark.asyncio
+    async def test_errors(self, daemon):
+        """Test invalid requests and per-target errors."""
+        daemon, address = daemon
+        
+        assert (await http_json(address, "POST", "/jobs", {"ports": "22"}))[0] == 400
+        assert (await http_json(address, "POST", "/jobs", {"targets": "10.0.0.1", "ports": "0-5"}))[0] == 400
+        status, body = await http_json(address, "POST", "/jobs", {"targets": ["10.0.0.0/8"], "ports": "22"})
+        assert status == 400
+        assert "16777214 hosts" in body["error"]
+        assert (await http_json(address, "GET", "/jobs/999"))[0] == 404
+        assert (await http_json(address, "GET", "/nothing"))[0] == 404
+        
+        _, job = await http_json(address, "POST", "/jobs", {"targets": ["10.0.0.1", "10.0.0.0/33"], "ports": "22"})
+        await http(address, "GET", f"/jobs/{job['id']}/events")
+        _, polled = await http_json(address, "GET", f"/jobs/{job['id']}")
+        
+        assert polled["status"] == "done"
+        assert [error["target"] for error in polled["errors"]] == ["10.0.0.0/33"]
+    
+    @pytest.mark.asyncio
+    async def test_excluded_target_is_a_job_error(self):
+        """Test that a name resolving to an excluded address is an error, not a result."""
+        network = SimulatedNetwork({"127.0.0.1": SimulatedHost(open_ports={22})})
+        config = ScanConfig(timeout=0.5, retry_count=0, service_detection=False, exclude=["127.0.0.1"])
+        daemon = ScanDaemon(PortScanner(config, transport=network))
+        address = await daemon.start("127.0.0.1", 0)
+        try:
+            _, job = await http_json(address, "POST", "/jobs", {"targets": "localhost", "ports": "22"})
+            await http(address, "GET", f"/jobs/{job['id']}/events")
+            _, polled = await http_json(address, "GET", f"/jobs/{job['id']}")
+        finally:
+            await daemon.close()
+        
+        assert polled["status"] == "done"
+        assert polled["results"] == []
+        assert polled["errors"] == [
+            {"target": "localhost", "error": "localhost resolves to excluded address 127.0.0.1"}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_metrics(self, daemon):
+        """Test the Prometheus endpoint."""
+        _, address = daemon
+        status, content = await http(address, "GET", "/metrics")
+        assert status == 200
+        assert b"# TYPE scanhero_ports_total counter" in content
+
+
+class TestScanJob:
+    """Test cases for ScanJob class."""
+    
+    def test_events_are_capped(self):
+        """Test that only the most recent events are kept."""
+        job = ScanJob("1", ["10.0.0.1"], "22", None, max_events=10)
+        for index in range(25):
+            job.add_event({"event": "port", "port": index})
+        
+        assert job.event_count == 25
+        assert len(job.events) <= 10
+        assert job.events[-1]["port"] == 24
+        assert job.events[0]["port"] == job.events_dropped
@@ -0,0 +1,111 @@
+"""Tests for host discovery."""
+
+import pytest
+import errno
+import time
+from scanhero.discovery import HostDiscovery
+from scanhero.exceptions import ConfigurationError
+from scanhero.limiter import ConcurrencyLimiter
+from scanhero.models import PortStatus, ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+from scanhero.transport import Transport
+
+
+class ExhaustedTransport(Transport):
+    """Transport whose every connect fails with EMFILE."""
+    
+    async def open_connection(self, host, port):
+        raise OSError(errno.EMFILE, "Too many open files")
+
+
+def network():
+    """Build a network with live hosts of each kind and dead hosts."""
+    return SimulatedNetwork({
+        "10.0.0.1": SimulatedHost(open_ports={443}, default_status=PortStatus.FILTERED),
+        "10.0.0.2": SimulatedHost(),
+        "10.0.0.3": SimulatedHost(default_status=PortStatus.FILTERED),
+        "10.0.0.4": SimulatedHost(unreachable=True),
+    })
+
+
+def discovery_config(**overrides):
+    """Build a scan config with host discovery and short timeouts."""
+    options = dict(
+        timeout=0.5, retry_count=0, service_detection=False,
+        host_discovery=True, discovery_timeout=0.1
+    )
+    options.update(overrides)
+    return ScanConfig(**options)
+
+
+class TestHostDiscovery:
+    """Test cases for HostDiscovery class."""
+    
+    def test_config_validation(self):
+        """Test invalid discovery settings are rejected."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(discovery_ports=[])
+        with pytest.raises(ConfigurationError):
+            ScanConfig(discovery_ports=[0])
+        with pytest.raises(ConfigurationError):
+            ScanConfig(discovery_timeout=0)
+    
+    @pytest.mark.asyncio
+    async def test_accepted_or_refused_means_alive(self):
+        """Test hosts that accept or refuse a probe are up, silent ones are down."""
+        discovery = HostDiscovery(network(), ConcurrencyLimiter(100), [80, 443], 0.1)
+        alive = await discovery.discover(["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4", "10.0.0.5"])
+        assert alive == ["10.0.0.1", "10.0.0.2"]
+    
+    @pytest.mark.asyncio
+    async def test_first_answer_ends_probing(self):
+        """Test a live host is reported without waiting for its silent ports."""
+        discovery = HostDiscovery(network(), ConcurrencyLimiter(100), [80, 443], 1.0)
+        started = time.perf_counter()
+        assert await discovery.is_alive("10.0.0.1")
+        assert time.perf_counter() - started < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_local_errors_count_as_alive(self):
+        """Test a host is not skipped because of a local resource problem."""
+        discovery = HostDiscovery(ExhaustedTransport(), ConcurrencyLimiter(100), [80], 0.1)
+        assert await discovery.is_alive("10.0.0.9")
+    
+    @pytest.mark.asyncio
+    async def test_respects_limiter(self):
+        """Test probes never exceed the shared concurrency cap."""
+        net = SimulatedNetwork(default_host=SimulatedHost(rtt=0.01))
+        discovery = HostDiscovery(net, ConcurrencyLimiter(8), [80, 443, 22], 0.5)
+        hosts = [f"10.0.1.{i}" for i in range(1, 41)]
+        assert await discovery.discover(hosts) == hosts
+        assert net.peak_in_flight <= 8
+    
+    @pytest.mark.asyncio
+    async def test_scan_hosts_skips_dead_hosts(self):
+        """Test the full scan only covers hosts found up."""
+        net = network()
+        scanner = PortScanner(discovery_config(), transport=net)
+        results = await scanner.scan_hosts(["10.0.0.1", "10.0.0.2", "10.0.0.3"], "440-445")
+        
+        assert [r.target for r in results] == ["10.0.0.1", "10.0.0.2"]
+        assert [p.port for p in results[0].open_ports] == [443]
+        samples = {
+            s["labels"]["state"]: s["value"]
+            for s in scanner.metrics.to_dict()["scanhero_discovered_hosts_total"]["samples"]
+        }
+        assert samples == {"up": 2, "down": 1}
+    
+    @pytest.mark.asyncio
+    async def test_discovery_off_or_single_host(self):
+        """Test dead hosts are scanned when discovery is off, overridden or given one host."""
+        scanner = PortScanner(discovery_config(host_discovery=False, timeout=0.05), transport=network())
+        results = await scanner.scan_hosts(["10.0.0.2", "10.0.0.3"], [80])
+        assert [r.target for r in results] == ["10.0.0.2", "10.0.0.3"]
+        
+        scanner = PortScanner(discovery_config(timeout=0.05), transport=network())
+        results = await scanner.scan_hosts(["10.0.0.3"], [80])
+        assert results[0].filtered_count == 1
+        
+        results = await scanner.scan_hosts(["10.0.0.2", "10.0.0.3"], [80], host_discovery=False)
+        assert [r.target for r in results] == ["10.0.0.2", "10.0.0.3"]
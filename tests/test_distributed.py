@@ -0,0 +1,263 @@
+"""Tests for distributed coordinator/worker scanning."""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import os
+import sys
+from scanhero.distributed import Coordinator, Worker, partition
+from scanhero.exceptions import ConfigurationError, InvalidTargetError
+from scanhero.models import ScanConfig, ServiceType
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def simulated_worker(name, **hosts):
+    """Build an in-process worker over a simulated network."""
+    network = SimulatedNetwork({host.replace("_", "."): h for host, h in hosts.items()})
+    scanner = PortScanner(ScanConfig(timeout=0.5, retry_count=0, service_detection=False), transport=network)
+    return Worker(scanner, name=name, heartbeat_interval=0.05)
+
+
+async def grab_lease(address):
+    """Connect as a worker and take a lease without working on it."""
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(json.dumps({"type": "hello", "worker": "flaky"}).encode() + b"\n")
+    await writer.drain()
+    lease = json.loads(await reader.readline())
+    assert lease["type"] == "lease"
+    return lease, writer
+
+
+@pytest_asyncio.fixture
+async def listeners():
+    """Start loopback listeners: one sending an SSH banner, one silent."""
+    async def banner(reader, writer):
+        writer.write(b"SSH-2.0-OpenSSH_8.9\r\n")
+        await writer.drain()
+        await reader.read()
+        writer.close()
+    
+    async def silent(reader, writer):
+        await reader.read()
+        writer.close()
+    
+    servers = [
+        await asyncio.start_server(banner, "127.0.0.1", 0),
+        await asyncio.start_server(silent, "127.0.0.1", 0),
+    ]
+    yield [server.sockets[0].getsockname()[1] for server in servers]
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+class TestPartition:
+    """Test cases for partition function."""
+    
+    def test_covers_every_pair_once(self):
+        """Test leases cover the (host, port) space exactly once."""
+        leases = list(partition(["10.0.0.0/29"], list(range(1, 11)), hosts_per_lease=4, ports_per_lease=3))
+        pairs = [(h, p) for lease in leases for h in lease.hosts for p in lease.ports]
+        assert len(pairs) == len(set(pairs)) == 6 * 10
+        assert len(leases) == 2 * 4
+        assert len({lease.id for lease in leases}) == len(leases)
+    
+    def test_is_lazy(self):
+        """Test huge target spaces are not expanded up front."""
+        leases = partition(["10.0.0.0/8"], [80], hosts_per_lease=256)
+        assert len(next(leases).hosts) == 256
+
+
+class TestCoordinator:
+    """Test cases for Coordinator class."""
+    
+    def test_validation(self):
+        """Test invalid coordinator settings are rejected."""
+        with pytest.raises(ConfigurationError):
+            Coordinator(["10.0.0.1"], [80], hosts_per_lease=0)
+        with pytest.raises(InvalidTargetError):
+            Coordinator(["10.0.0.1"], [])
+        with pytest.raises(InvalidTargetError):
+            Coordinator([""], [80])
+    
+    @pytest.mark.asyncio
+    async def test_merges_results_from_workers(self):
+        """Test port slices of one host from different leases are merged."""
+        coordinator = Coordinator(["10.0.0.1,10.0.0.2"], list(range(20, 30)), hosts_per_lease=1, ports_per_lease=3)
+        address = await coordinator.start("127.0.0.1", 0)
+        hosts = {
+            "10_0_0_1": SimulatedHost(open_ports={22, 25}),
+            "10_0_0_2": SimulatedHost(open_ports={21}),
+        }
+        workers = [simulated_worker(f"w{i}", **hosts) for i in range(2)]
+        await asyncio.gather(*(w.run(*address) for w in workers))
+        results = await coordinator.wait()
+        await coordinator.close()
+        
+        by_host = {r.target: r for r in results}
+        assert [p.port for p in by_host["10.0.0.1"].open_ports] == [22, 25]
+        assert [p.port for p in by_host["10.0.0.2"].open_ports] == [21]
+        assert by_host["10.0.0.1"].ports_scanned == list(range(20, 30))
+        assert by_host["10.0.0.1"].closed_count == 8
+        assert sum(w.leases_done for w in workers) == coordinator.leases_done == 8
+    
+    @pytest.mark.asyncio
+    async def test_reassigns_lease_of_disconnected_worker(self):
+        """Test a lease held by a worker that disconnects goes to another."""
+        coordinator = Coordinator(["10.0.0.1"], [22, 80], ports_per_lease=1)
+        address = await coordinator.start("127.0.0.1", 0)
+        
+        lease, writer = await grab_lease(address)
+        writer.write(json.dumps({
+            "type": "result", "lease": lease["lease"], "result": {"target": "10.0.0.1"}
+        }).encode() + b"\n")
+        writer.close()
+        
+        worker = simulated_worker("steady", **{"10_0_0_1": SimulatedHost(open_ports={22})})
+        await worker.run(*address)
+        results = await coordinator.wait()
+        await coordinator.close()
+        
+        assert worker.leases_done == 2
+        assert [p.port for p in results[0].open_ports] == [22]
+        assert results[0].total_ports == 2
+        assert not results[0].incomplete
+    
+    @pytest.mark.asyncio
+    async def test_reassigns_lease_of_silent_worker(self):
+        """Test a lease is taken back from a worker that stops talking."""
+        coordinator = Coordinator(["10.0.0.1"], [22], lease_timeout=0.2)
+        address = await coordinator.start("127.0.0.1", 0)
+        
+        _, writer = await grab_lease(address)
+        worker = simulated_worker("steady", **{"10_0_0_1": SimulatedHost(open_ports={22})})
+        await worker.run(*address)
+        results = await coordinator.wait()
+        await coordinator.close()
+        writer.close()
+        
+        assert worker.leases_done == 1
+        assert results[0].open_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_heartbeats_keep_slow_lease(self):
+        """Test a worker scanning longer than the lease timeout keeps its lease."""
+        coordinator = Coordinator(["10.0.0.1"], [22], lease_timeout=0.2)
+        address = await coordinator.start("127.0.0.1", 0)
+        worker = simulated_worker("slow", **{"10_0_0_1": SimulatedHost(open_ports={22}, rtt=0.4)})
+        await worker.run(*address)
+        results = await coordinator.wait()
+        await coordinator.close()
+        
+        assert results[0].open_count == 1
+        assert coordinator.leases_failed == 0
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Test a lease that keeps failing is reported as unscanned."""
+        coordinator = Coordinator(["10.0.0.1"], [22, 80], max_attempts=2)
+        address = await coordinator.start("127.0.0.1", 0)
+        for _ in range(2):
+            _, writer = await grab_lease(address)
+            writer.close()
+        results = await asyncio.wait_for(coordinator.wait(), 2)
+        await coordinator.close()
+        
+        assert coordinator.leases_failed == 1
+        assert results[0].incomplete
+        assert results[0].unscanned_ports == [22, 80]
+        assert results[0].ports_scanned == []
+        assert "failed after 2 attempts" in results[0].errors[0]
+    
+    @pytest.mark.asyncio
+    async def test_merges_worker_port_accounting(self):
+        """Test unscanned ports are not counted as scanned, and dropped hosts get a result."""
+        coordinator = Coordinator(["10.0.0.1,10.0.0.2"], [22, 80])
+        address = await coordinator.start("127.0.0.1", 0)
+        
+        lease, writer = await grab_lease(address)
+        assert lease["hosts"] == ["10.0.0.1", "10.0.0.2"]
+        result = {
+            "target": "10.0.0.1", "ports": {"open": [], "closed": [], "filtered": []},
+            "ports_scanned": [22], "unscanned_ports": [80], "incomplete": True,
+        }
+        for message in ({"type": "result", "lease": lease["lease"], "result": result},
+                        {"type": "done", "lease": lease["lease"]}):
+            writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        results = await asyncio.wait_for(coordinator.wait(), 2)
+        await coordinator.close()
+        writer.close()
+        
+        by_host = {r.target: r for r in results}
+        assert by_host["10.0.0.1"].ports_scanned == [22]
+        assert by_host["10.0.0.1"].unscanned_ports == [80]
+        assert by_host["10.0.0.2"].ports_scanned == []
+        assert "no answer to host discovery" in by_host["10.0.0.2"].errors[0]
+    
+    @pytest.mark.asyncio
+    async def test_discovery_runs_once_per_chunk(self):
+        """Test a down host spread over several port slices is discovered and reported once."""
+        coordinator = Coordinator(["10.0.0.1,10.0.0.2"], [21, 22, 23, 80], ports_per_lease=1)
+        address = await coordinator.start("127.0.0.1", 0)
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(open_ports={22}),
+            "10.0.0.2": SimulatedHost(unreachable=True),
+        })
+        config = ScanConfig(
+            timeout=0.5, retry_count=0, service_detection=False,
+            host_discovery=True, discovery_ports=[22], discovery_timeout=0.1
+        )
+        worker = Worker(PortScanner(config, transport=network), name="discovering", heartbeat_interval=0.05)
+        await worker.run(*address)
+        results = await asyncio.wait_for(coordinator.wait(), 2)
+        await coordinator.close()
+        
+        by_host = {r.target: r for r in results}
+        assert by_host["10.0.0.1"].ports_scanned == [21, 22, 23, 80]
+        assert by_host["10.0.0.2"].errors == ["10.0.0.2 is down: no answer to host discovery"]
+        assert by_host["10.0.0.2"].ports_scanned == []
+        assert worker.leases_done == coordinator.leases_done == 4
+        # Two discovery probes, then one connect per lease
+        assert network.connect_attempts == 2 + 4
+    
+    @pytest.mark.asyncio
+    async def test_worker_processes(self, listeners):
+        """Test a scan split across several local worker processes."""
+        banner_port, silent_port = listeners
+        closed_ports = [silent_port + 1, silent_port + 2]
+        ports = [banner_port, silent_port] + closed_ports
+        coordinator = Coordinator(
+            ["127.0.0.1,127.0.0.2"], ports, hosts_per_lease=1, ports_per_lease=2, lease_timeout=10
+        )
+        host, port = await coordinator.start("127.0.0.1", 0)
+        
+        env = dict(os.environ, PYTHONPATH=SRC)
+        processes = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "scanhero.cli", "worker", f"{host}:{port}",
+                "--name", f"proc{i}", "--timeout", "1", "--retry-count", "0",
+                env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            for i in range(3)
+        ]
+        try:
+            results = await asyncio.wait_for(coordinator.wait(), 30)
+            codes = await asyncio.wait_for(asyncio.gather(*(p.wait() for p in processes)), 30)
+        finally:
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+            await coordinator.close()
+        
+        assert codes == [0, 0, 0]
+        by_host = {r.target: r for r in results}
+        local = by_host["127.0.0.1"]
+        assert sorted(p.port for p in local.open_ports) == sorted([banner_port, silent_port])
+        assert local.get_port_result(banner_port).service.service_type == ServiceType.SSH
+        assert by_host["127.0.0.2"].open_count == 0
+        assert by_host["127.0.0.2"].total_ports == len(ports)
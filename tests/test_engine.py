@@ -0,0 +1,182 @@
+"""Tests for the epoll connect engine."""
+
+import pytest
+import asyncio
+import errno
+import socket
+from scanhero.engine import EPOLL_AVAILABLE, ConnectOutcome, EpollConnectEngine, TimerWheel
+from scanhero.connector import Connector
+from scanhero.hooks import Hooks
+from scanhero.models import PortStatus, ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.exceptions import ConfigurationError
+from scanhero.simulation import SimulatedNetwork
+from scanhero.sinks import CallbackSink
+
+needs_epoll = pytest.mark.skipif(not EPOLL_AVAILABLE, reason="epoll is Linux only")
+
+
+def closed_port() -> int:
+    """Get a loopback port with nothing listening on it."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestTimerWheel:
+    """Test cases for TimerWheel class."""
+    
+    def test_fires_after_delay_not_before(self):
+        """Test that timers expire in the first tick at or after their delay."""
+        wheel = TimerWheel(tick=0.1, horizon=1.0, now=0.0)
+        wheel.schedule("a", 0.25, now=0.0)
+        wheel.schedule("b", 0.5, now=0.05)
+        assert len(wheel) == 2
+        
+        assert wheel.advance(0.21) == []
+        assert wheel.advance(0.31) == ["a"]
+        assert wheel.advance(0.51) == []
+        assert wheel.advance(0.61) == ["b"]
+        assert len(wheel) == 0
+    
+    def test_wraps_around(self):
+        """Test that the wheel keeps working past its horizon, including after idling."""
+        wheel = TimerWheel(tick=0.1, horizon=0.3, now=0.0)
+        wheel.advance(10.0)
+        wheel.schedule("a", 0.3, now=10.0)
+        assert wheel.advance(10.21) == []
+        assert wheel.advance(10.31) == ["a"]
+    
+    def test_delay_beyond_horizon(self):
+        """Test that a delay the wheel cannot hold is rejected."""
+        wheel = TimerWheel(tick=0.1, horizon=0.3, now=0.0)
+        with pytest.raises(ValueError):
+            wheel.schedule("a", 1.0, now=0.0)
+
+
+@needs_epoll
+class TestEpollConnectEngine:
+    """Test cases for EpollConnectEngine class."""
+    
+    @pytest.mark.asyncio
+    async def test_open_and_refused(self):
+        """Test that outcomes of a submitted batch come back on the event loop."""
+        listener = socket.create_server(("127.0.0.1", 0))
+        open_port = listener.getsockname()[1]
+        refused_port = closed_port()
+        outcomes = []
+        done = asyncio.Event()
+        
+        def on_outcomes(batch):
+            outcomes.extend(batch)
+            if len(outcomes) == 2:
+                done.set()
+        
+        engine = EpollConnectEngine(
+            asyncio.get_running_loop(), on_outcomes, timeout=2.0, connector=Connector(linger_zero=True)
+        )
+        engine.start()
+        try:
+            engine.submit([("127.0.0.1", open_port), ("127.0.0.1", refused_port)])
+            await asyncio.wait_for(done.wait(), timeout=5.0)
+        finally:
+            engine.close()
+            listener.close()
+        
+        by_port = {o.port: o for o in outcomes}
+        assert by_port[open_port].error == 0
+        assert not by_port[open_port].timed_out
+        assert by_port[refused_port].error == errno.ECONNREFUSED
+    
+    @pytest.mark.asyncio
+    async def test_close_drops_in_flight(self):
+        """Test that closing the engine stops the worker and ignores later submissions."""
+        engine = EpollConnectEngine(asyncio.get_running_loop(), lambda batch: None, timeout=1.0)
+        engine.start()
+        engine.close()
+        engine.submit([("127.0.0.1", closed_port())])
+        assert not engine._thread.is_alive()
+
+
+@needs_epoll
+class TestEpollEngineScans:
+    """Test cases for scanning with the epoll engine."""
+    
+    @pytest.mark.asyncio
+    async def test_scan_matches_asyncio_engine(self):
+        """Test that both engines report the same statuses."""
+        listeners = [socket.create_server(("127.0.0.1", 0)) for _ in range(3)]
+        open_ports = sorted(listener.getsockname()[1] for listener in listeners)
+        ports = sorted(open_ports + [closed_port() for _ in range(5)])
+        try:
+            statuses = {}
+            for engine in ("asyncio", "epoll"):
+                config = ScanConfig(timeout=2.0, max_concurrent=4, service_detection=False, engine=engine)
+                result = await PortScanner(config).scan("127.0.0.1", ports)
+                statuses[engine] = {p.port: p.status for p in result.open_ports + result.closed_ports}
+        finally:
+            for listener in listeners:
+                listener.close()
+        
+        assert statuses["epoll"] == statuses["asyncio"]
+        assert [p for p, s in sorted(statuses["epoll"].items()) if s is PortStatus.OPEN] == open_ports
+    
+    @pytest.mark.asyncio
+    async def test_hooks_and_service_detection(self):
+        """Test that open ports still get hooks and service detection."""
+        async def handle(reader, writer):
+            writer.write(b"SSH-2.0-OpenSSH_9.6\r\n")
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        seen = []
+        hooks = Hooks()
+        hooks.register("on_port_result", lambda host, result: seen.append(result.port))
+        config = ScanConfig(timeout=2.0, null_probe_timeout=1.0, engine="epoll")
+        try:
+            result = await PortScanner(config, hooks=hooks).scan("127.0.0.1", [port, closed_port()])
+        finally:
+            server.close()
+            await server.wait_closed()
+        
+        assert len(seen) == 2
+        assert [p.port for p in result.open_ports] == [port]
+        assert result.open_ports[0].service is not None
+        assert result.open_ports[0].service.banner.startswith("SSH-2.0")
+    
+    @pytest.mark.asyncio
+    async def test_scan_to_sink(self):
+        """Test that hosts streamed into a sink are scanned by the engine."""
+        listener = socket.create_server(("127.0.0.1", 0))
+        open_port = listener.getsockname()[1]
+        written = []
+        config = ScanConfig(timeout=2.0, service_detection=False, engine="epoll")
+        try:
+            summary = await PortScanner(config).scan_to_sink(
+                ["127.0.0.1", "127.0.0.2", "127.0.0.3"], [open_port, closed_port()],
+                CallbackSink(written.append), batch_ports=2
+            )
+        finally:
+            listener.close()
+        
+        assert sorted(r.target for r in written) == ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+        assert (summary.hosts, summary.total_ports, summary.open_count) == (3, 6, 1)
+    
+    def test_local_policy_outcome_is_an_error(self):
+        """Test that a connect refused by local policy is raised, not reported as filtered."""
+        scanner = PortScanner(ScanConfig(engine="epoll"))
+        outcome = ConnectOutcome("127.0.0.1", 80, errno.EACCES, False, 0.001)
+        with pytest.raises(PermissionError):
+            scanner._outcome_status(outcome, 0)
+    
+    def test_requires_socket_connector(self):
+        """Test that the epoll engine rejects transports it cannot drive."""
+        with pytest.raises(ConfigurationError):
+            PortScanner(ScanConfig(engine="epoll"), transport=SimulatedNetwork({}))
+    
+    def test_unknown_engine(self):
+        """Test that unknown engines are rejected by the config."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(engine="kqueue")
@@ -192,3 +192,39 @@ class TestFormatters:
         assert "9999" in error_row
         assert "unknown" in error_row
         assert "Connection timeout" in error_row
+    
+    def test_json_formatter_incomplete(self, sample_result):
+        """Test JSONFormatter reports deadline-truncated scans."""
+        sample_result.incomplete = True
+        sample_result.unscanned_ports = [8080, 8443]
+        
+        data = json.loads(JSONFormatter().format(sample_result))
+        
+        assert data["incomplete"] is True
+        assert data["unscanned_ports"] == [8080, 8443]
+        assert data["summary"]["unscanned_ports"] == 2
+    
+    def test_json_formatter_presumed_filtered(self, sample_result):
+        """Test JSONFormatter reports ports of abandoned hosts as ranges."""
+        sample_result.presumed_filtered = [(100, 199), (443, 443)]
+        
+        data = json.loads(JSONFormatter().format(sample_result))
+        
+        assert data["presumed_filtered"] == [[100, 199], [443, 443]]
+        assert data["summary"]["presumed_filtered_ports"] == 101
+    
+    def test_json_formatter_format_results(self, sample_result):
+        """Test JSONFormatter emits an array for multi-host scans."""
+        data = json.loads(JSONFormatter().format_results([sample_result, sample_result]))
+        
+        assert isinstance(data, list)
+        assert len(data) == 2
+        assert data[0]["target"] == "127.0.0.1"
+    
+    def test_csv_formatter_format_results(self, sample_result):
+        """Test CSVFormatter writes a single header for multi-host scans."""
+        output = CSVFormatter().format_results([sample_result, sample_result])
+        lines = output.strip().split('\n')
+        
+        assert len(lines) == 5
+        assert lines[0].startswith("Target,Port")
@@ -0,0 +1,95 @@
+"""Tests for the event hook API."""
+
+import pytest
+import asyncio
+from scanhero.hooks import Hooks
+from scanhero.models import PortStatus, ScanConfig, ServiceType
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+def simulated_scanner(hooks=None):
+    """Build a scanner over a simulated host with SSH open."""
+    network = SimulatedNetwork({
+        "10.0.0.1": SimulatedHost(open_ports={22}, banners={22: b"SSH-2.0-OpenSSH_8.9\r\n"}),
+    })
+    config = ScanConfig(timeout=0.05, retry_count=0, null_probe_timeout=0.02)
+    return PortScanner(config, transport=network, hooks=hooks)
+
+
+class TestHooks:
+    """Test cases for Hooks class."""
+    
+    def test_register_and_unregister(self):
+        """Test registration bookkeeping."""
+        hooks = Hooks()
+        callback = hooks.register("on_port_result", lambda host, result: None)
+        assert hooks.on_port_result == [callback]
+        
+        hooks.unregister("on_port_result", callback)
+        assert not hooks.on_port_result
+    
+    def test_unknown_event(self):
+        """Test that unknown event names are rejected."""
+        with pytest.raises(ValueError):
+            Hooks().register("on_everything", print)
+    
+    @pytest.mark.asyncio
+    async def test_emit_sync_and_async(self):
+        """Test that both plain and coroutine callbacks are called."""
+        hooks = Hooks()
+        calls = []
+        
+        async def async_callback(host, port):
+            await asyncio.sleep(0)
+            calls.append(("async", host, port))
+        
+        hooks.register("on_connect_start", lambda host, port: calls.append(("sync", host, port)))
+        hooks.register("on_connect_start", async_callback)
+        await hooks.emit("on_connect_start", "10.0.0.1", 22)
+        
+        assert calls == [("sync", "10.0.0.1", 22), ("async", "10.0.0.1", 22)]
+    
+    @pytest.mark.asyncio
+    async def test_failing_callback_is_isolated(self):
+        """Test that a failing callback neither aborts the scan nor others."""
+        hooks = Hooks()
+        seen = []
+        
+        def broken(host, result):
+            raise RuntimeError("boom")
+        
+        hooks.register("on_port_result", broken)
+        hooks.register("on_port_result", lambda host, result: seen.append(result.port))
+        
+        result = await simulated_scanner(hooks).scan("10.0.0.1", [22, 23])
+        
+        assert result.open_count == 1
+        assert sorted(seen) == [22, 23]
+    
+    @pytest.mark.asyncio
+    async def test_scan_events(self):
+        """Test the events raised during a scan."""
+        scanner = simulated_scanner()
+        events = []
+        queue = asyncio.Queue()
+        
+        scanner.hooks.register("on_connect_start", lambda host, port: events.append(("start", port)))
+        
+        async def push_open(host, result):
+            if result.status == PortStatus.OPEN:
+                await queue.put((host, result.port))
+        
+        scanner.hooks.register("on_port_result", push_open)
+        scanner.hooks.register(
+            "on_service_detected",
+            lambda host, port, service: events.append(("service", port, service.service_type))
+        )
+        scanner.hooks.register("on_scan_complete", lambda result: events.append(("complete", result.open_count)))
+        
+        await scanner.scan("10.0.0.1", [22, 23])
+        
+        assert queue.get_nowait() == ("10.0.0.1", 22)
+        assert sorted(e for e in events if e[0] == "start") == [("start", 22), ("start", 23)]
+        assert ("service", 22, ServiceType.SSH) in events
+        assert events[-1] == ("complete", 1)
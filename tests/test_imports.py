@@ -0,0 +1,79 @@
+"""Tests for lazy imports and import time."""
+
+import pytest
+import subprocess
+import sys
+import scanhero
+
+# Cumulative import time budget for ``import scanhero``, in microseconds
+IMPORT_BUDGET_US = 50_000
+
+# Budget for ``from scanhero import PortScanner`` once asyncio, which the
+# scanner cannot do without, is loaded, in microseconds
+SCANNER_IMPORT_BUDGET_US = 100_000
+
+# Modules only needed by result sinks and output formatting
+SINK_MODULES = ("scanhero.sinks", "scanhero.formatters", "sqlite3", "json")
+
+
+def run_python(*args):
+    """Run a fresh interpreter and return the completed process."""
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def loads_rich(code):
+    """Check whether running some code imports rich."""
+    completed = run_python("-c", code + "\nimport sys\nprint('rich' in sys.modules)")
+    return completed.stdout.strip().splitlines()[-1] == "True"
+
+
+class TestLazyImports:
+    """Test cases for the lazy package attributes."""
+    
+    def test_public_names(self):
+        """Test that every public name resolves."""
+        for name in scanhero.__all__:
+            assert getattr(scanhero, name) is not None
+        assert set(scanhero.__all__) <= set(dir(scanhero))
+    
+    def test_unknown_attribute(self):
+        """Test that unknown attributes still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            scanhero.NoSuchThing
+    
+    def test_rich_not_loaded(self):
+        """Test that rich is only loaded for console output."""
+        assert not loads_rich("import scanhero")
+        assert not loads_rich("from scanhero import PortScanner, ScanConfig, cli_main")
+        assert not loads_rich(
+            "from scanhero.formatters import get_formatter\n"
+            "get_formatter('json'); get_formatter('csv')"
+        )
+        assert loads_rich("from scanhero.formatters import get_formatter\nget_formatter('console')")
+    
+    def test_import_time_budget(self):
+        """Test that ``import scanhero`` stays within its import time budget."""
+        completed = run_python("-X", "importtime", "-c", "import scanhero")
+        
+        cumulative = None
+        for line in completed.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].rstrip() == " scanhero":
+                cumulative = int(fields[1])
+        
+        assert cumulative is not None
+        assert cumulative < IMPORT_BUDGET_US
+    
+    def test_scanner_import_time_budget(self):
+        """Test that importing PortScanner stays within its budget and skips the sinks."""
+        completed = run_python("-c", (
+            "import asyncio, sys, time\n"
+            "started = time.perf_counter()\n"
+            "from scanhero import PortScanner\n"
+            "print(int((time.perf_counter() - started) * 1e6))\n"
+            f"print(sorted(set({SINK_MODULES!r}) & set(sys.modules)))"
+        ))
+        elapsed, loaded = completed.stdout.strip().splitlines()[-2:]
+        
+        assert loaded == "[]"
+        assert int(elapsed) < SCANNER_IMPORT_BUDGET_US
@@ -0,0 +1,36 @@
+"""Tests for interval sets."""
+
+import pytest
+from scanhero.intervals import IntervalSet
+
+
+class TestIntervalSet:
+    """Test cases for IntervalSet class."""
+    
+    def test_merges_overlapping_and_adjacent(self):
+        """Test intervals are sorted and merged on construction."""
+        intervals = IntervalSet([(20, 30), (1, 5), (6, 8), (25, 40), (50, 50)])
+        assert list(intervals) == [(1, 8), (20, 40), (50, 50)]
+        assert len(intervals) == 3
+        assert intervals.count() == 8 + 21 + 1
+    
+    def test_membership(self):
+        """Test membership at and around interval bounds."""
+        intervals = IntervalSet([(10, 20), (30, 30)])
+        assert [v for v in range(8, 33) if v in intervals] == list(range(10, 21)) + [30]
+        assert "10" not in intervals
+        assert 5 not in IntervalSet()
+    
+    def test_gaps(self):
+        """Test the uncovered parts of a range are found without scanning it."""
+        intervals = IntervalSet([(10, 20), (30, 40), (2 ** 31, 2 ** 32)])
+        assert list(intervals.gaps(0, 50)) == [(0, 9), (21, 29), (41, 50)]
+        assert list(intervals.gaps(15, 35)) == [(21, 29)]
+        assert list(intervals.gaps(12, 18)) == []
+        assert list(intervals.gaps(100, 2 ** 32 + 5)) == [(100, 2 ** 31 - 1), (2 ** 32 + 1, 2 ** 32 + 5)]
+        assert list(IntervalSet().gaps(3, 4)) == [(3, 4)]
+    
+    def test_invalid_interval(self):
+        """Test an interval that ends before it starts is rejected."""
+        with pytest.raises(ValueError):
+            IntervalSet([(5, 4)])
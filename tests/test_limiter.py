@@ -0,0 +1,101 @@
+"""Tests for the hierarchical concurrency limiter."""
+
+import pytest
+import asyncio
+from scanhero.limiter import ConcurrencyLimiter
+
+
+class TestConcurrencyLimiter:
+    """Test cases for ConcurrencyLimiter class."""
+    
+    def test_global_limit(self):
+        """Test that the global cap applies across hosts."""
+        limiter = ConcurrencyLimiter(2)
+        assert limiter.try_acquire("10.0.0.1") is not None
+        assert limiter.try_acquire("10.0.0.2") is not None
+        assert limiter.try_acquire("10.0.0.3") is None
+        assert limiter.in_flight == 2
+    
+    def test_per_host_limit(self):
+        """Test that a saturated host does not block other hosts."""
+        limiter = ConcurrencyLimiter(10, per_host_limit=1)
+        assert limiter.try_acquire("10.0.0.1") is not None
+        assert limiter.try_acquire("10.0.0.1") is None
+        assert limiter.try_acquire("10.0.0.2") is not None
+    
+    def test_per_subnet_limit(self):
+        """Test that hosts in the same /24 share the subnet cap."""
+        limiter = ConcurrencyLimiter(10, per_subnet_limit=2)
+        assert limiter.try_acquire("10.0.0.1") is not None
+        assert limiter.try_acquire("10.0.0.2") is not None
+        assert limiter.try_acquire("10.0.0.3") is None
+        assert limiter.try_acquire("10.0.1.1") is not None
+    
+    def test_per_subnet_limit_ignores_hostnames(self):
+        """Test that hostnames are only limited per host."""
+        limiter = ConcurrencyLimiter(10, per_subnet_limit=1)
+        assert limiter.try_acquire("example.com") is not None
+        assert limiter.try_acquire("example.org") is not None
+    
+    def test_release_is_idempotent(self):
+        """Test that releasing a slot twice only frees it once."""
+        limiter = ConcurrencyLimiter(1, per_host_limit=1, per_subnet_limit=1)
+        slot = limiter.try_acquire("10.0.0.1")
+        slot.release()
+        slot.release()
+        assert limiter.in_flight == 0
+        assert limiter.try_acquire("10.0.0.1") is not None
+        assert limiter.try_acquire("10.0.0.1") is None
+    
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_release(self):
+        """Test that acquire blocks until a slot is released."""
+        limiter = ConcurrencyLimiter(1)
+        slot = await limiter.acquire("10.0.0.1")
+        
+        waiter = asyncio.ensure_future(limiter.acquire("10.0.0.2"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        
+        slot.release()
+        second = await asyncio.wait_for(waiter, timeout=1.0)
+        assert second.host == "10.0.0.2"
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_discarded(self):
+        """Test that a cancelled waiter does not leak."""
+        limiter = ConcurrencyLimiter(1)
+        slot = await limiter.acquire("10.0.0.1")
+        
+        waiter = asyncio.ensure_future(limiter.acquire("10.0.0.1"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        
+        slot.release()
+        assert limiter.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_back_off_halves_limit_once_per_cooldown(self):
+        """Test that a burst of local errors only halves the cap once."""
+        limiter = ConcurrencyLimiter(8, backoff_cooldown=10.0)
+        limiter.back_off()
+        limiter.back_off()
+        assert limiter.limit == 4.0
+        
+        limiter.try_acquire("10.0.0.1")
+        limiter.try_acquire("10.0.0.1")
+        limiter.try_acquire("10.0.0.1")
+        limiter.try_acquire("10.0.0.1")
+        assert limiter.try_acquire("10.0.0.1") is None
+    
+    @pytest.mark.asyncio
+    async def test_recover_grows_limit_back(self):
+        """Test that successful connects restore the global cap."""
+        limiter = ConcurrencyLimiter(4, backoff_cooldown=0.0)
+        limiter.back_off()
+        assert limiter.limit == 2.0
+        for _ in range(20):
+            limiter.recover()
+        assert limiter.limit == 4.0
@@ -0,0 +1,101 @@
+"""Tests for the metrics registry."""
+
+import pytest
+import json
+from scanhero.metrics import Histogram, MetricsRegistry
+from scanhero.models import ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+class TestHistogram:
+    """Test cases for Histogram class."""
+    
+    def test_observe(self):
+        """Test bucket placement, sum and count."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.cumulative_counts() == [2, 3, 4]
+        assert histogram.sum == pytest.approx(2.65)
+        assert histogram.count == 4
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry class."""
+    
+    def test_families_are_shared(self):
+        """Test that registering a name twice returns the same family."""
+        registry = MetricsRegistry()
+        first = registry.counter("requests_total", "Requests.", ("code",))
+        second = registry.counter("requests_total", "Requests.", ("code",))
+        
+        assert first is second
+        assert first.labels(200) is second.labels("200")
+        with pytest.raises(ValueError):
+            registry.gauge("requests_total", "Requests.")
+        with pytest.raises(ValueError):
+            first.labels(200, "extra")
+    
+    def test_prometheus_text(self):
+        """Test the exposition format."""
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits.", ("path",)).labels('/a"b').inc(3)
+        registry.gauge("in_flight", "In flight.").labels().set(2)
+        registry.histogram("latency_seconds", "Latency.", buckets=(0.5, 1.0)).labels().observe(0.25)
+        
+        text = registry.to_prometheus()
+        
+        assert "# TYPE hits_total counter\n" in text
+        assert 'hits_total{path="/a\\"b"} 3\n' in text
+        assert "in_flight 2\n" in text
+        assert 'latency_seconds_bucket{le="0.5"} 1\n' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 1\n' in text
+        assert "latency_seconds_sum 0.25\n" in text
+        assert "latency_seconds_count 1\n" in text
+    
+    def test_phase(self):
+        """Test that phases accumulate wall-clock time."""
+        registry = MetricsRegistry()
+        with registry.phase("format"):
+            pass
+        with registry.phase("format"):
+            pass
+        
+        samples = registry.to_dict()["scanhero_phase_seconds_total"]["samples"]
+        assert samples[0]["labels"] == {"phase": "format"}
+        assert samples[0]["value"] >= 0
+    
+    @pytest.mark.asyncio
+    async def test_scanner_metrics(self):
+        """Test that a scan fills in status, errno and latency metrics."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(
+                open_ports={22},
+                filtered_ports={81},
+                banners={22: b"SSH-2.0-OpenSSH_8.9\r\n"},
+            ),
+        })
+        config = ScanConfig(timeout=0.05, retry_count=0, null_probe_timeout=0.02)
+        scanner = PortScanner(config, transport=network)
+        
+        await scanner.scan("10.0.0.1", [22, 80, 81])
+        exported = json.loads(json.dumps(scanner.metrics.to_dict()))
+        
+        def values(name):
+            return {
+                tuple(sample["labels"].values()): sample.get("value", sample.get("count"))
+                for sample in exported[name]["samples"]
+            }
+        
+        assert values("scanhero_ports_total")[("open",)] == 1
+        assert values("scanhero_ports_total")[("closed",)] == 1
+        assert values("scanhero_ports_total")[("filtered",)] == 1
+        assert values("scanhero_connect_errors_total") == {("ECONNREFUSED",): 1, ("timeout",): 1}
+        assert values("scanhero_connect_latency_seconds")[()] == 2
+        assert values("scanhero_banner_latency_seconds")[()] == 1
+        assert values("scanhero_services_detected_total") == {("ssh",): 1}
+        assert values("scanhero_connects_in_flight")[()] == 0
+        assert ("scan",) in values("scanhero_phase_seconds_total")
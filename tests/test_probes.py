@@ -0,0 +1,53 @@
+"""Tests for active probe definitions."""
+
+import pytest
+from scanhero.probes import (
+    PROBES, fallback_probes, get_probe, identify_response, select_probes
+)
+from scanhero.models import ServiceType
+
+
+class TestProbes:
+    """Test cases for probe selection and matching."""
+    
+    def test_probe_names_unique(self):
+        """Test that every probe has a unique name."""
+        names = [probe.name for probe in PROBES]
+        assert len(names) == len(set(names))
+    
+    def test_select_probes_by_port_hint(self):
+        """Test probe selection for server-speaks-second ports."""
+        assert [p.name for p in select_probes(80)] == ["http-head"]
+        assert [p.name for p in select_probes(6379)] == ["redis-ping"]
+        assert [p.name for p in select_probes(9200)] == ["elasticsearch", "http-head"]
+    
+    def test_select_probes_speaks_first_port(self):
+        """Test that speaks-first and unknown ports get no immediate probes."""
+        assert select_probes(22) == []
+        assert select_probes(9999) == []
+    
+    def test_fallback_probes_exclude(self):
+        """Test fallback probe exclusion."""
+        names = [p.name for p in fallback_probes(exclude=("http-head",))]
+        assert "http-head" not in names
+        assert "redis-ping" in names
+    
+    def test_get_probe_unknown(self):
+        """Test looking up a probe that does not exist."""
+        with pytest.raises(KeyError):
+            get_probe("does-not-exist")
+    
+    def test_probe_matches(self):
+        """Test probe response signatures."""
+        assert get_probe("http-head").matches(b"HTTP/1.1 404 Not Found\r\n")
+        assert get_probe("redis-ping").matches(b"+PONG\r\n")
+        assert get_probe("redis-ping").matches(b"-NOAUTH Authentication required.\r\n")
+        assert not get_probe("redis-ping").matches(b"HTTP/1.1 200 OK\r\n")
+    
+    def test_identify_response(self):
+        """Test service identification from probe responses."""
+        es_body = b'HTTP/1.1 200 OK\r\n\r\n{"cluster_name" : "prod"}'
+        assert identify_response(es_body) == ServiceType.ELASTICSEARCH
+        assert identify_response(b"HTTP/1.0 200 OK\r\n") == ServiceType.HTTP
+        assert identify_response(b"+PONG\r\n") == ServiceType.REDIS
+        assert identify_response(b"SSH-2.0-OpenSSH_8.0") is None
@@ -0,0 +1,50 @@
+"""Tests for scan profiling."""
+
+import pytest
+import json
+import os
+from scanhero.models import ScanConfig
+from scanhero.profiling import ScanProfiler
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+class TestScanProfiler:
+    """Test cases for ScanProfiler class."""
+    
+    @pytest.mark.asyncio
+    async def test_profile_scan(self, tmp_path):
+        """Test that a profiled scan writes all report files."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={22}, rtt=0.01)})
+        scanner = PortScanner(ScanConfig(timeout=0.5, service_detection=False), transport=network)
+        profiler = ScanProfiler(interval=0.001)
+        
+        await profiler.start()
+        await scanner.scan("10.0.0.1", "1-200")
+        await profiler.stop()
+        paths = profiler.write_report(str(tmp_path / "out"))
+        
+        assert [os.path.basename(p) for p in paths] == ["scan.prof", "profile.json", "summary.txt"]
+        with open(paths[1]) as f:
+            report = json.load(f)
+        assert report["loop_lag"]["samples"] > 0
+        assert report["peak_tasks"] > 1
+        functions = [row["function"] for row in report["hot_functions_by_module"]["scanner.py"]]
+        assert any("_check_port_status" in name for name in functions)
+        with open(paths[2]) as f:
+            assert "Hot functions - scanner.py" in f.read()
+    
+    def test_loop_lag_without_samples(self):
+        """Test the lag summary of an empty profile."""
+        assert ScanProfiler().loop_lag()["samples"] == 0
+    
+    def test_loop_lag_percentiles(self):
+        """Test the lag summary."""
+        profiler = ScanProfiler()
+        profiler.lags = [i / 1000 for i in range(1, 101)]
+        
+        lag = profiler.loop_lag()
+        
+        assert lag["p50_ms"] == 50.0
+        assert lag["p99_ms"] == 99.0
+        assert lag["max_ms"] == 100.0
@@ -0,0 +1,201 @@
+"""Tests for protocol fingerprinting modules, against local stand-in servers."""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import struct
+from scanhero.models import ServiceType
+from scanhero.protocols import (
+    PROTOCOLS, ProtocolModule, _bson_document, get_protocol, protocol_for_greeting,
+    protocol_for_port, register_protocol
+)
+from scanhero.service_detector import ServiceDetector
+
+MYSQL_GREETING_PAYLOAD = (
+    b"\x0a" + b"8.0.36-0ubuntu0.22.04.1\0" + struct.pack("<I", 42) + b"abcdefgh\0" + b"\xff\xf7\x08\x02\x00"
+)
+MYSQL_GREETING = len(MYSQL_GREETING_PAYLOAD).to_bytes(3, "little") + b"\0" + MYSQL_GREETING_PAYLOAD
+
+REDIS_INFO = b"# Server\r\nredis_version:7.2.4\r\nredis_mode:standalone\r\nos:Linux 6.1.0 x86_64\r\n"
+
+
+def mongo_message(request_id: int, response_to: int, opcode: int, body: bytes) -> bytes:
+    """Frame a MongoDB wire protocol message."""
+    return struct.pack("<iiii", 16 + len(body), request_id, response_to, opcode) + body
+
+
+async def handle_mysql(reader, writer):
+    writer.write(MYSQL_GREETING)
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+async def handle_postgres(reader, writer):
+    request = await reader.readexactly(8)
+    writer.write(b"N" if request == struct.pack("!II", 8, 80877103) else b"")
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+async def handle_redis(reader, writer):
+    await reader.readuntil(b"server\r\n")
+    writer.write(b"$%d\r\n%s\r\n" % (len(REDIS_INFO), REDIS_INFO))
+    await writer.drain()
+    writer.close()
+
+
+async def handle_mongo(reader, writer):
+    for _ in range(2):
+        length, request_id, _, opcode = struct.unpack("<iiii", await reader.readexactly(16))
+        await reader.readexactly(length - 16)
+        if opcode == 2004:
+            document = _bson_document(ismaster=1, maxWireVersion=21, ok=1)
+            body = struct.pack("<iqii", 0, 0, 0, 1) + document
+            writer.write(mongo_message(100, request_id, 1, body))
+        else:
+            document = _bson_document(version="7.0.5", gitVersion="abc", ok=1)
+            writer.write(mongo_message(101, request_id, 2013, struct.pack("<I", 0) + b"\0" + document))
+    await writer.drain()
+    writer.close()
+
+
+@pytest_asyncio.fixture
+async def stand_in():
+    """Start stand-in servers on demand and stop them afterwards."""
+    servers = []
+    
+    async def start(handler):
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        servers.append(server)
+        return server.sockets[0].getsockname()[1]
+    
+    yield start
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+class TestProtocolRegistry:
+    """Test cases for protocol module selection."""
+    
+    def test_names_unique(self):
+        """Test that every module has a unique name."""
+        names = [module.name for module in PROTOCOLS]
+        assert len(names) == len(set(names))
+    
+    def test_protocol_for_port(self):
+        """Test module selection by port hint."""
+        assert protocol_for_port(3306).name == "mysql"
+        assert protocol_for_port(5432).name == "postgresql"
+        assert protocol_for_port(6379).name == "redis"
+        assert protocol_for_port(27017).name == "mongodb"
+        assert protocol_for_port(80) is None
+    
+    def test_protocol_for_greeting(self):
+        """Test module selection by the first bytes a service sends."""
+        assert protocol_for_greeting(memoryview(MYSQL_GREETING)).name == "mysql"
+        assert protocol_for_greeting(b"SSH-2.0-OpenSSH_9.6\r\n") is None
+        assert protocol_for_greeting(b"") is None
+    
+    def test_register_protocol(self, monkeypatch):
+        """Test that registered modules take precedence and names stay unique."""
+        class EchoProtocol(ProtocolModule):
+            name = "echo"
+            ports = (6379,)
+            
+            async def probe(self, session, greeting):
+                return None
+        
+        monkeypatch.setattr("scanhero.protocols.PROTOCOLS", list(PROTOCOLS))
+        register_protocol(EchoProtocol())
+        assert protocol_for_port(6379).name == "echo"
+        with pytest.raises(ValueError):
+            register_protocol(EchoProtocol())
+
+
+class TestProtocolModules:
+    """Test cases for each module against a stand-in server."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name, handler, service_type, version", [
+        ("mysql", handle_mysql, ServiceType.MYSQL, "8.0.36-0ubuntu0.22.04.1"),
+        ("postgresql", handle_postgres, ServiceType.POSTGRESQL, None),
+        ("redis", handle_redis, ServiceType.REDIS, "7.2.4"),
+        ("mongodb", handle_mongo, ServiceType.MONGODB, "7.0.5"),
+    ])
+    async def test_fingerprint(self, stand_in, name, handler, service_type, version):
+        """Test that a module identifies its service and reads the exact version."""
+        port = await stand_in(handler)
+        detector = ServiceDetector(timeout=2.0)
+        
+        service = await detector._run_protocol(
+            "127.0.0.1", port, get_protocol(name), memoryview(bytearray(1024))
+        )
+        
+        assert service is not None
+        assert service.service_type == service_type
+        assert service.version == version
+    
+    @pytest.mark.asyncio
+    async def test_mongo_banner_carries_wire_version(self, stand_in):
+        """Test that the MongoDB fingerprint includes both replies of its single round trip."""
+        port = await stand_in(handle_mongo)
+        service = await ServiceDetector(timeout=2.0)._run_protocol(
+            "127.0.0.1", port, get_protocol("mongodb"), memoryview(bytearray(1024))
+        )
+        assert service.banner == "MongoDB 7.0.5 (maxWireVersion 21)"
+    
+    @pytest.mark.asyncio
+    async def test_module_rejects_other_service(self, stand_in):
+        """Test that a module returns None when the service speaks something else."""
+        port = await stand_in(handle_postgres)
+        service = await ServiceDetector(timeout=0.5)._run_protocol(
+            "127.0.0.1", port, get_protocol("redis"), memoryview(bytearray(1024))
+        )
+        assert service is None
+    
+    @pytest.mark.asyncio
+    async def test_greeting_selects_module_on_unknown_port(self, stand_in):
+        """Test that detection on an unknown port hands a MySQL greeting to the MySQL module."""
+        port = await stand_in(handle_mysql)
+        detector = ServiceDetector(timeout=2.0, null_probe_timeout=1.0)
+        
+        service = await detector.detect_service("127.0.0.1", port)
+        
+        assert service.service_type == ServiceType.MYSQL
+        assert service.version == "8.0.36-0ubuntu0.22.04.1"
+        assert service.banner == "8.0.36-0ubuntu0.22.04.1"
+    
+    @pytest.mark.asyncio
+    async def test_greeting_kept_when_module_gives_up(self, stand_in, monkeypatch):
+        """Test that the greeting survives a module that reuses the buffer and returns None."""
+        class ClobberingProtocol(ProtocolModule):
+            name = "clobber"
+            
+            def recognizes(self, greeting):
+                return True
+            
+            async def probe(self, session, greeting):
+                session.buffer[:len(greeting)] = b"x" * len(greeting)
+                return None
+        
+        monkeypatch.setattr("scanhero.protocols.PROTOCOLS", [ClobberingProtocol()])
+        port = await stand_in(handle_mysql)
+        detector = ServiceDetector(timeout=2.0, null_probe_timeout=1.0)
+        identified = []
+        
+        response = await detector._null_probe("127.0.0.1", port, memoryview(bytearray(1024)), identified)
+        
+        assert identified == []
+        assert bytes(response) == MYSQL_GREETING
+    
+    @pytest.mark.asyncio
+    async def test_mariadb_version_prefix(self):
+        """Test that MariaDB's compatibility prefix is stripped from the version."""
+        payload = b"\x0a5.5.5-10.11.6-MariaDB-log\0" + b"\0" * 20
+        greeting = len(payload).to_bytes(3, "little") + b"\0" + payload
+        service = await get_protocol("mysql").probe(None, memoryview(greeting))
+        assert service.name == "MariaDB"
+        assert service.version == "10.11.6-MariaDB-log"
@@ -0,0 +1,102 @@
+"""Tests for the caching DNS resolver."""
+
+import pytest
+import asyncio
+import socket
+import time
+from unittest.mock import patch
+from scanhero.exceptions import ConfigurationError, InvalidTargetError
+from scanhero.resolver import CachingResolver
+
+
+class TestCachingResolver:
+    """Test cases for CachingResolver class."""
+    
+    @pytest.mark.asyncio
+    async def test_ip_literal(self):
+        """Test that IP addresses are returned without a lookup."""
+        resolver = CachingResolver()
+        with patch.object(resolver, '_lookup') as lookup:
+            assert await resolver.resolve("10.0.0.1") == "10.0.0.1"
+            assert await resolver.resolve("::1") == "::1"
+        lookup.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_cache_and_shared_lookups(self):
+        """Test that concurrent and repeated lookups query once."""
+        resolver = CachingResolver()
+        calls = []
+        
+        async def lookup(host):
+            calls.append(host)
+            await asyncio.sleep(0.01)
+            return "192.0.2.7"
+        
+        with patch.object(resolver, '_lookup', side_effect=lookup):
+            answers = await asyncio.gather(*(resolver.resolve("example.test") for _ in range(5)))
+            assert await resolver.resolve("example.test") == "192.0.2.7"
+        
+        assert answers == ["192.0.2.7"] * 5
+        assert calls == ["example.test"]
+    
+    @pytest.mark.asyncio
+    async def test_failure(self):
+        """Test that resolution failures raise InvalidTargetError."""
+        resolver = CachingResolver()
+        error = socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        
+        with patch.object(resolver, '_lookup', side_effect=error):
+            with pytest.raises(InvalidTargetError):
+                await resolver.resolve("nosuch.test")
+        
+        assert len(resolver.cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_localhost(self):
+        """Test a real lookup."""
+        assert await CachingResolver().resolve("localhost") in ("127.0.0.1", "::1")
+    
+    @pytest.mark.asyncio
+    async def test_resolve_all_groups_and_reports_once(self):
+        """Test names sharing an address are grouped and failures listed once."""
+        resolver = CachingResolver(workers=2)
+        answers = {"a.test": "192.0.2.1", "b.test": "192.0.2.2", "c.test": "192.0.2.1"}
+        
+        async def lookup(host):
+            if host not in answers:
+                raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+            return answers[host]
+        
+        with patch.object(resolver, '_lookup', side_effect=lookup) as mock:
+            resolution = await resolver.resolve_all(
+                ["a.test", "nosuch.test", "b.test", "c.test", "a.test", "192.0.2.2"]
+            )
+        
+        assert resolution.names_by_address == {
+            "192.0.2.1": ["a.test", "c.test"],
+            "192.0.2.2": ["b.test", "192.0.2.2"],
+        }
+        assert resolution.addresses == ["192.0.2.1", "192.0.2.2"]
+        assert list(resolution.errors) == ["nosuch.test"]
+        assert mock.call_count == 4
+    
+    @pytest.mark.asyncio
+    async def test_lookup_timeout(self):
+        """Test a lookup slower than the timeout fails without waiting for it."""
+        resolver = CachingResolver(timeout=0.05)
+        
+        def slow(*args, **kwargs):
+            time.sleep(0.3)
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.9", 0))]
+        
+        with patch("scanhero.resolver.socket.getaddrinfo", side_effect=slow):
+            with pytest.raises(InvalidTargetError, match="Timed out"):
+                await resolver.resolve("slow.test")
+        resolver.close()
+    
+    def test_validation(self):
+        """Test invalid pool settings are rejected."""
+        with pytest.raises(ConfigurationError):
+            CachingResolver(workers=0)
+        with pytest.raises(ConfigurationError):
+            CachingResolver(timeout=0)
@@ -0,0 +1,106 @@
+"""Tests for automatic concurrency sizing."""
+
+import pytest
+from unittest.mock import patch
+from scanhero import resources
+from scanhero.resources import ResourceBudget, detect_resource_budget
+
+
+TCP_TABLE = (
+    "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid\n"
+    "   0: 0100007F:0016 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0\n"
+    "   1: 0100007F:D2F0 0100007F:0050 06 00000000:00000000 03:00000F9E 00000000     0\n"
+    "   2: 0100007F:D2F2 0100007F:0050 06 00000000:00000000 03:00000F9E 00000000     0\n"
+)
+
+
+class TestResources:
+    """Test cases for resource budget detection."""
+    
+    def test_ephemeral_port_count(self, tmp_path):
+        """Test reading the ephemeral port range."""
+        path = tmp_path / "ip_local_port_range"
+        path.write_text("32768\t60999\n")
+        assert resources._ephemeral_port_count(str(path)) == 28232
+    
+    def test_ephemeral_port_count_missing(self, tmp_path):
+        """Test a missing port range file."""
+        assert resources._ephemeral_port_count(str(tmp_path / "missing")) is None
+    
+    def test_time_wait_count(self, tmp_path):
+        """Test counting TIME_WAIT sockets in a procfs TCP table."""
+        path = tmp_path / "tcp"
+        path.write_text(TCP_TABLE)
+        assert resources._time_wait_count((str(path), str(tmp_path / "missing"))) == 2
+    
+    def test_budget_limited_by_open_files(self):
+        """Test that the open file limit bounds the budget."""
+        with patch.object(resources, '_nofile_limits', return_value=(1024, 1024, False)):
+            with patch.object(resources, '_ephemeral_port_count', return_value=28232):
+                with patch.object(resources, '_time_wait_count', return_value=0):
+                    budget = detect_resource_budget(reserved=20)
+        
+        assert budget.max_concurrent == 1024 - resources.RESERVED_FDS - 20
+    
+    def test_budget_limited_by_ephemeral_ports(self):
+        """Test that TIME_WAIT entries shrink the budget."""
+        with patch.object(resources, '_nofile_limits', return_value=(65536, 65536, True)):
+            with patch.object(resources, '_ephemeral_port_count', return_value=4000):
+                with patch.object(resources, '_time_wait_count', return_value=2000):
+                    budget = detect_resource_budget()
+        
+        assert budget.max_concurrent == 1000
+        assert budget.nofile_raised is True
+    
+    def test_budget_fallback(self):
+        """Test the fallback when no limit can be inspected."""
+        with patch.object(resources, '_nofile_limits', return_value=None):
+            with patch.object(resources, '_ephemeral_port_count', return_value=None):
+                with patch.object(resources, '_time_wait_count', return_value=None):
+                    budget = detect_resource_budget()
+        
+        assert budget.max_concurrent == resources.AUTO_CONCURRENCY_FALLBACK
+    
+    def test_describe(self):
+        """Test the budget summary line."""
+        budget = ResourceBudget(
+            max_concurrent=500, nofile_soft=1024, nofile_hard=4096,
+            nofile_raised=True, ephemeral_ports=28232, time_wait=3
+        )
+        assert budget.describe() == (
+            "max_concurrent=500, nofile=1024/4096 (raised), "
+            "ephemeral_ports=28232, time_wait=3"
+        )
+    
+    @pytest.mark.skipif(not resources.RESOURCE_AVAILABLE, reason="resource module unavailable")
+    def test_nofile_limits_raises_soft_limit(self):
+        """Test that the soft open file limit is raised towards the cap."""
+        rlimit = resources.resource
+        with patch.object(rlimit, 'getrlimit', return_value=(1024, 4096)):
+            with patch.object(rlimit, 'setrlimit') as setrlimit:
+                soft, hard, raised = resources._nofile_limits(0, raise_limit=True)
+        
+        setrlimit.assert_called_once_with(rlimit.RLIMIT_NOFILE, (4096, 4096))
+        assert (soft, hard, raised) == (4096, 4096, True)
+    
+    @pytest.mark.skipif(not resources.RESOURCE_AVAILABLE, reason="resource module unavailable")
+    def test_nofile_limits_never_lowers_soft_limit(self):
+        """Test that inspecting the open file limit never lowers it."""
+        rlimit = resources.resource
+        high = resources.AUTO_CONCURRENCY_CAP * 4
+        with patch.object(rlimit, 'getrlimit', return_value=(high, rlimit.RLIM_INFINITY)):
+            with patch.object(rlimit, 'setrlimit') as setrlimit:
+                soft, hard, raised = resources._nofile_limits(0, raise_limit=True)
+        
+        setrlimit.assert_not_called()
+        assert (soft, raised) == (high, False)
+    
+    @pytest.mark.skipif(not resources.RESOURCE_AVAILABLE, reason="resource module unavailable")
+    def test_nofile_limits_keeps_soft_limit_when_raise_fails(self):
+        """Test that a refused raise leaves the soft limit as it was."""
+        rlimit = resources.resource
+        with patch.object(rlimit, 'getrlimit', return_value=(256, 4096)):
+            with patch.object(rlimit, 'setrlimit', side_effect=ValueError("not allowed")):
+                soft, hard, raised = resources._nofile_limits(0, raise_limit=True)
+        
+        assert (soft, hard, raised) == (256, 4096, False)
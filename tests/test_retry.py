@@ -0,0 +1,51 @@
+"""Tests for connect error classification and retry policy."""
+
+import errno
+import pytest
+from scanhero.retry import ErrorClass, RetryPolicy, classify_error
+
+
+class TestClassifyError:
+    """Test cases for classify_error."""
+    
+    def test_refused_is_closed(self):
+        """Test that refused connections are final closed answers."""
+        assert classify_error(ConnectionRefusedError()) == ErrorClass.CLOSED
+        assert classify_error(OSError(errno.ECONNREFUSED, "refused")) == ErrorClass.CLOSED
+    
+    def test_unreachable_is_filtered(self):
+        """Test that unreachable answers are final filtered answers."""
+        assert classify_error(OSError(errno.EHOSTUNREACH, "no route")) == ErrorClass.FILTERED
+        assert classify_error(OSError(errno.ENETUNREACH, "unreachable")) == ErrorClass.FILTERED
+    
+    @pytest.mark.parametrize("code", [errno.EACCES, errno.EPERM])
+    def test_local_policy(self, code):
+        """Test that local firewall and permission refusals are not blamed on the target."""
+        assert classify_error(OSError(code, "not permitted")) == ErrorClass.LOCAL_POLICY
+    
+    @pytest.mark.parametrize("code", [errno.EMFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL])
+    def test_local_exhaustion(self, code):
+        """Test that local resource exhaustion is recognized."""
+        assert classify_error(OSError(code, "exhausted")) == ErrorClass.LOCAL_RESOURCE
+    
+    def test_unrecognized(self):
+        """Test that other errors are unknown."""
+        assert classify_error(OSError(errno.EINVAL, "invalid")) == ErrorClass.UNKNOWN
+        assert classify_error(OSError("no errno")) == ErrorClass.UNKNOWN
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy."""
+    
+    def test_delay_grows_exponentially_with_cap(self):
+        """Test that the backoff ceiling doubles and is capped."""
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+        for _ in range(50):
+            assert 0.0 <= policy.delay(0) <= 0.1
+            assert 0.0 <= policy.delay(2) <= 0.4
+            assert 0.0 <= policy.delay(10) <= 0.5
+    
+    def test_delay_is_jittered(self):
+        """Test that delays are not all identical."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=1.0)
+        assert len({policy.delay(0) for _ in range(20)}) > 1
@@ -4,8 +4,9 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 from scanhero.scanner import PortScanner
-from scanhero.models import ScanConfig, PortStatus, ServiceType
-from scanhero.exceptions import InvalidTargetError, ScanTimeoutError
+from scanhero.models import ScanConfig, PortStatus, ServiceType, port_ranges
+from scanhero.exceptions import InvalidTargetError, ConfigurationError, ScanTimeoutError
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
 
 
 class TestPortScanner:
@@ -85,11 +86,15 @@ class TestPortScanner:
         """Test port status check for open port."""
         with patch('asyncio.open_connection') as mock_conn:
             mock_reader = AsyncMock()
-            mock_writer = AsyncMock()
+            # StreamWriter.close is synchronous, only wait_closed is awaited
+            mock_writer = MagicMock()
+            mock_writer.wait_closed = AsyncMock()
             mock_conn.return_value = (mock_reader, mock_writer)
             
             status = await scanner._check_port_status("127.0.0.1", 80)
             assert status == PortStatus.OPEN
+            mock_writer.close.assert_called_once()
+            mock_writer.wait_closed.assert_awaited_once()
     
     @pytest.mark.asyncio
     async def test_check_port_status_closed(self, scanner):
@@ -109,6 +114,25 @@ class TestPortScanner:
             status = await scanner._check_port_status("127.0.0.1", 80)
             assert status == PortStatus.FILTERED
     
+    @pytest.mark.asyncio
+    async def test_check_port_status_falls_back_to_timeout(self):
+        """Test that connects without a connect timeout use the general timeout."""
+        config = ScanConfig(timeout=0.05, retry_count=0)
+        config.connect_timeout = None
+        scanner = PortScanner(config)
+        
+        async def hang(host, port):
+            await asyncio.sleep(10)
+        
+        with patch('asyncio.open_connection', side_effect=hang):
+            status = await asyncio.wait_for(scanner._check_port_status("127.0.0.1", 80), 2)
+        assert status == PortStatus.FILTERED
+    
+    def test_scan_timeout_error_is_deprecated(self):
+        """Test that the never-raised ScanTimeoutError warns when created."""
+        with pytest.warns(DeprecationWarning):
+            ScanTimeoutError()
+    
     @pytest.mark.asyncio
     async def test_scan_single_port_open(self, scanner):
         """Test scanning a single open port."""
@@ -185,15 +209,6 @@ class TestPortScanner:
             assert result.scan_duration > 0
             assert result.timestamp is not None
     
-    @pytest.mark.asyncio
-    async def test_scan_timeout_error(self, scanner):
-        """Test scan timeout error handling."""
-        with patch.object(scanner, '_scan_ports') as mock_scan_ports:
-            mock_scan_ports.side_effect = asyncio.TimeoutError()
-            
-            with pytest.raises(ScanTimeoutError):
-                await scanner.scan("127.0.0.1", [80])
-    
     @pytest.mark.asyncio
     async def test_scan_invalid_target(self, scanner):
         """Test scan with invalid target."""
@@ -205,3 +220,408 @@ class TestPortScanner:
         """Test scan with invalid ports."""
         with pytest.raises(InvalidTargetError):
             await scanner.scan("127.0.0.1", "invalid")
+    
+    def test_config_timeouts_default_to_timeout(self):
+        """Test that unset connect and banner timeouts fall back to timeout."""
+        config = ScanConfig(timeout=2.0, banner_timeout=0.5)
+        assert config.connect_timeout == 2.0
+        assert config.banner_timeout == 0.5
+        assert config.effective_connect_timeout == 2.0
+        assert config.effective_banner_timeout == 0.5
+        assert config.scan_deadline is None
+    
+    def test_config_invalid_deadline(self):
+        """Test that a non-positive scan deadline is rejected."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(scan_deadline=0)
+    
+    def test_init_passes_timeouts_to_detector(self):
+        """Test that the service detector gets the banner and connect timeouts."""
+        scanner = PortScanner(ScanConfig(connect_timeout=0.5, banner_timeout=1.5))
+        assert scanner.service_detector.connect_timeout == 0.5
+        assert scanner.service_detector.timeout == 1.5
+    
+    @pytest.mark.asyncio
+    async def test_scan_deadline_returns_partial_result(self):
+        """Test that an expired scan deadline yields a partial, incomplete result."""
+        scanner = PortScanner(ScanConfig(timeout=5.0, scan_deadline=0.2))
+        
+        async def check(target, port):
+            if port == 22:
+                await asyncio.sleep(10)
+            return PortStatus.OPEN if port == 80 else PortStatus.CLOSED
+        
+        with patch.object(scanner, '_check_port_status', side_effect=check):
+            result = await scanner.scan("127.0.0.1", [22, 80, 443], service_detection=False)
+        
+        assert result.incomplete is True
+        assert result.unscanned_ports == [22]
+        assert result.ports_scanned == [80, 443]
+        assert result.open_count == 1
+        assert result.closed_count == 1
+        assert result.scan_duration < 5.0
+    
+    @pytest.mark.asyncio
+    async def test_scan_without_deadline_is_complete(self, scanner):
+        """Test that a scan that finishes is not marked incomplete."""
+        with patch.object(scanner, '_check_port_status') as mock_check:
+            mock_check.return_value = PortStatus.CLOSED
+            
+            result = await scanner.scan("127.0.0.1", [80, 443], service_detection=False)
+        
+        assert result.incomplete is False
+        assert result.unscanned_ports == []
+    
+    @pytest.mark.asyncio
+    async def test_detection_does_not_hold_connect_slot(self):
+        """Test that slow service detection does not block the connect stage."""
+        scanner = PortScanner(ScanConfig(max_concurrent=1, detection_concurrency=1))
+        checked = []
+        detection_release = asyncio.Event()
+        
+        async def check(target, port):
+            checked.append(port)
+            return PortStatus.OPEN if port == 80 else PortStatus.CLOSED
+        
+        async def detect(target, port):
+            await detection_release.wait()
+            return None
+        
+        with patch.object(scanner, '_check_port_status', side_effect=check):
+            with patch.object(scanner.service_detector, 'detect_service', side_effect=detect):
+                scan_task = asyncio.ensure_future(
+                    scanner._scan_ports("127.0.0.1", [80, 81, 82], True)
+                )
+                await asyncio.sleep(0.05)
+                # Every port was connected while detection on 80 is still running
+                assert checked == [80, 81, 82]
+                assert not scan_task.done()
+                detection_release.set()
+                results = await scan_task
+        
+        assert len(results) == 3
+    
+    @pytest.mark.asyncio
+    async def test_detection_timeout(self):
+        """Test that detection is abandoned after detection_timeout."""
+        scanner = PortScanner(ScanConfig(detection_timeout=0.05))
+        
+        async def detect(target, port):
+            await asyncio.sleep(10)
+        
+        with patch.object(scanner, '_check_port_status', return_value=PortStatus.OPEN):
+            with patch.object(scanner.service_detector, 'detect_service', side_effect=detect):
+                result = await scanner._scan_single_port("127.0.0.1", 80, True)
+        
+        assert result.status == PortStatus.OPEN
+        assert result.service is None
+    
+    @pytest.mark.asyncio
+    async def test_scan_deadline_during_detection_keeps_status(self):
+        """Test that ports cut off during detection still report their status."""
+        scanner = PortScanner(ScanConfig(scan_deadline=0.1))
+        
+        async def detect(target, port):
+            await asyncio.sleep(10)
+        
+        with patch.object(scanner, '_check_port_status', return_value=PortStatus.OPEN):
+            with patch.object(scanner.service_detector, 'detect_service', side_effect=detect):
+                result = await scanner.scan("127.0.0.1", [80])
+        
+        assert result.open_count == 1
+        assert result.unscanned_ports == []
+        assert result.open_ports[0].service is None
+    
+    @pytest.mark.asyncio
+    async def test_scan_hosts_returns_result_per_host(self, scanner):
+        """Test that a multi-host scan returns one result per distinct host."""
+        async def check(target, port):
+            return PortStatus.OPEN if target == "10.0.0.1" else PortStatus.CLOSED
+        
+        with patch.object(scanner, '_check_port_status', side_effect=check):
+            results = await scanner.scan_hosts(
+                ["10.0.0.1", "10.0.0.2", "10.0.0.1"], [80, 443], service_detection=False
+            )
+        
+        assert [r.target for r in results] == ["10.0.0.1", "10.0.0.2"]
+        assert results[0].open_count == 2
+        assert results[1].closed_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_scan_hosts_respects_per_host_limit(self):
+        """Test that no host exceeds its in-flight cap."""
+        scanner = PortScanner(ScanConfig(max_concurrent=10, max_per_host=2))
+        active = {}
+        peak = {}
+        
+        async def check(target, port):
+            active[target] = active.get(target, 0) + 1
+            peak[target] = max(peak.get(target, 0), active[target])
+            await asyncio.sleep(0.01)
+            active[target] -= 1
+            return PortStatus.CLOSED
+        
+        with patch.object(scanner, '_check_port_status', side_effect=check):
+            await scanner.scan_hosts(["10.0.0.1", "10.0.0.2"], "1-20", service_detection=False)
+        
+        assert peak == {"10.0.0.1": 2, "10.0.0.2": 2}
+    
+    @pytest.mark.asyncio
+    async def test_scan_hosts_slow_host_does_not_starve_others(self):
+        """Test round-robin scheduling around a slow host."""
+        scanner = PortScanner(ScanConfig(max_concurrent=4, max_per_host=2))
+        
+        async def check(target, port):
+            if target == "10.0.0.1":
+                await asyncio.sleep(10)
+            return PortStatus.CLOSED
+        
+        with patch.object(scanner, '_check_port_status', side_effect=check):
+            scanner.config.scan_deadline = 0.3
+            results = await scanner.scan_hosts(
+                ["10.0.0.1", "10.0.0.2"], "1-50", service_detection=False
+            )
+        
+        slow, fast = results
+        assert slow.total_ports == 0
+        assert fast.closed_count == 50
+        assert fast.incomplete is False
+    
+    @pytest.mark.asyncio
+    async def test_check_port_status_definitive_errno_not_retried(self, scanner):
+        """Test that remote answers are final and never retried."""
+        import errno
+        with patch('asyncio.open_connection') as mock_conn:
+            mock_conn.side_effect = OSError(errno.EHOSTUNREACH, "No route to host")
+            status = await scanner._check_port_status("127.0.0.1", 80)
+            assert status == PortStatus.FILTERED
+            assert mock_conn.call_count == 1
+            
+            mock_conn.reset_mock()
+            mock_conn.side_effect = OSError(errno.ECONNREFUSED, "Connection refused")
+            status = await scanner._check_port_status("127.0.0.1", 80)
+            assert status == PortStatus.CLOSED
+            assert mock_conn.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_check_port_status_retries_local_exhaustion(self):
+        """Test that EMFILE is retried with backoff and throttles the limiter."""
+        import errno
+        scanner = PortScanner(ScanConfig(max_concurrent=8, retry_count=0, retry_backoff=0.001))
+        with patch('asyncio.open_connection') as mock_conn:
+            mock_conn.side_effect = [
+                OSError(errno.EMFILE, "Too many open files"),
+                OSError(errno.EMFILE, "Too many open files"),
+                ConnectionRefusedError(),
+            ]
+            
+            status = await scanner._check_port_status("127.0.0.1", 80)
+        
+        assert status == PortStatus.CLOSED
+        assert mock_conn.call_count == 3
+        assert scanner._limiter.limit < 8
+    
+    @pytest.mark.asyncio
+    async def test_check_port_status_gives_up_after_resource_retries(self):
+        """Test that local exhaustion ends as unknown after resource_retries."""
+        import errno
+        scanner = PortScanner(ScanConfig(resource_retries=2, retry_backoff=0.001))
+        with patch('asyncio.open_connection') as mock_conn:
+            mock_conn.side_effect = OSError(errno.ENOBUFS, "No buffer space available")
+            
+            status = await scanner._check_port_status("127.0.0.1", 80)
+        
+        assert status == PortStatus.UNKNOWN
+        assert mock_conn.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_local_policy_refusal_is_an_error(self, scanner):
+        """Test that EPERM from a local firewall rule is reported as an error, not filtered."""
+        import errno
+        with patch('asyncio.open_connection') as mock_conn:
+            mock_conn.side_effect = OSError(errno.EPERM, "Operation not permitted")
+            
+            result = await scanner._scan_single_port("127.0.0.1", 80, detect_services=False)
+        
+        assert result.status == PortStatus.UNKNOWN
+        assert "Operation not permitted" in result.error
+        assert mock_conn.call_count == 1
+        assert scanner._limiter.limit == scanner.max_concurrent
+    
+    def test_init_auto_concurrency(self):
+        """Test that max_concurrent="auto" sizes the limiter from the resource budget."""
+        from scanhero.resources import ResourceBudget
+        budget = ResourceBudget(max_concurrent=321)
+        with patch('scanhero.scanner.detect_resource_budget', return_value=budget):
+            scanner = PortScanner(ScanConfig(max_concurrent="auto"))
+        
+        assert scanner.resource_budget is budget
+        assert scanner.max_concurrent == 321
+        assert scanner._limiter.global_limit == 321
+    
+    def test_config_invalid_concurrency(self):
+        """Test that only integers and "auto" are accepted for max_concurrent."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(max_concurrent="lots")
+        with pytest.raises(ConfigurationError):
+            ScanConfig(max_concurrent=0)
+
+
+class TestFilteredHostAbandonment:
+    """Test cases for abandoning hosts that look fully filtered."""
+    
+    def config(self, **overrides):
+        """Build a scan config with short timeouts and abandonment on."""
+        options = dict(
+            timeout=0.05, retry_count=0, service_detection=False,
+            abandon_filtered=20, max_concurrent=10
+        )
+        options.update(overrides)
+        return ScanConfig(**options)
+    
+    def test_port_ranges(self):
+        """Test ports are compressed into sorted inclusive ranges."""
+        assert port_ranges([5, 1, 2, 3, 9, 10, 3]) == [(1, 3), (5, 5), (9, 10)]
+        assert port_ranges([]) == []
+    
+    def test_config_invalid_threshold(self):
+        """Test a threshold below one is rejected."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(abandon_filtered=0)
+    
+    def test_probe_order_samples_whole_range(self):
+        """Test the first probes are spread across the port list."""
+        scanner = PortScanner(self.config(abandon_filtered=10))
+        order = scanner._probe_order(list(range(1, 1001)))
+        assert sorted(order) == list(range(1, 1001))
+        assert order[:10] == list(range(1, 1001, 100))
+    
+    @pytest.mark.asyncio
+    async def test_filtered_host_is_abandoned(self):
+        """Test a silent host stops getting connects after the threshold."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(default_status=PortStatus.FILTERED)})
+        scanner = PortScanner(self.config(), transport=network)
+        result = await scanner.scan("10.0.0.1", "1-1000")
+        
+        assert result.abandoned
+        assert network.connect_attempts < 50
+        assert result.filtered_count == result.total_ports == network.connect_attempts
+        assert result.presumed_filtered_count == 1000 - result.total_ports
+        assert not result.incomplete
+        assert sorted(
+            result.ports_scanned
+            + [p for first, last in result.presumed_filtered for p in range(first, last + 1)]
+        ) == list(range(1, 1001))
+        assert scanner.metrics.get("scanhero_abandoned_hosts_total").labels().value == 1
+    
+    @pytest.mark.asyncio
+    async def test_answering_host_is_not_abandoned(self):
+        """Test one closed or open answer keeps the host in the scan."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(open_ports={999}, filtered_ports=set(range(901, 999))),
+            "10.0.0.2": SimulatedHost(default_status=PortStatus.FILTERED),
+        })
+        scanner = PortScanner(self.config(timeout=0.2, max_concurrent=20), transport=network)
+        results = await scanner.scan_hosts(["10.0.0.1", "10.0.0.2"], "900-1000")
+        
+        assert [r.abandoned for r in results] == [False, True]
+        assert results[0].total_ports == 101
+        assert [p.port for p in results[0].open_ports] == [999]
+    
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """Test every port is scanned without a threshold."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(default_status=PortStatus.FILTERED)})
+        scanner = PortScanner(self.config(abandon_filtered=None, max_concurrent=100), transport=network)
+        result = await scanner.scan("10.0.0.1", "1-100")
+        
+        assert not result.abandoned
+        assert result.filtered_count == 100
+
+
+class TestBulkResolution:
+    """Test cases for resolving targets before a multi-host scan."""
+    
+    @pytest.mark.asyncio
+    async def test_names_sharing_an_address_are_scanned_once(self):
+        """Test aliases of one address and unresolvable names in scan_hosts."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={22}, rtt=0.001)})
+        scanner = PortScanner(ScanConfig(timeout=0.2, retry_count=0, service_detection=False), transport=network)
+        answers = {"www.test": "10.0.0.1", "web.test": "10.0.0.1"}
+        
+        async def lookup(host):
+            if host not in answers:
+                raise InvalidTargetError(f"Could not resolve {host}")
+            return answers[host]
+        
+        with patch.object(scanner.resolver, '_lookup', side_effect=lookup):
+            results = await scanner.scan_hosts(["nosuch.test", "www.test", "web.test", "10.0.0.1"], "20-25")
+        
+        assert [r.target for r in results] == ["nosuch.test", "www.test"]
+        assert results[0].errors == ["Could not resolve nosuch.test"]
+        assert results[0].total_ports == 0
+        assert results[1].address == "10.0.0.1"
+        assert results[1].aliases == ["web.test", "10.0.0.1"]
+        assert [p.port for p in results[1].open_ports] == [22]
+        assert network.connect_attempts == 6
+        assert scanner.metrics.get("scanhero_resolve_failures_total").labels().value == 1
+    
+    @pytest.mark.asyncio
+    async def test_single_scan_resolves_once(self):
+        """Test scan() connects to the resolved address and keeps the name."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={80})})
+        scanner = PortScanner(ScanConfig(timeout=0.2, retry_count=0, service_detection=False), transport=network)
+        
+        with patch.object(scanner.resolver, '_lookup', return_value="10.0.0.1") as lookup:
+            result = await scanner.scan("www.test", "79-81")
+        
+        lookup.assert_called_once_with("www.test")
+        assert result.target == "www.test"
+        assert result.address == "10.0.0.1"
+        assert result.open_count == 1
+
+
+class TestExclusions:
+    """Test cases for excluded addresses and ports."""
+    
+    @pytest.mark.asyncio
+    async def test_excluded_addresses_are_never_touched(self):
+        """Test names resolving into an excluded range are reported, not scanned."""
+        network = SimulatedNetwork(default_host=SimulatedHost(open_ports={22}))
+        config = ScanConfig(timeout=0.2, retry_count=0, service_detection=False, exclude=["10.9.0.0/16"])
+        scanner = PortScanner(config, transport=network)
+        answers = {"db.test": "10.9.0.5", "web.test": "10.0.0.1"}
+        
+        async def lookup(host):
+            return answers[host]
+        
+        with patch.object(scanner.resolver, '_lookup', side_effect=lookup):
+            results = await scanner.scan_hosts(["db.test", "web.test", "10.9.1.1"], [22])
+            with pytest.raises(InvalidTargetError, match="excluded"):
+                await scanner.scan("db.test", [22])
+        
+        assert [r.errors for r in results] == [
+            ["db.test resolves to excluded address 10.9.0.5"], [],
+            ["10.9.1.1 resolves to excluded address 10.9.1.1"]
+        ]
+        assert results[1].open_count == 1
+        assert network.connect_attempts == 1
+    
+    @pytest.mark.asyncio
+    async def test_excluded_ports(self):
+        """Test excluded ports are dropped from every port list."""
+        network = SimulatedNetwork(default_host=SimulatedHost(open_ports={22, 9100}))
+        config = ScanConfig(timeout=0.2, retry_count=0, service_detection=False, exclude_ports=[9100, 515])
+        scanner = PortScanner(config, transport=network)
+        
+        result = await scanner.scan("10.0.0.1", "22,515,9100")
+        assert result.ports_scanned == [22]
+        with pytest.raises(InvalidTargetError):
+            await scanner.scan("10.0.0.1", [9100])
+    
+    def test_config_validation(self):
+        """Test invalid exclusions are rejected."""
+        with pytest.raises(ConfigurationError):
+            ScanConfig(exclude=["not-an-address"])
+        with pytest.raises(ConfigurationError):
+            ScanConfig(exclude_ports=[0])
@@ -0,0 +1,292 @@
+"""Tests for the recurring scan scheduler."""
+
+import pytest
+import asyncio
+import heapq
+import itertools
+import json
+from scanhero.daemon import ScanDaemon
+from scanhero.exceptions import ConfigurationError
+from scanhero.models import ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.scheduler import (
+    OverlapPolicy, ScanScheduler, ScheduledScan, load_schedule, scanner_runner
+)
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+class FakeClock:
+    """Virtual clock whose sleepers only wake when the test advances it."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers = []
+        self._order = itertools.count()
+    
+    def time(self):
+        return self.now
+    
+    async def sleep(self, delay):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + delay, next(self._order), waiter))
+        await waiter
+    
+    async def advance(self, seconds):
+        """Move time forward, waking sleepers in order and letting each settle."""
+        end = self.now + seconds
+        await self._settle()
+        while self._sleepers and self._sleepers[0][0] <= end:
+            wake, _, waiter = heapq.heappop(self._sleepers)
+            self.now = wake
+            if not waiter.done():
+                waiter.set_result(None)
+            await self._settle()
+        self.now = end
+        await self._settle()
+    
+    async def _settle(self):
+        # Let every task that became ready run until it blocks again
+        for _ in range(50):
+            await asyncio.sleep(0)
+
+
+class RecordingRunner:
+    """Runner that records batch start times and takes a fixed time."""
+    
+    def __init__(self, clock, duration=0.0):
+        self.clock = clock
+        self.duration = duration
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+    
+    async def __call__(self, scan, targets):
+        self.calls.append((scan.name, targets, self.clock.time()))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.clock.sleep(self.duration)
+        finally:
+            self.running -= 1
+
+
+def fake_scheduler(runner, clock, **kwargs):
+    """Build a scheduler driven by a fake clock."""
+    return ScanScheduler(runner, clock=clock.time, sleep=clock.sleep, **kwargs)
+
+
+class TestScheduledScan:
+    """Test cases for ScheduledScan class."""
+    
+    def test_validation(self):
+        """Test out-of-range fields are rejected."""
+        with pytest.raises(ConfigurationError):
+            ScheduledScan("a", ["10.0.0.1"], "80", interval=0)
+        with pytest.raises(ConfigurationError):
+            ScheduledScan("a", ["10.0.0.1"], "80", interval=10, jitter=10)
+        with pytest.raises(ConfigurationError):
+            ScheduledScan("a", [], "80", interval=10)
+        with pytest.raises(ConfigurationError):
+            ScheduledScan("a", ["10.0.0.1"], "80", interval=10, overlap="drop")
+    
+    def test_overlap_from_string(self):
+        """Test overlap policies given by name."""
+        scan = ScheduledScan("a", ["10.0.0.1"], "80", interval=10, overlap="queue")
+        assert scan.overlap is OverlapPolicy.QUEUE
+    
+    def test_phase_offset_is_stable_and_spread(self):
+        """Test derived phase offsets depend only on the name."""
+        offsets = {
+            ScheduledScan(f"scan-{i}", ["10.0.0.1"], "80", interval=60).phase_offset
+            for i in range(20)
+        }
+        assert len(offsets) == 20
+        assert all(0 <= offset < 60 for offset in offsets)
+        assert ScheduledScan("x", ["h"], "80", interval=60).phase_offset == \
+            ScheduledScan("x", ["h"], "80", interval=60).phase_offset
+    
+    def test_load_schedule(self, tmp_path):
+        """Test loading scheduled scans from JSON."""
+        path = tmp_path / "schedule.json"
+        path.write_text(json.dumps([
+            {"name": "dmz", "targets": "10.0.0.0/30", "ports": "22,80", "interval": 3600, "jitter": 30},
+        ]))
+        scans = load_schedule(str(path))
+        assert scans[0].targets == ["10.0.0.0/30"]
+        assert scans[0].jitter == 30
+        
+        path.write_text(json.dumps([{"name": "dmz", "cron": "* * * * *"}]))
+        with pytest.raises(ConfigurationError):
+            load_schedule(str(path))
+
+
+class TestScanScheduler:
+    """Test cases for ScanScheduler class."""
+    
+    @pytest.mark.asyncio
+    async def test_runs_on_interval(self):
+        """Test runs start at the phase offset and repeat every interval."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock)
+        scheduler = fake_scheduler(runner, clock)
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "80", interval=0.1, phase=0.05))
+        scheduler.start()
+        await clock.advance(0.38)
+        await scheduler.stop()
+        
+        times = [t for _, _, t in runner.calls]
+        assert times == [pytest.approx(t) for t in (0.05, 0.15, 0.25, 0.35)]
+    
+    @pytest.mark.asyncio
+    async def test_skips_overlapping_runs(self):
+        """Test runs due while the last one is going are skipped."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock, duration=0.25)
+        scheduler = fake_scheduler(runner, clock)
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "80", interval=0.1, phase=0))
+        scheduler.start()
+        await clock.advance(0.35)
+        await scheduler.stop()
+        
+        state = scheduler.states["a"]
+        assert state.runs == 2
+        assert state.skipped == 2
+        assert [t for _, _, t in runner.calls] == [0.0, pytest.approx(0.3)]
+    
+    @pytest.mark.asyncio
+    async def test_queues_overlapping_runs(self):
+        """Test missed runs coalesce into one run queued behind the current one."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock, duration=0.25)
+        scheduler = fake_scheduler(runner, clock)
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "80", interval=0.1, phase=0, overlap="queue"))
+        scheduler.start()
+        
+        # Runs due at 0.1 and 0.2 coalesce and start when the first ends
+        await clock.advance(0.27)
+        state = scheduler.states["a"]
+        assert state.runs == 2
+        assert state.queued == 1
+        assert [t for _, _, t in runner.calls] == [0.0, pytest.approx(0.25)]
+        
+        # Runs due at 0.3 and 0.4 coalesce behind the second run
+        await clock.advance(0.18)
+        assert state.runs == 2
+        assert state.queued == 2
+        assert state.pending is True
+        await scheduler.stop()
+    
+    @pytest.mark.asyncio
+    async def test_spreads_batches_over_interval(self):
+        """Test batches start evenly spaced over the interval."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock)
+        scheduler = fake_scheduler(runner, clock, max_concurrent_jobs=4)
+        scheduler.add(ScheduledScan("a", ["10.0.0.0/29"], "80", interval=0.4, phase=0, batches=4))
+        scheduler.start()
+        await clock.advance(0.35)
+        await scheduler.stop()
+        
+        assert [targets for _, targets, _ in runner.calls] == [
+            ["10.0.0.1", "10.0.0.2"], ["10.0.0.3", "10.0.0.4"], ["10.0.0.5"], ["10.0.0.6"]
+        ]
+        times = [t for _, _, t in runner.calls]
+        assert times == [pytest.approx(t) for t in (0.0, 0.1, 0.2, 0.3)]
+    
+    @pytest.mark.asyncio
+    async def test_caps_concurrent_jobs(self):
+        """Test batches of all scans share the concurrency cap."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock, duration=0.1)
+        scheduler = fake_scheduler(runner, clock, max_concurrent_jobs=2)
+        for name in "abcd":
+            scheduler.add(ScheduledScan(name, ["10.0.0.1"], "80", interval=10, phase=0))
+        scheduler.start()
+        
+        await clock.advance(0.05)
+        assert len(runner.calls) == 2
+        await clock.advance(0.1)
+        assert runner.peak == 2
+        assert [t for _, _, t in runner.calls] == [0.0, 0.0, pytest.approx(0.1), pytest.approx(0.1)]
+        await scheduler.stop()
+    
+    @pytest.mark.asyncio
+    async def test_jitter_delays_start(self):
+        """Test start jitter stays within its bound."""
+        clock = FakeClock()
+        runner = RecordingRunner(clock)
+        scheduler = fake_scheduler(runner, clock, seed=1)
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "80", interval=1, phase=0, jitter=0.1))
+        scheduler.start()
+        await clock.advance(0.15)
+        await scheduler.stop()
+        
+        assert len(runner.calls) == 1
+        assert 0 < runner.calls[0][2] <= 0.1
+    
+    @pytest.mark.asyncio
+    async def test_records_runner_errors(self):
+        """Test a failing run is recorded and does not stop the schedule."""
+        async def failing(scan, targets):
+            raise RuntimeError("boom")
+        
+        clock = FakeClock()
+        scheduler = fake_scheduler(failing, clock)
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "80", interval=0.05, phase=0))
+        scheduler.start()
+        await clock.advance(0.12)
+        await scheduler.stop()
+        
+        status = scheduler.status()["a"]
+        assert status["runs"] == 3
+        assert status["last_error"] == "boom"
+    
+    @pytest.mark.asyncio
+    async def test_scanner_runner(self):
+        """Test scheduled scans run standalone with a PortScanner."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={22})})
+        scanner = PortScanner(ScanConfig(timeout=0.5, service_detection=False), transport=network)
+        results = []
+        done = asyncio.Event()
+        
+        def on_result(scan, scan_results):
+            results.extend(scan_results)
+            done.set()
+        
+        scheduler = ScanScheduler(scanner_runner(scanner, on_result))
+        scheduler.add(ScheduledScan("a", ["10.0.0.1"], "20-25", interval=60, phase=0))
+        scheduler.start()
+        await asyncio.wait_for(done.wait(), timeout=5)
+        await scheduler.stop()
+        
+        assert [p.port for p in results[0].open_ports] == [22]
+    
+    @pytest.mark.asyncio
+    async def test_daemon_runs_schedule_as_jobs(self):
+        """Test the daemon submits scheduled scans as jobs."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={80})})
+        scanner = PortScanner(ScanConfig(timeout=0.5, service_detection=False), transport=network)
+        daemon = ScanDaemon(scanner, schedule=[
+            ScheduledScan("web", ["10.0.0.1"], "80", interval=60, phase=0),
+        ])
+        await daemon.start("127.0.0.1", 0)
+        
+        async def first_job():
+            # The first run is due at once; wait for its job to be submitted and finish
+            while not daemon.jobs:
+                await asyncio.sleep(0)
+            job = next(iter(daemon.jobs.values()))
+            await job.wait()
+            return job
+        
+        try:
+            job = await asyncio.wait_for(first_job(), timeout=5)
+        finally:
+            await daemon.close()
+        
+        assert job.schedule == "web"
+        assert job.status.value == "done"
+        assert daemon.scheduler.status()["web"]["runs"] == 1
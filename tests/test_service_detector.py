@@ -84,21 +84,26 @@ class TestServiceDetector:
     @pytest.mark.asyncio
     async def test_grab_banner_success(self, detector):
         """Test successful banner grabbing."""
-        with patch('asyncio.open_connection') as mock_conn:
-            mock_reader = AsyncMock()
-            mock_writer = AsyncMock()
-            mock_reader.read.return_value = b"HTTP/1.1 200 OK\r\n"
-            mock_conn.return_value = (mock_reader, mock_writer)
+        response = b"HTTP/1.1 200 OK\r\n"
+        
+        async def recv_into(buffer):
+            buffer[:len(response)] = response
+            return len(response)
+        
+        with patch.object(detector.transport, 'open_raw_connection') as mock_conn:
+            mock_connection = AsyncMock()
+            mock_connection.recv_into.side_effect = recv_into
+            mock_conn.return_value = mock_connection
             
             banner = await detector._grab_banner("127.0.0.1", 80)
             
             assert banner == "HTTP/1.1 200 OK"
-            mock_writer.close.assert_called_once()
+            mock_connection.close.assert_called_once()
     
     @pytest.mark.asyncio
     async def test_grab_banner_timeout(self, detector):
         """Test banner grabbing timeout."""
-        with patch('asyncio.open_connection') as mock_conn:
+        with patch.object(detector.transport, 'open_raw_connection') as mock_conn:
             mock_conn.side_effect = asyncio.TimeoutError()
             
             banner = await detector._grab_banner("127.0.0.1", 80)
@@ -108,7 +113,7 @@ class TestServiceDetector:
     @pytest.mark.asyncio
     async def test_grab_banner_connection_refused(self, detector):
         """Test banner grabbing with connection refused."""
-        with patch('asyncio.open_connection') as mock_conn:
+        with patch.object(detector.transport, 'open_raw_connection') as mock_conn:
             mock_conn.side_effect = ConnectionRefusedError()
             
             banner = await detector._grab_banner("127.0.0.1", 80)
@@ -159,3 +164,66 @@ class TestServiceDetector:
         banner = "Some unknown service response"
         service_type = detector._identify_from_banner(banner)
         assert service_type == ServiceType.UNKNOWN
+    
+    def test_identify_from_probe_response(self, detector):
+        """Test service identification from an active probe response."""
+        assert detector._identify_from_banner("+PONG") == ServiceType.REDIS
+    
+    @pytest.mark.asyncio
+    async def test_send_probes_stops_at_first_match(self, detector):
+        """Test that probing stops as soon as a probe matches."""
+        from scanhero.probes import get_probe
+        probes = [get_probe("elasticsearch"), get_probe("http-head"), get_probe("redis-ping")]
+        with patch.object(detector, '_exchange') as mock_exchange:
+            mock_exchange.side_effect = [b"HTTP/1.1 200 OK\r\n", b"HTTP/1.1 200 OK\r\n"]
+            
+            response = await detector._send_probes("127.0.0.1", 9200, probes, memoryview(bytearray(1024)))
+            
+            assert response == b"HTTP/1.1 200 OK\r\n"
+            assert mock_exchange.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_grab_banner_silent_service_uses_probe(self):
+        """Test that a server-speaks-second service is probed after the null window."""
+        async def handle(reader, writer):
+            await reader.readline()
+            writer.write(b"HTTP/1.0 200 OK\r\nServer: stand-in\r\n\r\n")
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        detector = ServiceDetector(timeout=2.0, null_probe_timeout=0.05)
+        try:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            banner = await detector._grab_banner("127.0.0.1", port)
+            elapsed = loop.time() - started
+        finally:
+            server.close()
+            await server.wait_closed()
+        
+        assert banner is not None
+        assert banner.startswith("HTTP/1.0 200 OK")
+        assert elapsed < 1.0
+    
+    @pytest.mark.asyncio
+    async def test_grab_banner_truncates_and_reuses_buffer(self):
+        """Test that only the start of a long banner is decoded and the buffer is pooled."""
+        async def handle(reader, writer):
+            writer.write(b"220 " + b"x" * 900 + b"\r\n")
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        detector = ServiceDetector(timeout=2.0, null_probe_timeout=1.0, max_banner_length=16)
+        try:
+            first = await detector._grab_banner("127.0.0.1", port)
+            second = await detector._grab_banner("127.0.0.1", port)
+        finally:
+            server.close()
+            await server.wait_closed()
+        
+        assert first == second == "220 " + "x" * 12
+        assert detector._buffers.idle == 1
@@ -0,0 +1,166 @@
+"""Tests for the simulated network transport."""
+
+import pytest
+import asyncio
+import errno
+import time
+from scanhero.exceptions import ConfigurationError
+from scanhero.models import PortStatus, ScanConfig, ServiceType
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+
+
+def fast_config(**overrides):
+    """Build a scan config with short timeouts for simulated scans."""
+    options = dict(timeout=0.05, retry_count=0, service_detection=False, null_probe_timeout=0.02)
+    options.update(overrides)
+    return ScanConfig(**options)
+
+
+class TestSimulatedHost:
+    """Test cases for SimulatedHost class."""
+    
+    def test_validation(self):
+        """Test that invalid host behaviour is rejected."""
+        with pytest.raises(ConfigurationError):
+            SimulatedHost(drop_rate=1.5)
+        with pytest.raises(ConfigurationError):
+            SimulatedHost(rtt=-0.1)
+        with pytest.raises(ConfigurationError):
+            SimulatedHost(default_status=PortStatus.OPEN)
+    
+    def test_is_filtered(self):
+        """Test filtered port lookup."""
+        host = SimulatedHost(open_ports={80}, filtered_ports={81})
+        assert host.is_filtered(81) is True
+        assert host.is_filtered(82) is False
+        
+        firewalled = SimulatedHost(open_ports={80}, default_status=PortStatus.FILTERED)
+        assert firewalled.is_filtered(80) is False
+        assert firewalled.is_filtered(82) is True
+
+
+class TestSimulatedNetwork:
+    """Test cases for SimulatedNetwork class."""
+    
+    @pytest.mark.asyncio
+    async def test_connect_outcomes(self):
+        """Test refused, unreachable and dropped connects."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(open_ports={22}),
+            "10.0.0.2": SimulatedHost(unreachable=True),
+        })
+        
+        _, writer = await network.open_connection("10.0.0.1", 22)
+        writer.close()
+        
+        with pytest.raises(ConnectionRefusedError):
+            await network.open_connection("10.0.0.1", 23)
+        
+        with pytest.raises(OSError) as exc_info:
+            await network.open_connection("10.0.0.2", 22)
+        assert exc_info.value.errno == errno.EHOSTUNREACH
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(network.open_connection("10.0.0.3", 22), timeout=0.01)
+        
+        assert network.connect_attempts == 4
+        assert network.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_banner_and_response(self):
+        """Test that banners arrive on connect and responses after a write."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(
+                open_ports={22, 80},
+                banners={22: b"SSH-2.0-OpenSSH_8.9\r\n"},
+                responses={80: b"HTTP/1.1 200 OK\r\n\r\n"},
+            ),
+        })
+        
+        reader, writer = await network.open_connection("10.0.0.1", 22)
+        assert await reader.read(1024) == b"SSH-2.0-OpenSSH_8.9\r\n"
+        writer.close()
+        
+        reader, writer = await network.open_connection("10.0.0.1", 80)
+        writer.write(b"HEAD / HTTP/1.0\r\n\r\n")
+        await writer.drain()
+        assert await reader.read(1024) == b"HTTP/1.1 200 OK\r\n\r\n"
+        writer.close()
+        await writer.wait_closed()
+    
+    @pytest.mark.asyncio
+    async def test_scan_statuses(self):
+        """Test a scan through the simulated network."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(open_ports={22, 80}, filtered_ports={443}),
+        })
+        scanner = PortScanner(fast_config(), transport=network)
+        
+        result = await scanner.scan("10.0.0.1", [22, 80, 443, 8080])
+        
+        assert [p.port for p in result.open_ports] == [22, 80]
+        assert [p.port for p in result.filtered_ports] == [443]
+        assert [p.port for p in result.closed_ports] == [8080]
+    
+    @pytest.mark.asyncio
+    async def test_service_detection(self):
+        """Test that service detection runs over the simulated network."""
+        network = SimulatedNetwork({
+            "10.0.0.1": SimulatedHost(
+                open_ports={22, 80},
+                banners={22: b"SSH-2.0-OpenSSH_8.9\r\n"},
+                responses={80: b"HTTP/1.1 200 OK\r\nServer: nginx\r\n\r\n"},
+            ),
+        })
+        scanner = PortScanner(fast_config(service_detection=True), transport=network)
+        
+        result = await scanner.scan("10.0.0.1", [22, 80])
+        
+        services = {p.port: p.service.service_type for p in result.open_ports}
+        assert services == {22: ServiceType.SSH, 80: ServiceType.HTTP}
+    
+    @pytest.mark.asyncio
+    async def test_deterministic_with_packet_loss(self):
+        """Test that the same seed gives the same results despite drops."""
+        def run():
+            host = SimulatedHost(open_ports=set(range(1, 201)), rtt=0.002, rtt_jitter=0.001, drop_rate=0.2)
+            network = SimulatedNetwork({"10.0.0.1": host}, seed=7)
+            scanner = PortScanner(fast_config(timeout=0.5, max_concurrent=50), transport=network)
+            return scanner.scan("10.0.0.1", "1-200")
+        
+        first = await run()
+        second = await run()
+        
+        filtered = [p.port for p in first.filtered_ports]
+        assert 0 < len(filtered) < 200
+        assert filtered == [p.port for p in second.filtered_ports]
+    
+    @pytest.mark.asyncio
+    async def test_large_sweep_respects_concurrency(self):
+        """Test a full port sweep in well under a second per thousand ports."""
+        network = SimulatedNetwork({"10.0.0.1": SimulatedHost(open_ports={22, 443}, rtt=0.005)})
+        scanner = PortScanner(fast_config(timeout=1.0, max_concurrent=500), transport=network)
+        
+        started = time.perf_counter()
+        result = await scanner.scan("10.0.0.1", "1-20000")
+        elapsed = time.perf_counter() - started
+        
+        assert result.closed_count == 19998
+        assert network.peak_in_flight <= 500
+        assert elapsed < 20
+    
+    @pytest.mark.asyncio
+    async def test_many_hosts_per_host_limit(self):
+        """Test a subnet sweep against the default host behaviour."""
+        network = SimulatedNetwork(default_host=SimulatedHost(open_ports={80}, rtt=0.002))
+        scanner = PortScanner(fast_config(timeout=1.0, max_concurrent=200, max_per_host=2), transport=network)
+        targets = [f"10.1.{i // 256}.{i % 256}" for i in range(1000)]
+        
+        results = await scanner.scan_hosts(targets, [80, 81])
+        
+        assert len(results) == 1000
+        assert all(r.open_count == 1 and r.closed_count == 1 for r in results)
+        assert network.peak_in_flight <= 200
+        # Hosts without random behaviour need no per-endpoint attempt counters
+        assert network._attempts == {}
@@ -0,0 +1,190 @@
+"""Tests for result sinks and streaming scans."""
+
+import pytest
+import io
+import json
+import sqlite3
+from scanhero.exceptions import ConfigurationError
+from scanhero.models import PortStatus, ScanConfig
+from scanhero.scanner import PortScanner
+from scanhero.simulation import SimulatedHost, SimulatedNetwork
+from scanhero.sinks import CallbackSink, JSONLSink, SQLiteSink
+
+
+def scanner():
+    """Build a scanner over a /24 where every host has port 22 open."""
+    network = SimulatedNetwork(default_host=SimulatedHost(open_ports={22}, filtered_ports={23}))
+    config = ScanConfig(timeout=0.05, retry_count=0, service_detection=False)
+    return PortScanner(config, transport=network)
+
+
+def hosts(count):
+    """Generate host addresses."""
+    return (f"10.0.{i // 250}.{i % 250 + 1}" for i in range(count))
+
+
+class TestSinks:
+    """Test cases for the sink classes."""
+    
+    @pytest.mark.asyncio
+    async def test_jsonl(self, tmp_path):
+        """Test each host becomes one JSON line."""
+        path = tmp_path / "out.jsonl"
+        with JSONLSink(str(path)) as sink:
+            await scanner().scan_to_sink(["10.0.0.1", "10.0.0.2"], "21-23", sink)
+        
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["target"] for line in lines] == ["10.0.0.1", "10.0.0.2"]
+        assert lines[0]["summary"]["open_ports"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_jsonl_overwrites_unless_appending(self, tmp_path):
+        """Test a JSON lines file is overwritten by default and extended with append."""
+        path = tmp_path / "out.jsonl"
+        path.write_text('{"target": "stale"}\n')
+        with JSONLSink(str(path)) as sink:
+            await scanner().scan_to_sink(["10.0.0.1"], [22], sink)
+        with JSONLSink(str(path), append=True) as sink:
+            await scanner().scan_to_sink(["10.0.0.2"], [22], sink)
+        
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["target"] for line in lines] == ["10.0.0.1", "10.0.0.2"]
+    
+    @pytest.mark.asyncio
+    async def test_jsonl_stream_left_open(self):
+        """Test a caller's stream is written to but not closed."""
+        stream = io.StringIO()
+        with JSONLSink(stream=stream) as sink:
+            await scanner().scan_to_sink(["10.0.0.1"], [22], sink)
+        assert not stream.closed
+        assert json.loads(stream.getvalue())["target"] == "10.0.0.1"
+        with pytest.raises(ValueError):
+            JSONLSink()
+    
+    @pytest.mark.asyncio
+    async def test_sqlite(self, tmp_path):
+        """Test hosts and port rows are stored, optionally without closed ports."""
+        path = str(tmp_path / "out.db")
+        with SQLiteSink(path, store_closed=False) as sink:
+            await scanner().scan_to_sink(["10.0.0.1", "10.0.0.2"], "21-23", sink)
+        
+        db = sqlite3.connect(path)
+        assert db.execute("SELECT target, open_ports, closed_ports FROM hosts ORDER BY id").fetchall() == [
+            ("10.0.0.1", 1, 1), ("10.0.0.2", 1, 1)
+        ]
+        assert db.execute("SELECT DISTINCT port, status FROM ports ORDER BY port").fetchall() == [
+            (22, "open"), (23, "filtered")
+        ]
+        db.close()
+    
+    @pytest.mark.asyncio
+    async def test_async_callback(self):
+        """Test coroutine callbacks are awaited."""
+        seen = []
+        
+        async def record(result):
+            seen.append(result.target)
+        
+        await scanner().scan_to_sink(["10.0.0.1"], [22], CallbackSink(record))
+        assert seen == ["10.0.0.1"]
+
+
+class TestScanToSink:
+    """Test cases for PortScanner.scan_to_sink."""
+    
+    @pytest.mark.asyncio
+    async def test_summary(self):
+        """Test totals are counted and open ports kept only when asked."""
+        summary = await scanner().scan_to_sink(hosts(20), "21-23", CallbackSink(lambda r: None))
+        assert (summary.hosts, summary.total_ports, summary.open_count) == (20, 60, 20)
+        assert (summary.closed_count, summary.filtered_count) == (20, 20)
+        assert summary.open_ports == {}
+        
+        summary = await scanner().scan_to_sink(
+            hosts(3), [22, 80], CallbackSink(lambda r: None), retain_open_ports=True
+        )
+        assert {t: [p.port for p in r] for t, r in summary.open_ports.items()} == {
+            "10.0.0.1": [22], "10.0.0.2": [22], "10.0.0.3": [22]
+        }
+        assert summary.open_ports["10.0.0.1"][0].status is PortStatus.OPEN
+    
+    @pytest.mark.asyncio
+    async def test_targets_read_as_hosts_finish(self):
+        """Test results are written before later targets are read."""
+        consumed = []
+        written_at = []
+        
+        def targets():
+            for host in hosts(40):
+                consumed.append(host)
+                yield host
+        
+        sink = CallbackSink(lambda r: written_at.append(len(consumed)))
+        summary = await scanner().scan_to_sink(targets(), "20-29", sink, batch_ports=100)
+        
+        assert summary.hosts == 40
+        assert written_at[0] == 10
+        assert written_at[-1] == 40
+        # Never more than the window of ten hosts is read ahead of the sink
+        assert all(seen <= 10 + i for i, seen in enumerate(written_at))
+    
+    @pytest.mark.asyncio
+    async def test_slow_host_does_not_hold_up_others(self):
+        """Test later targets are scanned and written while a slow host is still running."""
+        network = SimulatedNetwork(
+            {"10.0.0.1": SimulatedHost(open_ports={22}, rtt=0.5)},
+            default_host=SimulatedHost(open_ports={22}),
+        )
+        config = ScanConfig(timeout=2.0, retry_count=0, service_detection=False)
+        written = []
+        sink = CallbackSink(lambda r: written.append(r.target))
+        
+        summary = await PortScanner(config, transport=network).scan_to_sink(
+            hosts(40), [22, 80], sink, batch_ports=20
+        )
+        
+        assert summary.hosts == 40
+        assert summary.open_count == 40
+        assert written[-1] == "10.0.0.1"
+    
+    @pytest.mark.asyncio
+    async def test_host_discovery_on_streamed_hosts(self):
+        """Test hosts read one at a time into the window still go through host discovery."""
+        network = SimulatedNetwork(
+            {"10.0.0.3": SimulatedHost(unreachable=True), "10.0.0.5": SimulatedHost(unreachable=True)},
+            default_host=SimulatedHost(open_ports={22}),
+        )
+        config = ScanConfig(
+            timeout=0.5, retry_count=0, service_detection=False,
+            host_discovery=True, discovery_ports=[22], discovery_timeout=0.1
+        )
+        written = []
+        
+        summary = await PortScanner(config, transport=network).scan_to_sink(
+            hosts(6), [22], CallbackSink(lambda r: written.append(r.target)), batch_ports=2
+        )
+        
+        assert sorted(written) == ["10.0.0.1", "10.0.0.2", "10.0.0.4", "10.0.0.6"]
+        assert (summary.hosts, summary.hosts_skipped) == (4, 2)
+    
+    @pytest.mark.asyncio
+    async def test_deadline_reports_remaining_targets(self):
+        """Test targets not reached before the deadline are written as unscanned."""
+        network = SimulatedNetwork(default_host=SimulatedHost(open_ports={22}, rtt=0.2))
+        config = ScanConfig(timeout=2.0, retry_count=0, service_detection=False, scan_deadline=0.1)
+        written = []
+        
+        summary = await PortScanner(config, transport=network).scan_to_sink(
+            hosts(30), [22], CallbackSink(written.append), batch_ports=10
+        )
+        
+        assert summary.hosts == 30
+        assert summary.incomplete_hosts == 30
+        assert sorted(r.target for r in written) == sorted(hosts(30))
+        assert all(r.unscanned_ports == [22] for r in written)
+    
+    @pytest.mark.asyncio
+    async def test_invalid_batch_size(self):
+        """Test a batch size below one is rejected."""
+        with pytest.raises(ConfigurationError):
+            await scanner().scan_to_sink(["10.0.0.1"], [22], CallbackSink(print), batch_ports=0)
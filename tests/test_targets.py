@@ -0,0 +1,125 @@
+"""Tests for target specification parsing."""
+
+import pytest
+import io
+from scanhero.targets import (
+    ExclusionList, count_targets, expand_target_lines, expand_targets, read_exclude_file, read_target_file
+)
+from scanhero.exceptions import InvalidTargetError
+
+
+class TestExpandTargets:
+    """Test cases for expand_targets."""
+    
+    def test_single_host(self):
+        """Test a single hostname."""
+        assert list(expand_targets("example.com")) == ["example.com"]
+    
+    def test_comma_separated(self):
+        """Test a comma-separated list of targets."""
+        assert list(expand_targets("10.0.0.1, example.com,")) == ["10.0.0.1", "example.com"]
+    
+    def test_cidr(self):
+        """Test that networks expand to their usable hosts."""
+        assert list(expand_targets("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+    
+    def test_single_address_network(self):
+        """Test a /32 network."""
+        assert list(expand_targets("10.0.0.7/32")) == ["10.0.0.7"]
+    
+    def test_invalid_network(self):
+        """Test that an invalid network is rejected."""
+        with pytest.raises(InvalidTargetError):
+            list(expand_targets("10.0.0.0/33"))
+    
+    def test_count_matches_expansion(self):
+        """Test that counting agrees with expansion without expanding."""
+        for spec in ["example.com", "10.0.0.0/30, 10.0.0.7/32", "10.0.0.0/31", "fd00::/126", "10.0.0.0/33,a"]:
+            try:
+                expected = len(list(expand_targets(spec)))
+            except InvalidTargetError:
+                expected = 1
+            assert count_targets(spec) == expected
+        assert count_targets("10.0.0.0/8") == 2 ** 24 - 2
+
+
+class TestTargetFiles:
+    """Test cases for reading target lists."""
+    
+    def test_lines(self):
+        """Test separators, comments and networks in target lines."""
+        lines = ["10.0.0.1 example.com\n", "# all of them\n", "\n", "10.0.1.0/30,10.0.2.1  # lab\n"]
+        assert list(expand_target_lines(lines)) == [
+            "10.0.0.1", "example.com", "10.0.1.1", "10.0.1.2", "10.0.2.1"
+        ]
+    
+    def test_lazy(self):
+        """Test lines are only read as hosts are taken."""
+        read = []
+        
+        def lines():
+            for line in ["10.0.0.0/8\n", "10.1.0.1\n"]:
+                read.append(line)
+                yield line
+        
+        hosts = expand_target_lines(lines())
+        assert next(hosts) == "10.0.0.1"
+        assert read == ["10.0.0.0/8\n"]
+    
+    def test_invalid_line(self):
+        """Test an invalid network names its line."""
+        with pytest.raises(InvalidTargetError, match="Line 2"):
+            list(expand_target_lines(["10.0.0.1\n", "10.0.0.0/33\n"]))
+    
+    def test_file_and_stdin(self, tmp_path, monkeypatch):
+        """Test reading a file and standard input."""
+        path = tmp_path / "targets.txt"
+        path.write_text("10.0.0.1\n10.0.0.2\n")
+        assert list(read_target_file(str(path))) == ["10.0.0.1", "10.0.0.2"]
+        
+        monkeypatch.setattr("sys.stdin", io.StringIO("example.com\n"))
+        assert list(read_target_file("-")) == ["example.com"]
+    
+    def test_missing_file(self, tmp_path):
+        """Test an unreadable file raises InvalidTargetError before any host is read."""
+        with pytest.raises(InvalidTargetError):
+            read_target_file(str(tmp_path / "missing.txt"))
+
+
+class TestExclusionList:
+    """Test cases for ExclusionList class."""
+    
+    def test_specs(self):
+        """Test addresses, networks and ranges of both IP versions."""
+        exclude = ExclusionList(["10.0.0.0/24, 192.0.2.10-192.0.2.20", "2001:db8::/64 198.51.100.7"])
+        assert "10.0.0.200" in exclude
+        assert "192.0.2.15" in exclude and "192.0.2.21" not in exclude
+        assert "198.51.100.7" in exclude
+        assert "2001:db8::1" in exclude and "2001:db9::1" not in exclude
+        assert "example.com" not in exclude
+        assert not ExclusionList()
+    
+    def test_invalid(self):
+        """Test host names and reversed ranges are rejected."""
+        for spec in ["example.com", "10.0.0.9-10.0.0.1", "10.0.0.1-2001:db8::1"]:
+            with pytest.raises(InvalidTargetError):
+                ExclusionList([spec])
+    
+    def test_expansion_skips_excluded(self):
+        """Test excluded hosts and network parts are left out."""
+        exclude = ExclusionList(["10.0.0.0/29", "10.0.0.13-10.0.0.14", "10.0.1.5"])
+        assert list(expand_targets("10.0.0.0/28,10.0.1.5,example.com", exclude)) == [
+            "10.0.0.8", "10.0.0.9", "10.0.0.10", "10.0.0.11", "10.0.0.12", "example.com"
+        ]
+        assert list(expand_targets("10.0.0.0/29", exclude)) == []
+    
+    def test_large_exclusion_is_skipped_wholesale(self):
+        """Test an excluded /8 inside a /7 is not expanded address by address."""
+        hosts = expand_targets("10.0.0.0/7", ExclusionList(["10.0.0.0/8"]))
+        assert next(hosts) == "11.0.0.0"
+    
+    def test_exclude_file(self, tmp_path):
+        """Test exclusions are read from a file with comments."""
+        path = tmp_path / "exclude.txt"
+        path.write_text("# production\n10.1.0.0/16 10.2.0.1\n\n10.3.0.1-10.3.0.9  # partner\n")
+        assert read_exclude_file(str(path)) == ["10.1.0.0/16", "10.2.0.1", "10.3.0.1-10.3.0.9"]